@@ -0,0 +1,247 @@
+"""
+Materialized analytics rollups for films, books and shows (rebuild with: python analytics_rollups.py)
+"""
+import re
+from collections import defaultdict
+from decimal import Decimal, ROUND_HALF_UP
+
+# Base-table columns each rollup family is computed from
+SOURCE_COLUMNS = {
+    'films': ['year_watched', 'date_seen', 'release_year', 'rotten_tomatoes', 'score'],
+    'books': ['year', 'type', 'form', 'author', 'score'],
+    'shows': ['start_year', 'score']
+}
+
+RT_RANGES = [
+    (90, '90-100%'), (80, '80-89%'), (70, '70-79%'), (60, '60-69%'), (50, '50-59%'),
+    (40, '40-49%'), (30, '30-39%'), (20, '20-29%'), (10, '10-19%'), (0, '0-9%')
+]
+
+DATE_PATTERN = re.compile(r'^.{4}-.{2}-.{2}$')
+LEADING_INT = re.compile(r'^\s*([+-]?\d+)')
+
+
+def _leading_int(value):
+    """Integer prefix of a string, like SQLite's CAST(... AS INTEGER) (0 if none)"""
+    match = LEADING_INT.match(str(value))
+    return int(match.group(1)) if match else 0
+
+
+def _as_number(value):
+    """A numeric column value as a float; None for NULL, '' and anything else that isn't a number"""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _round_score(value):
+    """Round to 2 places, half away from zero like SQL's ROUND()"""
+    return float(Decimal(str(value)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
+
+
+def by_count(row):
+    """Sort key: most common buckets first"""
+    return (-row['count'], row['bucket'])
+
+
+def by_number(row):
+    """Sort key: '1994', '1990s' numerically, with 'Pre-1950' style buckets first"""
+    return _leading_int(row['bucket'])
+
+
+def by_rt_range(row):
+    """Sort key: Rotten Tomatoes ranges from 90-100% down to 0-9%"""
+    return [label for _, label in RT_RANGES].index(row['bucket'])
+
+
+def _decade(year, cutoff):
+    """Decade bucket of a year; None when the year isn't a number"""
+    year = _as_number(year)
+    if year is None:
+        return None
+    year = int(year)
+    if year < cutoff:
+        return f'Pre-{cutoff}'
+    return f'{(year // 10) * 10}s'
+
+
+def _film_buckets(row):
+    """Yield the (rollup, bucket) pairs a film row counts towards"""
+    year_watched = row.get('year_watched')
+    date_seen = row.get('date_seen')
+    watch_year = None
+    if year_watched not in (None, ''):
+        watch_year = str(year_watched)
+    elif date_seen and DATE_PATTERN.match(date_seen):
+        watch_year = date_seen[:4]
+    if watch_year is not None:
+        yield 'film_watch_year', watch_year
+
+    release_decade = _decade(row.get('release_year'), 1950)
+    if release_decade is not None:
+        yield 'film_release_decade', release_decade
+
+    rotten_tomatoes = row.get('rotten_tomatoes')
+    if rotten_tomatoes not in (None, ''):
+        rt_score = _leading_int(str(rotten_tomatoes).replace('%', ''))
+        yield 'film_rt_range', next(label for floor, label in RT_RANGES if rt_score >= floor or floor == 0)
+
+
+def _book_buckets(row):
+    if row.get('year') is not None:
+        yield 'book_year', str(row['year'])
+    for column in ('type', 'form', 'author'):
+        if row.get(column):
+            yield f'book_{column}', row[column]
+
+
+def _show_buckets(row):
+    decade = _decade(row.get('start_year'), 1990)
+    if decade is not None:
+        yield 'show_decade', decade
+
+
+BUCKET_FUNCTIONS = {
+    'films': _film_buckets,
+    'books': _book_buckets,
+    'shows': _show_buckets
+}
+
+
+class AnalyticsRollups:
+    """Maintains and reads the analytics_rollups table"""
+
+    def __init__(self, use_postgres):
+        self._use_postgres = use_postgres
+        self._placeholder = '%s' if use_postgres else '?'
+
+    def ensure_schema(self, conn):
+        score_type = 'DOUBLE PRECISION' if self._use_postgres else 'REAL'
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS analytics_rollups (
+                rollup TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                score_sum {score_type} NOT NULL DEFAULT 0,
+                score_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (rollup, bucket)
+            )
+        ''')
+
+    def depends_on(self, table, columns):
+        """True if writing any of ``columns`` can move a row of ``table`` between buckets"""
+        return any(column in SOURCE_COLUMNS.get(table, ()) for column in columns)
+
+    def is_empty(self, conn):
+        cursor = conn.cursor()
+        cursor.execute('SELECT COUNT(*) FROM analytics_rollups')
+        return cursor.fetchone()[0] == 0
+
+    def _fetch_row(self, conn, table, row_id, lock=False):
+        columns = SOURCE_COLUMNS[table]
+        query = f'SELECT {", ".join(columns)} FROM {table} WHERE id = {self._placeholder}'
+        # Lock the row so concurrent updates to it apply their deltas one after another
+        if lock and self._use_postgres:
+            query += ' FOR UPDATE'
+        cursor = conn.cursor()
+        cursor.execute(query, (row_id,))
+        row = cursor.fetchone()
+        return dict(zip(columns, row)) if row else None
+
+    def snapshot(self, conn, table, row_id):
+        """Read the rollup-relevant columns of a row before it is updated or deleted"""
+        return self._fetch_row(conn, table, row_id, lock=True)
+
+    def apply(self, conn, table, row_id, before):
+        """Apply the rollup delta between ``before`` and the row's current state
+
+        Call after the INSERT/UPDATE/DELETE and before commit; ``before`` is None for
+        inserts and the row is simply missing after deletes.
+        """
+        after = self._fetch_row(conn, table, row_id)
+        deltas = defaultdict(lambda: [0, 0, 0])  # (rollup, bucket) -> [count, score_sum, score_count]
+        for row, sign in ((before, -1), (after, 1)):
+            if row is None:
+                continue
+            score = _as_number(row.get('score'))
+            for key in BUCKET_FUNCTIONS[table](row):
+                delta = deltas[key]
+                delta[0] += sign
+                if score is not None:
+                    delta[1] += sign * score
+                    delta[2] += sign
+        self._write_deltas(conn, deltas)
+
+    def _write_deltas(self, conn, deltas):
+        changed = [(key, delta) for key, delta in deltas.items() if any(delta)]
+        if not changed:
+            return
+        p = self._placeholder
+        cursor = conn.cursor()
+        for (rollup, bucket), (count, score_sum, score_count) in changed:
+            cursor.execute(f'''
+                INSERT INTO analytics_rollups (rollup, bucket, count, score_sum, score_count)
+                VALUES ({p}, {p}, {p}, {p}, {p})
+                ON CONFLICT (rollup, bucket) DO UPDATE SET
+                    count = analytics_rollups.count + excluded.count,
+                    score_sum = analytics_rollups.score_sum + excluded.score_sum,
+                    score_count = analytics_rollups.score_count + excluded.score_count
+            ''', (rollup, bucket, count, score_sum, score_count))
+        cursor.execute('DELETE FROM analytics_rollups WHERE count <= 0')
+
+    def rebuild(self, conn, tables=None):
+        """Recompute rollups from scratch (all tables, or just ``tables``)"""
+        cursor = conn.cursor()
+        rebuilt = {}
+        for table in tables or BUCKET_FUNCTIONS:
+            prefix = table[:-1] + '_'  # films -> film_, books -> book_, shows -> show_
+            cursor.execute(f'DELETE FROM analytics_rollups WHERE rollup LIKE {self._placeholder}', (prefix + '%',))
+            cursor.execute(f'SELECT {", ".join(SOURCE_COLUMNS[table])} FROM {table}')
+            deltas = defaultdict(lambda: [0, 0, 0])
+            rows = 0
+            for values in cursor.fetchall():
+                row = dict(zip(SOURCE_COLUMNS[table], values))
+                score = _as_number(row.get('score'))
+                for key in BUCKET_FUNCTIONS[table](row):
+                    delta = deltas[key]
+                    delta[0] += 1
+                    if score is not None:
+                        delta[1] += score
+                        delta[2] += 1
+                rows += 1
+            self._write_deltas(conn, deltas)
+            rebuilt[table] = {'rows': rows, 'buckets': len(deltas)}
+        return rebuilt
+
+    def read(self, conn, rollup):
+        """Return [{bucket, count, avg_score}] for one rollup (unordered)"""
+        cursor = conn.cursor()
+        cursor.execute(
+            f'SELECT bucket, count, score_sum, score_count FROM analytics_rollups WHERE rollup = {self._placeholder}',
+            (rollup,)
+        )
+        return [
+            {
+                'bucket': bucket,
+                'count': count,
+                'avg_score': _round_score(score_sum / score_count) if score_count else None
+            }
+            for bucket, count, score_sum, score_count in cursor.fetchall()
+        ]
+
+
+if __name__ == '__main__':
+    from app import get_db, analytics_rollups, table_versions
+
+    with get_db() as conn:
+        result = analytics_rollups.rebuild(conn)
+        for table in result:
+            table_versions.bump(conn, table)
+        table_versions.commit(conn)
+
+    for table, info in result.items():
+        print(f"✓ Rebuilt {table} rollups: {info['buckets']} buckets from {info['rows']} rows")
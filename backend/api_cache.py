@@ -0,0 +1,335 @@
+"""
+Persistent on-disk cache for upstream API lookups (TMDB, OMDb, Google Books, Open Library)
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import requests
+
+DAY = 24 * 60 * 60
+
+# How long a found result stays fresh, per source
+SOURCE_TTLS = {
+    'tmdb': 30 * DAY,
+    'tmdb_watch_providers': 1 * DAY,  # streaming availability changes often
+    'omdb': 7 * DAY,                  # RT scores move after release
+    'google_books': 30 * DAY,
+    'open_library': 14 * DAY
+}
+
+# How long a "not found" answer is trusted before asking again
+NEGATIVE_TTLS = {
+    'tmdb': 3 * DAY,
+    'tmdb_watch_providers': 1 * DAY,
+    'omdb': 3 * DAY,
+    'google_books': 3 * DAY,
+    'open_library': 3 * DAY
+}
+
+# Query parameters that identify the caller, not the request
+SECRET_PARAMS = {'api_key', 'apikey', 'key'}
+
+# Free-text title/search parameters the upstream APIs match case-insensitively
+# (TMDB query, OMDb t/s, Google Books and Open Library q, Open Library title/author)
+FREE_TEXT_PARAMS = {'query', 'q', 't', 's', 'title', 'author'}
+
+# Stores between checks of the total cache size
+EVICTION_CHECK_INTERVAL = 50
+
+
+class CacheMiss(requests.exceptions.RequestException):
+    """Raised in offline mode when a request has no cached response"""
+
+
+class CachedResponse:
+    """The parts of requests.Response that the service modules use"""
+
+    from_cache = True
+
+    def __init__(self, status_code, body, url):
+        self.status_code = status_code
+        self.url = url
+        self.text = body
+        self.headers = {}
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f'{self.status_code} Error (cached) for url: {self.url}', response=self)
+
+
+def _json_body(response):
+    try:
+        return response.json()
+    except ValueError:
+        return None
+
+
+def is_negative(source, response):
+    """True if a cacheable response means "nothing found" rather than a result"""
+    if response.status_code == 404:
+        return True
+    data = _json_body(response)
+    if not isinstance(data, dict):
+        return False
+    if source == 'omdb':
+        return data.get('Response') == 'False'
+    if source == 'google_books':
+        return 'items' not in data and 'volumeInfo' not in data
+    if source == 'open_library':
+        return data.get('numFound') == 0
+    if source == 'tmdb':
+        return data.get('results') == []
+    return False
+
+
+def is_cacheable(source, response):
+    """Only answers that will not change on retry: 200s (minus OMDb errors) and 404s"""
+    if response.status_code == 404:
+        return True
+    if response.status_code != 200:
+        return False
+    data = _json_body(response)
+    if source == 'omdb' and isinstance(data, dict) and data.get('Response') == 'False':
+        # "Movie not found!" is an answer; "Request limit reached!" / "Invalid API key!" are not
+        return 'not found' in (data.get('Error') or '').lower()
+    return data is not None
+
+
+def _normalize_value(name, value):
+    if name in FREE_TEXT_PARAMS:
+        return ' '.join(str(value).split()).casefold()
+    return str(value)
+
+
+def normalize_request(source, url, params=None):
+    """Canonical JSON for a request: secrets dropped, params sorted, free-text values trimmed and case-folded"""
+    normalized = sorted(
+        (name, _normalize_value(name, value))
+        for name, value in (params or {}).items()
+        if name not in SECRET_PARAMS and value is not None and value != ''
+    )
+    return json.dumps([source, url, normalized], ensure_ascii=False, separators=(',', ':'))
+
+
+class ApiCache:
+    """SQLite-backed response cache shared by the service modules and backfill scripts"""
+
+    def __init__(self, path=None, max_bytes=None, offline=None):
+        default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api_cache.db')
+        self.path = path or os.getenv('API_CACHE_PATH', default_path)
+        self.max_bytes = max_bytes or int(float(os.getenv('API_CACHE_MAX_MB', '200')) * 1024 * 1024)
+        self.offline = offline if offline is not None else os.getenv('API_CACHE_OFFLINE', '') == '1'
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._schema_ready = False
+        self._stores_since_check = 0
+        self._stats = {}  # source -> counters
+
+    # ---- storage ----
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        if not self._schema_ready:
+            with self._lock:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS api_cache (
+                        key TEXT PRIMARY KEY,
+                        source TEXT NOT NULL,
+                        request TEXT NOT NULL,
+                        status_code INTEGER NOT NULL,
+                        negative INTEGER NOT NULL DEFAULT 0,
+                        body TEXT NOT NULL,
+                        size INTEGER NOT NULL,
+                        created_at REAL NOT NULL,
+                        expires_at REAL NOT NULL,
+                        accessed_at REAL NOT NULL
+                    )
+                ''')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_api_cache_accessed ON api_cache (accessed_at)')
+                conn.commit()
+                self._schema_ready = True
+        return conn
+
+    def _count(self, source, counter, amount=1):
+        with self._lock:
+            entry = self._stats.setdefault(source, {
+                'hits': 0, 'negative_hits': 0, 'stale_hits': 0, 'misses': 0,
+                'stores': 0, 'offline_misses': 0, 'refreshes': 0
+            })
+            entry[counter] += amount
+
+    def _lookup(self, key):
+        conn = self._connection()
+        row = conn.execute(
+            'SELECT status_code, negative, body, expires_at, accessed_at FROM api_cache WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        # Recency only matters to eviction, so don't turn every hit into a write
+        if now - row[4] > 60 * 60:
+            conn.execute('UPDATE api_cache SET accessed_at = ? WHERE key = ?', (now, key))
+            conn.commit()
+        return row
+
+    def _store(self, key, source, request_text, response):
+        negative = is_negative(source, response)
+        ttl = NEGATIVE_TTLS[source] if negative else SOURCE_TTLS[source]
+        body = response.text
+        now = time.time()
+        conn = self._connection()
+        conn.execute('''
+            INSERT OR REPLACE INTO api_cache
+                (key, source, request, status_code, negative, body, size, created_at, expires_at, accessed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (key, source, request_text, response.status_code, int(negative), body,
+              len(body.encode('utf-8')) + len(request_text), now, now + ttl, now))
+        conn.commit()
+        self._count(source, 'stores')
+
+        with self._lock:
+            self._stores_since_check += 1
+            check = self._stores_since_check >= EVICTION_CHECK_INTERVAL
+            if check:
+                self._stores_since_check = 0
+        if check:
+            self.evict()
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones, until the file is under max_bytes"""
+        conn = self._connection()
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM api_cache').fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        evicted = conn.execute('DELETE FROM api_cache WHERE expires_at < ?', (time.time(),)).rowcount
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM api_cache').fetchone()[0]
+        # Trim to 90% so the next few stores don't immediately trigger another pass
+        target = self.max_bytes * 0.9
+        while total > target:
+            rows = conn.execute('SELECT key, size FROM api_cache ORDER BY accessed_at LIMIT 500').fetchall()
+            if not rows:
+                break
+            victims = []
+            for key, size in rows:
+                victims.append((key,))
+                total -= size
+                if total <= target:
+                    break
+            conn.executemany('DELETE FROM api_cache WHERE key = ?', victims)
+            evicted += len(victims)
+        conn.commit()
+        return evicted
+
+    # ---- public API ----
+
+    def get(self, source, url, params, fetch, refresh=False):
+        """Return the cached response for a request, or call ``fetch()`` and cache its result
+
+        ``fetch`` performs the real request and returns a requests.Response. In offline
+        mode nothing is fetched: expired entries are still served, and a request that was
+        never cached raises CacheMiss. With ``refresh`` a fresh entry is ignored and
+        replaced (offline mode still serves it).
+        """
+        request_text = normalize_request(source, url, params)
+        key = hashlib.sha256(request_text.encode('utf-8')).hexdigest()
+
+        row = self._lookup(key) if not refresh or self.offline else None
+        if row is not None:
+            status_code, negative, body, expires_at, _ = row
+            fresh = expires_at >= time.time()
+            if fresh or self.offline:
+                self._count(source, 'negative_hits' if negative else 'hits')
+                if not fresh:
+                    self._count(source, 'stale_hits')
+                return CachedResponse(status_code, body, url)
+
+        if self.offline:
+            self._count(source, 'offline_misses')
+            raise CacheMiss(f'Not in API cache (offline mode): {url}')
+
+        self._count(source, 'refreshes' if refresh else 'misses')
+        response = fetch()
+        response.from_cache = False
+        if is_cacheable(source, response):
+            self._store(key, source, request_text, response)
+        return response
+
+    def stats(self):
+        with self._lock:
+            sources = {source: dict(counters) for source, counters in self._stats.items()}
+        try:
+            conn = self._connection()
+            entries, size = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM api_cache').fetchone()
+        except sqlite3.Error:
+            entries, size = None, None
+        return {
+            'path': self.path,
+            'offline': self.offline,
+            'entries': entries,
+            'size_bytes': size,
+            'max_bytes': self.max_bytes,
+            'sources': sources
+        }
+
+    def network_calls(self):
+        """Total requests that went upstream (lets scripts skip their sleep() on cache hits)"""
+        with self._lock:
+            return sum(counters['misses'] for counters in self._stats.values())
+
+
+api_cache = ApiCache()
+
+
+def add_cache_only_argument(parser):
+    """Add the shared --cache-only flag to a script's argparse parser"""
+    parser.add_argument('--cache-only', action='store_true',
+                        help='Offline mode: use only cached API responses and make no network calls')
+
+
+def apply_cache_args(args):
+    if args.cache_only:
+        api_cache.offline = True
+        print("📦 Cache-only mode: no network calls will be made")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Inspect or trim the API response cache')
+    parser.add_argument('--evict', action='store_true', help='Apply the size bound now')
+    parser.add_argument('--clear', metavar='SOURCE', help="Delete every entry for a source ('all' for everything)")
+    args = parser.parse_args()
+
+    if args.clear:
+        conn = api_cache._connection()
+        if args.clear == 'all':
+            deleted = conn.execute('DELETE FROM api_cache').rowcount
+        else:
+            deleted = conn.execute('DELETE FROM api_cache WHERE source = ?', (args.clear,)).rowcount
+        conn.commit()
+        print(f"✓ Deleted {deleted} cached responses")
+    if args.evict:
+        print(f"✓ Evicted {api_cache.evict()} cached responses")
+
+    conn = api_cache._connection()
+    print(f"API cache: {api_cache.path}")
+    for source, count, negative, size in conn.execute('''
+        SELECT source, COUNT(*), SUM(negative), SUM(size) FROM api_cache GROUP BY source ORDER BY source
+    '''):
+        print(f"  {source}: {count} entries ({negative} not-found), {size / 1024:.0f} KB")
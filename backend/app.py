@@ -1,12 +1,29 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, redirect, send_file
 from flask_cors import CORS
-import sqlite3
 import os
-from tmdb_service import search_movie, get_movie_details, search_tv_show, get_tv_show_details, get_movie_watch_providers, get_tv_watch_providers
+import threading
+from contextlib import contextmanager
+from db_pool import PostgresConnectionPool, SQLiteConnectionPool
+from table_versions import TableVersionTracker
+from response_cache import ResponseCache
+from analytics_rollups import AnalyticsRollups, by_count, by_number, by_rt_range
+from genre_index import GenreIndex, genre_key
+from search_index import SearchIndex
+from title_matcher import TitleIndex
+from film_enrichment import FilmEnricher, DEFAULT_BUDGET_SECONDS, MAX_BUDGET_SECONDS
+from enrichment_jobs import EnrichmentJobQueue
+from batch_jobs import BatchJobRunner
+from provider_refresh import ProviderRefreshScheduler, REFRESH_BUDGET as PROVIDER_REFRESH_BUDGET
+from api_cache import api_cache
+from omdb_service import omdb_client
+from book_enrichment import book_enricher
+from image_cache import image_store, ImageUnavailable, VARIANTS as IMAGE_VARIANTS
+from poster_images import PosterPlaceholders, POSTER_FILE, poster_source, poster_srcset, ingest_poster
+from tmdb_service import tmdb_client, search_movie, get_movie_bundle, search_tv_show, get_tv_show_details, get_movie_watch_providers, get_tv_watch_providers
 import json
 import re
+import base64
 from urllib.parse import urlparse
-import requests
 
 app = Flask(__name__)
 CORS(app)
@@ -22,8 +39,7 @@ DATABASE_URL = os.getenv('DATABASE_URL')
 USE_POSTGRES = DATABASE_URL is not None
 
 if USE_POSTGRES:
-    import psycopg2
-    from psycopg2.extras import RealDictCursor
+    from psycopg2.extras import RealDictCursor, execute_batch
 
     # Parse DATABASE_URL for psycopg2
     result = urlparse(DATABASE_URL)
@@ -35,317 +51,416 @@ if USE_POSTGRES:
         'port': result.port
     }
 
+_db_pool = None
+_db_pool_lock = threading.Lock()
+
+def get_db_pool():
+    """Get the process-wide connection pool, creating it on first use (after gunicorn forks)"""
+    global _db_pool
+    if _db_pool is None:
+        with _db_pool_lock:
+            if _db_pool is None:
+                if USE_POSTGRES:
+                    _db_pool = PostgresConnectionPool(
+                        DB_CONFIG,
+                        minconn=int(os.getenv('DB_POOL_MIN', 1)),
+                        maxconn=int(os.getenv('DB_POOL_MAX', 10)),
+                        checkout_timeout=float(os.getenv('DB_POOL_TIMEOUT', 10)),
+                        health_check_interval=float(os.getenv('DB_POOL_HEALTH_CHECK_INTERVAL', 30))
+                    )
+                else:
+                    _db_pool = SQLiteConnectionPool(DATABASE)
+    return _db_pool
+
+@contextmanager
 def get_db():
-    """Get database connection (PostgreSQL or SQLite based on environment)"""
-    if USE_POSTGRES:
-        conn = psycopg2.connect(**DB_CONFIG)
-        return conn
-    else:
-        conn = sqlite3.connect(DATABASE)
-        conn.row_factory = sqlite3.Row
-        return conn
+    """Check out a pooled database connection (PostgreSQL or SQLite based on environment)
+
+    Usage: ``with get_db() as conn:`` - the connection goes back to the pool when the
+    block exits, and anything not committed by then is rolled back.
+    """
+    pool = get_db_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+    finally:
+        pool.putconn(conn)
+
+# Change counters behind the ETag / 304 handling of GET routes
+table_versions = TableVersionTracker(
+    get_db, USE_POSTGRES, ['films', 'books', 'shows'],
+    cache_seconds=float(os.getenv('TABLE_VERSION_CACHE_SECONDS', 1))
+)
+
+# Cache for the analytics aggregates; writes to a table evict that table's entries
+analytics_cache = ResponseCache(
+    table_versions.get,
+    max_entries=int(os.getenv('ANALYTICS_CACHE_MAX_ENTRIES', 256)),
+    ttl_seconds=float(os.getenv('ANALYTICS_CACHE_TTL_SECONDS', 300))
+)
+table_versions.add_listener(analytics_cache.invalidate)
+
+# Running per-bucket counts/score sums behind the analytics routes
+analytics_rollups = AnalyticsRollups(USE_POSTGRES)
+
+# film_genres / show_genres join tables mirroring the genres column
+genre_index = GenreIndex(USE_POSTGRES)
+
+# FTS5 (SQLite) / tsvector (PostgreSQL) index behind ?search= and /api/search
+search_index = SearchIndex(USE_POSTGRES)
+
+# Background poster/runtime/RT/cover/... lookups for added and edited items (handlers below)
+enrichment_jobs = EnrichmentJobQueue()
+
+# Checkpointed full-library backfills (TMDB ids, watch providers); tasks are registered below
+batch_jobs = BatchJobRunner()
+
+# View counts and the stale-while-revalidate schedule for watch providers
+provider_refresh = ProviderRefreshScheduler(USE_POSTGRES)
+
+# Clears a film/show's poster placeholder when its poster changes
+poster_placeholders = PosterPlaceholders(USE_POSTGRES)
 
 def init_db():
     """Initialize the database"""
-    conn = get_db()
-    cursor = conn.cursor()
+    with get_db() as conn:
+        cursor = conn.cursor()
 
-    if USE_POSTGRES:
-        # PostgreSQL syntax
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS films (
-                id SERIAL PRIMARY KEY,
-                order_number INTEGER,
-                date_seen TEXT,
-                title TEXT NOT NULL,
-                letter_rating TEXT,
-                score INTEGER,
-                year_watched TEXT,
-                location TEXT,
-                format TEXT,
-                release_year INTEGER,
-                rotten_tomatoes TEXT,
-                length_minutes INTEGER,
-                rt_per_minute TEXT,
-                genres TEXT,
-                poster_url TEXT,
-                rt_link TEXT,
-                a_grade_rank INTEGER,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Add missing columns if they don't exist (for existing PostgreSQL databases)
-        # Check and add date_seen if missing
-        cursor.execute("""
-            SELECT column_name 
-            FROM information_schema.columns 
-            WHERE table_name='films' AND column_name='date_seen'
-        """)
-        if not cursor.fetchone():
-            try:
-                cursor.execute('ALTER TABLE films ADD COLUMN date_seen TEXT')
-                print("Added date_seen column to PostgreSQL database")
-            except Exception as e:
-                print(f"Error adding date_seen column: {e}")
+        if USE_POSTGRES:
+            # PostgreSQL syntax
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS films (
+                    id SERIAL PRIMARY KEY,
+                    order_number INTEGER,
+                    date_seen TEXT,
+                    title TEXT NOT NULL,
+                    letter_rating TEXT,
+                    score INTEGER,
+                    year_watched TEXT,
+                    location TEXT,
+                    format TEXT,
+                    release_year INTEGER,
+                    rotten_tomatoes TEXT,
+                    length_minutes INTEGER,
+                    rt_per_minute TEXT,
+                    genres TEXT,
+                    poster_url TEXT,
+                    rt_link TEXT,
+                    a_grade_rank INTEGER,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
         
-        # Check and add other missing columns
-        for column_name, column_type in [('genres', 'TEXT'), ('poster_url', 'TEXT'), ('rt_link', 'TEXT'), ('a_grade_rank', 'INTEGER'), ('updated_at', 'TIMESTAMP'), ('tmdb_id', 'INTEGER'), ('watch_providers', 'TEXT'), ('watch_providers_updated_at', 'TIMESTAMP')]:
+            # Add missing columns if they don't exist (for existing PostgreSQL databases)
+            # Check and add date_seen if missing
             cursor.execute("""
                 SELECT column_name 
                 FROM information_schema.columns 
-                WHERE table_name='films' AND column_name=%s
-            """, (column_name,))
+                WHERE table_name='films' AND column_name='date_seen'
+            """)
             if not cursor.fetchone():
                 try:
-                    cursor.execute(f'ALTER TABLE films ADD COLUMN {column_name} {column_type}')
-                    print(f"Added {column_name} column to PostgreSQL database")
+                    cursor.execute('ALTER TABLE films ADD COLUMN date_seen TEXT')
+                    print("Added date_seen column to PostgreSQL database")
                 except Exception as e:
-                    print(f"Error adding {column_name} column: {e}")
-    else:
-        # SQLite syntax
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS films (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                order_number INTEGER,
-                date_seen TEXT,
-                title TEXT NOT NULL,
-                letter_rating TEXT,
-                score INTEGER,
-                year_watched TEXT,
-                location TEXT,
-                format TEXT,
-                release_year INTEGER,
-                rotten_tomatoes TEXT,
-                length_minutes INTEGER,
-                rt_per_minute TEXT,
-                genres TEXT,
-                poster_url TEXT,
-                rt_link TEXT,
-                a_grade_rank INTEGER,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-
-        # Add missing columns if they don't exist (for existing SQLite databases)
-        for col in ['genres TEXT', 'poster_url TEXT', 'rt_link TEXT', 'tmdb_id INTEGER', 'watch_providers TEXT', 'watch_providers_updated_at TIMESTAMP']:
-            try:
-                cursor.execute(f'ALTER TABLE films ADD COLUMN {col}')
-            except:
-                pass
+                    print(f"Error adding date_seen column: {e}")
+        
+            # Check and add other missing columns
+            for column_name, column_type in [('genres', 'TEXT'), ('poster_url', 'TEXT'), ('rt_link', 'TEXT'), ('a_grade_rank', 'INTEGER'), ('updated_at', 'TIMESTAMP'), ('tmdb_id', 'INTEGER'), ('watch_providers', 'TEXT'), ('watch_providers_updated_at', 'TIMESTAMP'), ('imdb_id', 'TEXT'), ('poster_placeholder', 'TEXT')]:
+                cursor.execute("""
+                    SELECT column_name 
+                    FROM information_schema.columns 
+                    WHERE table_name='films' AND column_name=%s
+                """, (column_name,))
+                if not cursor.fetchone():
+                    try:
+                        cursor.execute(f'ALTER TABLE films ADD COLUMN {column_name} {column_type}')
+                        print(f"Added {column_name} column to PostgreSQL database")
+                    except Exception as e:
+                        print(f"Error adding {column_name} column: {e}")
+        else:
+            # SQLite syntax
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS films (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    order_number INTEGER,
+                    date_seen TEXT,
+                    title TEXT NOT NULL,
+                    letter_rating TEXT,
+                    score INTEGER,
+                    year_watched TEXT,
+                    location TEXT,
+                    format TEXT,
+                    release_year INTEGER,
+                    rotten_tomatoes TEXT,
+                    length_minutes INTEGER,
+                    rt_per_minute TEXT,
+                    genres TEXT,
+                    poster_url TEXT,
+                    rt_link TEXT,
+                    a_grade_rank INTEGER,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+
+            # Add missing columns if they don't exist (for existing SQLite databases)
+            for col in ['genres TEXT', 'poster_url TEXT', 'rt_link TEXT', 'tmdb_id INTEGER', 'watch_providers TEXT', 'watch_providers_updated_at TIMESTAMP', 'imdb_id TEXT', 'poster_placeholder TEXT']:
+                try:
+                    cursor.execute(f'ALTER TABLE films ADD COLUMN {col}')
+                except:
+                    pass
 
-    conn.commit()
-    conn.close()
+        table_versions.ensure_schema(conn)
+        conn.commit()
 
 def init_books_db():
     """Initialize the books database"""
-    conn = get_db()
-    cursor = conn.cursor()
+    with get_db() as conn:
+        cursor = conn.cursor()
 
-    if USE_POSTGRES:
-        # PostgreSQL syntax
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS books (
-                id SERIAL PRIMARY KEY,
-                order_number INTEGER,
-                date_read TEXT,
-                year INTEGER,
-                book_name TEXT NOT NULL,
-                author TEXT,
-                details_commentary TEXT,
-                j_rayting TEXT,
-                score INTEGER,
-                type TEXT,
-                pages INTEGER,
-                form TEXT,
-                notes_in_notion TEXT,
-                cover_url TEXT,
-                google_books_id TEXT,
-                isbn TEXT,
-                average_rating REAL,
-                ratings_count INTEGER,
-                published_date TEXT,
-                year_written INTEGER,
-                description TEXT,
-                a_grade_rank INTEGER,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+        if USE_POSTGRES:
+            # PostgreSQL syntax
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS books (
+                    id SERIAL PRIMARY KEY,
+                    order_number INTEGER,
+                    date_read TEXT,
+                    year INTEGER,
+                    book_name TEXT NOT NULL,
+                    author TEXT,
+                    details_commentary TEXT,
+                    j_rayting TEXT,
+                    score INTEGER,
+                    type TEXT,
+                    pages INTEGER,
+                    form TEXT,
+                    notes_in_notion TEXT,
+                    cover_url TEXT,
+                    google_books_id TEXT,
+                    isbn TEXT,
+                    average_rating REAL,
+                    ratings_count INTEGER,
+                    published_date TEXT,
+                    year_written INTEGER,
+                    description TEXT,
+                    a_grade_rank INTEGER,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
         
-        # Add missing columns if they don't exist (for existing PostgreSQL databases)
-        for column_name, column_type in [
-            ('cover_url', 'TEXT'), ('google_books_id', 'TEXT'), ('isbn', 'TEXT'),
-            ('average_rating', 'REAL'), ('ratings_count', 'INTEGER'),
-            ('published_date', 'TEXT'), ('year_written', 'INTEGER'), ('description', 'TEXT'),
-            ('notion_link', 'TEXT'), ('a_grade_rank', 'INTEGER'), ('updated_at', 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP')
-        ]:
-            cursor.execute("""
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_name='books' AND column_name=%s
-            """, (column_name,))
-            if not cursor.fetchone():
+            # Add missing columns if they don't exist (for existing PostgreSQL databases)
+            for column_name, column_type in [
+                ('cover_url', 'TEXT'), ('google_books_id', 'TEXT'), ('isbn', 'TEXT'),
+                ('average_rating', 'REAL'), ('ratings_count', 'INTEGER'),
+                ('published_date', 'TEXT'), ('year_written', 'INTEGER'), ('description', 'TEXT'),
+                ('notion_link', 'TEXT'), ('a_grade_rank', 'INTEGER'), ('updated_at', 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP')
+            ]:
+                cursor.execute("""
+                    SELECT column_name 
+                    FROM information_schema.columns 
+                    WHERE table_name='books' AND column_name=%s
+                """, (column_name,))
+                if not cursor.fetchone():
+                    try:
+                        cursor.execute(f'ALTER TABLE books ADD COLUMN {column_name} {column_type}')
+                        print(f"Added {column_name} column to PostgreSQL database")
+                    except Exception as e:
+                        print(f"Error adding {column_name} column: {e}")
+        else:
+            # SQLite syntax
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS books (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    order_number INTEGER,
+                    date_read TEXT,
+                    year INTEGER,
+                    book_name TEXT NOT NULL,
+                    author TEXT,
+                    details_commentary TEXT,
+                    j_rayting TEXT,
+                    score INTEGER,
+                    type TEXT,
+                    pages INTEGER,
+                    form TEXT,
+                    notes_in_notion TEXT,
+                    cover_url TEXT,
+                    google_books_id TEXT,
+                    isbn TEXT,
+                    average_rating REAL,
+                    ratings_count INTEGER,
+                    published_date TEXT,
+                    year_written INTEGER,
+                    description TEXT,
+                    a_grade_rank INTEGER,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+
+            # Add missing columns if they don't exist (for existing SQLite databases)
+            for column_name, column_type in [
+                ('cover_url', 'TEXT'), ('google_books_id', 'TEXT'), ('isbn', 'TEXT'),
+                ('average_rating', 'REAL'), ('ratings_count', 'INTEGER'),
+                ('published_date', 'TEXT'), ('description', 'TEXT'), ('year_written', 'INTEGER'),
+                ('notion_link', 'TEXT'), ('a_grade_rank', 'INTEGER'), ('updated_at', 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP')
+            ]:
                 try:
                     cursor.execute(f'ALTER TABLE books ADD COLUMN {column_name} {column_type}')
-                    print(f"Added {column_name} column to PostgreSQL database")
-                except Exception as e:
-                    print(f"Error adding {column_name} column: {e}")
-    else:
-        # SQLite syntax
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS books (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                order_number INTEGER,
-                date_read TEXT,
-                year INTEGER,
-                book_name TEXT NOT NULL,
-                author TEXT,
-                details_commentary TEXT,
-                j_rayting TEXT,
-                score INTEGER,
-                type TEXT,
-                pages INTEGER,
-                form TEXT,
-                notes_in_notion TEXT,
-                cover_url TEXT,
-                google_books_id TEXT,
-                isbn TEXT,
-                average_rating REAL,
-                ratings_count INTEGER,
-                published_date TEXT,
-                year_written INTEGER,
-                description TEXT,
-                a_grade_rank INTEGER,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-
-        # Add missing columns if they don't exist (for existing SQLite databases)
-        for column_name, column_type in [
-            ('cover_url', 'TEXT'), ('google_books_id', 'TEXT'), ('isbn', 'TEXT'),
-            ('average_rating', 'REAL'), ('ratings_count', 'INTEGER'),
-            ('published_date', 'TEXT'), ('description', 'TEXT'), ('year_written', 'INTEGER'),
-            ('notion_link', 'TEXT'), ('a_grade_rank', 'INTEGER'), ('updated_at', 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP')
-        ]:
-            try:
-                cursor.execute(f'ALTER TABLE books ADD COLUMN {column_name} {column_type}')
-            except:
-                pass
+                except:
+                    pass
 
-    conn.commit()
-    conn.close()
+        conn.commit()
 
 def init_shows_db():
     """Initialize the shows database"""
-    conn = get_db()
-    cursor = conn.cursor()
-
-    if USE_POSTGRES:
-        # PostgreSQL syntax
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS shows (
-                id SERIAL PRIMARY KEY,
-                title TEXT NOT NULL,
-                start_year INTEGER,
-                end_year INTEGER,
-                is_ongoing BOOLEAN DEFAULT FALSE,
-                seasons INTEGER,
-                episodes INTEGER,
-                j_rayting TEXT,
-                score INTEGER,
-                imdb_rating TEXT,
-                imdb_id TEXT,
-                tmdb_id INTEGER,
-                genres TEXT,
-                poster_url TEXT,
-                details_commentary TEXT,
-                date_watched TEXT,
-                a_grade_rank INTEGER,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+    with get_db() as conn:
+        cursor = conn.cursor()
 
-        # Add missing columns if they don't exist
-        for column_name, column_type in [
-            ('is_ongoing', 'BOOLEAN DEFAULT FALSE'),
-            ('episodes', 'INTEGER'),
-            ('imdb_rating', 'TEXT'),
-            ('imdb_id', 'TEXT'),
-            ('tmdb_id', 'INTEGER'),
-            ('genres', 'TEXT'),
-            ('poster_url', 'TEXT'),
-            ('details_commentary', 'TEXT'),
-            ('date_watched', 'TEXT'),
-            ('a_grade_rank', 'INTEGER'),
-            ('updated_at', 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP'),
-            ('watch_providers', 'TEXT'),
-            ('watch_providers_updated_at', 'TIMESTAMP')
-        ]:
-            cursor.execute("""
-                SELECT column_name
-                FROM information_schema.columns
-                WHERE table_name='shows' AND column_name=%s
-            """, (column_name,))
-            if not cursor.fetchone():
+        if USE_POSTGRES:
+            # PostgreSQL syntax
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS shows (
+                    id SERIAL PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    start_year INTEGER,
+                    end_year INTEGER,
+                    is_ongoing BOOLEAN DEFAULT FALSE,
+                    seasons INTEGER,
+                    episodes INTEGER,
+                    j_rayting TEXT,
+                    score INTEGER,
+                    imdb_rating TEXT,
+                    imdb_id TEXT,
+                    tmdb_id INTEGER,
+                    genres TEXT,
+                    poster_url TEXT,
+                    details_commentary TEXT,
+                    date_watched TEXT,
+                    a_grade_rank INTEGER,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+
+            # Add missing columns if they don't exist
+            for column_name, column_type in [
+                ('is_ongoing', 'BOOLEAN DEFAULT FALSE'),
+                ('episodes', 'INTEGER'),
+                ('imdb_rating', 'TEXT'),
+                ('imdb_id', 'TEXT'),
+                ('tmdb_id', 'INTEGER'),
+                ('genres', 'TEXT'),
+                ('poster_url', 'TEXT'),
+                ('details_commentary', 'TEXT'),
+                ('date_watched', 'TEXT'),
+                ('a_grade_rank', 'INTEGER'),
+                ('updated_at', 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP'),
+                ('watch_providers', 'TEXT'),
+                ('watch_providers_updated_at', 'TIMESTAMP'),
+                ('poster_placeholder', 'TEXT')
+            ]:
+                cursor.execute("""
+                    SELECT column_name
+                    FROM information_schema.columns
+                    WHERE table_name='shows' AND column_name=%s
+                """, (column_name,))
+                if not cursor.fetchone():
+                    try:
+                        cursor.execute(f'ALTER TABLE shows ADD COLUMN {column_name} {column_type}')
+                        print(f"Added {column_name} column to PostgreSQL shows table")
+                    except Exception as e:
+                        print(f"Error adding {column_name} column to shows: {e}")
+        else:
+            # SQLite syntax
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS shows (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    title TEXT NOT NULL,
+                    start_year INTEGER,
+                    end_year INTEGER,
+                    is_ongoing BOOLEAN DEFAULT 0,
+                    seasons INTEGER,
+                    episodes INTEGER,
+                    j_rayting TEXT,
+                    score INTEGER,
+                    imdb_rating TEXT,
+                    imdb_id TEXT,
+                    tmdb_id INTEGER,
+                    genres TEXT,
+                    poster_url TEXT,
+                    details_commentary TEXT,
+                    date_watched TEXT,
+                    a_grade_rank INTEGER,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+
+            # Add missing columns if they don't exist
+            for column_name, column_type in [
+                ('is_ongoing', 'BOOLEAN DEFAULT 0'),
+                ('episodes', 'INTEGER'),
+                ('imdb_rating', 'TEXT'),
+                ('imdb_id', 'TEXT'),
+                ('tmdb_id', 'INTEGER'),
+                ('genres', 'TEXT'),
+                ('poster_url', 'TEXT'),
+                ('details_commentary', 'TEXT'),
+                ('date_watched', 'TEXT'),
+                ('a_grade_rank', 'INTEGER'),
+                ('updated_at', 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP'),
+                ('watch_providers', 'TEXT'),
+                ('watch_providers_updated_at', 'TIMESTAMP'),
+                ('poster_placeholder', 'TEXT')
+            ]:
                 try:
                     cursor.execute(f'ALTER TABLE shows ADD COLUMN {column_name} {column_type}')
-                    print(f"Added {column_name} column to PostgreSQL shows table")
-                except Exception as e:
-                    print(f"Error adding {column_name} column to shows: {e}")
-    else:
-        # SQLite syntax
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS shows (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                start_year INTEGER,
-                end_year INTEGER,
-                is_ongoing BOOLEAN DEFAULT 0,
-                seasons INTEGER,
-                episodes INTEGER,
-                j_rayting TEXT,
-                score INTEGER,
-                imdb_rating TEXT,
-                imdb_id TEXT,
-                tmdb_id INTEGER,
-                genres TEXT,
-                poster_url TEXT,
-                details_commentary TEXT,
-                date_watched TEXT,
-                a_grade_rank INTEGER,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+                except:
+                    pass
 
-        # Add missing columns if they don't exist
-        for column_name, column_type in [
-            ('is_ongoing', 'BOOLEAN DEFAULT 0'),
-            ('episodes', 'INTEGER'),
-            ('imdb_rating', 'TEXT'),
-            ('imdb_id', 'TEXT'),
-            ('tmdb_id', 'INTEGER'),
-            ('genres', 'TEXT'),
-            ('poster_url', 'TEXT'),
-            ('details_commentary', 'TEXT'),
-            ('date_watched', 'TEXT'),
-            ('a_grade_rank', 'INTEGER'),
-            ('updated_at', 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP'),
-            ('watch_providers', 'TEXT'),
-            ('watch_providers_updated_at', 'TIMESTAMP')
-        ]:
-            try:
-                cursor.execute(f'ALTER TABLE shows ADD COLUMN {column_name} {column_type}')
-            except:
-                pass
+        conn.commit()
+
+def init_search_index():
+    """Create the full-text search tables/triggers and build any index that is out of date"""
+    with get_db() as conn:
+        result = search_index.ensure_schema(conn)
+        if result:
+            print(f"✓ Built search index: {result}")
+        conn.commit()
+
+def init_genre_index():
+    """Create the film/show genre join tables and backfill them on first run"""
+    with get_db() as conn:
+        genre_index.ensure_schema(conn)
+        empty_tables = [table for table in ('films', 'shows') if genre_index.is_empty(conn, table)]
+        if empty_tables:
+            result = genre_index.rebuild(conn, empty_tables)
+            print(f"✓ Built genre index: {result}")
+        conn.commit()
+
+def init_provider_refresh():
+    """Create the item_views table behind the watch provider refresh schedule"""
+    with get_db() as conn:
+        provider_refresh.ensure_schema(conn)
+        conn.commit()
+
+def init_poster_placeholders():
+    """Create the triggers that drop a poster placeholder when poster_url changes"""
+    with get_db() as conn:
+        poster_placeholders.ensure_schema(conn)
+        conn.commit()
 
-    conn.commit()
-    conn.close()
+def init_analytics_rollups():
+    """Create the analytics rollup table and build it on first run"""
+    with get_db() as conn:
+        analytics_rollups.ensure_schema(conn)
+        if analytics_rollups.is_empty(conn):
+            result = analytics_rollups.rebuild(conn)
+            print(f"✓ Built analytics rollups: {result}")
+        conn.commit()
 
 def simplify_format(format_str):
     """Simplify format to standard categories"""
@@ -435,12 +550,16 @@ def letter_rating_to_score(letter_rating):
     
     return rating_map.get(letter_rating.strip())
 
-def row_to_dict(row):
-    """Convert database row to dictionary (works for both SQLite and PostgreSQL)"""
+def row_to_dict(row, fields=None):
+    """Convert database row to dictionary (works for both SQLite and PostgreSQL)
+
+    When ``fields`` is given (a projected list request), only the post-processing for
+    requested fields is done and helper columns selected for derived fields are dropped.
+    """
     film_dict = dict(row)
 
     # Calculate RT/Minute if we have both RT score and length
-    if film_dict.get('rotten_tomatoes') and film_dict.get('length_minutes'):
+    if (fields is None or 'rt_per_minute' in fields) and film_dict.get('rotten_tomatoes') and film_dict.get('length_minutes'):
         try:
             # Extract numeric RT score (remove % if present)
             rt_score = int(film_dict['rotten_tomatoes'].replace('%', ''))
@@ -469,6 +588,13 @@ def row_to_dict(row):
         except json.JSONDecodeError:
             film_dict['watch_providers'] = None
 
+    # Locally served poster widths (ingested TMDB posters only)
+    if fields is None or 'poster_srcset' in fields:
+        film_dict['poster_srcset'] = poster_srcset(film_dict.get('poster_url'), film_dict.get('poster_placeholder'))
+
+    if fields is not None:
+        film_dict = {key: value for key, value in film_dict.items() if key in fields}
+
     return film_dict
 
 def book_row_to_dict(row):
@@ -476,7 +602,7 @@ def book_row_to_dict(row):
     book_dict = dict(row)
     return book_dict
 
-def show_row_to_dict(row):
+def show_row_to_dict(row, fields=None):
     """Convert database row to dictionary for shows (works for both SQLite and PostgreSQL)"""
     show_dict = dict(row)
     # Parse watch_providers JSON if it exists
@@ -485,11 +611,148 @@ def show_row_to_dict(row):
             show_dict['watch_providers'] = json.loads(show_dict['watch_providers'])
         except json.JSONDecodeError:
             show_dict['watch_providers'] = None
+    # Locally served poster widths (ingested TMDB posters only)
+    if fields is None or 'poster_srcset' in fields:
+        show_dict['poster_srcset'] = poster_srcset(show_dict.get('poster_url'), show_dict.get('poster_placeholder'))
+    if fields is not None:
+        show_dict = {key: value for key, value in show_dict.items() if key in fields}
     return show_dict
 
+# Columns list endpoints may project with ?fields=a,b,c
+FILM_FIELDS = [
+    'id', 'order_number', 'date_seen', 'title', 'letter_rating', 'score', 'year_watched',
+    'location', 'format', 'release_year', 'rotten_tomatoes', 'length_minutes', 'rt_per_minute',
+    'genres', 'poster_url', 'poster_srcset', 'poster_placeholder', 'rt_link', 'a_grade_rank', 'tmdb_id',
+    'imdb_id', 'watch_providers', 'watch_providers_updated_at', 'created_at', 'updated_at'
+]
+BOOK_FIELDS = [
+    'id', 'order_number', 'date_read', 'year', 'book_name', 'author', 'details_commentary',
+    'j_rayting', 'score', 'type', 'pages', 'form', 'notes_in_notion', 'notion_link', 'cover_url',
+    'google_books_id', 'isbn', 'average_rating', 'ratings_count', 'published_date', 'year_written',
+    'description', 'a_grade_rank', 'created_at', 'updated_at'
+]
+SHOW_FIELDS = [
+    'id', 'title', 'start_year', 'end_year', 'is_ongoing', 'seasons', 'episodes', 'j_rayting',
+    'score', 'imdb_rating', 'imdb_id', 'tmdb_id', 'genres', 'poster_url', 'poster_srcset',
+    'poster_placeholder', 'details_commentary', 'date_watched', 'a_grade_rank', 'watch_providers',
+    'watch_providers_updated_at', 'created_at', 'updated_at'
+]
+
+# Columns the admin field endpoints (single and bulk) may write
+FILM_EDITABLE_FIELDS = [
+    'poster_url', 'title', 'letter_rating', 'score', 'release_year',
+    'rotten_tomatoes', 'length_minutes', 'genres', 'rt_link', 'imdb_id',
+    'date_seen', 'year_watched', 'location', 'format', 'order_number', 'a_grade_rank'
+]
+BOOK_EDITABLE_FIELDS = [
+    'order_number', 'date_read', 'year', 'book_name', 'author',
+    'details_commentary', 'j_rayting', 'score', 'type', 'pages',
+    'form', 'notes_in_notion', 'notion_link', 'cover_url', 'google_books_id',
+    'isbn', 'average_rating', 'ratings_count', 'published_date', 'year_written', 'description', 'a_grade_rank'
+]
+SHOW_EDITABLE_FIELDS = [
+    'title', 'start_year', 'end_year', 'is_ongoing', 'seasons', 'episodes',
+    'j_rayting', 'score', 'imdb_rating', 'imdb_id', 'tmdb_id', 'genres',
+    'poster_url', 'details_commentary', 'date_watched', 'a_grade_rank'
+]
+
+# Derived fields and the stored columns they are computed from
+FILM_FIELD_DEPENDENCIES = {
+    'rt_per_minute': ['rotten_tomatoes', 'length_minutes'],
+    'poster_srcset': ['poster_url', 'poster_placeholder']
+}
+SHOW_FIELD_DEPENDENCIES = {
+    'poster_srcset': ['poster_url', 'poster_placeholder']
+}
+
+# Fields computed in Python, never selected from the table
+COMPUTED_FIELDS = {'poster_srcset'}
+
+def get_projection_args(allowed_fields, key_fields, dependencies=None):
+    """Read ?fields= and return (select_list, output_fields)
+
+    Returns ('*', None) when no projection was requested. The id/sort-key columns are
+    always returned so pagination cursors keep working; unknown fields raise ValueError.
+    """
+    fields_arg = request.args.get('fields', '')
+    requested = [field.strip() for field in fields_arg.split(',') if field.strip()]
+    if not requested:
+        return '*', None
+
+    unknown = [field for field in requested if field not in allowed_fields]
+    if unknown:
+        raise ValueError(f'Unknown fields: {", ".join(unknown)}. Allowed fields: {", ".join(allowed_fields)}')
+
+    output_fields = list(key_fields) + [field for field in requested if field not in key_fields]
+
+    select_columns = [field for field in output_fields if field not in COMPUTED_FIELDS]
+    for field in output_fields:
+        for column in (dependencies or {}).get(field, []):
+            if column not in select_columns:
+                select_columns.append(column)
+
+    return ', '.join(select_columns), set(output_fields)
+
+# Pagination for list endpoints: ?limit=N returns one page plus a cursor for the next
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+def encode_cursor(sort_key):
+    """Encode the sort key of the last row on a page as an opaque cursor token"""
+    return base64.urlsafe_b64encode(json.dumps(sort_key).encode()).decode().rstrip('=')
+
+def decode_cursor(token, key_size):
+    """Decode a cursor token back into its sort key values (raises ValueError if malformed)"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        sort_key = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(sort_key, list) or len(sort_key) != key_size or not isinstance(sort_key[-1], int):
+        raise ValueError('Invalid cursor')
+    return sort_key
+
+def get_pagination_args(key_size):
+    """Read limit/cursor/include_total from the query string
+
+    Returns (limit, cursor_key, include_total); limit is None when the client did not
+    ask for pagination, in which case the endpoint returns the full list as before.
+    """
+    limit = request.args.get('limit')
+    cursor = request.args.get('cursor')
+    include_total = request.args.get('include_total', '').lower() in ('1', 'true', 'yes')
+
+    if limit is None and cursor is None:
+        return None, None, include_total
+
+    try:
+        limit = int(limit) if limit is not None else DEFAULT_PAGE_SIZE
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    if limit < 1:
+        raise ValueError('limit must be at least 1')
+    limit = min(limit, MAX_PAGE_SIZE)
+
+    cursor_key = decode_cursor(cursor, key_size) if cursor else None
+    return limit, cursor_key, include_total
+
+def build_page(items, limit, sort_key, total=None):
+    """Trim the lookahead row fetched past the limit and attach the next-page cursor"""
+    has_more = len(items) > limit
+    items = items[:limit]
+    page = {
+        'items': items,
+        'next_cursor': encode_cursor(sort_key(items[-1])) if has_more else None,
+        'has_more': has_more
+    }
+    if total is not None:
+        page['total'] = total
+    return page
+
 @app.route('/api/books', methods=['GET'])
+@table_versions.conditional('books')
 def get_books():
-    """Get all books with optional search/filter"""
+    """Get all books with optional search/filter (paginated when ?limit or ?cursor is given)"""
     search = request.args.get('search', '')
     book_type = request.args.get('type', '')
     form = request.args.get('form', '')
@@ -498,70 +761,99 @@ def get_books():
     rating = request.args.get('rating', '')
     year = request.args.get('year', '')
 
-    conn = get_db()
-    if USE_POSTGRES:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-    else:
-        cursor = conn.cursor()
+    try:
+        limit, cursor_key, include_total = get_pagination_args(key_size=1)
+        select_list, output_fields = get_projection_args(BOOK_FIELDS, ['id'])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
     # Use %s for PostgreSQL, ? for SQLite
     placeholder = '%s' if USE_POSTGRES else '?'
 
-    query = 'SELECT * FROM books WHERE 1=1'
+    filters = ''
     params = []
 
     if search:
-        query += f' AND (book_name LIKE {placeholder} OR author LIKE {placeholder})'
-        params.append(f'%{search}%')
-        params.append(f'%{search}%')
+        match = search_index.match_query(search)
+        if match:
+            filters += f" AND {search_index.filter_clause('books')}"
+            params.append(match)
+        else:
+            filters += f' AND (book_name LIKE {placeholder} OR author LIKE {placeholder})'
+            params.append(f'%{search}%')
+            params.append(f'%{search}%')
 
     if book_type:
-        query += f' AND type = {placeholder}'
+        filters += f' AND type = {placeholder}'
         params.append(book_type)
 
     if form:
-        query += f' AND form = {placeholder}'
+        filters += f' AND form = {placeholder}'
         params.append(form)
 
     if author:
-        query += f' AND author LIKE {placeholder}'
+        filters += f' AND author LIKE {placeholder}'
         params.append(f'%{author}%')
 
     if min_score:
-        query += f' AND score >= {placeholder}'
+        filters += f' AND score >= {placeholder}'
         params.append(int(min_score))
 
     if rating:
-        query += f' AND j_rayting = {placeholder}'
+        filters += f' AND j_rayting = {placeholder}'
         params.append(rating)
 
     if year:
-        query += f' AND year = {placeholder}'
+        filters += f' AND year = {placeholder}'
         params.append(int(year))
 
+    query = f'SELECT {select_list} FROM books WHERE 1=1{filters}'
+    query_params = list(params)
+
+    # Keyset pagination: continue strictly after the last id of the previous page
+    if cursor_key:
+        query += f' AND id < {placeholder}'
+        query_params.append(cursor_key[0])
+
     # Order by ID descending (newest first) so newly added books appear at top
-    # Fallback to order_number if ID is not available
     query += ' ORDER BY id DESC'
 
-    cursor.execute(query, params)
-    books = [book_row_to_dict(row) for row in cursor.fetchall()]
-    conn.close()
+    if limit:
+        query += f' LIMIT {placeholder}'
+        query_params.append(limit + 1)
+
+    with get_db() as conn:
+        if USE_POSTGRES:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+        else:
+            cursor = conn.cursor()
+
+        cursor.execute(query, query_params)
+        books = [book_row_to_dict(row) for row in cursor.fetchall()]
 
-    return jsonify(books)
+        total = None
+        if limit and include_total:
+            cursor.execute(f'SELECT COUNT(*) AS total FROM books WHERE 1=1{filters}', params)
+            total = dict(cursor.fetchone())['total']
+
+    if not limit:
+        return jsonify(books)
+
+    return jsonify(build_page(books, limit, lambda book: [book['id']], total))
 
 @app.route('/api/books/<int:book_id>', methods=['GET'])
+@table_versions.conditional('books')
 def get_book(book_id):
     """Get a single book by ID"""
-    conn = get_db()
-    if USE_POSTGRES:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        cursor.execute('SELECT * FROM books WHERE id = %s', (book_id,))
-    else:
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM books WHERE id = ?', (book_id,))
+    with get_db() as conn:
+        if USE_POSTGRES:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            cursor.execute('SELECT * FROM books WHERE id = %s', (book_id,))
+        else:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM books WHERE id = ?', (book_id,))
 
-    book = cursor.fetchone()
-    conn.close()
+        book = cursor.fetchone()
 
     if book is None:
         return jsonify({'error': 'Book not found'}), 404
@@ -569,62 +861,108 @@ def get_book(book_id):
     return jsonify(book_row_to_dict(book))
 
 @app.route('/api/films', methods=['GET'])
+@table_versions.conditional('films')
 def get_films():
-    """Get all films with optional search/filter"""
+    """Get all films with optional search/filter (paginated when ?limit or ?cursor is given)"""
     search = request.args.get('search', '')
     location = request.args.get('location', '')
     format_type = request.args.get('format', '')
     min_score = request.args.get('min_score', '')
+    genre = request.args.get('genre', '')
 
-    conn = get_db()
-    if USE_POSTGRES:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-    else:
-        cursor = conn.cursor()
+    try:
+        limit, cursor_key, include_total = get_pagination_args(key_size=2)
+        select_list, output_fields = get_projection_args(
+            FILM_FIELDS, ['id', 'order_number'], FILM_FIELD_DEPENDENCIES
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
     # Use %s for PostgreSQL, ? for SQLite
     placeholder = '%s' if USE_POSTGRES else '?'
 
-    query = 'SELECT * FROM films WHERE 1=1'
+    filters = ''
     params = []
 
     if search:
-        query += f' AND title LIKE {placeholder}'
-        params.append(f'%{search}%')
+        match = search_index.match_query(search)
+        if match:
+            filters += f" AND {search_index.filter_clause('films')}"
+            params.append(match)
+        else:
+            filters += f' AND title LIKE {placeholder}'
+            params.append(f'%{search}%')
 
     if location:
-        query += f' AND location LIKE {placeholder}'
+        filters += f' AND location LIKE {placeholder}'
         params.append(f'%{location}%')
 
     if format_type:
-        query += f' AND format LIKE {placeholder}'
+        filters += f' AND format LIKE {placeholder}'
         params.append(f'%{format_type}%')
 
     if min_score:
-        query += f' AND score >= {placeholder}'
+        filters += f' AND score >= {placeholder}'
         params.append(int(min_score))
 
-    query += ' ORDER BY order_number ASC'
+    if genre:
+        filters += f" AND {genre_index.filter_clause('films')}"
+        params.append(genre_key(genre))
+
+    query = f'SELECT {select_list} FROM films WHERE 1=1{filters}'
+    query_params = list(params)
+
+    # Keyset pagination on (order_number, id) with NULL order_numbers sorted last
+    if cursor_key:
+        last_order_number, last_id = cursor_key
+        if last_order_number is None:
+            query += f' AND order_number IS NULL AND id > {placeholder}'
+            query_params.append(last_id)
+        else:
+            query += (f' AND (order_number IS NULL OR order_number > {placeholder}'
+                      f' OR (order_number = {placeholder} AND id > {placeholder}))')
+            query_params.extend([last_order_number, last_order_number, last_id])
+
+    # Explicit NULLS LAST so SQLite and PostgreSQL agree on the order (and on cursors)
+    query += ' ORDER BY CASE WHEN order_number IS NULL THEN 1 ELSE 0 END, order_number ASC, id ASC'
+
+    if limit:
+        query += f' LIMIT {placeholder}'
+        query_params.append(limit + 1)
+
+    with get_db() as conn:
+        if USE_POSTGRES:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+        else:
+            cursor = conn.cursor()
+
+        cursor.execute(query, query_params)
+        films = [row_to_dict(row, output_fields) for row in cursor.fetchall()]
+
+        total = None
+        if limit and include_total:
+            cursor.execute(f'SELECT COUNT(*) AS total FROM films WHERE 1=1{filters}', params)
+            total = dict(cursor.fetchone())['total']
 
-    cursor.execute(query, params)
-    films = [row_to_dict(row) for row in cursor.fetchall()]
-    conn.close()
+    if not limit:
+        return jsonify(films)
 
-    return jsonify(films)
+    return jsonify(build_page(films, limit, lambda film: [film['order_number'], film['id']], total))
 
 @app.route('/api/films/<int:film_id>', methods=['GET'])
+@provider_refresh.tracks('films', 'film_id')
+@table_versions.conditional('films')
 def get_film(film_id):
     """Get a single film by ID"""
-    conn = get_db()
-    if USE_POSTGRES:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        cursor.execute('SELECT * FROM films WHERE id = %s', (film_id,))
-    else:
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM films WHERE id = ?', (film_id,))
+    with get_db() as conn:
+        if USE_POSTGRES:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            cursor.execute('SELECT * FROM films WHERE id = %s', (film_id,))
+        else:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM films WHERE id = ?', (film_id,))
 
-    film = cursor.fetchone()
-    conn.close()
+        film = cursor.fetchone()
 
     if film is None:
         return jsonify({'error': 'Film not found'}), 404
@@ -639,51 +977,17 @@ def generate_rt_url(title):
     slug = re.sub(r'[\s]+', '_', slug)
     return f"https://www.rottentomatoes.com/m/{slug}"
 
-def fetch_rt_score_from_omdb(title, year=None):
-    """Fetch Rotten Tomatoes score from OMDb API"""
-    # Get OMDb API key from environment or use default
-    omdb_api_key = os.getenv('OMDB_API_KEY', '4e9616c3')
-    omdb_base_url = 'http://www.omdbapi.com/'
-    
-    # Handle titles in "Last, First" format (e.g., "Fugitive, The" -> "The Fugitive")
-    search_title = title
-    if ',' in title:
-        parts = title.split(',', 1)
-        if len(parts) == 2:
-            search_title = f"{parts[1].strip()} {parts[0].strip()}"
-    
-    params = {
-        'apikey': omdb_api_key,
-        't': search_title,
-        'type': 'movie'
-    }
-    
-    # Only include year if we have it
-    if year:
-        params['y'] = year
-    
+def fetch_rt_score_from_omdb(title, year=None, imdb_id=None):
+    """Fetch Rotten Tomatoes score from OMDb (by IMDb id when known); None if not found or OMDb fails"""
     try:
-        response = requests.get(omdb_base_url, params=params, timeout=5)
-        response.raise_for_status()
-        data = response.json()
-        
-        if data.get('Response') == 'True':
-            # Get Rotten Tomatoes score from Ratings array
-            ratings = data.get('Ratings', [])
-            for rating in ratings:
-                if rating.get('Source') == 'Rotten Tomatoes':
-                    rt_value = rating.get('Value', '')
-                    # OMDb returns RT score as "85%" or "85"
-                    if rt_value:
-                        # Ensure it has % sign
-                        if '%' not in rt_value:
-                            rt_value = f"{rt_value}%"
-                        return rt_value
-        return None
+        return omdb_client.rt_score(title, year, imdb_id)
     except Exception as e:
         print(f"Error fetching RT score from OMDb: {e}")
         return None
 
+# Shared pool for the concurrent TMDB/OMDb lookups made when a film is added
+film_enricher = FilmEnricher(fetch_rt_score_from_omdb, max_workers=int(os.getenv('FILM_ENRICHMENT_WORKERS', '8')))
+
 @app.route('/api/films', methods=['POST'])
 def add_film():
     """Add a new film with automatic metadata fetching from TMDB"""
@@ -693,203 +997,175 @@ def add_film():
     if not all(field in data for field in required_fields):
         return jsonify({'error': 'Missing required fields'}), 400
 
-    # Check for duplicates by title
-    conn = get_db()
-    if USE_POSTGRES:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        cursor.execute('SELECT id, title, release_year, rt_link FROM films WHERE title = %s', (data['title'],))
-    else:
-        cursor = conn.cursor()
-        cursor.execute('SELECT id, title, release_year, rt_link FROM films WHERE title = ?', (data['title'],))
-
-    existing_films = cursor.fetchall()
+    # Block only on the same title (ignoring case, punctuation and "Title, The" order) from the same
+    # year when both are known; near-miss titles ("Late Night" vs "Date Night") are only reported back
+    with get_db() as conn:
+        if USE_POSTGRES:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+        else:
+            cursor = conn.cursor()
+        cursor.execute('SELECT id, title, release_year, rt_link FROM films')
+        all_films = {film['id']: film for film in cursor.fetchall()}
+
+        title_index = TitleIndex((film_id, film['title']) for film_id, film in all_films.items())
+        exact_ids = title_index.exact(data['title'])
+        existing_films = [
+            all_films[film_id] for film_id in exact_ids
+            if not data.get('release_year') or not all_films[film_id]['release_year']
+            or str(all_films[film_id]['release_year']) == str(data['release_year'])
+        ]
+        similar_films = [
+            {'id': film_id, 'title': all_films[film_id]['title'], 'release_year': all_films[film_id]['release_year']}
+            for film_id in title_index.near_duplicates(data['title']) if film_id not in exact_ids
+        ]
 
-    # If duplicates exist and user hasn't provided RT URL to distinguish, return warning
-    if existing_films and not data.get('rt_link'):
-        duplicate_info = []
-        for film in existing_films:
-            if USE_POSTGRES:
+        # If duplicates exist and user hasn't provided RT URL to distinguish, return warning
+        if existing_films and not data.get('rt_link'):
+            duplicate_info = []
+            for film in existing_films:
                 duplicate_info.append({
                     'id': film['id'],
                     'title': film['title'],
                     'release_year': film['release_year'],
                     'rt_link': film['rt_link']
                 })
-            else:
-                duplicate_info.append({
-                    'id': film[0],
-                    'title': film[1],
-                    'release_year': film[2],
-                    'rt_link': film[3]
-                })
-        conn.close()
-        return jsonify({
-            'duplicate': True,
-            'message': 'A film with this title already exists. Please provide the Rotten Tomatoes URL to distinguish between versions.',
-            'existing_films': duplicate_info
-        }), 409
-
-    conn.close()
-
-    # Initialize variables with user-provided data
-    poster_url = data.get('poster_url')
-    release_year = data.get('release_year')
-    length_minutes = data.get('length_minutes')
-    genres = data.get('genres')
-    rotten_tomatoes = data.get('rotten_tomatoes')
-    metadata_fetched = False
-
-    # Fetch metadata from TMDB if API key is available
-    tmdb_id = None
-    imdb_id = None
-    if os.getenv('TMDB_API_KEY'):
-        try:
-            # Search for the movie
-            movie_data = search_movie(data['title'], release_year)
-
-            if movie_data:
-                # Get poster if not already provided
-                if not poster_url:
-                    poster_url = movie_data.get('poster_url')
-
-                # Get genres if not already provided
-                if not genres:
-                    genres = movie_data.get('genres')
-
-                # Get detailed info (runtime, release year) if we have a TMDB ID
-                tmdb_id = movie_data.get('tmdb_id')
-                if tmdb_id:
-                    details = get_movie_details(tmdb_id)
-                    if details:
-                        if not length_minutes:
-                            length_minutes = details.get('runtime')
-                        if not release_year and details.get('release_date'):
-                            release_year = int(details['release_date'][:4])
-                    
-                    # Get IMDB ID for better RT link generation
-                    try:
-                        import requests
-                        tmdb_api_key = os.getenv('TMDB_API_KEY')
-                        external_response = requests.get(
-                            f'https://api.themoviedb.org/3/movie/{tmdb_id}/external_ids',
-                            params={'api_key': tmdb_api_key},
-                            timeout=5
-                        )
-                        if external_response.status_code == 200:
-                            external_data = external_response.json()
-                            imdb_id = external_data.get('imdb_id')
-                    except Exception as e:
-                        print(f"Error fetching IMDB ID: {e}")
-
-                metadata_fetched = True
-                print(f"✓ Fetched metadata for '{data['title']}'")
-        except Exception as e:
-            print(f"Error fetching TMDB data: {e}")
-
-    # Always try to fetch Rotten Tomatoes score from OMDb (even if user provided one, we can verify/update)
-    try:
-        rt_score = fetch_rt_score_from_omdb(data['title'], release_year)
-        if rt_score:
-            rotten_tomatoes = rt_score
-            metadata_fetched = True
-            print(f"✓ Fetched RT score for '{data['title']}': {rt_score}")
-        elif not rotten_tomatoes:
-            print(f"⚠️  No RT score found for '{data['title']}'")
-    except Exception as e:
-        print(f"Error fetching RT score: {e}")
+            return jsonify({
+                'duplicate': True,
+                'message': 'A film with this title already exists. Please provide the Rotten Tomatoes URL to distinguish between versions.',
+                'existing_films': duplicate_info
+            }), 409
+
+
+    # Optionally look up TMDB metadata and the RT score inline (concurrently, within the latency
+    # budget); whatever isn't found in time is left to the background enrichment jobs
+    use_tmdb = bool(os.getenv('TMDB_API_KEY'))
+    budget = request.args.get('enrichment_budget', DEFAULT_BUDGET_SECONDS, type=float)
+    budget = min(max(budget, 0), MAX_BUDGET_SECONDS)
+    if budget > 0:
+        enrichment = film_enricher.enrich(data['title'], data.get('release_year'), budget, use_tmdb=use_tmdb)
+        if enrichment['pending']:
+            print(f"⚠️  Enrichment budget ({budget}s) ran out for '{data['title']}', still waiting on: {', '.join(enrichment['pending'])}")
+    else:
+        enrichment = {'fields': {}, 'steps': {}, 'pending': ['omdb'] + (['tmdb_search'] if use_tmdb else []), 'elapsed_ms': 0}
+    found = enrichment['fields']
+
+    # User-provided values win, except the RT score (OMDb's is used to verify/update it)
+    poster_url = data.get('poster_url') or found.get('poster_url')
+    release_year = data.get('release_year') or found.get('release_year')
+    length_minutes = data.get('length_minutes') or found.get('length_minutes')
+    genres = data.get('genres') or found.get('genres')
+    rotten_tomatoes = found.get('rotten_tomatoes') or data.get('rotten_tomatoes')
+    tmdb_id = found.get('tmdb_id')
+    imdb_id = found.get('imdb_id')
+    metadata_fetched = bool(found)
+    if found:
+        print(f"✓ Fetched metadata for '{data['title']}' in {enrichment['elapsed_ms']}ms: {', '.join(sorted(found))}")
 
     # Generate RT link if not provided
     rt_link = data.get('rt_link')
     if not rt_link:
         rt_link = generate_rt_url(data['title'])
 
-    # Fetch watch providers if we have a TMDB ID
-    watch_providers = None
-    if tmdb_id:
-        try:
-            watch_providers_data = get_movie_watch_providers(tmdb_id)
-            if watch_providers_data:
-                watch_providers = json.dumps(watch_providers_data)
-                print(f"✓ Fetched watch providers for '{data['title']}'")
-        except Exception as e:
-            print(f"Error fetching watch providers: {e}")
+    watch_providers = json.dumps(found['watch_providers']) if found.get('watch_providers') else None
 
     # Auto-calculate score from letter_rating if score not provided
     score = data.get('score')
     if not score and data.get('letter_rating'):
         score = letter_rating_to_score(data.get('letter_rating'))
 
-    conn = get_db()
-    cursor = conn.cursor()
+    with get_db() as conn:
+        cursor = conn.cursor()
 
-    # Set timestamp if we have watch providers
-    from datetime import datetime
-    watch_providers_updated_at = datetime.utcnow() if watch_providers else None
+        # Set timestamp if we have watch providers
+        from datetime import datetime
+        watch_providers_updated_at = datetime.utcnow() if watch_providers else None
 
-    if USE_POSTGRES:
-        cursor.execute('''
-            INSERT INTO films (order_number, date_seen, title, letter_rating, score,
-                              year_watched, location, format, release_year,
-                              rotten_tomatoes, length_minutes, rt_per_minute, poster_url, genres, rt_link, tmdb_id, watch_providers, watch_providers_updated_at)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            RETURNING id
-        ''', (
-            data.get('order_number'),
-            data.get('date_seen'),
-            data['title'],
-            data.get('letter_rating'),
-            score,
-            data.get('year_watched'),
-            data.get('location'),
-            data.get('format'),
-            release_year,
-            rotten_tomatoes,
-            length_minutes,
-            data.get('rt_per_minute'),
-            poster_url,
-            genres,
-            rt_link,
-            tmdb_id,
-            watch_providers,
-            watch_providers_updated_at
-        ))
-        film_id = cursor.fetchone()[0]
-    else:
-        cursor.execute('''
-            INSERT INTO films (order_number, date_seen, title, letter_rating, score,
-                              year_watched, location, format, release_year,
-                              rotten_tomatoes, length_minutes, rt_per_minute, poster_url, genres, rt_link, a_grade_rank, tmdb_id, watch_providers, watch_providers_updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            data.get('order_number'),
-            data.get('date_seen'),
-            data['title'],
-            data.get('letter_rating'),
-            score,
-            data.get('year_watched'),
-            data.get('location'),
-            data.get('format'),
-            release_year,
-            rotten_tomatoes,
-            length_minutes,
-            data.get('rt_per_minute'),
-            poster_url,
-            genres,
-            rt_link,
-            data.get('a_grade_rank'),
-            tmdb_id,
-            watch_providers,
-            watch_providers_updated_at
-        ))
-        film_id = cursor.lastrowid
-
-    conn.commit()
-    conn.close()
+        if USE_POSTGRES:
+            cursor.execute('''
+                INSERT INTO films (order_number, date_seen, title, letter_rating, score,
+                                  year_watched, location, format, release_year,
+                                  rotten_tomatoes, length_minutes, rt_per_minute, poster_url, genres, rt_link, tmdb_id, imdb_id, watch_providers, watch_providers_updated_at)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                RETURNING id
+            ''', (
+                data.get('order_number'),
+                data.get('date_seen'),
+                data['title'],
+                data.get('letter_rating'),
+                score,
+                data.get('year_watched'),
+                data.get('location'),
+                data.get('format'),
+                release_year,
+                rotten_tomatoes,
+                length_minutes,
+                data.get('rt_per_minute'),
+                poster_url,
+                genres,
+                rt_link,
+                tmdb_id,
+                imdb_id,
+                watch_providers,
+                watch_providers_updated_at
+            ))
+            film_id = cursor.fetchone()[0]
+        else:
+            cursor.execute('''
+                INSERT INTO films (order_number, date_seen, title, letter_rating, score,
+                                  year_watched, location, format, release_year,
+                                  rotten_tomatoes, length_minutes, rt_per_minute, poster_url, genres, rt_link, a_grade_rank, tmdb_id, imdb_id, watch_providers, watch_providers_updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                data.get('order_number'),
+                data.get('date_seen'),
+                data['title'],
+                data.get('letter_rating'),
+                score,
+                data.get('year_watched'),
+                data.get('location'),
+                data.get('format'),
+                release_year,
+                rotten_tomatoes,
+                length_minutes,
+                data.get('rt_per_minute'),
+                poster_url,
+                genres,
+                rt_link,
+                data.get('a_grade_rank'),
+                tmdb_id,
+                imdb_id,
+                watch_providers,
+                watch_providers_updated_at
+            ))
+            film_id = cursor.lastrowid
+
+        analytics_rollups.apply(conn, 'films', film_id, None)
+        genre_index.sync(conn, 'films', film_id)
+        table_versions.bump(conn, 'films')
+        table_versions.commit(conn)
+
+    # Hand unfinished lookups to the job queue (the RT lookup waits for TMDB when there's no year yet)
+    kinds = []
+    if 'tmdb_search' in enrichment['pending'] or 'tmdb_details' in enrichment['pending']:
+        kinds.append('tmdb')
+    if 'omdb' in enrichment['pending'] and (release_year or 'tmdb' not in kinds):
+        kinds.append('omdb')
+    if poster_url:
+        kinds.append('posters')
+    job_ids = enrichment_jobs.enqueue('films', film_id, kinds) if kinds else []
 
     return jsonify({
         'id': film_id,
         'message': 'Film added successfully',
-        'metadata_fetched': metadata_fetched
+        'metadata_fetched': metadata_fetched,
+        'enrichment': {
+            'complete': not enrichment['pending'],
+            'pending': enrichment['pending'],
+            'steps': enrichment['steps'],
+            'elapsed_ms': enrichment['elapsed_ms']
+        },
+        'enrichment_jobs': job_ids,
+        'similar_films': similar_films
     }), 201
 
 @app.route('/api/films/<int:film_id>', methods=['PUT'])
@@ -897,9 +1173,9 @@ def update_film(film_id):
     """Update an existing film"""
     data = request.get_json()
 
-    # Fetch RT score if not provided and film doesn't have one
-    # Make this non-blocking - if it fails, just use what was provided
+    # Look the RT score up (in the background) if it's not provided and the film doesn't have one
     rotten_tomatoes = data.get('rotten_tomatoes')
+    lookup_rt_score = False
     release_year = data.get('release_year')
     title = data.get('title')
     
@@ -907,8 +1183,7 @@ def update_film(film_id):
     if (rotten_tomatoes is None or rotten_tomatoes == '') and title:
         try:
             # Check current RT score in database
-            check_conn = get_db()
-            try:
+            with get_db() as check_conn:
                 if USE_POSTGRES:
                     check_cursor = check_conn.cursor(cursor_factory=RealDictCursor)
                     check_cursor.execute('SELECT rotten_tomatoes FROM films WHERE id = %s', (film_id,))
@@ -919,24 +1194,14 @@ def update_film(film_id):
                     check_cursor.execute('SELECT rotten_tomatoes FROM films WHERE id = ?', (film_id,))
                     current_film = check_cursor.fetchone()
                     current_rt = current_film[0] if current_film else None
-                
-                # Only fetch if current film also doesn't have RT score
-                if not current_rt or current_rt == '':
-                    try:
-                        rt_score = fetch_rt_score_from_omdb(title, release_year)
-                        if rt_score:
-                            data['rotten_tomatoes'] = rt_score
-                            rotten_tomatoes = rt_score
-                            print(f"✓ Fetched RT score for '{title}': {rt_score}")
-                    except Exception as e:
-                        print(f"Error fetching RT score (non-blocking): {e}")
-                        # Continue without RT score
-                else:
-                    # Keep existing RT score if not being updated
-                    data['rotten_tomatoes'] = current_rt
-                    rotten_tomatoes = current_rt
-            finally:
-                check_conn.close()
+
+            # Only fetch if current film also doesn't have RT score
+            if not current_rt or current_rt == '':
+                lookup_rt_score = True
+            else:
+                # Keep existing RT score if not being updated
+                data['rotten_tomatoes'] = current_rt
+                rotten_tomatoes = current_rt
         except Exception as e:
             print(f"Error checking RT score (non-blocking): {e}")
             # Continue - use whatever was provided
@@ -945,84 +1210,83 @@ def update_film(film_id):
     if rotten_tomatoes is None:
         rotten_tomatoes = data.get('rotten_tomatoes')
 
-    conn = None
     try:
-        conn = get_db()
-        cursor = conn.cursor()
+        with get_db() as conn:
+            cursor = conn.cursor()
+            before = analytics_rollups.snapshot(conn, 'films', film_id)
 
-        if USE_POSTGRES:
-            # Build UPDATE dynamically - only update fields that are provided
-            # This avoids errors if columns don't exist
-            updates = []
-            values = []
+            if USE_POSTGRES:
+                # Build UPDATE dynamically - only update fields that are provided
+                # This avoids errors if columns don't exist
+                updates = []
+                values = []
             
-            # All film fields that can be updated
-            allowed_film_fields = [
-                'order_number', 'date_seen', 'title', 'letter_rating', 'score',
-                'year_watched', 'location', 'format', 'release_year', 'rotten_tomatoes',
-                'length_minutes', 'rt_per_minute', 'rt_link', 'genres', 'poster_url', 'a_grade_rank'
-            ]
+                # All film fields that can be updated
+                allowed_film_fields = [
+                    'order_number', 'date_seen', 'title', 'letter_rating', 'score',
+                    'year_watched', 'location', 'format', 'release_year', 'rotten_tomatoes',
+                    'length_minutes', 'rt_per_minute', 'rt_link', 'genres', 'poster_url', 'a_grade_rank'
+                ]
             
-            for field in allowed_film_fields:
-                if field in data:
-                    updates.append(f'{field} = %s')
-                    # Use processed rotten_tomatoes value if available, otherwise use from data
-                    if field == 'rotten_tomatoes' and rotten_tomatoes is not None:
-                        values.append(rotten_tomatoes)
-                    else:
-                        values.append(data.get(field))
+                for field in allowed_film_fields:
+                    if field in data:
+                        updates.append(f'{field} = %s')
+                        # Use processed rotten_tomatoes value if available, otherwise use from data
+                        if field == 'rotten_tomatoes' and rotten_tomatoes is not None:
+                            values.append(rotten_tomatoes)
+                        else:
+                            values.append(data.get(field))
             
-            if updates:
-                values.append(film_id)
-                # Always update updated_at timestamp
-                updates.append('updated_at = CURRENT_TIMESTAMP')
-                query = f'UPDATE films SET {", ".join(updates)} WHERE id = %s'
-                cursor.execute(query, values)
+                if updates:
+                    values.append(film_id)
+                    # Always update updated_at timestamp
+                    updates.append('updated_at = CURRENT_TIMESTAMP')
+                    query = f'UPDATE films SET {", ".join(updates)} WHERE id = %s'
+                    cursor.execute(query, values)
+                else:
+                    # No fields to update
+                    return jsonify({'error': 'No fields to update'}), 400
             else:
-                # No fields to update
-                conn.close()
-                return jsonify({'error': 'No fields to update'}), 400
-        else:
-            # SQLite: Build UPDATE dynamically to match PostgreSQL behavior
-            updates = []
-            values = []
+                # SQLite: Build UPDATE dynamically to match PostgreSQL behavior
+                updates = []
+                values = []
             
-            allowed_film_fields = [
-                'order_number', 'date_seen', 'title', 'letter_rating', 'score',
-                'year_watched', 'location', 'format', 'release_year', 'rotten_tomatoes',
-                'length_minutes', 'rt_per_minute', 'rt_link', 'genres', 'poster_url', 'a_grade_rank'
-            ]
+                allowed_film_fields = [
+                    'order_number', 'date_seen', 'title', 'letter_rating', 'score',
+                    'year_watched', 'location', 'format', 'release_year', 'rotten_tomatoes',
+                    'length_minutes', 'rt_per_minute', 'rt_link', 'genres', 'poster_url', 'a_grade_rank'
+                ]
             
-            for field in allowed_film_fields:
-                if field in data:
-                    updates.append(f'{field} = ?')
-                    # Use processed rotten_tomatoes value if available, otherwise use from data
-                    if field == 'rotten_tomatoes' and rotten_tomatoes is not None:
-                        values.append(rotten_tomatoes)
-                    else:
-                        values.append(data.get(field))
+                for field in allowed_film_fields:
+                    if field in data:
+                        updates.append(f'{field} = ?')
+                        # Use processed rotten_tomatoes value if available, otherwise use from data
+                        if field == 'rotten_tomatoes' and rotten_tomatoes is not None:
+                            values.append(rotten_tomatoes)
+                        else:
+                            values.append(data.get(field))
             
-            if updates:
-                values.append(film_id)
-                # Always update updated_at timestamp
-                updates.append('updated_at = CURRENT_TIMESTAMP')
-                query = f'UPDATE films SET {", ".join(updates)} WHERE id = ?'
-                cursor.execute(query, values)
-            else:
-                conn.close()
-                return jsonify({'error': 'No fields to update'}), 400
+                if updates:
+                    values.append(film_id)
+                    # Always update updated_at timestamp
+                    updates.append('updated_at = CURRENT_TIMESTAMP')
+                    query = f'UPDATE films SET {", ".join(updates)} WHERE id = ?'
+                    cursor.execute(query, values)
+                else:
+                    return jsonify({'error': 'No fields to update'}), 400
 
-        conn.commit()
+            if cursor.rowcount == 0:
+                return jsonify({'error': 'Film not found'}), 404
 
-        if cursor.rowcount == 0:
-            conn.close()
-            return jsonify({'error': 'Film not found'}), 404
+            analytics_rollups.apply(conn, 'films', film_id, before)
+            genre_index.sync(conn, 'films', film_id)
+            table_versions.bump(conn, 'films')
+            table_versions.commit(conn)
 
-        conn.close()
-        return jsonify({'message': 'Film updated successfully'})
+        kinds = (['omdb'] if lookup_rt_score else []) + (['posters'] if data.get('poster_url') else [])
+        job_ids = enrichment_jobs.enqueue('films', film_id, kinds) if kinds else []
+        return jsonify({'message': 'Film updated successfully', 'enrichment_jobs': job_ids})
     except Exception as e:
-        if conn:
-            conn.close()
         print(f"Error updating film: {e}")
         import traceback
         traceback.print_exc()
@@ -1037,27 +1301,24 @@ def update_film_poster(film_id):
     if not poster_url:
         return jsonify({'error': 'poster_url is required'}), 400
     
-    conn = None
     try:
-        conn = get_db()
-        cursor = conn.cursor()
+        with get_db() as conn:
+            cursor = conn.cursor()
         
-        if USE_POSTGRES:
-            cursor.execute('UPDATE films SET poster_url = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s', (poster_url, film_id))
-        else:
-            cursor.execute('UPDATE films SET poster_url = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?', (poster_url, film_id))
+            if USE_POSTGRES:
+                cursor.execute('UPDATE films SET poster_url = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s', (poster_url, film_id))
+            else:
+                cursor.execute('UPDATE films SET poster_url = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?', (poster_url, film_id))
         
-        conn.commit()
+            if cursor.rowcount == 0:
+                return jsonify({'error': 'Film not found'}), 404
         
-        if cursor.rowcount == 0:
-            conn.close()
-            return jsonify({'error': 'Film not found'}), 404
+            table_versions.bump(conn, 'films')
+            table_versions.commit(conn)
         
-        conn.close()
+        queue_poster_ingest('films', [film_id])
         return jsonify({'message': 'Poster URL updated successfully', 'film_id': film_id})
     except Exception as e:
-        if conn:
-            conn.close()
         print(f"Error updating poster: {e}")
         import traceback
         traceback.print_exc()
@@ -1074,34 +1335,31 @@ def update_film_field(film_id):
         return jsonify({'error': 'field name is required'}), 400
     
     # Whitelist of allowed fields to update
-    allowed_fields = ['poster_url', 'title', 'letter_rating', 'score', 'release_year', 
-                     'rotten_tomatoes', 'length_minutes', 'genres', 'rt_link', 
-                     'date_seen', 'year_watched', 'location', 'format', 'order_number', 'a_grade_rank']
-    
-    if field_name not in allowed_fields:
-        return jsonify({'error': f'Field "{field_name}" is not allowed. Allowed fields: {", ".join(allowed_fields)}'}), 400
+    if field_name not in FILM_EDITABLE_FIELDS:
+        return jsonify({'error': f'Field "{field_name}" is not allowed. Allowed fields: {", ".join(FILM_EDITABLE_FIELDS)}'}), 400
     
-    conn = None
     try:
-        conn = get_db()
-        cursor = conn.cursor()
+        with get_db() as conn:
+            cursor = conn.cursor()
+            before = analytics_rollups.snapshot(conn, 'films', film_id)
         
-        if USE_POSTGRES:
-            cursor.execute(f'UPDATE films SET {field_name} = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s', (field_value, film_id))
-        else:
-            cursor.execute(f'UPDATE films SET {field_name} = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?', (field_value, film_id))
+            if USE_POSTGRES:
+                cursor.execute(f'UPDATE films SET {field_name} = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s', (field_value, film_id))
+            else:
+                cursor.execute(f'UPDATE films SET {field_name} = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?', (field_value, film_id))
         
-        conn.commit()
+            if cursor.rowcount == 0:
+                return jsonify({'error': 'Film not found'}), 404
         
-        if cursor.rowcount == 0:
-            conn.close()
-            return jsonify({'error': 'Film not found'}), 404
+            analytics_rollups.apply(conn, 'films', film_id, before)
+            genre_index.sync(conn, 'films', film_id)
+            table_versions.bump(conn, 'films')
+            table_versions.commit(conn)
         
-        conn.close()
+        if field_name == 'poster_url' and field_value:
+            queue_poster_ingest('films', [film_id])
         return jsonify({'message': f'{field_name} updated successfully', 'film_id': film_id, 'field': field_name, 'value': field_value})
     except Exception as e:
-        if conn:
-            conn.close()
         print(f"Error updating field: {e}")
         import traceback
         traceback.print_exc()
@@ -1109,85 +1367,74 @@ def update_film_field(film_id):
 
 @app.route('/api/admin/set-a-grade-rankings', methods=['POST'])
 def set_a_grade_rankings():
-    """Admin endpoint to bulk set A-grade rankings"""
+    """Admin endpoint to bulk set A-grade rankings
+
+    Titles are matched against the A-rated films in memory, ignoring case, punctuation,
+    leading articles and "Last, First" order. Only those exact matches are written; a
+    confident typo match comes back in ``fuzzy_matches`` for the admin to confirm (resend
+    it with the matched title), and other misses in ``not_found`` with ranked ``suggestions``.
+    """
     data = request.get_json()
-    rankings = data.get('rankings', [])  # List of {title: str, rank: int}
+    rankings = data.get('rankings', [])  # List of {title: str, rank: int, alternatives: [str]}
     
     if not rankings:
         return jsonify({'error': 'rankings array is required'}), 400
     
-    conn = None
     try:
-        conn = get_db()
-        cursor = conn.cursor()
+        with get_db() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("SELECT id, title FROM films WHERE letter_rating = 'A'")
+            title_index = TitleIndex(cursor.fetchall())
         
-        updated = 0
-        not_found = []
+            updates = []
+            not_found = []
+            fuzzy_matches = []
+            suggestions = {}
         
-        for item in rankings:
-            title = item.get('title')
-            rank = item.get('rank')
-            alternatives = item.get('alternatives', [])
+            for item in rankings:
+                title = item.get('title')
+                rank = item.get('rank')
+                alternatives = item.get('alternatives', [])
             
-            if not title or rank is None:
-                continue
-            
-            # Try main title first, then alternatives
-            titles_to_try = [title] + alternatives
-            film = None
-            
-            for try_title in titles_to_try:
-                # Find film by title (case-insensitive)
-                if USE_POSTGRES:
-                    cursor.execute("""
-                        SELECT id FROM films 
-                        WHERE LOWER(title) = LOWER(%s) AND letter_rating = 'A'
-                    """, (try_title,))
-                else:
-                    cursor.execute("""
-                        SELECT id FROM films 
-                        WHERE LOWER(title) = LOWER(?) AND letter_rating = 'A'
-                    """, (try_title,))
-                
-                film = cursor.fetchone()
-                if film:
-                    break  # Found it, stop trying alternatives
+                if not title or rank is None:
+                    continue
             
-            if film:
-                film_id = film[0] if USE_POSTGRES else film[0]
-                
-                # Check if a_grade_rank column exists
-                if USE_POSTGRES:
-                    cursor.execute("""
-                        SELECT column_name 
-                        FROM information_schema.columns 
-                        WHERE table_name='films' AND column_name='a_grade_rank'
-                    """)
-                    if not cursor.fetchone():
-                        conn.close()
-                        return jsonify({'error': 'a_grade_rank column does not exist'}), 500
-                
-                # Update the ranking
-                if USE_POSTGRES:
-                    cursor.execute('UPDATE films SET a_grade_rank = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s', (rank, film_id))
-                else:
-                    cursor.execute('UPDATE films SET a_grade_rank = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?', (rank, film_id))
-                
-                updated += 1
-            else:
-                not_found.append(title)
+                # Try main title first, then alternatives
+                film_id, matched_title, score, candidates = title_index.resolve(
+                    [title] + alternatives
+                )
+
+                if film_id is None:
+                    not_found.append(title)
+                    if candidates:
+                        suggestions[title] = candidates
+                    continue
+
+                # Typo matches are only proposed; writing one needs the admin's confirmation
+                if score < 1.0:
+                    fuzzy_matches.append({'title': title, 'matched_title': matched_title, 'id': film_id, 'score': score})
+                    continue
+                updates.append((rank, film_id))
+
+            if updates:
+                placeholder = '%s' if USE_POSTGRES else '?'
+                cursor.executemany(
+                    f'UPDATE films SET a_grade_rank = {placeholder}, updated_at = CURRENT_TIMESTAMP WHERE id = {placeholder}',
+                    updates
+                )
         
-        conn.commit()
-        conn.close()
+            table_versions.bump(conn, 'films')
+            table_versions.commit(conn)
         
         return jsonify({
-            'message': f'Successfully updated {updated} rankings',
-            'updated': updated,
-            'not_found': not_found
+            'message': f'Successfully updated {len(updates)} rankings',
+            'updated': len(updates),
+            'not_found': not_found,
+            'fuzzy_matches': fuzzy_matches,
+            'suggestions': suggestions
         })
     except Exception as e:
-        if conn:
-            conn.close()
         print(f"Error setting A-grade rankings: {e}")
         import traceback
         traceback.print_exc()
@@ -1195,110 +1442,90 @@ def set_a_grade_rankings():
 
 @app.route('/api/admin/set-a-grade-book-rankings', methods=['POST'])
 def set_a_grade_book_rankings():
-    """Admin endpoint to bulk set A-grade book rankings"""
+    """Admin endpoint to bulk set A-grade book rankings
+
+    Matching works like set_a_grade_rankings, against books rated A, A/A+ or A+.
+    """
     data = request.get_json()
-    rankings = data.get('rankings', [])  # List of {book_name: str, rank: int}
+    rankings = data.get('rankings', [])  # List of {book_name: str, rank: int, alternatives: [str]}
     
     if not rankings:
         return jsonify({'error': 'rankings array is required'}), 400
     
-    conn = None
     try:
-        conn = get_db()
-        cursor = conn.cursor()
+        with get_db() as conn:
+            cursor = conn.cursor()
         
-        # Check if updated_at column exists (before any updates to avoid transaction issues)
-        has_updated_at = False
-        try:
-            if USE_POSTGRES:
-                cursor.execute("""
-                    SELECT column_name 
-                    FROM information_schema.columns 
-                    WHERE table_name='books' AND column_name='updated_at'
-                """)
-                has_updated_at = cursor.fetchone() is not None
-            else:
-                # SQLite: try to get column info
-                cursor.execute("PRAGMA table_info(books)")
-                columns = cursor.fetchall()
-                has_updated_at = any(col[1] == 'updated_at' for col in columns)
-        except Exception as e:
-            print(f"Error checking for updated_at column: {e}")
+            # Check if updated_at column exists (SQLite databases created before it was added may lack it)
             has_updated_at = False
-        
-        updated = 0
-        not_found = []
-        
-        for item in rankings:
-            book_name = item.get('book_name')
-            rank = item.get('rank')
-            alternatives = item.get('alternatives', [])
-            
-            if not book_name or rank is None:
-                continue
-            
-            # Try main book name first, then alternatives
-            names_to_try = [book_name] + alternatives
-            book = None
-            
-            for try_name in names_to_try:
-                # Find book by name (case-insensitive) - check for A+ or A/A+ or A ratings
-                if USE_POSTGRES:
-                    cursor.execute("""
-                        SELECT id FROM books 
-                        WHERE LOWER(book_name) = LOWER(%s) AND j_rayting IN ('A+', 'A/A+', 'A')
-                    """, (try_name,))
-                else:
-                    cursor.execute("""
-                        SELECT id FROM books 
-                        WHERE LOWER(book_name) = LOWER(?) AND j_rayting IN ('A+', 'A/A+', 'A')
-                    """, (try_name,))
-                
-                book = cursor.fetchone()
-                if book:
-                    break  # Found it, stop trying alternatives
-            
-            if book:
-                book_id = book[0] if USE_POSTGRES else book[0]
-                
-                # Check if a_grade_rank column exists
+            try:
                 if USE_POSTGRES:
                     cursor.execute("""
                         SELECT column_name 
                         FROM information_schema.columns 
-                        WHERE table_name='books' AND column_name='a_grade_rank'
+                        WHERE table_name='books' AND column_name='updated_at'
                     """)
-                    if not cursor.fetchone():
-                        conn.close()
-                        return jsonify({'error': 'a_grade_rank column does not exist'}), 500
-                
+                    has_updated_at = cursor.fetchone() is not None
+                else:
+                    # SQLite: try to get column info
+                    cursor.execute("PRAGMA table_info(books)")
+                    columns = cursor.fetchall()
+                    has_updated_at = any(col[1] == 'updated_at' for col in columns)
+            except Exception as e:
+                print(f"Error checking for updated_at column: {e}")
+                has_updated_at = False
+
+            cursor.execute("SELECT id, book_name FROM books WHERE j_rayting IN ('A+', 'A/A+', 'A')")
+            title_index = TitleIndex(cursor.fetchall())
+        
+            updates = []
+            not_found = []
+            fuzzy_matches = []
+            suggestions = {}
+        
+            for item in rankings:
+                book_name = item.get('book_name')
+                rank = item.get('rank')
+                alternatives = item.get('alternatives', [])
+            
+                if not book_name or rank is None:
+                    continue
+            
+                # Try main book name first, then alternatives
+                book_id, matched_name, score, candidates = title_index.resolve(
+                    [book_name] + alternatives
+                )
+
+                if book_id is None:
+                    not_found.append(book_name)
+                    if candidates:
+                        suggestions[book_name] = candidates
+                    continue
+
+                if score < 1.0:
+                    fuzzy_matches.append({'book_name': book_name, 'matched_book_name': matched_name, 'id': book_id, 'score': score})
+                    continue
+                updates.append((rank, book_id))
+
+            if updates:
+                placeholder = '%s' if USE_POSTGRES else '?'
                 # Update the ranking (include updated_at only if column exists)
+                set_clause = f'a_grade_rank = {placeholder}'
                 if has_updated_at:
-                    if USE_POSTGRES:
-                        cursor.execute('UPDATE books SET a_grade_rank = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s', (rank, book_id))
-                    else:
-                        cursor.execute('UPDATE books SET a_grade_rank = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?', (rank, book_id))
-                else:
-                    if USE_POSTGRES:
-                        cursor.execute('UPDATE books SET a_grade_rank = %s WHERE id = %s', (rank, book_id))
-                    else:
-                        cursor.execute('UPDATE books SET a_grade_rank = ? WHERE id = ?', (rank, book_id))
-                
-                updated += 1
-            else:
-                not_found.append(book_name)
+                    set_clause += ', updated_at = CURRENT_TIMESTAMP'
+                cursor.executemany(f'UPDATE books SET {set_clause} WHERE id = {placeholder}', updates)
         
-        conn.commit()
-        conn.close()
+            table_versions.bump(conn, 'books')
+            table_versions.commit(conn)
         
         return jsonify({
-            'message': f'Successfully updated {updated} rankings',
-            'updated': updated,
-            'not_found': not_found
+            'message': f'Successfully updated {len(updates)} rankings',
+            'updated': len(updates),
+            'not_found': not_found,
+            'fuzzy_matches': fuzzy_matches,
+            'suggestions': suggestions
         })
     except Exception as e:
-        if conn:
-            conn.close()
         print(f"Error setting A-grade book rankings: {e}")
         import traceback
         traceback.print_exc()
@@ -1307,165 +1534,47 @@ def set_a_grade_book_rankings():
 @app.route('/api/films/<int:film_id>', methods=['DELETE'])
 def delete_film(film_id):
     """Delete a film"""
-    conn = get_db()
-    cursor = conn.cursor()
+    with get_db() as conn:
+        cursor = conn.cursor()
+        before = analytics_rollups.snapshot(conn, 'films', film_id)
 
-    if USE_POSTGRES:
-        cursor.execute('DELETE FROM films WHERE id = %s', (film_id,))
-    else:
-        cursor.execute('DELETE FROM films WHERE id = ?', (film_id,))
+        if USE_POSTGRES:
+            cursor.execute('DELETE FROM films WHERE id = %s', (film_id,))
+        else:
+            cursor.execute('DELETE FROM films WHERE id = ?', (film_id,))
 
-    conn.commit()
+        if cursor.rowcount == 0:
+            return jsonify({'error': 'Film not found'}), 404
 
-    if cursor.rowcount == 0:
-        conn.close()
-        return jsonify({'error': 'Film not found'}), 404
+        analytics_rollups.apply(conn, 'films', film_id, before)
+        genre_index.sync(conn, 'films', film_id)
+        table_versions.bump(conn, 'films')
+        table_versions.commit(conn)
 
-    conn.close()
     return jsonify({'message': 'Film deleted successfully'})
 
 
 @app.route('/api/films/backfill-tmdb-ids', methods=['POST'])
 def backfill_film_tmdb_ids():
-    """Backfill tmdb_id for all films that don't have one by searching TMDB"""
-    import time
-
-    # Get limit from query params (default 200 to stay under Railway timeout)
-    limit = request.args.get('limit', 200, type=int)
-
-    # First get total remaining count
-    conn = get_db()
-    if USE_POSTGRES:
-        from psycopg2.extras import RealDictCursor
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        cursor.execute('SELECT COUNT(*) as count FROM films WHERE tmdb_id IS NULL')
-        total_remaining = cursor.fetchone()['count']
-        cursor.execute('SELECT id, title, release_year FROM films WHERE tmdb_id IS NULL LIMIT %s', (limit,))
-    else:
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) as count FROM films WHERE tmdb_id IS NULL')
-        total_remaining = cursor.fetchone()['count']
-        cursor.execute('SELECT id, title, release_year FROM films WHERE tmdb_id IS NULL LIMIT ?', (limit,))
-
-    films = cursor.fetchall()
-    conn.close()
+    """Start the background tmdb_id backfill for films that don't have one (see batch jobs below)
 
-    updated = []
-    failed = []
-
-    for i, film in enumerate(films):
-        film_dict = dict(film)
-        film_id = film_dict['id']
-        title = film_dict['title']
-        release_year = film_dict.get('release_year')
-
-        try:
-            result = search_movie(title, release_year)
-            if result and result.get('tmdb_id'):
-                tmdb_id = result['tmdb_id']
-
-                conn = get_db()
-                cursor = conn.cursor()
-                if USE_POSTGRES:
-                    cursor.execute('UPDATE films SET tmdb_id = %s WHERE id = %s', (tmdb_id, film_id))
-                else:
-                    cursor.execute('UPDATE films SET tmdb_id = ? WHERE id = ?', (tmdb_id, film_id))
-                conn.commit()
-                conn.close()
-
-                updated.append({'id': film_id, 'title': title, 'tmdb_id': tmdb_id})
-                print(f"✓ [{i+1}/{len(films)}] Found tmdb_id {tmdb_id} for '{title}'")
-            else:
-                failed.append({'id': film_id, 'title': title, 'reason': 'Not found on TMDB'})
-                print(f"✗ [{i+1}/{len(films)}] Could not find '{title}' on TMDB")
-
-            # Rate limiting - TMDB allows 40 requests per 10 seconds
-            time.sleep(0.25)
-
-        except Exception as e:
-            failed.append({'id': film_id, 'title': title, 'reason': str(e)})
-            print(f"✗ [{i+1}/{len(films)}] Error for '{title}': {e}")
-
-    return jsonify({
-        'updated': len(updated),
-        'failed': len(failed),
-        'total_remaining': total_remaining - len(updated),
-        'updated_films': updated[:20],
-        'failed_films': failed[:20]
-    })
+    Same as POST /api/admin/batch-jobs/films-tmdb-ids/start; ?limit= caps the run.
+    """
+    return start_batch_job('films-tmdb-ids')
 
 
 @app.route('/api/films/refresh-providers', methods=['POST'])
 def refresh_film_providers():
-    """Refresh watch providers for all films that have tmdb_id but missing watch_providers"""
-    import time
-
-    # Get limit from query params (default 200 to stay under Railway timeout)
-    limit = request.args.get('limit', 200, type=int)
-
-    conn = get_db()
-    if USE_POSTGRES:
-        from psycopg2.extras import RealDictCursor
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        cursor.execute('SELECT COUNT(*) as count FROM films WHERE tmdb_id IS NOT NULL AND (watch_providers IS NULL OR watch_providers = \'\')')
-        total_remaining = cursor.fetchone()['count']
-        cursor.execute('SELECT id, title, tmdb_id FROM films WHERE tmdb_id IS NOT NULL AND (watch_providers IS NULL OR watch_providers = \'\') LIMIT %s', (limit,))
-    else:
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) as count FROM films WHERE tmdb_id IS NOT NULL AND (watch_providers IS NULL OR watch_providers = \'\')')
-        total_remaining = cursor.fetchone()['count']
-        cursor.execute('SELECT id, title, tmdb_id FROM films WHERE tmdb_id IS NOT NULL AND (watch_providers IS NULL OR watch_providers = \'\') LIMIT ?', (limit,))
-
-    films = cursor.fetchall()
-    conn.close()
+    """Start the background watch provider refresh for films that have tmdb_id but no watch_providers
 
-    updated = []
-    failed = []
-
-    for i, film in enumerate(films):
-        film_dict = dict(film)
-        film_id = film_dict['id']
-        title = film_dict['title']
-        tmdb_id = film_dict['tmdb_id']
-
-        try:
-            providers = get_movie_watch_providers(tmdb_id)
-            if providers:
-                watch_providers_json = json.dumps(providers)
-
-                conn = get_db()
-                cursor = conn.cursor()
-                if USE_POSTGRES:
-                    cursor.execute('UPDATE films SET watch_providers = %s, watch_providers_updated_at = CURRENT_TIMESTAMP WHERE id = %s', (watch_providers_json, film_id))
-                else:
-                    cursor.execute('UPDATE films SET watch_providers = ?, watch_providers_updated_at = CURRENT_TIMESTAMP WHERE id = ?', (watch_providers_json, film_id))
-                conn.commit()
-                conn.close()
-
-                updated.append({'id': film_id, 'title': title, 'providers': len(providers.get('flatrate', [])) + len(providers.get('rent', [])) + len(providers.get('buy', []))})
-                print(f"✓ [{i+1}/{len(films)}] Updated watch providers for '{title}'")
-            else:
-                failed.append({'id': film_id, 'title': title, 'reason': 'No providers found'})
-
-            # Rate limiting
-            time.sleep(0.25)
-        except Exception as e:
-            failed.append({'id': film_id, 'title': title, 'reason': str(e)})
-            print(f"✗ [{i+1}/{len(films)}] Failed to update '{title}': {e}")
-
-    return jsonify({
-        'updated': len(updated),
-        'failed': len(failed),
-        'total_remaining': total_remaining - len(updated),
-        'details': {'updated': updated[:20], 'failed': failed[:20]}
-    })
+    Same as POST /api/admin/batch-jobs/films-watch-providers/start; ?limit= caps the run.
+    """
+    return start_batch_job('films-watch-providers')
 
 
 @app.route('/api/books', methods=['POST'])
 def add_book():
-    """Add a new book with automatic metadata fetching from Google Books"""
-    from google_books_service import search_book
-    
+    """Add a new book; cover, ratings, pages etc. are fetched from Google Books by a background job"""
     data = request.get_json()
 
     required_fields = ['book_name']
@@ -1473,41 +1582,39 @@ def add_book():
         return jsonify({'error': 'Missing required fields'}), 400
 
     # Check for duplicates by book name and author
-    conn = get_db()
-    if USE_POSTGRES:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        cursor.execute('SELECT id, book_name, author FROM books WHERE book_name = %s AND author = %s', 
-                      (data['book_name'], data.get('author', '')))
-    else:
-        cursor = conn.cursor()
-        cursor.execute('SELECT id, book_name, author FROM books WHERE book_name = ? AND author = ?', 
-                      (data['book_name'], data.get('author', '')))
+    with get_db() as conn:
+        if USE_POSTGRES:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            cursor.execute('SELECT id, book_name, author FROM books WHERE book_name = %s AND author = %s', 
+                          (data['book_name'], data.get('author', '')))
+        else:
+            cursor = conn.cursor()
+            cursor.execute('SELECT id, book_name, author FROM books WHERE book_name = ? AND author = ?', 
+                          (data['book_name'], data.get('author', '')))
 
-    existing_books = cursor.fetchall()
+        existing_books = cursor.fetchall()
 
-    if existing_books:
-        duplicate_info = []
-        for book in existing_books:
-            if USE_POSTGRES:
-                duplicate_info.append({
-                    'id': book['id'],
-                    'book_name': book['book_name'],
-                    'author': book['author']
-                })
-            else:
-                duplicate_info.append({
-                    'id': book[0],
-                    'book_name': book[1],
-                    'author': book[2]
-                })
-        conn.close()
-        return jsonify({
-            'duplicate': True,
-            'message': 'A book with this name and author already exists.',
-            'existing_books': duplicate_info
-        }), 409
+        if existing_books:
+            duplicate_info = []
+            for book in existing_books:
+                if USE_POSTGRES:
+                    duplicate_info.append({
+                        'id': book['id'],
+                        'book_name': book['book_name'],
+                        'author': book['author']
+                    })
+                else:
+                    duplicate_info.append({
+                        'id': book[0],
+                        'book_name': book[1],
+                        'author': book[2]
+                    })
+            return jsonify({
+                'duplicate': True,
+                'message': 'A book with this name and author already exists.',
+                'existing_books': duplicate_info
+            }), 409
 
-    conn.close()
 
     # Initialize variables with user-provided data
     cover_url = data.get('cover_url')
@@ -1518,65 +1625,6 @@ def add_book():
     published_date = data.get('published_date')
     description = data.get('description')
     pages = data.get('pages')
-    metadata_fetched = False
-
-    # Always fetch metadata from Google Books API (works without key, but better with key)
-    try:
-        # Search for the book
-        book_data = search_book(data['book_name'], data.get('author'), data.get('isbn'))
-
-        if book_data:
-            # Get cover if not already provided
-            if not cover_url:
-                cover_url = book_data.get('cover_url')
-
-            # Get other metadata if not already provided
-            if not google_books_id:
-                google_books_id = book_data.get('google_books_id')
-            if not isbn:
-                isbn = book_data.get('isbn')
-            if average_rating is None:
-                average_rating = book_data.get('average_rating')
-            if ratings_count is None:
-                ratings_count = book_data.get('ratings_count')
-            if not published_date:
-                published_date = book_data.get('published_date')
-            # Extract year_written from published_date if not already set
-            # Don't use future dates (2025+) as they're likely API errors
-            if not data.get('year_written') and published_date:
-                year_match = None
-                if isinstance(published_date, str):
-                    year_match = published_date[:4] if len(published_date) >= 4 else None
-                elif isinstance(published_date, int):
-                    year_match = str(published_date) if 0 < published_date < 3000 else None
-                if year_match and year_match.isdigit():
-                    year_int = int(year_match)
-                    # Don't use future dates (2025+) as year_written - they're likely API errors
-                    current_year = 2024  # Use 2024 as threshold to avoid 2025+ dates
-                    if year_int <= current_year:
-                        data['year_written'] = year_int
-            if not description:
-                description = book_data.get('description')
-            # Get page count if not already provided
-            if not pages and book_data.get('page_count'):
-                pages = book_data.get('page_count')
-
-            metadata_fetched = True
-            print(f"✓ Fetched metadata for '{data['book_name']}'")
-            if cover_url:
-                print(f"  Cover URL: {cover_url}")
-            else:
-                print(f"  ⚠️  No cover URL found for '{data['book_name']}'")
-            if pages:
-                print(f"  Pages: {pages}")
-            if data.get('year_written'):
-                print(f"  Year written: {data.get('year_written')}")
-        else:
-            print(f"⚠️  No Google Books data found for '{data['book_name']}'")
-    except Exception as e:
-        print(f"Error fetching Google Books data for '{data.get('book_name', 'unknown')}': {e}")
-        import traceback
-        traceback.print_exc()
 
     # Extract year from date_read if year is not provided
     year = data.get('year')
@@ -1610,121 +1658,123 @@ def add_book():
                     pass
 
     # Get max order_number to set new book's order
-    conn = get_db()
-    cursor = conn.cursor()
-    if USE_POSTGRES:
-        cursor.execute('SELECT COALESCE(MAX(order_number), 0) FROM books')
-    else:
-        cursor.execute('SELECT COALESCE(MAX(order_number), 0) FROM books')
-    result = cursor.fetchone()
-    max_order = result[0] if result else 0
-    new_order = max_order + 1
-
-    # Insert new book
-    if USE_POSTGRES:
-        # Extract year_written from published_date if not provided
-        year_written = data.get('year_written')
-        if not year_written and published_date:
-            if isinstance(published_date, str):
-                year_match = published_date[:4] if len(published_date) >= 4 else None
-                if year_match and year_match.isdigit():
-                    year_written = int(year_match)
-            elif isinstance(published_date, int):
-                if 0 < published_date < 3000:
-                    year_written = published_date
-        
-        cursor.execute('''
-            INSERT INTO books (
-                order_number, date_read, year, book_name, author,
-                details_commentary, j_rayting, score, type, pages,
-                form, notes_in_notion, notion_link, cover_url, google_books_id,
-                isbn, average_rating, ratings_count, published_date, year_written, description
-            )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            RETURNING id
-        ''', (
-            data.get('order_number', new_order),
-            data.get('date_read'),
-            year or data.get('year'),  # Use extracted year if available, otherwise user-provided
-            data['book_name'],
-            data.get('author'),
-            data.get('details_commentary'),
-            data.get('j_rayting'),
-            data.get('score') or letter_rating_to_score(data.get('j_rayting')),
-            data.get('type'),
-            pages or data.get('pages'),  # Use fetched pages if available, otherwise user-provided
-            data.get('form'),
-            data.get('notes_in_notion'),
-            data.get('notion_link'),
-            cover_url,
-            google_books_id,
-            isbn,
-            average_rating,
-            ratings_count,
-            published_date,
-            year_written,
-            description
-        ))
-        book_id = cursor.fetchone()[0]
-    else:
-        # Extract year_written from published_date if not provided
-        # Don't use future dates (2025+) as they're likely API errors
-        year_written = data.get('year_written')
-        if not year_written and published_date:
-            if isinstance(published_date, str):
-                year_match = published_date[:4] if len(published_date) >= 4 else None
-                if year_match and year_match.isdigit():
-                    year_int = int(year_match)
-                    # Don't use future dates (2025+) as year_written - they're likely API errors
-                    current_year = 2024  # Use 2024 as threshold to avoid 2025+ dates
-                    if year_int <= current_year:
-                        year_written = year_int
-            elif isinstance(published_date, int):
-                if 0 < published_date < 3000:
-                    current_year = 2024  # Use 2024 as threshold to avoid 2025+ dates
-                    if published_date <= current_year:
+    with get_db() as conn:
+        cursor = conn.cursor()
+        if USE_POSTGRES:
+            cursor.execute('SELECT COALESCE(MAX(order_number), 0) FROM books')
+        else:
+            cursor.execute('SELECT COALESCE(MAX(order_number), 0) FROM books')
+        result = cursor.fetchone()
+        max_order = result[0] if result else 0
+        new_order = max_order + 1
+
+        # Insert new book
+        if USE_POSTGRES:
+            # Extract year_written from published_date if not provided
+            year_written = data.get('year_written')
+            if not year_written and published_date:
+                if isinstance(published_date, str):
+                    year_match = published_date[:4] if len(published_date) >= 4 else None
+                    if year_match and year_match.isdigit():
+                        year_written = int(year_match)
+                elif isinstance(published_date, int):
+                    if 0 < published_date < 3000:
                         year_written = published_date
         
-        cursor.execute('''
-            INSERT INTO books (
-                order_number, date_read, year, book_name, author,
-                details_commentary, j_rayting, score, type, pages,
-                form, notes_in_notion, notion_link, cover_url, google_books_id,
-                isbn, average_rating, ratings_count, published_date, year_written, description
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            data.get('order_number', new_order),
-            data.get('date_read'),
-            year or data.get('year'),  # Use extracted year if available, otherwise user-provided
-            data['book_name'],
-            data.get('author'),
-            data.get('details_commentary'),
-            data.get('j_rayting'),
-            data.get('score') or letter_rating_to_score(data.get('j_rayting')),
-            data.get('type'),
-            pages or data.get('pages'),  # Use fetched pages if available, otherwise user-provided
-            data.get('form'),
-            data.get('notes_in_notion'),
-            data.get('notion_link'),
-            cover_url,
-            google_books_id,
-            isbn,
-            average_rating,
-            ratings_count,
-            published_date,
-            year_written,
-            description
-        ))
-        book_id = cursor.lastrowid
-
-    conn.commit()
-    conn.close()
+            cursor.execute('''
+                INSERT INTO books (
+                    order_number, date_read, year, book_name, author,
+                    details_commentary, j_rayting, score, type, pages,
+                    form, notes_in_notion, notion_link, cover_url, google_books_id,
+                    isbn, average_rating, ratings_count, published_date, year_written, description
+                )
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                RETURNING id
+            ''', (
+                data.get('order_number', new_order),
+                data.get('date_read'),
+                year or data.get('year'),  # Use extracted year if available, otherwise user-provided
+                data['book_name'],
+                data.get('author'),
+                data.get('details_commentary'),
+                data.get('j_rayting'),
+                data.get('score') or letter_rating_to_score(data.get('j_rayting')),
+                data.get('type'),
+                pages or data.get('pages'),  # Use fetched pages if available, otherwise user-provided
+                data.get('form'),
+                data.get('notes_in_notion'),
+                data.get('notion_link'),
+                cover_url,
+                google_books_id,
+                isbn,
+                average_rating,
+                ratings_count,
+                published_date,
+                year_written,
+                description
+            ))
+            book_id = cursor.fetchone()[0]
+        else:
+            # Extract year_written from published_date if not provided
+            # Don't use future dates (2025+) as they're likely API errors
+            year_written = data.get('year_written')
+            if not year_written and published_date:
+                if isinstance(published_date, str):
+                    year_match = published_date[:4] if len(published_date) >= 4 else None
+                    if year_match and year_match.isdigit():
+                        year_int = int(year_match)
+                        # Don't use future dates (2025+) as year_written - they're likely API errors
+                        current_year = 2024  # Use 2024 as threshold to avoid 2025+ dates
+                        if year_int <= current_year:
+                            year_written = year_int
+                elif isinstance(published_date, int):
+                    if 0 < published_date < 3000:
+                        current_year = 2024  # Use 2024 as threshold to avoid 2025+ dates
+                        if published_date <= current_year:
+                            year_written = published_date
+        
+            cursor.execute('''
+                INSERT INTO books (
+                    order_number, date_read, year, book_name, author,
+                    details_commentary, j_rayting, score, type, pages,
+                    form, notes_in_notion, notion_link, cover_url, google_books_id,
+                    isbn, average_rating, ratings_count, published_date, year_written, description
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                data.get('order_number', new_order),
+                data.get('date_read'),
+                year or data.get('year'),  # Use extracted year if available, otherwise user-provided
+                data['book_name'],
+                data.get('author'),
+                data.get('details_commentary'),
+                data.get('j_rayting'),
+                data.get('score') or letter_rating_to_score(data.get('j_rayting')),
+                data.get('type'),
+                pages or data.get('pages'),  # Use fetched pages if available, otherwise user-provided
+                data.get('form'),
+                data.get('notes_in_notion'),
+                data.get('notion_link'),
+                cover_url,
+                google_books_id,
+                isbn,
+                average_rating,
+                ratings_count,
+                published_date,
+                year_written,
+                description
+            ))
+            book_id = cursor.lastrowid
+
+        analytics_rollups.apply(conn, 'books', book_id, None)
+        table_versions.bump(conn, 'books')
+        table_versions.commit(conn)
 
     return jsonify({
         'message': 'Book added successfully',
         'book_id': book_id,
-        'metadata_fetched': metadata_fetched
+        'metadata_fetched': False,
+        'enrichment_jobs': enrichment_jobs.enqueue('books', book_id, ['google_books'])
     }), 201
 
 @app.route('/api/books/<int:book_id>', methods=['PUT'])
@@ -1732,99 +1782,100 @@ def update_book(book_id):
     """Update an existing book"""
     data = request.get_json()
 
-    conn = get_db()
-    cursor = conn.cursor()
+    with get_db() as conn:
+        cursor = conn.cursor()
+        before = analytics_rollups.snapshot(conn, 'books', book_id)
 
-    # Build update query dynamically based on provided fields
-    updates = []
-    params = []
+        # Build update query dynamically based on provided fields
+        updates = []
+        params = []
 
-    allowed_fields = [
-        'order_number', 'date_read', 'year', 'book_name', 'author',
-        'details_commentary', 'j_rayting', 'score', 'type', 'pages',
-        'form', 'notes_in_notion', 'notion_link', 'cover_url', 'google_books_id',
-        'isbn', 'average_rating', 'ratings_count', 'published_date', 'year_written', 'description'
-    ]
+        allowed_fields = [
+            'order_number', 'date_read', 'year', 'book_name', 'author',
+            'details_commentary', 'j_rayting', 'score', 'type', 'pages',
+            'form', 'notes_in_notion', 'notion_link', 'cover_url', 'google_books_id',
+            'isbn', 'average_rating', 'ratings_count', 'published_date', 'year_written', 'description'
+        ]
 
-    placeholder = '%s' if USE_POSTGRES else '?'
+        placeholder = '%s' if USE_POSTGRES else '?'
     
-    # Track if j_rayting is being updated and if score is provided
-    j_rayting_updated = False
-    score_provided = 'score' in data
+        # Track if j_rayting is being updated and if score is provided
+        j_rayting_updated = False
+        score_provided = 'score' in data
     
-    for field in allowed_fields:
-        if field in data:
-            updates.append(f'{field} = {placeholder}')
-            if field == 'j_rayting':
-                j_rayting_updated = True
-            # Always append the value as-is (including empty strings and None)
-            params.append(data[field])
+        for field in allowed_fields:
+            if field in data:
+                updates.append(f'{field} = {placeholder}')
+                if field == 'j_rayting':
+                    j_rayting_updated = True
+                # Always append the value as-is (including empty strings and None)
+                params.append(data[field])
     
-    # If j_rayting was updated but score wasn't provided, auto-calculate score
-    if j_rayting_updated and not score_provided:
-        j_rayting_value = data.get('j_rayting')
-        calculated_score = letter_rating_to_score(j_rayting_value)
-        if calculated_score is not None:
-            updates.append(f'score = {placeholder}')
-            params.append(calculated_score)
-
-    if not updates:
-        conn.close()
-        return jsonify({'error': 'No valid fields to update'}), 400
-
-    params.append(book_id)
+        # If j_rayting was updated but score wasn't provided, auto-calculate score
+        if j_rayting_updated and not score_provided:
+            j_rayting_value = data.get('j_rayting')
+            calculated_score = letter_rating_to_score(j_rayting_value)
+            if calculated_score is not None:
+                updates.append(f'score = {placeholder}')
+                params.append(calculated_score)
+
+        if not updates:
+            return jsonify({'error': 'No valid fields to update'}), 400
+
+        params.append(book_id)
     
-    # Always update updated_at timestamp
-    updates.append('updated_at = CURRENT_TIMESTAMP')
+        # Always update updated_at timestamp
+        updates.append('updated_at = CURRENT_TIMESTAMP')
 
-    if USE_POSTGRES:
-        query = f'UPDATE books SET {", ".join(updates)} WHERE id = %s'
-    else:
-        query = f'UPDATE books SET {", ".join(updates)} WHERE id = ?'
+        if USE_POSTGRES:
+            query = f'UPDATE books SET {", ".join(updates)} WHERE id = %s'
+        else:
+            query = f'UPDATE books SET {", ".join(updates)} WHERE id = ?'
 
-    # Log the update for debugging
-    print(f"Updating book {book_id}: {len(updates)} fields")
-    if 'cover_url' in [u.split('=')[0].strip() for u in updates]:
-        cover_idx = [u.split('=')[0].strip() for u in updates].index('cover_url')
-        print(f"  cover_url = {params[cover_idx]}")
+        # Log the update for debugging
+        print(f"Updating book {book_id}: {len(updates)} fields")
+        if 'cover_url' in [u.split('=')[0].strip() for u in updates]:
+            cover_idx = [u.split('=')[0].strip() for u in updates].index('cover_url')
+            print(f"  cover_url = {params[cover_idx]}")
     
-    cursor.execute(query, params)
-    conn.commit()
+        cursor.execute(query, params)
+        if cursor.rowcount == 0:
+            return jsonify({'error': 'Book not found'}), 404
 
-    if cursor.rowcount == 0:
-        conn.close()
-        return jsonify({'error': 'Book not found'}), 404
+        analytics_rollups.apply(conn, 'books', book_id, before)
+        table_versions.bump(conn, 'books')
+        table_versions.commit(conn)
 
-    # Verify the update by fetching the book back
-    if USE_POSTGRES:
-        cursor.execute('SELECT cover_url FROM books WHERE id = %s', (book_id,))
-    else:
-        cursor.execute('SELECT cover_url FROM books WHERE id = ?', (book_id,))
-    updated_book = cursor.fetchone()
-    saved_cover_url = updated_book[0] if updated_book else None
-    print(f"  Saved cover_url: {saved_cover_url}")
+        # Verify the update by fetching the book back
+        if USE_POSTGRES:
+            cursor.execute('SELECT cover_url FROM books WHERE id = %s', (book_id,))
+        else:
+            cursor.execute('SELECT cover_url FROM books WHERE id = ?', (book_id,))
+        updated_book = cursor.fetchone()
+        saved_cover_url = updated_book[0] if updated_book else None
+        print(f"  Saved cover_url: {saved_cover_url}")
 
-    conn.close()
     return jsonify({'message': 'Book updated successfully', 'cover_url': saved_cover_url})
 
 @app.route('/api/books/<int:book_id>', methods=['DELETE'])
 def delete_book(book_id):
     """Delete a book"""
-    conn = get_db()
-    cursor = conn.cursor()
+    with get_db() as conn:
+        cursor = conn.cursor()
+        before = analytics_rollups.snapshot(conn, 'books', book_id)
 
-    if USE_POSTGRES:
-        cursor.execute('DELETE FROM books WHERE id = %s', (book_id,))
-    else:
-        cursor.execute('DELETE FROM books WHERE id = ?', (book_id,))
+        if USE_POSTGRES:
+            cursor.execute('DELETE FROM books WHERE id = %s', (book_id,))
+        else:
+            cursor.execute('DELETE FROM books WHERE id = ?', (book_id,))
 
-    conn.commit()
+        if cursor.rowcount == 0:
+            return jsonify({'error': 'Book not found'}), 404
 
-    if cursor.rowcount == 0:
-        conn.close()
-        return jsonify({'error': 'Book not found'}), 404
+        analytics_rollups.apply(conn, 'books', book_id, before)
+        table_versions.bump(conn, 'books')
+        table_versions.commit(conn)
 
-    conn.close()
     return jsonify({'message': 'Book deleted successfully'})
 
 @app.route('/api/admin/books/<int:book_id>/cover', methods=['PUT'])
@@ -1837,90 +1888,121 @@ def update_book_cover(book_id):
     book_name = data.get('book_name')
     author = data.get('author')
     
-    conn = None
     try:
-        conn = get_db()
-        cursor = conn.cursor()
+        with get_db() as conn:
+            cursor = conn.cursor()
         
-        # If cover_url not provided, try to fetch from Google Books
-        if not cover_url and (book_name or author):
-            book_data = search_book(book_name or '', author)
-            if book_data and book_data.get('cover_url'):
-                cover_url = book_data['cover_url']
+            # If cover_url not provided, try to fetch from Google Books
+            if not cover_url and (book_name or author):
+                book_data = search_book(book_name or '', author)
+                if book_data and book_data.get('cover_url'):
+                    cover_url = book_data['cover_url']
         
-        if not cover_url:
-            return jsonify({'error': 'cover_url is required or book_name/author needed to fetch'}), 400
+            if not cover_url:
+                return jsonify({'error': 'cover_url is required or book_name/author needed to fetch'}), 400
         
-        if USE_POSTGRES:
-            cursor.execute('UPDATE books SET cover_url = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s', (cover_url, book_id))
-        else:
-            cursor.execute('UPDATE books SET cover_url = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?', (cover_url, book_id))
+            if USE_POSTGRES:
+                cursor.execute('UPDATE books SET cover_url = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s', (cover_url, book_id))
+            else:
+                cursor.execute('UPDATE books SET cover_url = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?', (cover_url, book_id))
+
+            if cursor.rowcount == 0:
+                return jsonify({'error': 'Book not found'}), 404
         
-        conn.commit()
-        conn.close()
+            table_versions.bump(conn, 'books')
+            table_versions.commit(conn)
         return jsonify({'message': 'Cover updated successfully', 'cover_url': cover_url})
     except Exception as e:
-        if conn:
-            conn.close()
         print(f"Error updating cover: {e}")
         import traceback
         traceback.print_exc()
         return jsonify({'error': f'Error updating cover: {str(e)}'}), 500
 
+IMAGE_HASH = re.compile(r'^[0-9a-f]{64}$')
+
+def preferred_image_format():
+    """'webp' when the browser says it can decode WebP, else 'jpeg'"""
+    return 'webp' if 'image/webp' in request.headers.get('Accept', '') else 'jpeg'
+
+def image_variant_redirect(source_key, candidate_urls, size):
+    """Redirect to the immutable /api/images/<hash> URL of ``size`` of an image, fetching it on first use"""
+    try:
+        blob_hash = image_store.resolve(source_key, candidate_urls)
+    except ImageUnavailable as e:
+        return jsonify({'error': str(e)}), 502
+    variant_hash = image_store.variant(blob_hash, size, preferred_image_format())
+    response = redirect(f'/api/images/{variant_hash}', 302)
+    # The hash behind a source can change (new cover, eviction), so only the redirect is short-lived
+    response.headers['Cache-Control'] = 'public, max-age=86400'
+    response.headers['Vary'] = 'Accept'
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    return response
+
+# Hosts book covers come from (Google Books, its image CDN, Open Library); the proxy fetches nothing else
+COVER_PROXY_HOSTS = ('books.google.com', 'covers.openlibrary.org')
+COVER_PROXY_HOST_SUFFIXES = ('.googleusercontent.com',)
+GOOGLE_BOOKS_ID = re.compile(r'^[A-Za-z0-9_-]+$')
+
+def is_cover_proxy_url(url):
+    """True for an http(s) URL on one of the book cover hosts"""
+    parsed = urlparse(url)
+    host = (parsed.hostname or '').lower()
+    return parsed.scheme in ('http', 'https') and (
+        host in COVER_PROXY_HOSTS or host.endswith(COVER_PROXY_HOST_SUFFIXES)
+    )
+
 @app.route('/api/books/cover-proxy', methods=['GET'])
 def proxy_book_cover():
-    """Proxy endpoint to serve book cover images and avoid CORS issues"""
+    """Serve a book cover from the local image store (?size=thumb|grid|detail|original)"""
     cover_url = request.args.get('url')
     book_id = request.args.get('book_id')  # Optional: Google Books ID
+    size = request.args.get('size', 'original')
     
     if not cover_url and not book_id:
         return jsonify({'error': 'url or book_id parameter is required'}), 400
+    if size not in IMAGE_VARIANTS:
+        return jsonify({'error': f'size must be one of: {", ".join(IMAGE_VARIANTS)}'}), 400
+    if cover_url and not is_cover_proxy_url(cover_url):
+        return jsonify({'error': f'url must be an http(s) URL on {", ".join(COVER_PROXY_HOSTS)} or *.googleusercontent.com'}), 400
+    if book_id and not GOOGLE_BOOKS_ID.match(book_id):
+        return jsonify({'error': 'book_id is not a Google Books ID'}), 400
     
-    # If we have a book_id, try to construct a working thumbnail URL
+    candidate_urls = []
     if book_id:
-        # Try the standard Google Books thumbnail URL format
-        thumbnail_urls = [
+        # Try the standard Google Books thumbnail URL formats
+        candidate_urls = [
             f"https://books.google.com/books/publisher/content/images/frontcover/{book_id}?fife=w480-h690",
             f"https://books.google.com/books/content?id={book_id}&printsec=frontcover&img=1&zoom=1",
             f"http://books.google.com/books/content?id={book_id}&printsec=frontcover&img=1&zoom=1"
         ]
-    else:
-        thumbnail_urls = [cover_url]
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Referer': 'https://books.google.com/'
-    }
+    if cover_url:
+        candidate_urls.append(cover_url)
     
-    # Try each URL until one works
-    for url in thumbnail_urls:
-        try:
-            response = requests.get(url, timeout=10, stream=True, headers=headers, allow_redirects=True)
-            response.raise_for_status()
-            
-            # Check if it's actually an image
-            content_type = response.headers.get('Content-Type', '')
-            if 'image' not in content_type:
-                # Check first few bytes to see if it's an image
-                content_preview = response.content[:10]
-                if not (content_preview.startswith(b'\xff\xd8') or content_preview.startswith(b'\x89PNG')):
-                    continue  # Try next URL
-            
-            # Return the image with appropriate headers
-            from flask import Response
-            return Response(
-                response.content,
-                mimetype=content_type or 'image/jpeg',
-                headers={
-                    'Access-Control-Allow-Origin': '*',
-                    'Cache-Control': 'no-cache, no-store, must-revalidate'  # Don't cache to allow updates
-                }
-            )
-        except requests.exceptions.RequestException:
-            continue  # Try next URL
-    
-    # If all URLs failed, return error
-    return jsonify({'error': 'Failed to fetch cover image from all attempted URLs'}), 500
+    # Keyed on the cover URL too, so an admin changing the cover gets the new image
+    source_key = f'google_books:{book_id}:{cover_url or ""}' if book_id else f'url:{cover_url}'
+    return image_variant_redirect(source_key, candidate_urls, size)
+
+@app.route('/api/images/<blob_hash>', methods=['GET'])
+def serve_image(blob_hash):
+    """Serve a cached image blob; the URL is its content hash, so it can be cached forever"""
+    if not IMAGE_HASH.match(blob_hash):
+        return jsonify({'error': 'Image not found'}), 404
+    blob = image_store.open_blob(blob_hash)
+    if blob is None:
+        return jsonify({'error': 'Image not found'}), 404
+    path, content_type = blob
+    response = send_file(path, mimetype=content_type, conditional=True, etag=blob_hash)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    return response
+
+@app.route('/api/posters/<size>/<poster_file>', methods=['GET'])
+def serve_poster(size, poster_file):
+    """A TMDB poster at one of the poster_srcset widths (thumb/grid/detail/original), from the local image store"""
+    if size not in IMAGE_VARIANTS or not POSTER_FILE.match(poster_file):
+        return jsonify({'error': 'Poster not found'}), 404
+    source_key, candidate_urls = poster_source(poster_file)
+    return image_variant_redirect(source_key, candidate_urls, size)
 
 @app.route('/api/admin/books/<int:book_id>/field', methods=['PUT'])
 def update_book_field(book_id):
@@ -1933,416 +2015,237 @@ def update_book_field(book_id):
         return jsonify({'error': 'field is required'}), 400
     
     # Validate field name
-    allowed_fields = [
-        'order_number', 'date_read', 'year', 'book_name', 'author',
-        'details_commentary', 'j_rayting', 'score', 'type', 'pages',
-        'form', 'notes_in_notion', 'notion_link', 'cover_url', 'google_books_id',
-        'isbn', 'average_rating', 'ratings_count', 'published_date', 'year_written', 'description', 'a_grade_rank'
-    ]
-    
-    if field_name not in allowed_fields:
+    if field_name not in BOOK_EDITABLE_FIELDS:
         return jsonify({'error': f'Field {field_name} is not allowed'}), 400
     
-    conn = None
     try:
-        conn = get_db()
-        cursor = conn.cursor()
+        with get_db() as conn:
+            cursor = conn.cursor()
+            before = analytics_rollups.snapshot(conn, 'books', book_id)
         
-        placeholder = '%s' if USE_POSTGRES else '?'
+            placeholder = '%s' if USE_POSTGRES else '?'
         
-        if USE_POSTGRES:
-            cursor.execute(f'UPDATE books SET {field_name} = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s', (field_value, book_id))
-        else:
-            cursor.execute(f'UPDATE books SET {field_name} = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?', (field_value, book_id))
+            if USE_POSTGRES:
+                cursor.execute(f'UPDATE books SET {field_name} = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s', (field_value, book_id))
+            else:
+                cursor.execute(f'UPDATE books SET {field_name} = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?', (field_value, book_id))
+
+            if cursor.rowcount == 0:
+                return jsonify({'error': 'Book not found'}), 404
         
-        conn.commit()
-        conn.close()
+            analytics_rollups.apply(conn, 'books', book_id, before)
+            table_versions.bump(conn, 'books')
+            table_versions.commit(conn)
         return jsonify({'message': f'{field_name} updated successfully', 'book_id': book_id, 'field': field_name, 'value': field_value})
     except Exception as e:
-        if conn:
-            conn.close()
         print(f"Error updating field: {e}")
         import traceback
         traceback.print_exc()
         return jsonify({'error': f'Error updating {field_name}: {str(e)}'}), 500
 
+def read_rollup(rollup, label, sort_key, reverse=False, limit=None, convert=None):
+    """Read one precomputed analytics rollup as [{<label>, count, avg_score}]"""
+    with get_db() as conn:
+        rows = analytics_rollups.read(conn, rollup)
+
+    rows.sort(key=sort_key, reverse=reverse)
+    if limit:
+        rows = rows[:limit]
+    return [
+        {
+            label: convert(row['bucket']) if convert else row['bucket'],
+            'count': row['count'],
+            'avg_score': row['avg_score']
+        }
+        for row in rows
+    ]
+
 @app.route('/api/analytics/by-year', methods=['GET'])
+@table_versions.conditional('films')
+@analytics_cache.cached('films')
 def get_analytics_by_year():
     """Get analytics data grouped by year watched (uses date_seen as fallback)"""
-    conn = get_db()
-    if USE_POSTGRES:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-    else:
-        cursor = conn.cursor()
-
-    # Use year_watched if available, otherwise extract year from date_seen (YYYY-MM-DD format)
-    cursor.execute('''
-        SELECT
-            COALESCE(
-                NULLIF(year_watched, ''),
-                CASE
-                    WHEN date_seen IS NOT NULL AND date_seen != '' AND date_seen LIKE '____-__-__'
-                    THEN SUBSTR(date_seen, 1, 4)
-                    ELSE NULL
-                END
-            ) as year_watched,
-            COUNT(*) as count,
-            ROUND(AVG(score), 2) as avg_score
-        FROM films
-        WHERE (year_watched IS NOT NULL AND year_watched != '')
-           OR (date_seen IS NOT NULL AND date_seen != '' AND date_seen LIKE '____-__-__')
-        GROUP BY 1
-        HAVING COALESCE(
-            NULLIF(year_watched, ''),
-            CASE
-                WHEN date_seen IS NOT NULL AND date_seen != '' AND date_seen LIKE '____-__-__'
-                THEN SUBSTR(date_seen, 1, 4)
-                ELSE NULL
-            END
-        ) IS NOT NULL
-        ORDER BY
-            CASE
-                WHEN COALESCE(
-                    NULLIF(year_watched, ''),
-                    CASE
-                        WHEN date_seen IS NOT NULL AND date_seen != '' AND date_seen LIKE '____-__-__'
-                        THEN SUBSTR(date_seen, 1, 4)
-                        ELSE NULL
-                    END
-                ) = 'Pre-2006' THEN 0
-                ELSE CAST(COALESCE(
-                    NULLIF(year_watched, ''),
-                    CASE
-                        WHEN date_seen IS NOT NULL AND date_seen != '' AND date_seen LIKE '____-__-__'
-                        THEN SUBSTR(date_seen, 1, 4)
-                        ELSE NULL
-                    END
-                ) AS INTEGER)
-            END
-    ''')
-    data = [row_to_dict(row) for row in cursor.fetchall()]
-    conn.close()
-    return jsonify(data)
+    return jsonify(read_rollup('film_watch_year', 'year_watched', by_number))
 
 @app.route('/api/analytics/by-film-year', methods=['GET'])
+@table_versions.conditional('films')
+@analytics_cache.cached('films')
 def get_analytics_by_film_year():
     """Get analytics data grouped by film release year (by decade)"""
-    conn = get_db()
-    if USE_POSTGRES:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-    else:
-        cursor = conn.cursor()
-
-    cursor.execute('''
-        SELECT
-            CASE
-                WHEN release_year < 1950 THEN 'Pre-1950'
-                ELSE CAST((release_year / 10) * 10 AS TEXT) || 's'
-            END as decade,
-            COUNT(*) as count,
-            ROUND(AVG(score), 2) as avg_score
-        FROM films
-        WHERE release_year IS NOT NULL
-        GROUP BY decade
-        ORDER BY
-            CASE
-                WHEN decade = 'Pre-1950' THEN 0
-                ELSE CAST(SUBSTR(decade, 1, 4) AS INTEGER)
-            END
-    ''')
-    data = [row_to_dict(row) for row in cursor.fetchall()]
-    conn.close()
-    return jsonify(data)
+    return jsonify(read_rollup('film_release_decade', 'decade', by_number))
 
 @app.route('/api/analytics/by-rt-score', methods=['GET'])
+@table_versions.conditional('films')
+@analytics_cache.cached('films')
 def get_analytics_by_rt_score():
     """Get analytics data grouped by Rotten Tomatoes score ranges"""
-    conn = get_db()
-    if USE_POSTGRES:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-    else:
-        cursor = conn.cursor()
-
-    cursor.execute('''
-        SELECT
-            CASE
-                WHEN CAST(REPLACE(rotten_tomatoes, '%', '') AS INTEGER) >= 90 THEN '90-100%'
-                WHEN CAST(REPLACE(rotten_tomatoes, '%', '') AS INTEGER) >= 80 THEN '80-89%'
-                WHEN CAST(REPLACE(rotten_tomatoes, '%', '') AS INTEGER) >= 70 THEN '70-79%'
-                WHEN CAST(REPLACE(rotten_tomatoes, '%', '') AS INTEGER) >= 60 THEN '60-69%'
-                WHEN CAST(REPLACE(rotten_tomatoes, '%', '') AS INTEGER) >= 50 THEN '50-59%'
-                WHEN CAST(REPLACE(rotten_tomatoes, '%', '') AS INTEGER) >= 40 THEN '40-49%'
-                WHEN CAST(REPLACE(rotten_tomatoes, '%', '') AS INTEGER) >= 30 THEN '30-39%'
-                WHEN CAST(REPLACE(rotten_tomatoes, '%', '') AS INTEGER) >= 20 THEN '20-29%'
-                WHEN CAST(REPLACE(rotten_tomatoes, '%', '') AS INTEGER) >= 10 THEN '10-19%'
-                ELSE '0-9%'
-            END as rt_range,
-            COUNT(*) as count,
-            ROUND(AVG(score), 2) as avg_score
-        FROM films
-        WHERE rotten_tomatoes IS NOT NULL
-        AND rotten_tomatoes != ''
-        GROUP BY rt_range
-        ORDER BY
-            CASE rt_range
-                WHEN '90-100%' THEN 1
-                WHEN '80-89%' THEN 2
-                WHEN '70-79%' THEN 3
-                WHEN '60-69%' THEN 4
-                WHEN '50-59%' THEN 5
-                WHEN '40-49%' THEN 6
-                WHEN '30-39%' THEN 7
-                WHEN '20-29%' THEN 8
-                WHEN '10-19%' THEN 9
-                WHEN '0-9%' THEN 10
-            END
-    ''')
-    data = [row_to_dict(row) for row in cursor.fetchall()]
-    conn.close()
-    return jsonify(data)
+    return jsonify(read_rollup('film_rt_range', 'rt_range', by_rt_range))
 
 @app.route('/api/analytics/by-genre', methods=['GET'])
+@table_versions.conditional('films')
+@analytics_cache.cached('films')
 def get_analytics_by_genre():
     """Get analytics data grouped by genre, sorted by count descending"""
-    conn = get_db()
-    if USE_POSTGRES:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-    else:
-        cursor = conn.cursor()
-
-    # Get all genres (films can have multiple genres separated by comma)
-    cursor.execute('''
-        SELECT genres, score
-        FROM films
-        WHERE genres IS NOT NULL
-        AND genres != ''
-    ''')
-
-    films_with_genres = cursor.fetchall()
-
-    # Count occurrences of each genre and calculate average scores
-    genre_stats = {}
-    for row in films_with_genres:
-        row_dict = row_to_dict(row)
-        genres = row_dict['genres'].split(', ')
-        score = row_dict['score']
-
-        for genre in genres:
-            genre = genre.strip()
-            if genre not in genre_stats:
-                genre_stats[genre] = {'count': 0, 'scores': []}
-            genre_stats[genre]['count'] += 1
-            if score:
-                genre_stats[genre]['scores'].append(score)
-
-    # Convert to list format and calculate averages
-    data = []
-    for genre, stats in genre_stats.items():
-        avg_score = round(sum(stats['scores']) / len(stats['scores']), 2) if stats['scores'] else None
-        data.append({
-            'genre': genre,
-            'count': stats['count'],
-            'avg_score': avg_score
-        })
-
-    # Sort by count descending
-    data.sort(key=lambda x: x['count'], reverse=True)
-
-    conn.close()
+    with get_db() as conn:
+        data = genre_index.stats(conn, 'films')
     return jsonify(data)
 
 @app.route('/api/analytics/books/by-year', methods=['GET'])
+@table_versions.conditional('books')
+@analytics_cache.cached('books')
 def get_books_analytics_by_year():
     """Get books analytics data grouped by year read"""
-    conn = get_db()
-    if USE_POSTGRES:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-    else:
-        cursor = conn.cursor()
-
-    cursor.execute('''
-        SELECT year, COUNT(*) as count, ROUND(AVG(score), 2) as avg_score
-        FROM books
-        WHERE year IS NOT NULL
-        GROUP BY year
-        ORDER BY year DESC
-    ''')
-    data = [book_row_to_dict(row) for row in cursor.fetchall()]
-    conn.close()
-    return jsonify(data)
+    return jsonify(read_rollup('book_year', 'year', by_number, reverse=True, convert=int))
 
 @app.route('/api/analytics/books/by-type', methods=['GET'])
+@table_versions.conditional('books')
+@analytics_cache.cached('books')
 def get_books_analytics_by_type():
     """Get books analytics data grouped by type"""
-    conn = get_db()
-    if USE_POSTGRES:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-    else:
-        cursor = conn.cursor()
-
-    cursor.execute('''
-        SELECT type, COUNT(*) as count, ROUND(AVG(score), 2) as avg_score
-        FROM books
-        WHERE type IS NOT NULL AND type != ''
-        GROUP BY type
-        ORDER BY count DESC
-    ''')
-    data = [book_row_to_dict(row) for row in cursor.fetchall()]
-    conn.close()
-    return jsonify(data)
+    return jsonify(read_rollup('book_type', 'type', by_count))
 
 @app.route('/api/analytics/books/by-form', methods=['GET'])
+@table_versions.conditional('books')
+@analytics_cache.cached('books')
 def get_books_analytics_by_form():
     """Get books analytics data grouped by form (Kindle vs Book)"""
-    conn = get_db()
-    if USE_POSTGRES:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-    else:
-        cursor = conn.cursor()
-
-    cursor.execute('''
-        SELECT form, COUNT(*) as count, ROUND(AVG(score), 2) as avg_score
-        FROM books
-        WHERE form IS NOT NULL AND form != ''
-        GROUP BY form
-        ORDER BY count DESC
-    ''')
-    data = [book_row_to_dict(row) for row in cursor.fetchall()]
-    conn.close()
-    return jsonify(data)
+    return jsonify(read_rollup('book_form', 'form', by_count))
 
 @app.route('/api/analytics/books/by-author', methods=['GET'])
+@table_versions.conditional('books')
+@analytics_cache.cached('books')
 def get_books_analytics_by_author():
     """Get books analytics data grouped by author (top authors)"""
-    conn = get_db()
-    if USE_POSTGRES:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-    else:
-        cursor = conn.cursor()
-
-    cursor.execute('''
-        SELECT author, COUNT(*) as count, ROUND(AVG(score), 2) as avg_score
-        FROM books
-        WHERE author IS NOT NULL AND author != ''
-        GROUP BY author
-        ORDER BY count DESC
-        LIMIT 20
-    ''')
-    data = [book_row_to_dict(row) for row in cursor.fetchall()]
-    conn.close()
-    return jsonify(data)
+    return jsonify(read_rollup('book_author', 'author', by_count, limit=20))
 
 @app.route('/api/analytics/books/summary', methods=['GET'])
+@table_versions.conditional('books')
+@analytics_cache.cached('books')
 def get_books_summary():
     """Get overall books summary statistics"""
-    conn = get_db()
-    if USE_POSTGRES:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-    else:
-        cursor = conn.cursor()
+    with get_db() as conn:
+        if USE_POSTGRES:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+        else:
+            cursor = conn.cursor()
 
-    cursor.execute('''
-        SELECT 
-            COUNT(*) as total_books,
-            ROUND(AVG(score), 2) as avg_score,
-            SUM(pages) as total_pages,
-            ROUND(AVG(pages), 2) as avg_pages,
-            ROUND(AVG(average_rating), 2) as avg_goodreads_rating
-        FROM books
-        WHERE pages IS NOT NULL
-    ''')
+        cursor.execute('''
+            SELECT 
+                COUNT(*) as total_books,
+                ROUND(AVG(score), 2) as avg_score,
+                SUM(pages) as total_pages,
+                ROUND(AVG(pages), 2) as avg_pages,
+                ROUND(AVG(average_rating), 2) as avg_goodreads_rating
+            FROM books
+            WHERE pages IS NOT NULL
+        ''')
     
-    result = cursor.fetchone()
-    if USE_POSTGRES:
-        summary = dict(result)
-    else:
-        summary = {
-            'total_books': result[0],
-            'avg_score': result[1],
-            'total_pages': result[2],
-            'avg_pages': result[3],
-            'avg_goodreads_rating': result[4]
-        }
+        result = cursor.fetchone()
+        if USE_POSTGRES:
+            summary = dict(result)
+        else:
+            summary = {
+                'total_books': result[0],
+                'avg_score': result[1],
+                'total_pages': result[2],
+                'avg_pages': result[3],
+                'avg_goodreads_rating': result[4]
+            }
     
-    conn.close()
     return jsonify(summary)
 
 # ============== SHOWS API ROUTES ==============
 
 def fetch_imdb_rating(imdb_id):
-    """Fetch IMDB rating from OMDb API"""
-    if not imdb_id:
-        return None
-
-    omdb_api_key = os.getenv('OMDB_API_KEY', '4e9616c3')
-    omdb_base_url = 'http://www.omdbapi.com/'
-
+    """Fetch IMDB rating from OMDb; None if not found or OMDb fails"""
     try:
-        response = requests.get(omdb_base_url, params={
-            'apikey': omdb_api_key,
-            'i': imdb_id
-        }, timeout=5)
-        response.raise_for_status()
-        data = response.json()
-
-        if data.get('Response') == 'True':
-            return data.get('imdbRating')
-        return None
+        return omdb_client.imdb_rating(imdb_id)
     except Exception as e:
         print(f"Error fetching IMDB rating: {e}")
         return None
 
 @app.route('/api/shows', methods=['GET'])
+@table_versions.conditional('shows')
 def get_shows():
-    """Get all shows with optional search/filter"""
+    """Get all shows with optional search/filter (paginated when ?limit or ?cursor is given)"""
     search = request.args.get('search', '')
     genre = request.args.get('genre', '')
     rating = request.args.get('rating', '')
 
-    conn = get_db()
-    if USE_POSTGRES:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-    else:
-        cursor = conn.cursor()
+    try:
+        limit, cursor_key, include_total = get_pagination_args(key_size=1)
+        select_list, output_fields = get_projection_args(SHOW_FIELDS, ['id'], SHOW_FIELD_DEPENDENCIES)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
     placeholder = '%s' if USE_POSTGRES else '?'
 
-    query = 'SELECT * FROM shows WHERE 1=1'
+    filters = ''
     params = []
 
     if search:
-        query += f' AND title LIKE {placeholder}'
-        params.append(f'%{search}%')
+        match = search_index.match_query(search)
+        if match:
+            filters += f" AND {search_index.filter_clause('shows')}"
+            params.append(match)
+        else:
+            filters += f' AND title LIKE {placeholder}'
+            params.append(f'%{search}%')
 
     if genre:
-        query += f' AND genres LIKE {placeholder}'
+        filters += f' AND genres LIKE {placeholder}'
         params.append(f'%{genre}%')
 
     if rating:
-        query += f' AND j_rayting = {placeholder}'
+        filters += f' AND j_rayting = {placeholder}'
         params.append(rating)
 
+    query = f'SELECT {select_list} FROM shows WHERE 1=1{filters}'
+    query_params = list(params)
+
+    if cursor_key:
+        query += f' AND id < {placeholder}'
+        query_params.append(cursor_key[0])
+
     query += ' ORDER BY id DESC'
 
-    cursor.execute(query, params)
-    shows = [show_row_to_dict(row) for row in cursor.fetchall()]
-    conn.close()
+    if limit:
+        query += f' LIMIT {placeholder}'
+        query_params.append(limit + 1)
+
+    with get_db() as conn:
+        if USE_POSTGRES:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+        else:
+            cursor = conn.cursor()
+
+        cursor.execute(query, query_params)
+        shows = [show_row_to_dict(row, output_fields) for row in cursor.fetchall()]
 
-    return jsonify(shows)
+        total = None
+        if limit and include_total:
+            cursor.execute(f'SELECT COUNT(*) AS total FROM shows WHERE 1=1{filters}', params)
+            total = dict(cursor.fetchone())['total']
+
+    if not limit:
+        return jsonify(shows)
+
+    return jsonify(build_page(shows, limit, lambda show: [show['id']], total))
 
 @app.route('/api/shows/<int:show_id>', methods=['GET'])
+@provider_refresh.tracks('shows', 'show_id')
+@table_versions.conditional('shows')
 def get_show(show_id):
     """Get a single show by ID"""
-    conn = get_db()
-    if USE_POSTGRES:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        cursor.execute('SELECT * FROM shows WHERE id = %s', (show_id,))
-    else:
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM shows WHERE id = ?', (show_id,))
+    with get_db() as conn:
+        if USE_POSTGRES:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            cursor.execute('SELECT * FROM shows WHERE id = %s', (show_id,))
+        else:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM shows WHERE id = ?', (show_id,))
 
-    show = cursor.fetchone()
-    conn.close()
+        show = cursor.fetchone()
 
     if show is None:
         return jsonify({'error': 'Show not found'}), 404
@@ -2351,7 +2254,7 @@ def get_show(show_id):
 
 @app.route('/api/shows', methods=['POST'])
 def add_show():
-    """Add a new show with automatic metadata fetching from TMDB"""
+    """Add a new show; poster, seasons, IMDb rating etc. are fetched from TMDB/OMDb by background jobs"""
     data = request.get_json()
 
     required_fields = ['title']
@@ -2359,24 +2262,22 @@ def add_show():
         return jsonify({'error': 'Missing required fields'}), 400
 
     # Check for duplicates
-    conn = get_db()
-    if USE_POSTGRES:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        cursor.execute('SELECT id, title FROM shows WHERE title = %s', (data['title'],))
-    else:
-        cursor = conn.cursor()
-        cursor.execute('SELECT id, title FROM shows WHERE title = ?', (data['title'],))
+    with get_db() as conn:
+        if USE_POSTGRES:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            cursor.execute('SELECT id, title FROM shows WHERE title = %s', (data['title'],))
+        else:
+            cursor = conn.cursor()
+            cursor.execute('SELECT id, title FROM shows WHERE title = ?', (data['title'],))
 
-    existing_shows = cursor.fetchall()
-    if existing_shows:
-        conn.close()
-        return jsonify({
-            'duplicate': True,
-            'message': 'A show with this title already exists.',
-            'existing_shows': [dict(s) for s in existing_shows]
-        }), 409
+        existing_shows = cursor.fetchall()
+        if existing_shows:
+            return jsonify({
+                'duplicate': True,
+                'message': 'A show with this title already exists.',
+                'existing_shows': [dict(s) for s in existing_shows]
+            }), 409
 
-    conn.close()
 
     # Initialize variables with user-provided data
     poster_url = data.get('poster_url')
@@ -2389,59 +2290,7 @@ def add_show():
     imdb_id = data.get('imdb_id')
     imdb_rating = data.get('imdb_rating')
     tmdb_id = data.get('tmdb_id')
-    metadata_fetched = False
-
-    # Fetch metadata from TMDB if API key is available
-    if os.getenv('TMDB_API_KEY'):
-        try:
-            show_data = search_tv_show(data['title'], start_year)
-
-            if show_data:
-                tmdb_id = show_data.get('tmdb_id')
-
-                if tmdb_id:
-                    details = get_tv_show_details(tmdb_id)
-                    if details:
-                        if not poster_url:
-                            poster_url = details.get('poster_url')
-                        if not start_year:
-                            start_year = details.get('start_year')
-                        if not end_year and not is_ongoing:
-                            end_year = details.get('end_year')
-                            is_ongoing = details.get('is_ongoing', False)
-                        if not seasons:
-                            seasons = details.get('seasons')
-                        if not episodes:
-                            episodes = details.get('episodes')
-                        if not genres:
-                            genres = details.get('genres')
-                        if not imdb_id:
-                            imdb_id = details.get('imdb_id')
-
-                        metadata_fetched = True
-                        print(f"✓ Fetched metadata for '{data['title']}'")
-        except Exception as e:
-            print(f"Error fetching TMDB data for show: {e}")
-
-    # Fetch IMDB rating if we have an IMDB ID
-    if imdb_id and not imdb_rating:
-        try:
-            imdb_rating = fetch_imdb_rating(imdb_id)
-            if imdb_rating:
-                print(f"✓ Fetched IMDB rating for '{data['title']}': {imdb_rating}")
-        except Exception as e:
-            print(f"Error fetching IMDB rating: {e}")
-
-    # Fetch watch providers if we have a TMDB ID
-    watch_providers = None
-    if tmdb_id:
-        try:
-            watch_providers_data = get_tv_watch_providers(tmdb_id)
-            if watch_providers_data:
-                watch_providers = json.dumps(watch_providers_data)
-                print(f"✓ Fetched watch providers for '{data['title']}'")
-        except Exception as e:
-            print(f"Error fetching watch providers: {e}")
+    watch_providers = None  # filled in by the tmdb enrichment job
 
     # Auto-calculate score from j_rayting
     score = data.get('score')
@@ -2452,76 +2301,85 @@ def add_show():
     from datetime import datetime
     watch_providers_updated_at = datetime.utcnow() if watch_providers else None
 
-    conn = get_db()
-    cursor = conn.cursor()
+    with get_db() as conn:
+        cursor = conn.cursor()
 
-    if USE_POSTGRES:
-        cursor.execute('''
-            INSERT INTO shows (
-                title, start_year, end_year, is_ongoing, seasons, episodes,
-                j_rayting, score, imdb_rating, imdb_id, tmdb_id, genres,
-                poster_url, details_commentary, date_watched, a_grade_rank, watch_providers, watch_providers_updated_at
-            )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            RETURNING id
-        ''', (
-            data['title'],
-            start_year,
-            end_year,
-            is_ongoing,
-            seasons,
-            episodes,
-            data.get('j_rayting'),
-            score,
-            imdb_rating,
-            imdb_id,
-            tmdb_id,
-            genres,
-            poster_url,
-            data.get('details_commentary'),
-            data.get('date_watched'),
-            data.get('a_grade_rank'),
-            watch_providers,
-            watch_providers_updated_at
-        ))
-        show_id = cursor.fetchone()[0]
-    else:
-        cursor.execute('''
-            INSERT INTO shows (
-                title, start_year, end_year, is_ongoing, seasons, episodes,
-                j_rayting, score, imdb_rating, imdb_id, tmdb_id, genres,
-                poster_url, details_commentary, date_watched, a_grade_rank, watch_providers, watch_providers_updated_at
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            data['title'],
-            start_year,
-            end_year,
-            is_ongoing,
-            seasons,
-            episodes,
-            data.get('j_rayting'),
-            score,
-            imdb_rating,
-            imdb_id,
-            tmdb_id,
-            genres,
-            poster_url,
-            data.get('details_commentary'),
-            data.get('date_watched'),
-            data.get('a_grade_rank'),
-            watch_providers,
-            watch_providers_updated_at
-        ))
-        show_id = cursor.lastrowid
-
-    conn.commit()
-    conn.close()
+        if USE_POSTGRES:
+            cursor.execute('''
+                INSERT INTO shows (
+                    title, start_year, end_year, is_ongoing, seasons, episodes,
+                    j_rayting, score, imdb_rating, imdb_id, tmdb_id, genres,
+                    poster_url, details_commentary, date_watched, a_grade_rank, watch_providers, watch_providers_updated_at
+                )
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                RETURNING id
+            ''', (
+                data['title'],
+                start_year,
+                end_year,
+                is_ongoing,
+                seasons,
+                episodes,
+                data.get('j_rayting'),
+                score,
+                imdb_rating,
+                imdb_id,
+                tmdb_id,
+                genres,
+                poster_url,
+                data.get('details_commentary'),
+                data.get('date_watched'),
+                data.get('a_grade_rank'),
+                watch_providers,
+                watch_providers_updated_at
+            ))
+            show_id = cursor.fetchone()[0]
+        else:
+            cursor.execute('''
+                INSERT INTO shows (
+                    title, start_year, end_year, is_ongoing, seasons, episodes,
+                    j_rayting, score, imdb_rating, imdb_id, tmdb_id, genres,
+                    poster_url, details_commentary, date_watched, a_grade_rank, watch_providers, watch_providers_updated_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                data['title'],
+                start_year,
+                end_year,
+                is_ongoing,
+                seasons,
+                episodes,
+                data.get('j_rayting'),
+                score,
+                imdb_rating,
+                imdb_id,
+                tmdb_id,
+                genres,
+                poster_url,
+                data.get('details_commentary'),
+                data.get('date_watched'),
+                data.get('a_grade_rank'),
+                watch_providers,
+                watch_providers_updated_at
+            ))
+            show_id = cursor.lastrowid
+
+        analytics_rollups.apply(conn, 'shows', show_id, None)
+        genre_index.sync(conn, 'shows', show_id)
+        table_versions.bump(conn, 'shows')
+        table_versions.commit(conn)
+
+    kinds = ['tmdb'] if os.getenv('TMDB_API_KEY') else []
+    if imdb_id and not imdb_rating:
+        kinds.append('omdb')
+    if poster_url:
+        kinds.append('posters')
 
     return jsonify({
         'id': show_id,
         'message': 'Show added successfully',
-        'metadata_fetched': metadata_fetched
+        'metadata_fetched': False,
+        'enrichment_jobs': enrichment_jobs.enqueue('shows', show_id, kinds) if kinds else []
     }), 201
 
 @app.route('/api/shows/<int:show_id>', methods=['PUT'])
@@ -2529,131 +2387,92 @@ def update_show(show_id):
     """Update an existing show"""
     data = request.get_json()
 
-    conn = get_db()
-    cursor = conn.cursor()
+    with get_db() as conn:
+        cursor = conn.cursor()
+        before = analytics_rollups.snapshot(conn, 'shows', show_id)
 
-    updates = []
-    params = []
+        updates = []
+        params = []
 
-    allowed_fields = [
-        'title', 'start_year', 'end_year', 'is_ongoing', 'seasons', 'episodes',
-        'j_rayting', 'score', 'imdb_rating', 'imdb_id', 'tmdb_id', 'genres',
-        'poster_url', 'details_commentary', 'date_watched', 'a_grade_rank'
-    ]
+        allowed_fields = [
+            'title', 'start_year', 'end_year', 'is_ongoing', 'seasons', 'episodes',
+            'j_rayting', 'score', 'imdb_rating', 'imdb_id', 'tmdb_id', 'genres',
+            'poster_url', 'details_commentary', 'date_watched', 'a_grade_rank'
+        ]
 
-    placeholder = '%s' if USE_POSTGRES else '?'
+        placeholder = '%s' if USE_POSTGRES else '?'
 
-    j_rayting_updated = False
-    score_provided = 'score' in data
+        j_rayting_updated = False
+        score_provided = 'score' in data
 
-    for field in allowed_fields:
-        if field in data:
-            updates.append(f'{field} = {placeholder}')
-            if field == 'j_rayting':
-                j_rayting_updated = True
-            params.append(data[field])
+        for field in allowed_fields:
+            if field in data:
+                updates.append(f'{field} = {placeholder}')
+                if field == 'j_rayting':
+                    j_rayting_updated = True
+                params.append(data[field])
 
-    # Auto-calculate score if j_rayting updated but score not provided
-    if j_rayting_updated and not score_provided:
-        calculated_score = letter_rating_to_score(data.get('j_rayting'))
-        if calculated_score is not None:
-            updates.append(f'score = {placeholder}')
-            params.append(calculated_score)
+        # Auto-calculate score if j_rayting updated but score not provided
+        if j_rayting_updated and not score_provided:
+            calculated_score = letter_rating_to_score(data.get('j_rayting'))
+            if calculated_score is not None:
+                updates.append(f'score = {placeholder}')
+                params.append(calculated_score)
 
-    if not updates:
-        conn.close()
-        return jsonify({'error': 'No valid fields to update'}), 400
+        if not updates:
+            return jsonify({'error': 'No valid fields to update'}), 400
 
-    params.append(show_id)
-    updates.append('updated_at = CURRENT_TIMESTAMP')
+        params.append(show_id)
+        updates.append('updated_at = CURRENT_TIMESTAMP')
 
-    if USE_POSTGRES:
-        query = f'UPDATE shows SET {", ".join(updates)} WHERE id = %s'
-    else:
-        query = f'UPDATE shows SET {", ".join(updates)} WHERE id = ?'
+        if USE_POSTGRES:
+            query = f'UPDATE shows SET {", ".join(updates)} WHERE id = %s'
+        else:
+            query = f'UPDATE shows SET {", ".join(updates)} WHERE id = ?'
 
-    cursor.execute(query, params)
-    conn.commit()
+        cursor.execute(query, params)
+        if cursor.rowcount == 0:
+            return jsonify({'error': 'Show not found'}), 404
 
-    if cursor.rowcount == 0:
-        conn.close()
-        return jsonify({'error': 'Show not found'}), 404
+        analytics_rollups.apply(conn, 'shows', show_id, before)
+        genre_index.sync(conn, 'shows', show_id)
+        table_versions.bump(conn, 'shows')
+        table_versions.commit(conn)
 
-    conn.close()
+    if data.get('poster_url'):
+        queue_poster_ingest('shows', [show_id])
     return jsonify({'message': 'Show updated successfully'})
 
 @app.route('/api/shows/<int:show_id>', methods=['DELETE'])
 def delete_show(show_id):
     """Delete a show"""
-    conn = get_db()
-    cursor = conn.cursor()
+    with get_db() as conn:
+        cursor = conn.cursor()
+        before = analytics_rollups.snapshot(conn, 'shows', show_id)
 
-    if USE_POSTGRES:
-        cursor.execute('DELETE FROM shows WHERE id = %s', (show_id,))
-    else:
-        cursor.execute('DELETE FROM shows WHERE id = ?', (show_id,))
+        if USE_POSTGRES:
+            cursor.execute('DELETE FROM shows WHERE id = %s', (show_id,))
+        else:
+            cursor.execute('DELETE FROM shows WHERE id = ?', (show_id,))
 
-    conn.commit()
+        if cursor.rowcount == 0:
+            return jsonify({'error': 'Show not found'}), 404
 
-    if cursor.rowcount == 0:
-        conn.close()
-        return jsonify({'error': 'Show not found'}), 404
+        analytics_rollups.apply(conn, 'shows', show_id, before)
+        genre_index.sync(conn, 'shows', show_id)
+        table_versions.bump(conn, 'shows')
+        table_versions.commit(conn)
 
-    conn.close()
     return jsonify({'message': 'Show deleted successfully'})
 
 
 @app.route('/api/shows/refresh-providers', methods=['POST'])
 def refresh_show_providers():
-    """Refresh watch providers for all shows that have tmdb_id but missing watch_providers"""
-    conn = get_db()
-    if USE_POSTGRES:
-        from psycopg2.extras import RealDictCursor
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        cursor.execute('SELECT id, title, tmdb_id FROM shows WHERE tmdb_id IS NOT NULL AND (watch_providers IS NULL OR watch_providers = \'\')')
-    else:
-        cursor = conn.cursor()
-        cursor.execute('SELECT id, title, tmdb_id FROM shows WHERE tmdb_id IS NOT NULL AND (watch_providers IS NULL OR watch_providers = \'\')')
+    """Start the background watch provider refresh for shows that have tmdb_id but no watch_providers
 
-    shows = cursor.fetchall()
-    conn.close()
-
-    updated = []
-    failed = []
-
-    for show in shows:
-        show_dict = dict(show)
-        show_id = show_dict['id']
-        title = show_dict['title']
-        tmdb_id = show_dict['tmdb_id']
-
-        try:
-            providers = get_tv_watch_providers(tmdb_id)
-            if providers:
-                watch_providers_json = json.dumps(providers)
-
-                conn = get_db()
-                cursor = conn.cursor()
-                if USE_POSTGRES:
-                    cursor.execute('UPDATE shows SET watch_providers = %s, watch_providers_updated_at = CURRENT_TIMESTAMP WHERE id = %s', (watch_providers_json, show_id))
-                else:
-                    cursor.execute('UPDATE shows SET watch_providers = ?, watch_providers_updated_at = CURRENT_TIMESTAMP WHERE id = ?', (watch_providers_json, show_id))
-                conn.commit()
-                conn.close()
-
-                updated.append({'id': show_id, 'title': title, 'providers': len(providers.get('flatrate', [])) + len(providers.get('rent', [])) + len(providers.get('buy', []))})
-                print(f"✓ Updated watch providers for '{title}'")
-            else:
-                failed.append({'id': show_id, 'title': title, 'reason': 'No providers found'})
-        except Exception as e:
-            failed.append({'id': show_id, 'title': title, 'reason': str(e)})
-            print(f"✗ Failed to update '{title}': {e}")
-
-    return jsonify({
-        'updated': len(updated),
-        'failed': len(failed),
-        'details': {'updated': updated, 'failed': failed}
-    })
+    Same as POST /api/admin/batch-jobs/shows-watch-providers/start.
+    """
+    return start_batch_job('shows-watch-providers')
 
 
 @app.route('/api/admin/shows/<int:show_id>/field', methods=['PUT'])
@@ -2666,144 +2485,129 @@ def update_show_field(show_id):
     if not field_name:
         return jsonify({'error': 'field is required'}), 400
 
-    allowed_fields = [
-        'title', 'start_year', 'end_year', 'is_ongoing', 'seasons', 'episodes',
-        'j_rayting', 'score', 'imdb_rating', 'imdb_id', 'tmdb_id', 'genres',
-        'poster_url', 'details_commentary', 'date_watched', 'a_grade_rank'
-    ]
-
-    if field_name not in allowed_fields:
+    if field_name not in SHOW_EDITABLE_FIELDS:
         return jsonify({'error': f'Field {field_name} is not allowed'}), 400
 
-    conn = None
     try:
-        conn = get_db()
-        cursor = conn.cursor()
+        with get_db() as conn:
+            cursor = conn.cursor()
+            before = analytics_rollups.snapshot(conn, 'shows', show_id)
 
-        if USE_POSTGRES:
-            cursor.execute(f'UPDATE shows SET {field_name} = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s', (field_value, show_id))
-        else:
-            cursor.execute(f'UPDATE shows SET {field_name} = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?', (field_value, show_id))
+            if USE_POSTGRES:
+                cursor.execute(f'UPDATE shows SET {field_name} = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s', (field_value, show_id))
+            else:
+                cursor.execute(f'UPDATE shows SET {field_name} = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?', (field_value, show_id))
 
-        conn.commit()
-        conn.close()
+            if cursor.rowcount == 0:
+                return jsonify({'error': 'Show not found'}), 404
+
+            analytics_rollups.apply(conn, 'shows', show_id, before)
+            genre_index.sync(conn, 'shows', show_id)
+            table_versions.bump(conn, 'shows')
+            table_versions.commit(conn)
+        if field_name == 'poster_url' and field_value:
+            queue_poster_ingest('shows', [show_id])
         return jsonify({'message': f'{field_name} updated successfully', 'show_id': show_id, 'field': field_name, 'value': field_value})
     except Exception as e:
-        if conn:
-            conn.close()
         print(f"Error updating field: {e}")
         return jsonify({'error': f'Error updating {field_name}: {str(e)}'}), 500
 
 @app.route('/api/analytics/shows/by-year', methods=['GET'])
+@table_versions.conditional('shows')
+@analytics_cache.cached('shows')
 def get_shows_analytics_by_year():
     """Get shows analytics grouped by start year decade"""
-    conn = get_db()
-    if USE_POSTGRES:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-    else:
-        cursor = conn.cursor()
-
-    cursor.execute('''
-        SELECT
-            CASE
-                WHEN start_year < 1990 THEN 'Pre-1990'
-                ELSE CAST((start_year / 10) * 10 AS TEXT) || 's'
-            END as decade,
-            COUNT(*) as count,
-            ROUND(AVG(score), 2) as avg_score
-        FROM shows
-        WHERE start_year IS NOT NULL
-        GROUP BY decade
-        ORDER BY
-            CASE
-                WHEN decade = 'Pre-1990' THEN 0
-                ELSE CAST(SUBSTR(decade, 1, 4) AS INTEGER)
-            END
-    ''')
-    data = [show_row_to_dict(row) for row in cursor.fetchall()]
-    conn.close()
-    return jsonify(data)
+    return jsonify(read_rollup('show_decade', 'decade', by_number))
 
 @app.route('/api/analytics/shows/by-genre', methods=['GET'])
+@table_versions.conditional('shows')
+@analytics_cache.cached('shows')
 def get_shows_analytics_by_genre():
     """Get shows analytics grouped by genre"""
-    conn = get_db()
-    if USE_POSTGRES:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-    else:
-        cursor = conn.cursor()
-
-    cursor.execute('''
-        SELECT genres, score
-        FROM shows
-        WHERE genres IS NOT NULL AND genres != ''
-    ''')
-
-    shows_with_genres = cursor.fetchall()
-
-    genre_stats = {}
-    for row in shows_with_genres:
-        row_dict = show_row_to_dict(row)
-        genres = row_dict['genres'].split(', ')
-        score = row_dict['score']
-
-        for genre in genres:
-            genre = genre.strip()
-            if genre not in genre_stats:
-                genre_stats[genre] = {'count': 0, 'scores': []}
-            genre_stats[genre]['count'] += 1
-            if score:
-                genre_stats[genre]['scores'].append(score)
-
-    data = []
-    for genre, stats in genre_stats.items():
-        avg_score = round(sum(stats['scores']) / len(stats['scores']), 2) if stats['scores'] else None
-        data.append({
-            'genre': genre,
-            'count': stats['count'],
-            'avg_score': avg_score
-        })
-
-    data.sort(key=lambda x: x['count'], reverse=True)
-    conn.close()
+    with get_db() as conn:
+        data = genre_index.stats(conn, 'shows')
     return jsonify(data)
 
 @app.route('/api/analytics/shows/summary', methods=['GET'])
+@table_versions.conditional('shows')
+@analytics_cache.cached('shows')
 def get_shows_summary():
     """Get overall shows summary statistics"""
-    conn = get_db()
-    if USE_POSTGRES:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-    else:
-        cursor = conn.cursor()
+    with get_db() as conn:
+        if USE_POSTGRES:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+        else:
+            cursor = conn.cursor()
 
-    cursor.execute('''
-        SELECT
-            COUNT(*) as total_shows,
-            ROUND(AVG(score), 2) as avg_score,
-            SUM(seasons) as total_seasons,
-            SUM(episodes) as total_episodes,
-            ROUND(AVG(CAST(REPLACE(imdb_rating, '/10', '') AS REAL)), 2) as avg_imdb_rating
-        FROM shows
-    ''')
-
-    result = cursor.fetchone()
-    if USE_POSTGRES:
-        summary = dict(result)
-    else:
-        summary = {
-            'total_shows': result[0],
-            'avg_score': result[1],
-            'total_seasons': result[2],
-            'total_episodes': result[3],
-            'avg_imdb_rating': result[4]
-        }
+        cursor.execute('''
+            SELECT
+                COUNT(*) as total_shows,
+                ROUND(AVG(score), 2) as avg_score,
+                SUM(seasons) as total_seasons,
+                SUM(episodes) as total_episodes,
+                ROUND(AVG(CAST(REPLACE(imdb_rating, '/10', '') AS REAL)), 2) as avg_imdb_rating
+            FROM shows
+        ''')
+
+        result = cursor.fetchone()
+        if USE_POSTGRES:
+            summary = dict(result)
+        else:
+            summary = {
+                'total_shows': result[0],
+                'avg_score': result[1],
+                'total_seasons': result[2],
+                'total_episodes': result[3],
+                'avg_imdb_rating': result[4]
+            }
 
-    conn.close()
     return jsonify(summary)
 
 # ============== END SHOWS API ROUTES ==============
 
+SEARCH_ROW_CONVERTERS = {
+    'films': row_to_dict,
+    'books': book_row_to_dict,
+    'shows': show_row_to_dict
+}
+
+@app.route('/api/search', methods=['GET'])
+@table_versions.conditional('films', 'books', 'shows')
+def search_all():
+    """Ranked full-text search across films, books and shows
+
+    ?q= words to match (each as a prefix), ?type=films,books,shows to restrict the
+    tables searched, ?limit= results per table (default 20, max 100).
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'q is required'}), 400
+
+    types = [t.strip() for t in request.args.get('type', 'films,books,shows').split(',') if t.strip()]
+    unknown = [t for t in types if t not in SEARCH_ROW_CONVERTERS]
+    if unknown:
+        return jsonify({'error': f'Unknown type: {", ".join(unknown)}. Allowed types: {", ".join(SEARCH_ROW_CONVERTERS)}'}), 400
+
+    try:
+        limit = int(request.args.get('limit', 20))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    if limit < 1:
+        return jsonify({'error': 'limit must be at least 1'}), 400
+    limit = min(limit, 100)
+
+    results = {'query': query}
+    with get_db() as conn:
+        for table in types:
+            if USE_POSTGRES:
+                cursor = conn.cursor(cursor_factory=RealDictCursor)
+            else:
+                cursor = conn.cursor()
+            rows = search_index.search(cursor, table, query, limit)
+            results[table] = [SEARCH_ROW_CONVERTERS[table](row) for row in rows]
+
+    return jsonify(results)
+
 @app.route('/api/admin/init-db', methods=['POST'])
 def init_database():
     """Initialize database tables (admin only)"""
@@ -2820,6 +2624,153 @@ def init_database():
             'error': str(e)
         }), 500
 
+@app.route('/api/admin/db-pool-stats', methods=['GET'])
+def get_db_pool_stats():
+    """Connection pool metrics (checkouts, waits, exhaustion, in-use/idle counts)"""
+    return jsonify(get_db_pool().stats())
+
+@app.route('/api/admin/tmdb-stats', methods=['GET'])
+def get_tmdb_stats():
+    """TMDB client metrics per endpoint (calls, errors, retries, latency) and rate limiter wait time"""
+    return jsonify(tmdb_client.stats())
+
+@app.route('/api/admin/omdb-stats', methods=['GET'])
+def get_omdb_stats():
+    """OMDb client metrics (lookups by id/title, coalesced, network calls) and today's remaining quota"""
+    return jsonify(omdb_client.stats())
+
+@app.route('/api/admin/book-enrichment-stats', methods=['GET'])
+def get_book_enrichment_stats():
+    """Book enrichment metrics (lookups, coalesced duplicates, errors), source priority and rate limits"""
+    return jsonify(book_enricher.stats())
+
+@app.route('/api/admin/cache-stats', methods=['GET'])
+def get_cache_stats():
+    """Analytics response cache, on-disk API cache and image store metrics (hits, misses, evictions, ...)"""
+    return jsonify({'analytics': analytics_cache.stats(), 'api': api_cache.stats(), 'images': image_store.stats()})
+
+@app.route('/api/admin/rebuild-analytics-rollups', methods=['POST'])
+def rebuild_analytics_rollups():
+    """Recompute the analytics rollups and genre index from the base tables (e.g. after running an import script)"""
+    try:
+        with get_db() as conn:
+            result = analytics_rollups.rebuild(conn)
+            genres = genre_index.rebuild(conn)
+            for table in result:
+                table_versions.bump(conn, table)
+            table_versions.commit(conn)
+        return jsonify({'success': True, 'rebuilt': result, 'genre_index': genres})
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+BULK_EDITABLE_FIELDS = {
+    'films': FILM_EDITABLE_FIELDS,
+    'books': BOOK_EDITABLE_FIELDS,
+    'shows': SHOW_EDITABLE_FIELDS
+}
+MAX_BULK_OPERATIONS = 5000
+
+@app.route('/api/admin/<table>/bulk-update', methods=['POST'])
+def bulk_update_fields(table):
+    """Admin endpoint to apply many single-field updates in one request and one transaction
+
+    Body: {"operations": [{"id": 12, "field": "a_grade_rank", "value": 3}, ...]}
+    Fields are checked against the same allow-lists as the /field endpoints. Valid
+    operations are written with one batched UPDATE per field; the response has a result
+    per operation (in request order) with status "updated", "invalid" or "not_found".
+    """
+    if table not in BULK_EDITABLE_FIELDS:
+        return jsonify({'error': f'Unknown table "{table}". Allowed tables: {", ".join(BULK_EDITABLE_FIELDS)}'}), 404
+
+    data = request.get_json() or {}
+    operations = data.get('operations')
+    if not isinstance(operations, list) or not operations:
+        return jsonify({'error': 'operations array is required'}), 400
+    if len(operations) > MAX_BULK_OPERATIONS:
+        return jsonify({'error': f'At most {MAX_BULK_OPERATIONS} operations per request'}), 400
+
+    allowed_fields = BULK_EDITABLE_FIELDS[table]
+    results = []
+    valid = []  # (result index, id, field, value)
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict):
+            results.append({'index': index, 'status': 'invalid', 'error': 'operation must be an object'})
+            continue
+        row_id = operation.get('id')
+        field_name = operation.get('field')
+        result = {'index': index, 'id': row_id, 'field': field_name}
+        if not isinstance(row_id, int) or isinstance(row_id, bool):
+            result.update({'status': 'invalid', 'error': 'id must be an integer'})
+        elif field_name not in allowed_fields:
+            result.update({'status': 'invalid', 'error': f'Field "{field_name}" is not allowed'})
+        elif 'value' not in operation:
+            result.update({'status': 'invalid', 'error': 'value is required'})
+        else:
+            valid.append((index, row_id, field_name, operation['value']))
+        results.append(result)
+
+    placeholder = '%s' if USE_POSTGRES else '?'
+    try:
+        with get_db() as conn:
+            cursor = conn.cursor()
+
+            existing_ids = set()
+            requested_ids = sorted({row_id for _, row_id, _, _ in valid})
+            for start in range(0, len(requested_ids), 500):
+                chunk = requested_ids[start:start + 500]
+                cursor.execute(
+                    f'SELECT id FROM {table} WHERE id IN ({", ".join([placeholder] * len(chunk))})',
+                    chunk
+                )
+                existing_ids.update(row[0] for row in cursor.fetchall())
+
+            # One batched UPDATE per field; operations keep their request order within a field
+            updates_by_field = {}
+            for index, row_id, field_name, value in valid:
+                if row_id not in existing_ids:
+                    results[index]['status'] = 'not_found'
+                    continue
+                updates_by_field.setdefault(field_name, []).append((value, row_id))
+                results[index]['status'] = 'updated'
+
+            for field_name, rows in updates_by_field.items():
+                query = (f'UPDATE {table} SET {field_name} = {placeholder}, updated_at = CURRENT_TIMESTAMP '
+                         f'WHERE id = {placeholder}')
+                if USE_POSTGRES:
+                    execute_batch(cursor, query, rows, page_size=200)
+                else:
+                    cursor.executemany(query, rows)
+
+            # Derived tables: recomputing once is cheaper than per-row deltas for large batches
+            if updates_by_field:
+                if analytics_rollups.depends_on(table, updates_by_field):
+                    analytics_rollups.rebuild(conn, [table])
+                if 'genres' in updates_by_field and table in ('films', 'shows'):
+                    genre_index.rebuild(conn, [table])
+                table_versions.bump(conn, table)
+            table_versions.commit(conn)
+    except Exception as e:
+        print(f"Error applying bulk update to {table}: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': f'Error applying bulk update (no changes were saved): {str(e)}'}), 500
+
+    if table in ('films', 'shows') and 'poster_url' in updates_by_field:
+        queue_poster_ingest(table, [row_id for value, row_id in updates_by_field['poster_url'] if value])
+
+    counts = {}
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+    return jsonify({
+        'updated': counts.get('updated', 0),
+        'invalid': counts.get('invalid', 0),
+        'not_found': counts.get('not_found', 0),
+        'results': results
+    })
+
 @app.route('/api/admin/import-from-json', methods=['POST'])
 def import_from_json():
     """Import films from JSON file (admin only - for data migration)"""
@@ -2831,77 +2782,82 @@ def import_from_json():
         with open(json_file, 'r', encoding='utf-8') as f:
             films = json.load(f)
 
-        conn = get_db()
-        cursor = conn.cursor()
-
-        # Clear existing data
-        if USE_POSTGRES:
-            cursor.execute('DELETE FROM films')
-        else:
-            cursor.execute('DELETE FROM films')
-        conn.commit()
+        with get_db() as conn:
+            cursor = conn.cursor()
 
-        # Insert all films
-        inserted = 0
-        for film in films:
+            # Clear existing data
             if USE_POSTGRES:
-                cursor.execute('''
-                    INSERT INTO films (
-                        order_number, date_seen, title, letter_rating, score,
-                        year_watched, location, format, release_year,
-                        rotten_tomatoes, length_minutes, rt_per_minute,
-                        poster_url, genres, rt_link, created_at
-                    )
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ''', (
-                    film.get('order_number'),
-                    film.get('date_seen'),
-                    film.get('title'),
-                    film.get('letter_rating'),
-                    film.get('score'),
-                    film.get('year_watched'),
-                    film.get('location'),
-                    film.get('format'),
-                    film.get('release_year'),
-                    film.get('rotten_tomatoes'),
-                    film.get('length_minutes'),
-                    film.get('rt_per_minute'),
-                    film.get('poster_url'),
-                    film.get('genres'),
-                    film.get('rt_link'),
-                    film.get('created_at')
-                ))
+                cursor.execute('DELETE FROM films')
             else:
-                cursor.execute('''
-                    INSERT INTO films (
-                        order_number, date_seen, title, letter_rating, score,
-                        year_watched, location, format, release_year,
-                        rotten_tomatoes, length_minutes, rt_per_minute,
-                        poster_url, genres, rt_link, created_at
-                    )
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    film.get('order_number'),
-                    film.get('date_seen'),
-                    film.get('title'),
-                    film.get('letter_rating'),
-                    film.get('score'),
-                    film.get('year_watched'),
-                    film.get('location'),
-                    film.get('format'),
-                    film.get('release_year'),
-                    film.get('rotten_tomatoes'),
-                    film.get('length_minutes'),
-                    film.get('rt_per_minute'),
-                    film.get('poster_url'),
-                    film.get('genres'),
-                    film.get('rt_link'),
-                    film.get('created_at')
-                ))
-            inserted += 1
-
-        conn.commit()
-        conn.close()
+                cursor.execute('DELETE FROM films')
+            analytics_rollups.rebuild(conn, ['films'])
+            genre_index.rebuild(conn, ['films'])
+            table_versions.bump(conn, 'films')
+            table_versions.commit(conn)
+
+            # Insert all films
+            inserted = 0
+            for film in films:
+                if USE_POSTGRES:
+                    cursor.execute('''
+                        INSERT INTO films (
+                            order_number, date_seen, title, letter_rating, score,
+                            year_watched, location, format, release_year,
+                            rotten_tomatoes, length_minutes, rt_per_minute,
+                            poster_url, genres, rt_link, created_at
+                        )
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    ''', (
+                        film.get('order_number'),
+                        film.get('date_seen'),
+                        film.get('title'),
+                        film.get('letter_rating'),
+                        film.get('score'),
+                        film.get('year_watched'),
+                        film.get('location'),
+                        film.get('format'),
+                        film.get('release_year'),
+                        film.get('rotten_tomatoes'),
+                        film.get('length_minutes'),
+                        film.get('rt_per_minute'),
+                        film.get('poster_url'),
+                        film.get('genres'),
+                        film.get('rt_link'),
+                        film.get('created_at')
+                    ))
+                else:
+                    cursor.execute('''
+                        INSERT INTO films (
+                            order_number, date_seen, title, letter_rating, score,
+                            year_watched, location, format, release_year,
+                            rotten_tomatoes, length_minutes, rt_per_minute,
+                            poster_url, genres, rt_link, created_at
+                        )
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', (
+                        film.get('order_number'),
+                        film.get('date_seen'),
+                        film.get('title'),
+                        film.get('letter_rating'),
+                        film.get('score'),
+                        film.get('year_watched'),
+                        film.get('location'),
+                        film.get('format'),
+                        film.get('release_year'),
+                        film.get('rotten_tomatoes'),
+                        film.get('length_minutes'),
+                        film.get('rt_per_minute'),
+                        film.get('poster_url'),
+                        film.get('genres'),
+                        film.get('rt_link'),
+                        film.get('created_at')
+                    ))
+                inserted += 1
+
+            analytics_rollups.rebuild(conn, ['films'])
+            genre_index.rebuild(conn, ['films'])
+            table_versions.bump(conn, 'films')
+            table_versions.commit(conn)
 
         return jsonify({
             'success': True,
@@ -2920,14 +2876,468 @@ def import_from_json():
             'error': str(e)
         }), 500
 
+# ============== ENRICHMENT JOBS ==============
+
+def load_item(table, item_id, columns):
+    """Selected columns of one row as a dict (None if the row is gone)"""
+    placeholder = '%s' if USE_POSTGRES else '?'
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f'SELECT {", ".join(columns)} FROM {table} WHERE id = {placeholder}', (item_id,))
+        row = cursor.fetchone()
+    return dict(zip(columns, row)) if row else None
+
+def fill_enriched_fields(table, item_id, values, overwrite=()):
+    """Write enrichment results to a row, filling only empty columns (plus any listed in ``overwrite``)
+
+    Goes through the usual write path (rollups, genre index, table versions) and
+    returns the fields that actually changed, so re-running a job is a no-op.
+    """
+    values = {column: value for column, value in values.items() if value not in (None, '')}
+    if not values:
+        return {}
+    placeholder = '%s' if USE_POSTGRES else '?'
+    columns = list(values)
+
+    with get_db() as conn:
+        cursor = conn.cursor()
+        before = analytics_rollups.snapshot(conn, table, item_id)
+        cursor.execute(f'SELECT {", ".join(columns)} FROM {table} WHERE id = {placeholder}', (item_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return {}
+        current = dict(zip(columns, row))
+
+        changes = {
+            column: value for column, value in values.items()
+            if (column in overwrite or current[column] in (None, '')) and current[column] != value
+        }
+        if not changes:
+            return {}
+
+        assignments = ', '.join(f'{column} = {placeholder}' for column in changes)
+        cursor.execute(
+            f'UPDATE {table} SET {assignments}, updated_at = CURRENT_TIMESTAMP WHERE id = {placeholder}',
+            list(changes.values()) + [item_id]
+        )
+        analytics_rollups.apply(conn, table, item_id, before)
+        if 'genres' in changes:
+            genre_index.sync(conn, table, item_id)
+        table_versions.bump(conn, table)
+        table_versions.commit(conn)
+
+    return {column: value for column, value in changes.items() if column != 'watch_providers_updated_at'}
+
+@enrichment_jobs.handler('films', 'tmdb')
+def enrich_film_from_tmdb(film_id):
+    """Poster, genres, release year, runtime and watch providers for a film"""
+    film = load_item('films', film_id, ['title', 'release_year', 'tmdb_id'])
+    if film is None:
+        return {}
+
+    values = {}
+    tmdb_id = film['tmdb_id']
+    if not tmdb_id:
+        movie = search_movie(film['title'], film['release_year'])
+        if movie:
+            tmdb_id = movie.get('tmdb_id')
+            values.update(tmdb_id=tmdb_id, poster_url=movie.get('poster_url'), genres=movie.get('genres'))
+            if movie.get('release_date'):
+                values['release_year'] = int(movie['release_date'][:4])
+
+    overwrite = ()
+    if tmdb_id:
+        bundle = get_movie_bundle(tmdb_id)
+        if bundle:
+            values['length_minutes'] = bundle.get('runtime')
+            values['imdb_id'] = bundle.get('imdb_id')
+            if bundle.get('release_date') and 'release_year' not in values:
+                values['release_year'] = int(bundle['release_date'][:4])
+            if bundle.get('watch_providers'):
+                from datetime import datetime
+                values['watch_providers'] = json.dumps(bundle['watch_providers'])
+                values['watch_providers_updated_at'] = datetime.utcnow()
+                overwrite = ('watch_providers', 'watch_providers_updated_at')
+
+    applied = fill_enriched_fields('films', film_id, values, overwrite)
+
+    # Without a release year at save time the RT lookup waited for this one; with a new
+    # IMDb id it can now be an exact i= lookup instead of a title search
+    if not film['release_year'] or 'imdb_id' in applied:
+        enrichment_jobs.enqueue('films', film_id, ['omdb'])
+    if 'poster_url' in applied:
+        enrichment_jobs.enqueue('films', film_id, ['posters'])
+    return applied
+
+@enrichment_jobs.handler('films', 'omdb')
+def enrich_film_from_omdb(film_id):
+    """Rotten Tomatoes score (OMDb's value replaces the stored one, as when adding a film)"""
+    film = load_item('films', film_id, ['title', 'release_year', 'imdb_id'])
+    if film is None:
+        return {}
+    # Called directly (not via fetch_rt_score_from_omdb) so OMDb errors and quota refusals are retried
+    rt_score = omdb_client.rt_score(film['title'], film['release_year'], film['imdb_id'])
+    return fill_enriched_fields('films', film_id, {'rotten_tomatoes': rt_score}, overwrite=('rotten_tomatoes',))
+
+@enrichment_jobs.handler('shows', 'tmdb')
+def enrich_show_from_tmdb(show_id):
+    """Poster, years, seasons/episodes, genres, IMDb id and watch providers for a show"""
+    show = load_item('shows', show_id, ['title', 'start_year', 'end_year', 'is_ongoing', 'tmdb_id', 'imdb_rating'])
+    if show is None:
+        return {}
+
+    tmdb_id = show['tmdb_id']
+    if not tmdb_id:
+        show_data = search_tv_show(show['title'], show['start_year'])
+        tmdb_id = show_data.get('tmdb_id') if show_data else None
+
+    values = {'tmdb_id': tmdb_id}
+    overwrite = []
+    if tmdb_id:
+        details = get_tv_show_details(tmdb_id)
+        if details:
+            for field in ('poster_url', 'start_year', 'seasons', 'episodes', 'genres', 'imdb_id'):
+                values[field] = details.get(field)
+            if not show['end_year'] and not show['is_ongoing']:
+                values['end_year'] = details.get('end_year')
+                values['is_ongoing'] = details.get('is_ongoing', False)
+                overwrite.append('is_ongoing')
+
+        providers = get_tv_watch_providers(tmdb_id)
+        if providers:
+            from datetime import datetime
+            values['watch_providers'] = json.dumps(providers)
+            values['watch_providers_updated_at'] = datetime.utcnow()
+            overwrite += ['watch_providers', 'watch_providers_updated_at']
+
+    applied = fill_enriched_fields('shows', show_id, values, overwrite)
+
+    if values.get('imdb_id') and not show['imdb_rating']:
+        enrichment_jobs.enqueue('shows', show_id, ['omdb'])
+    if 'poster_url' in applied:
+        enrichment_jobs.enqueue('shows', show_id, ['posters'])
+    return applied
+
+@enrichment_jobs.handler('shows', 'omdb')
+def enrich_show_from_omdb(show_id):
+    """IMDb rating for a show that has an IMDb id"""
+    show = load_item('shows', show_id, ['imdb_id', 'imdb_rating'])
+    if show is None or not show['imdb_id'] or show['imdb_rating']:
+        return {}
+    return fill_enriched_fields('shows', show_id, {'imdb_rating': omdb_client.imdb_rating(show['imdb_id'])})
+
+@enrichment_jobs.handler('books', 'google_books')
+def enrich_book(book_id):
+    """Cover, ISBN, ratings, publication date/year written, description and page count for a book
+
+    Google Books and Open Library are asked at once and merged by source priority
+    (see book_enrichment.py). If either source fails the job is retried before anything
+    is written, so a transient error can't let a lower-priority source win a field.
+    """
+    book = load_item('books', book_id, ['book_name', 'author', 'isbn'])
+    if book is None:
+        return {}
+    result = book_enricher.lookup(book['book_name'], book['author'], book['isbn'])
+    if result['errors']:
+        raise RuntimeError('; '.join(f'{source}: {error}' for source, error in result['errors'].items()))
+    return fill_enriched_fields('books', book_id, result['fields'])
+
+def store_watch_providers(table, item_id, providers):
+    """Replace an item's watch providers (clearing them when TMDB lists none) and mark them refreshed"""
+    from datetime import datetime
+    placeholder = '%s' if USE_POSTGRES else '?'
+    watch_providers_json = json.dumps(providers) if providers else None
+
+    with get_db() as conn:
+        cursor = conn.cursor()
+        before = analytics_rollups.snapshot(conn, table, item_id)
+        cursor.execute(
+            f'UPDATE {table} SET watch_providers = {placeholder}, watch_providers_updated_at = {placeholder} '
+            f'WHERE id = {placeholder}', (watch_providers_json, datetime.utcnow(), item_id)
+        )
+        if cursor.rowcount == 0:
+            return False
+        analytics_rollups.apply(conn, table, item_id, before)
+        table_versions.bump(conn, table)
+        table_versions.commit(conn)
+    return True
+
+@enrichment_jobs.handler('films', 'providers')
+def refresh_film_watch_providers(film_id):
+    """Re-fetch a film's watch providers (scheduled by provider_refresh)"""
+    film = load_item('films', film_id, ['tmdb_id'])
+    if film is None or not film['tmdb_id']:
+        return {}
+    # The API cache would answer from its 1-day entry; a scheduled refresh must ask TMDB
+    providers = get_movie_watch_providers(film['tmdb_id'], raise_errors=True, refresh=True)
+    store_watch_providers('films', film_id, providers)
+    return {'watch_providers': len(providers.get('flatrate', [])) if providers else 0}
+
+@enrichment_jobs.handler('shows', 'providers')
+def refresh_show_watch_providers(show_id):
+    """Re-fetch a show's watch providers (scheduled by provider_refresh)"""
+    show = load_item('shows', show_id, ['tmdb_id'])
+    if show is None or not show['tmdb_id']:
+        return {}
+    providers = get_tv_watch_providers(show['tmdb_id'], raise_errors=True, refresh=True)
+    store_watch_providers('shows', show_id, providers)
+    return {'watch_providers': len(providers.get('flatrate', [])) if providers else 0}
+
+def queue_provider_refresh(table, ids):
+    for item_id in ids:
+        enrichment_jobs.enqueue(table, item_id, ['providers'])
+
+def store_poster_placeholder(table, item_id):
+    """Fetch an item's TMDB poster into the image store, build its widths and save its placeholder"""
+    item = load_item(table, item_id, ['poster_url', 'poster_placeholder'])
+    if item is None or item['poster_placeholder']:
+        return {}
+    placeholder = ingest_poster(item['poster_url'])
+    if placeholder is None:
+        return {}
+    db_placeholder = '%s' if USE_POSTGRES else '?'
+    with get_db() as conn:
+        cursor = conn.cursor()
+        # Skip it if the poster changed while it was being fetched
+        cursor.execute(
+            f'UPDATE {table} SET poster_placeholder = {db_placeholder} '
+            f'WHERE id = {db_placeholder} AND poster_url = {db_placeholder}',
+            (placeholder, item_id, item['poster_url'])
+        )
+        if cursor.rowcount == 0:
+            return {}
+        table_versions.bump(conn, table)
+        table_versions.commit(conn)
+    return {'poster_placeholder': len(placeholder)}
+
+@enrichment_jobs.handler('films', 'posters')
+def ingest_film_poster(film_id):
+    """Local poster widths and placeholder for a film"""
+    return store_poster_placeholder('films', film_id)
+
+@enrichment_jobs.handler('shows', 'posters')
+def ingest_show_poster(show_id):
+    """Local poster widths and placeholder for a show"""
+    return store_poster_placeholder('shows', show_id)
+
+def queue_poster_ingest(table, ids):
+    for item_id in ids:
+        enrichment_jobs.enqueue(table, item_id, ['posters'])
+
+@app.route('/api/<any(films, books, shows):table>/<int:item_id>/jobs', methods=['GET'])
+def get_item_enrichment_jobs(table, item_id):
+    """Enrichment job history for one film/book/show (status, attempts, fields filled, last error)"""
+    jobs = enrichment_jobs.jobs_for(table, item_id)
+    pending = [job['kind'] for job in jobs if job['status'] in ('queued', 'running')]
+    return jsonify({'table': table, 'id': item_id, 'pending': pending, 'jobs': jobs})
+
+@app.route('/api/<any(films, books, shows):table>/<int:item_id>/enrich', methods=['POST'])
+def enqueue_item_enrichment(table, item_id):
+    """Queue a metadata refresh for one item (all of its sources, or ?kind=tmdb,omdb,providers,posters)"""
+    all_kinds = {'films': ['tmdb', 'omdb'], 'shows': ['tmdb', 'omdb'], 'books': ['google_books']}[table]
+    allowed_kinds = all_kinds + (['providers', 'posters'] if table in ('films', 'shows') else [])
+    kinds = [kind for kind in request.args.get('kind', ','.join(all_kinds)).split(',') if kind]
+    unknown = [kind for kind in kinds if kind not in allowed_kinds]
+    if unknown:
+        return jsonify({'error': f"Unknown job kind(s) for {table}: {', '.join(unknown)}"}), 400
+    if load_item(table, item_id, ['id']) is None:
+        return jsonify({'error': 'Not found'}), 404
+    return jsonify({'queued': enrichment_jobs.enqueue(table, item_id, kinds)}), 202
+
+@app.route('/api/admin/enrichment-jobs', methods=['GET'])
+def get_enrichment_jobs():
+    """Queue counts per table/kind/status plus the most recent jobs (?status=failed to filter)"""
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    return jsonify({**enrichment_jobs.stats(), 'recent': enrichment_jobs.recent(request.args.get('status'), limit)})
+
+@app.route('/api/admin/provider-refresh', methods=['GET'])
+def get_provider_refresh_status():
+    """Watch provider refresh schedule: how many items are due, the next ones up, and the last pass"""
+    limit = min(request.args.get('limit', 20, type=int), 500)
+    with get_db() as conn:
+        provider_refresh.flush(conn)
+        due = provider_refresh.candidates(conn)
+    return jsonify({
+        'due': len(due),
+        'next': due[:limit],
+        'in_flight': enrichment_jobs.count_active('providers'),
+        'last_run': provider_refresh.last_run
+    })
+
+@app.route('/api/admin/provider-refresh/run', methods=['POST'])
+def run_provider_refresh():
+    """Queue a refresh pass now (?budget= caps the TMDB calls, default PROVIDER_REFRESH_BUDGET)"""
+    budget = request.args.get('budget', PROVIDER_REFRESH_BUDGET, type=int)
+    result = provider_refresh.run_pass(get_db, queue_provider_refresh, enrichment_jobs.count_active('providers'), budget)
+    return jsonify(result), 202
+
+# ============== BATCH JOBS ==============
+
+MISSING_PROVIDERS = "tmdb_id IS NOT NULL AND (watch_providers IS NULL OR watch_providers = '')"
+
+def table_batches(table, columns, where, unchanged=()):
+    """select/count/write callables for a batch task over the ``table`` rows matching ``where``
+
+    Rows are paged by id. Each batch is written on one connection through the usual
+    write path (rollups, genre index) with a single version bump and commit; ``where``
+    is re-checked in the UPDATE, as are the read values of the ``unchanged`` columns,
+    so rows changed since they were read are left alone.
+    """
+    placeholder = '%s' if USE_POSTGRES else '?'
+
+    def select(after_id, limit):
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f'SELECT id, {", ".join(columns)} FROM {table} WHERE id > {placeholder} AND ({where}) '
+                f'ORDER BY id LIMIT {placeholder}', (after_id, limit)
+            )
+            return [dict(zip(['id'] + columns, row)) for row in cursor.fetchall()]
+
+    def count(after_id):
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'SELECT COUNT(*) FROM {table} WHERE id > {placeholder} AND ({where})', (after_id,))
+            return cursor.fetchone()[0]
+
+    def write(updates):
+        with get_db() as conn:
+            cursor = conn.cursor()
+            for row, values in updates:
+                item_id = row['id']
+                before = analytics_rollups.snapshot(conn, table, item_id)
+                assignments = ', '.join(f'{column} = {placeholder}' for column in values)
+                guards = ''.join(f' AND {column} = {placeholder}' for column in unchanged)
+                cursor.execute(
+                    f'UPDATE {table} SET {assignments} WHERE id = {placeholder} AND ({where}){guards}',
+                    list(values.values()) + [item_id] + [row[column] for column in unchanged]
+                )
+                analytics_rollups.apply(conn, table, item_id, before)
+                if 'genres' in values:
+                    genre_index.sync(conn, table, item_id)
+            table_versions.bump(conn, table)
+            table_versions.commit(conn)
+
+    return {'select': select, 'count': count, 'write': write}
+
+def watch_provider_values(providers):
+    if not providers:
+        return None
+    from datetime import datetime
+    return {'watch_providers': json.dumps(providers), 'watch_providers_updated_at': datetime.utcnow()}
+
+@batch_jobs.task('films-tmdb-ids', 'Find the TMDB id of every film without one',
+                 **table_batches('films', ['title', 'release_year'], 'tmdb_id IS NULL'))
+def backfill_film_tmdb_id(film):
+    result = search_movie(film['title'], film['release_year'])
+    return {'tmdb_id': result['tmdb_id']} if result and result.get('tmdb_id') else None
+
+@batch_jobs.task('films-watch-providers', 'Fetch watch providers for films with a TMDB id but none stored',
+                 **table_batches('films', ['title', 'tmdb_id'], MISSING_PROVIDERS))
+def backfill_film_watch_providers(film):
+    return watch_provider_values(get_movie_watch_providers(film['tmdb_id']))
+
+@batch_jobs.task('shows-watch-providers', 'Fetch watch providers for shows with a TMDB id but none stored',
+                 **table_batches('shows', ['title', 'tmdb_id'], MISSING_PROVIDERS))
+def backfill_show_watch_providers(show):
+    return watch_provider_values(get_tv_watch_providers(show['tmdb_id']))
+
+MISSING_POSTER_PLACEHOLDER = "poster_url LIKE 'https://image.tmdb.org/%' AND poster_placeholder IS NULL"
+
+def poster_placeholder_values(item):
+    placeholder = ingest_poster(item['poster_url'])
+    return {'poster_placeholder': placeholder} if placeholder else None
+
+@batch_jobs.task('films-posters', 'Build local poster widths and placeholders for films with a TMDB poster',
+                 **table_batches('films', ['title', 'poster_url'], MISSING_POSTER_PLACEHOLDER, unchanged=['poster_url']))
+def backfill_film_posters(film):
+    return poster_placeholder_values(film)
+
+@batch_jobs.task('shows-posters', 'Build local poster widths and placeholders for shows with a TMDB poster',
+                 **table_batches('shows', ['title', 'poster_url'], MISSING_POSTER_PLACEHOLDER, unchanged=['poster_url']))
+def backfill_show_posters(show):
+    return poster_placeholder_values(show)
+
+BOOK_METADATA_COLUMNS = ['cover_url', 'pages', 'isbn', 'year_written', 'average_rating']
+MISSING_BOOK_METADATA = ' OR '.join(
+    f"{column} IS NULL" + (f" OR {column} = ''" if column in ('cover_url', 'isbn') else '')
+    for column in BOOK_METADATA_COLUMNS
+)
+
+@batch_jobs.task('books-metadata', 'Fill missing covers, pages, ISBNs, years written and ratings from Google Books and Open Library',
+                 **table_batches('books', ['book_name', 'author'] + BOOK_METADATA_COLUMNS +
+                                 ['ratings_count', 'google_books_id', 'published_date', 'description'],
+                                 MISSING_BOOK_METADATA))
+def backfill_book_metadata(book):
+    result = book_enricher.lookup(book['book_name'], book['author'], book['isbn'] or None)
+    if result['errors']:
+        raise RuntimeError('; '.join(f'{source}: {error}' for source, error in result['errors'].items()))
+    values = {
+        column: value for column, value in result['fields'].items()
+        if column in book and book[column] in (None, '')
+    }
+    return values or None
+
+def start_batch_job(name):
+    """Start a batch task from a request (?limit= caps the run, ?resume=1 continues a cancelled one)"""
+    if name not in batch_jobs.tasks:
+        return jsonify({'error': f'Unknown batch job: {name}'}), 404
+    limit = request.args.get('limit', type=int)
+    resume = request.args.get('resume', '').lower() in ('1', 'true', 'yes')
+    run, created = batch_jobs.start(name, max_items=limit, resume=resume)
+    return jsonify({'started': created, 'run': run}), 202 if created else 200
+
+@app.route('/api/admin/batch-jobs', methods=['GET'])
+def get_batch_jobs():
+    """Registered batch tasks with the latest run of each"""
+    return jsonify(batch_jobs.overview())
+
+@app.route('/api/admin/batch-jobs/<name>', methods=['GET'])
+def get_batch_job_status(name):
+    """Progress of a task's latest run (processed/total, updated, not found, failures, ETA)"""
+    if name not in batch_jobs.tasks:
+        return jsonify({'error': f'Unknown batch job: {name}'}), 404
+    return jsonify({'task': name, 'run': batch_jobs.latest(name)})
+
+@app.route('/api/admin/batch-jobs/<name>/start', methods=['POST'])
+def start_batch_job_route(name):
+    """Start a full-table run of a batch task in the background (returns the running one if any)"""
+    return start_batch_job(name)
+
+@app.route('/api/admin/batch-jobs/<name>/cancel', methods=['POST'])
+def cancel_batch_job(name):
+    """Stop a task's running run after its current batch; start it again with ?resume=1 to continue"""
+    if name not in batch_jobs.tasks:
+        return jsonify({'error': f'Unknown batch job: {name}'}), 404
+    run = batch_jobs.cancel(name)
+    if run is None:
+        return jsonify({'error': f'{name} is not running'}), 409
+    return jsonify({'run': run})
+
 # Initialize database on app startup (runs every time app starts)
-# Wrap in try-except to prevent deployment failures if DB isn't ready yet
-try:
-    init_db()
-    init_books_db()
-    init_shows_db()
-except Exception as e:
-    print(f"Warning: Database initialization had an issue (this is OK if DB isn't ready yet): {e}")
+# Each step is wrapped in try-except to prevent deployment failures if DB isn't ready yet,
+# and so one failing step doesn't skip the ones after it
+for init_step in (init_db, init_books_db, init_shows_db, init_analytics_rollups, init_genre_index,
+                  init_search_index, init_provider_refresh, init_poster_placeholders):
+    try:
+        init_step()
+    except Exception as e:
+        print(f"Warning: {init_step.__name__} had an issue (this is OK if DB isn't ready yet): {e}")
+
+# Run enrichment jobs in this process only when asked to: the web start commands (Procfile, railway.*)
+# set ENRICHMENT_WORKER_THREADS=1; scripts that import app and `python enrichment_jobs.py` start none
+enrichment_jobs.start_worker_threads(int(os.getenv('ENRICHMENT_WORKER_THREADS', '0')))
+
+# Pick up new and interrupted batch jobs only in the designated runner: the web process (its start
+# command sets BATCH_JOB_RUNNER=1), or a separate `python batch_jobs.py`
+if os.getenv('BATCH_JOB_RUNNER', '0') == '1':
+    batch_jobs.start_supervisor()
+
+# Each process flushes its view counts (and revalidates stale providers of viewed items) from its first
+# counted view on; only the designated PROVIDER_REFRESH_RUNNER process also runs the scheduled passes
+provider_refresh.attach(get_db, queue_provider_refresh, lambda: enrichment_jobs.count_active('providers'))
+if os.getenv('PROVIDER_REFRESH_RUNNER', '0') == '1':
+    provider_refresh.start(scheduled=True)
 
 if __name__ == '__main__':
     port = int(os.getenv('PORT', os.getenv('FLASK_RUN_PORT', 5001)))
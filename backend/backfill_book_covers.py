@@ -2,9 +2,11 @@
 """
 Script to backfill missing book cover images from Google Books API
 """
+import argparse
 import sqlite3
 import os
 import time
+from api_cache import api_cache, add_cache_only_argument, apply_cache_args
 from google_books_service import search_book
 
 DATABASE = 'films.db'
@@ -79,6 +81,7 @@ def backfill_covers():
         print(f"[{i}/{total}] Searching for '{book_name}' by {author or 'Unknown'}...")
         
         # Try searching
+        network_calls = api_cache.network_calls()
         book_data = search_book(book_name, author)
         
         if book_data and book_data.get('cover_url'):
@@ -104,8 +107,8 @@ def backfill_covers():
             failed_count += 1
             print(f"  ✗ No cover found")
         
-        # Rate limiting - Google Books allows 1000 requests/day free tier
-        if i < total:
+        # Rate limiting - Google Books allows 1000 requests/day free tier (cached answers cost nothing)
+        if i < total and api_cache.network_calls() > network_calls:
             time.sleep(0.25)  # 250ms delay between requests
     
     conn.close()
@@ -114,5 +117,8 @@ def backfill_covers():
     print(f"✗ Failed to find covers for {failed_count} books")
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Backfill missing book covers from Google Books')
+    add_cache_only_argument(parser)
+    apply_cache_args(parser.parse_args())
     backfill_covers()
 
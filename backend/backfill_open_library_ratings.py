@@ -1,6 +1,8 @@
+import argparse
 import sqlite3
 import os
 import time
+from api_cache import api_cache, add_cache_only_argument, apply_cache_args
 from urllib.parse import urlparse
 from open_library_service import get_book_rating_by_isbn, get_book_rating_by_title_author
 
@@ -56,6 +58,7 @@ def backfill_ratings():
         print(f"[{i+1}/{len(books_without_ratings)}] Checking '{book_name}' by {author or 'Unknown'}...")
         
         rating_data = None
+        network_calls = api_cache.network_calls()
         
         # Try ISBN first if available
         if isbn:
@@ -86,8 +89,8 @@ def backfill_ratings():
         else:
             print(f"  ✗ No rating found")
         
-        # Rate limiting - be respectful to Open Library
-        if i < len(books_without_ratings) - 1:
+        # Rate limiting - be respectful to Open Library (cached answers cost nothing)
+        if i < len(books_without_ratings) - 1 and api_cache.network_calls() > network_calls:
             time.sleep(0.5)  # Small delay between requests
         
         # Commit every 10 books
@@ -102,5 +105,8 @@ def backfill_ratings():
     print(f"   {len(books_without_ratings) - updated_count} books still without ratings")
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Backfill book ratings from Open Library')
+    add_cache_only_argument(parser)
+    apply_cache_args(parser.parse_args())
     backfill_ratings()
 
@@ -0,0 +1,355 @@
+"""
+Resumable batch jobs for full-library backfills
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+BATCH_SIZE = int(os.getenv('BATCH_JOB_BATCH_SIZE', '50'))
+CONCURRENCY = int(os.getenv('BATCH_JOB_CONCURRENCY', '4'))
+LEASE_SECONDS = 120
+POLL_SECONDS = 5.0
+MAX_RECORDED_FAILURES = 20
+
+
+class BatchTask:
+    """One kind of backfill: how to page through its rows, look one up, and save a batch
+
+    ``select(after_id, limit)`` returns dicts with an 'id', in id order;
+    ``process(row)`` returns the values to write, or None when nothing was found;
+    ``write(updates)`` saves a list of (row, values) in one transaction;
+    ``count(after_id)`` returns how many rows past the cursor are left to do.
+    """
+
+    def __init__(self, name, description, select, process, write, count):
+        self.name = name
+        self.description = description
+        self.select = select
+        self.process = process
+        self.write = write
+        self.count = count
+
+
+class BatchJobRunner:
+    """SQLite-backed checkpoints for BatchTask runs plus the thread that executes them"""
+
+    def __init__(self, path=None, batch_size=BATCH_SIZE, concurrency=CONCURRENCY):
+        default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'batch_jobs.db')
+        self.path = path or os.getenv('BATCH_JOBS_PATH', default_path)
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.tasks = {}
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._active = set()  # run ids executing in this process
+
+    # ---- storage ----
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        if not self._schema_ready:
+            with self._schema_lock:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS batch_runs (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        task TEXT NOT NULL,
+                        status TEXT NOT NULL DEFAULT 'running',
+                        cursor INTEGER NOT NULL DEFAULT 0,
+                        max_items INTEGER,
+                        total INTEGER,
+                        processed INTEGER NOT NULL DEFAULT 0,
+                        updated INTEGER NOT NULL DEFAULT 0,
+                        not_found INTEGER NOT NULL DEFAULT 0,
+                        failed INTEGER NOT NULL DEFAULT 0,
+                        failures TEXT NOT NULL DEFAULT '[]',
+                        last_error TEXT,
+                        locked_by TEXT,
+                        locked_at REAL,
+                        created_at REAL NOT NULL,
+                        updated_at REAL NOT NULL,
+                        finished_at REAL
+                    )
+                ''')
+                # One active run per task
+                conn.execute('''
+                    CREATE UNIQUE INDEX IF NOT EXISTS idx_batch_runs_active
+                    ON batch_runs (task) WHERE status = 'running'
+                ''')
+                self._schema_ready = True
+        return conn
+
+    def _run(self, run_id):
+        row = self._connection().execute('SELECT * FROM batch_runs WHERE id = ?', (run_id,)).fetchone()
+        return dict(row) if row else None
+
+    # ---- control ----
+
+    def task(self, name, description, select, write, count):
+        """Decorator registering ``fn(row)`` as the per-row step of a batch task"""
+        def register(fn):
+            self.tasks[name] = BatchTask(name, description, select, fn, write, count)
+            return fn
+        return register
+
+    def start(self, name, max_items=None, resume=False):
+        """Start a run of a task (or return the one already running); returns (run, created)
+
+        With ``resume`` the new run continues from the checkpoint of the task's last
+        cancelled or failed run instead of the first row.
+        """
+        if name not in self.tasks:
+            raise ValueError(f'Unknown batch task: {name}')
+        conn = self._connection()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            active = conn.execute("SELECT id FROM batch_runs WHERE task = ? AND status = 'running'", (name,)).fetchone()
+            if active:
+                conn.execute('COMMIT')
+                return self.status(active['id']), False
+            cursor = 0
+            if resume:
+                previous = conn.execute('''
+                    SELECT cursor FROM batch_runs WHERE task = ? AND status IN ('cancelled', 'failed')
+                    ORDER BY id DESC LIMIT 1
+                ''', (name,)).fetchone()
+                cursor = previous['cursor'] if previous else 0
+            run_id = conn.execute('''
+                INSERT INTO batch_runs (task, status, cursor, max_items, created_at, updated_at)
+                VALUES (?, 'running', ?, ?, ?, ?)
+            ''', (name, cursor, max_items, now, now)).lastrowid
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        self._wakeup.set()
+        return self.status(run_id), True
+
+    def cancel(self, name):
+        """Stop a task's running run after its current batch; returns the run (None if nothing was running)"""
+        conn = self._connection()
+        row = conn.execute("SELECT id FROM batch_runs WHERE task = ? AND status = 'running'", (name,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        conn.execute('''
+            UPDATE batch_runs SET status = 'cancelled', finished_at = ?, updated_at = ?
+            WHERE id = ? AND status = 'running'
+        ''', (now, now, row['id']))
+        return self.status(row['id'])
+
+    # ---- execution ----
+
+    def claim(self, worker_id):
+        """Take the lease on the oldest running run that no live process holds; None if there is none"""
+        conn = self._connection()
+        now = time.time()
+        # A slow batch here must not look abandoned to this process's own supervisor
+        skip = ', '.join(str(run_id) for run_id in self._active) or '0'
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(f'''
+                SELECT id FROM batch_runs
+                WHERE status = 'running' AND (locked_by IS NULL OR locked_at < ?) AND id NOT IN ({skip})
+                ORDER BY id LIMIT 1
+            ''', (now - LEASE_SECONDS,)).fetchone()
+            if row is not None:
+                conn.execute('UPDATE batch_runs SET locked_by = ?, locked_at = ?, updated_at = ? WHERE id = ?',
+                             (worker_id, now, now, row['id']))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return self._run(row['id']) if row else None
+
+    def _checkpoint(self, run, worker_id, **fields):
+        """Save progress; False if the run was cancelled or its lease was taken over meanwhile"""
+        now = time.time()
+        fields['locked_at'] = now
+        fields['updated_at'] = now
+        assignments = ', '.join(f'{column} = ?' for column in fields)
+        updated = self._connection().execute(
+            f"UPDATE batch_runs SET {assignments} WHERE id = ? AND status = 'running' AND locked_by = ?",
+            list(fields.values()) + [run['id'], worker_id]
+        ).rowcount
+        return updated == 1
+
+    def _finish(self, run, worker_id, status, error=None):
+        now = time.time()
+        self._connection().execute('''
+            UPDATE batch_runs SET status = ?, last_error = COALESCE(?, last_error), locked_by = NULL,
+                locked_at = NULL, finished_at = ?, updated_at = ?
+            WHERE id = ? AND status = 'running' AND locked_by = ?
+        ''', (status, error, now, now, run['id'], worker_id))
+
+    def execute(self, run, worker_id):
+        """Process a claimed run batch by batch until it is done, cancelled, or hits a write error"""
+        task = self.tasks.get(run['task'])
+        if task is None:
+            self._finish(run, worker_id, 'failed', error='No task registered')
+            return
+        if run['total'] is None:
+            try:
+                run['total'] = run['processed'] + task.count(run['cursor'])
+            except Exception as e:
+                print(f"Error counting rows for batch task {task.name}: {e}")
+            self._checkpoint(run, worker_id, total=run['total'])
+
+        failures = json.loads(run['failures'])
+        print(f"▶ Batch job {task.name} (run {run['id']}) from id > {run['cursor']}")
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix=f'batch-{task.name}') as executor:
+            while True:
+                limit = self.batch_size
+                if run['max_items'] is not None:
+                    limit = min(limit, run['max_items'] - run['processed'])
+                    if limit <= 0:
+                        break
+                try:
+                    rows = task.select(run['cursor'], limit)
+                except Exception as e:
+                    self._finish(run, worker_id, 'failed', error=f'select: {e}')
+                    print(f"✗ Batch job {task.name} stopped reading rows: {e}")
+                    return
+                if not rows:
+                    break
+
+                def step(row):
+                    try:
+                        return row, task.process(row), None
+                    except Exception as e:
+                        return row, None, str(e)
+
+                updates = []
+                not_found = failed = 0
+                for row, values, error in executor.map(step, rows):
+                    if error:
+                        failed += 1
+                        failures = (failures + [{'id': row['id'], 'title': row.get('title'), 'reason': error}])[-MAX_RECORDED_FAILURES:]
+                    elif values:
+                        updates.append((row, values))
+                    else:
+                        not_found += 1
+
+                try:
+                    if updates:
+                        task.write(updates)
+                except Exception as e:
+                    # Nothing from this batch was saved, so the checkpoint stays before it
+                    self._finish(run, worker_id, 'failed', error=f'write: {e}')
+                    print(f"✗ Batch job {task.name} stopped saving at id > {run['cursor']}: {e}")
+                    return
+
+                run['cursor'] = rows[-1]['id']
+                run['processed'] += len(rows)
+                run['updated'] += len(updates)
+                run['not_found'] += not_found
+                run['failed'] += failed
+                print(f"✓ Batch job {task.name}: {run['processed']}/{run['total'] or '?'} "
+                      f"({run['updated']} updated, {run['not_found']} not found, {run['failed']} failed)")
+                if not self._checkpoint(run, worker_id, cursor=run['cursor'], processed=run['processed'],
+                                        updated=run['updated'], not_found=run['not_found'],
+                                        failed=run['failed'], failures=json.dumps(failures)):
+                    print(f"⚠️  Batch job {task.name} (run {run['id']}) cancelled")
+                    return
+
+        self._finish(run, worker_id, 'done')
+        print(f"✓ Batch job {task.name} (run {run['id']}) finished: {run['updated']} updated")
+
+    def _execute_safely(self, run, worker_id):
+        self._active.add(run['id'])
+        try:
+            self.execute(run, worker_id)
+        except Exception as e:
+            self._finish(run, worker_id, 'failed', error=str(e))
+            print(f"✗ Batch job {run['task']} (run {run['id']}) failed: {e}")
+        finally:
+            self._active.discard(run['id'])
+
+    def work(self, worker_id=None, stop=None):
+        """Supervisor loop: claim runs and execute each on its own thread until ``stop`` is set
+
+        Different tasks run side by side; they still share tmdb_client's rate limit.
+        """
+        worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        while stop is None or not stop.is_set():
+            try:
+                run = self.claim(worker_id)
+            except sqlite3.Error as e:
+                print(f"Error claiming batch job: {e}")
+                run = None
+            if run is not None:
+                self._active.add(run['id'])
+                threading.Thread(target=self._execute_safely, args=(run, worker_id),
+                                 name=f"batch-{run['task']}", daemon=True).start()
+                continue
+            self._wakeup.wait(POLL_SECONDS)
+            self._wakeup.clear()
+
+    def start_supervisor(self):
+        """Run the supervisor loop on a daemon thread in this process"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.work, name='batch-jobs', daemon=True)
+            self._thread.start()
+
+    # ---- status ----
+
+    def status(self, run_id):
+        run = self._run(run_id)
+        return self._run_to_dict(run) if run else None
+
+    def latest(self, name):
+        row = self._connection().execute(
+            'SELECT id FROM batch_runs WHERE task = ? ORDER BY id DESC LIMIT 1', (name,)
+        ).fetchone()
+        return self.status(row['id']) if row else None
+
+    def overview(self):
+        return {
+            'path': self.path,
+            'supervisor': self._thread is not None,
+            'tasks': [
+                {'name': task.name, 'description': task.description, 'latest': self.latest(task.name)}
+                for task in self.tasks.values()
+            ]
+        }
+
+    @staticmethod
+    def _run_to_dict(run):
+        run = dict(run)
+        run['failures'] = json.loads(run['failures'])
+        run.pop('locked_by', None)
+        run.pop('locked_at', None)
+        elapsed = (run['finished_at'] or time.time()) - run['created_at']
+        run['elapsed_seconds'] = round(elapsed, 1)
+        if run['status'] == 'running' and run['total'] and run['processed'] and elapsed > 0:
+            rate = run['processed'] / elapsed
+            run['eta_seconds'] = round(max(run['total'] - run['processed'], 0) / rate)
+        for field in ('created_at', 'updated_at', 'finished_at'):
+            if run.get(field) is not None:
+                run[field] = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(run[field]))
+        return run
+
+
+if __name__ == '__main__':
+    os.environ['BATCH_JOB_RUNNER'] = '0'  # this process is the runner; don't also start the thread
+    from app import batch_jobs
+
+    print(f"✓ Batch job runner started ({batch_jobs.path})")
+    try:
+        batch_jobs.work()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,230 @@
+"""
+Book metadata from Google Books and Open Library, looked up concurrently and merged
+"""
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+import google_books_service
+import open_library_service
+from api_cache import normalize_request
+
+SOURCES = ('google_books', 'open_library')
+
+# Which source's value wins, per merged field. Open Library's first_publish_year is the
+# work's original publication year; Google's publishedDate is often a later edition's.
+DEFAULT_PRIORITY = {
+    'cover_url': ('google_books', 'open_library'),
+    'pages': ('google_books', 'open_library'),
+    'isbn': ('google_books', 'open_library'),
+    'year_written': ('open_library', 'google_books'),
+    'ratings': ('google_books', 'open_library'),
+}
+
+# Fields only Google Books provides
+GOOGLE_ONLY_FIELDS = ('google_books_id', 'published_date', 'description')
+
+# Later years are likely API errors (pre-orders, reprint metadata)
+MAX_YEAR_WRITTEN = 2024
+
+
+def parse_priority(text):
+    """DEFAULT_PRIORITY with the overrides in a BOOK_SOURCE_PRIORITY string applied
+
+    Raises ValueError for unknown fields or sources.
+    """
+    priority = dict(DEFAULT_PRIORITY)
+    for part in (text or '').split(';'):
+        if not part.strip():
+            continue
+        field, _, sources = part.partition('=')
+        field = field.strip()
+        order = tuple(source.strip() for source in sources.split(',') if source.strip())
+        if field not in priority:
+            raise ValueError(f'Unknown field in BOOK_SOURCE_PRIORITY: {field}')
+        unknown = [source for source in order if source not in SOURCES]
+        if unknown or not order:
+            raise ValueError(f'Bad sources for {field} in BOOK_SOURCE_PRIORITY: {sources}')
+        # Sources left out still count, after the listed ones
+        priority[field] = order + tuple(source for source in SOURCES if source not in order)
+    return priority
+
+
+def year_written_from_published_date(published_date):
+    """Year from a Google Books publishedDate ('1999', '1999-05-01' or an int); None for 2025+ (likely API errors)"""
+    if isinstance(published_date, int):
+        year = published_date if 0 < published_date < 3000 else None
+    elif isinstance(published_date, str) and published_date[:4].isdigit():
+        year = int(published_date[:4])
+    else:
+        year = None
+    return year if year and year <= MAX_YEAR_WRITTEN else None
+
+
+def _google_books_values(record):
+    return {
+        'cover_url': record.get('cover_url'),
+        'pages': record.get('page_count'),
+        'isbn': record.get('isbn'),
+        'year_written': year_written_from_published_date(record.get('published_date')),
+        'average_rating': record.get('average_rating'),
+        'ratings_count': record.get('ratings_count'),
+        'google_books_id': record.get('google_books_id'),
+        'published_date': record.get('published_date'),
+        'description': record.get('description'),
+    }
+
+
+def _open_library_values(record):
+    year = record.get('year_written')
+    return {
+        'cover_url': record.get('cover_url'),
+        'pages': record.get('page_count'),
+        'isbn': record.get('isbn'),
+        'year_written': year if year and year <= MAX_YEAR_WRITTEN else None,
+        'average_rating': record.get('average_rating'),
+        'ratings_count': record.get('ratings_count'),
+    }
+
+
+class BookEnricher:
+    """Concurrent, coalescing Google Books + Open Library lookups with a source-priority merge"""
+
+    def __init__(self, priority=None, max_workers=None):
+        self.priority = priority or parse_priority(os.getenv('BOOK_SOURCE_PRIORITY', ''))
+        self.max_workers = max_workers or int(os.getenv('BOOK_ENRICHMENT_WORKERS', '8'))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='book-enrichment')
+        self._lock = threading.Lock()
+        self._in_flight = {}  # normalized lookup -> Future
+        self._stats = {'books': 0, 'lookups': 0, 'coalesced': 0, 'errors': 0}
+
+    # ---- source lookups ----
+
+    def _shared(self, source, params, fetch):
+        """Run ``fetch()`` once for identical lookups that overlap in time; all callers get its result"""
+        key = normalize_request(source, 'book-enrichment', params)
+        with self._lock:
+            self._stats['lookups'] += 1
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+            else:
+                self._stats['coalesced'] += 1
+        if not owner:
+            return future.result()
+
+        try:
+            result = fetch()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _google_books(self, title, author, isbn):
+        record = self._shared('google_books', {'title': title, 'author': author, 'isbn': isbn},
+                              lambda: google_books_service.search_book(title, author, isbn, raise_errors=True))
+        return _google_books_values(record) if record else None
+
+    def _open_library(self, title, author, isbn):
+        # An ISBN identifies the book on its own, so books sharing one share the lookup
+        params = {'isbn': isbn} if isbn else {'title': title, 'author': author}
+        record = self._shared('open_library', params,
+                              lambda: open_library_service.search_book(title, author, isbn, raise_errors=True))
+        return _open_library_values(record) if record else None
+
+    # ---- merging ----
+
+    def merge(self, found):
+        """Merged fields from {source: values or None}, plus which source each field came from"""
+        fields = {}
+        origins = {}
+        for field, order in self.priority.items():
+            for source in order:
+                values = found.get(source)
+                if not values:
+                    continue
+                if field == 'ratings':
+                    if values.get('average_rating') is not None and values.get('ratings_count'):
+                        fields['average_rating'] = values['average_rating']
+                        fields['ratings_count'] = values['ratings_count']
+                        origins['ratings'] = source
+                        break
+                elif values.get(field) not in (None, ''):
+                    fields[field] = values[field]
+                    origins[field] = source
+                    break
+        for field in GOOGLE_ONLY_FIELDS:
+            value = (found.get('google_books') or {}).get(field)
+            if value not in (None, ''):
+                fields[field] = value
+                origins[field] = 'google_books'
+        return fields, origins
+
+    # ---- public ----
+
+    def lookup(self, title, author=None, isbn=None):
+        """Look a book up on both sources at once and merge the answers
+
+        Returns {'fields': {...}, 'sources': {source: 'ok'|'not_found'|'error'},
+        'origins': {field: source}, 'errors': {source: message}}. Fields: cover_url,
+        pages, isbn, year_written, average_rating, ratings_count, google_books_id,
+        published_date, description - only the ones found.
+        """
+        with self._lock:
+            self._stats['books'] += 1
+        futures = {
+            self._executor.submit(self._google_books, title, author, isbn): 'google_books',
+            self._executor.submit(self._open_library, title, author, isbn): 'open_library',
+        }
+        found, sources, errors = {}, {}, {}
+        for future in as_completed(futures):
+            source = futures[future]
+            try:
+                found[source] = future.result()
+            except Exception as e:
+                with self._lock:
+                    self._stats['errors'] += 1
+                sources[source] = 'error'
+                errors[source] = str(e)
+            else:
+                sources[source] = 'ok' if found[source] else 'not_found'
+
+        fields, origins = self.merge(found)
+        return {'fields': fields, 'sources': sources, 'origins': origins, 'errors': errors}
+
+    def lookup_many(self, books, max_concurrent_books=None):
+        """Look up many books ({'book_name'|'title', 'author', 'isbn', ...}), yielding (book, result)
+
+        Results come in completion order. Books sharing an ISBN or title/author are
+        fetched once per source.
+        """
+        workers = max_concurrent_books or self.max_workers
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='book-batch') as executor:
+            futures = {
+                executor.submit(self.lookup, book.get('book_name') or book.get('title'),
+                                book.get('author'), book.get('isbn')): book
+                for book in books
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update(
+            max_workers=self.max_workers,
+            priority={field: list(order) for field, order in self.priority.items()},
+            rate_limits={'google_books': google_books_service.GOOGLE_BOOKS_RATE_LIMIT,
+                         'open_library': open_library_service.OPEN_LIBRARY_RATE_LIMIT}
+        )
+        return stats
+
+
+# Shared by the enrichment job, the batch backfill and scripts
+book_enricher = BookEnricher()
@@ -0,0 +1,213 @@
+"""
+Connection pooling for the films/books/shows database
+"""
+import sqlite3
+import threading
+import time
+
+
+class PoolExhaustedError(Exception):
+    """Raised when no connection becomes available before the checkout timeout"""
+
+
+class PostgresConnectionPool:
+    """Bounded pool of psycopg2 connections with health checks and usage metrics"""
+
+    def __init__(self, db_config, minconn=1, maxconn=10, checkout_timeout=10, health_check_interval=30):
+        import psycopg2
+        self._psycopg2 = psycopg2
+        self._db_config = db_config
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+
+        self._cond = threading.Condition()
+        self._idle = []  # list of (connection, last_used_timestamp)
+        self._in_use = 0
+
+        self._stats = {
+            'created': 0,
+            'discarded': 0,
+            'checkouts': 0,
+            'waits': 0,
+            'exhausted': 0,
+            'health_check_failures': 0,
+            'peak_in_use': 0,
+            'total_wait_seconds': 0.0
+        }
+
+        for _ in range(minconn):
+            self._idle.append((self._new_connection(), time.monotonic()))
+
+    def _new_connection(self):
+        conn = self._psycopg2.connect(**self._db_config)
+        with self._cond:
+            self._stats['created'] += 1
+        return conn
+
+    def _discard(self, conn):
+        """Close a connection; the caller holds self._cond"""
+        self._stats['discarded'] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, conn, last_used):
+        """Cheap liveness check; only round-trips if the connection sat idle a while"""
+        if conn.closed:
+            return False
+        if time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            cursor = conn.cursor()
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+            conn.rollback()
+            return True
+        except Exception:
+            with self._cond:
+                self._stats['health_check_failures'] += 1
+            return False
+
+    def getconn(self):
+        """Check a connection out of the pool, waiting up to checkout_timeout if exhausted"""
+        deadline = time.monotonic() + self.checkout_timeout
+        waited = False
+        wait_started = time.monotonic()
+
+        with self._cond:
+            while not self._idle and self._in_use >= self.maxconn:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['exhausted'] += 1
+                    raise PoolExhaustedError(
+                        f'No database connection available after {self.checkout_timeout}s '
+                        f'({self._in_use}/{self.maxconn} in use)'
+                    )
+                if not waited:
+                    self._stats['waits'] += 1
+                    waited = True
+                self._cond.wait(remaining)
+
+            if waited:
+                self._stats['total_wait_seconds'] += time.monotonic() - wait_started
+
+            # Reserve the slot before doing any network I/O outside the lock
+            idle_entry = self._idle.pop() if self._idle else None
+            self._in_use += 1
+            self._stats['checkouts'] += 1
+            self._stats['peak_in_use'] = max(self._stats['peak_in_use'], self._in_use)
+
+        try:
+            if idle_entry:
+                conn, last_used = idle_entry
+                if self._is_healthy(conn, last_used):
+                    return conn
+                with self._cond:
+                    self._discard(conn)
+            return self._new_connection()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+    def putconn(self, conn):
+        """Return a connection to the pool, rolling back any uncommitted transaction"""
+        healthy = not conn.closed
+        if healthy:
+            try:
+                conn.rollback()
+            except Exception:
+                healthy = False
+
+        with self._cond:
+            self._in_use -= 1
+            if healthy:
+                self._idle.append((conn, time.monotonic()))
+            else:
+                self._discard(conn)
+            self._cond.notify()
+
+    def closeall(self):
+        """Close every idle connection (connections checked out are closed on return)"""
+        with self._cond:
+            for conn, _ in self._idle:
+                self._discard(conn)
+            self._idle = []
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats['total_wait_seconds'] = round(stats['total_wait_seconds'], 3)
+            stats.update({
+                'backend': 'postgresql',
+                'min_size': self.minconn,
+                'max_size': self.maxconn,
+                'in_use': self._in_use,
+                'idle': len(self._idle)
+            })
+            return stats
+
+
+class SQLiteConnectionPool:
+    """One reusable sqlite3 connection per thread"""
+
+    def __init__(self, database):
+        self.database = database
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {
+            'created': 0,
+            'discarded': 0,
+            'checkouts': 0,
+            'health_check_failures': 0
+        }
+
+    def _new_connection(self):
+        conn = sqlite3.connect(self.database)
+        conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._stats['created'] += 1
+        return conn
+
+    def getconn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            try:
+                conn.execute('SELECT 1')
+            except sqlite3.Error:
+                with self._lock:
+                    self._stats['health_check_failures'] += 1
+                    self._stats['discarded'] += 1
+                conn = None
+        if conn is None:
+            conn = self._new_connection()
+            self._local.conn = conn
+        with self._lock:
+            self._stats['checkouts'] += 1
+        return conn
+
+    def putconn(self, conn):
+        """Leave the connection cached on this thread, discarding any uncommitted work"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._local.conn = None
+            with self._lock:
+                self._stats['discarded'] += 1
+
+    def closeall(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['backend'] = 'sqlite'
+        return stats
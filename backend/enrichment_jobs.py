@@ -0,0 +1,256 @@
+"""
+Background job queue for film, book and show metadata enrichment
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+ACTIVE_STATUSES = ('queued', 'running')
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 30
+LEASE_SECONDS = 300
+POLL_SECONDS = 2.0
+
+
+class EnrichmentJobQueue:
+    """SQLite-backed queue of (table, item_id, kind) enrichment jobs plus the worker loop"""
+
+    def __init__(self, path=None):
+        default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'enrichment_jobs.db')
+        self.path = path or os.getenv('ENRICHMENT_JOBS_PATH', default_path)
+        self._handlers = {}  # (table, kind) -> fn(item_id) -> dict of applied fields
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+        self._wakeup = threading.Event()
+        self._threads = []
+
+    # ---- storage ----
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        if not self._schema_ready:
+            with self._schema_lock:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS enrichment_jobs (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        item_table TEXT NOT NULL,
+                        item_id INTEGER NOT NULL,
+                        kind TEXT NOT NULL,
+                        status TEXT NOT NULL DEFAULT 'queued',
+                        attempts INTEGER NOT NULL DEFAULT 0,
+                        run_after REAL NOT NULL,
+                        locked_by TEXT,
+                        locked_at REAL,
+                        result TEXT,
+                        last_error TEXT,
+                        created_at REAL NOT NULL,
+                        updated_at REAL NOT NULL
+                    )
+                ''')
+                # One pending job per item and kind
+                conn.execute('''
+                    CREATE UNIQUE INDEX IF NOT EXISTS idx_enrichment_jobs_active
+                    ON enrichment_jobs (item_table, item_id, kind) WHERE status IN ('queued', 'running')
+                ''')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_enrichment_jobs_due ON enrichment_jobs (status, run_after)')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_enrichment_jobs_item ON enrichment_jobs (item_table, item_id)')
+                self._schema_ready = True
+        return conn
+
+    # ---- producers ----
+
+    def handler(self, table, kind):
+        """Decorator registering the function that runs ``kind`` jobs for ``table`` rows"""
+        def register(fn):
+            self._handlers[(table, kind)] = fn
+            return fn
+        return register
+
+    def enqueue(self, table, item_id, kinds, delay=0):
+        """Queue jobs for an item (skipping kinds that already have one pending); returns their ids"""
+        conn = self._connection()
+        now = time.time()
+        ids = []
+        for kind in kinds:
+            if (table, kind) not in self._handlers:
+                raise ValueError(f'No enrichment handler for {table}/{kind}')
+            conn.execute('''
+                INSERT OR IGNORE INTO enrichment_jobs (item_table, item_id, kind, status, run_after, created_at, updated_at)
+                VALUES (?, ?, ?, 'queued', ?, ?, ?)
+            ''', (table, item_id, kind, now + delay, now, now))
+            row = conn.execute('''
+                SELECT id FROM enrichment_jobs
+                WHERE item_table = ? AND item_id = ? AND kind = ? AND status IN ('queued', 'running')
+            ''', (table, item_id, kind)).fetchone()
+            if row:
+                ids.append(row['id'])
+        self._wakeup.set()
+        return ids
+
+    # ---- consumers ----
+
+    def claim(self, worker_id):
+        """Atomically take the oldest due job (or one whose lease expired); None if there is nothing to do"""
+        conn = self._connection()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('''
+                SELECT * FROM enrichment_jobs
+                WHERE (status = 'queued' AND run_after <= ?) OR (status = 'running' AND locked_at < ?)
+                ORDER BY run_after, id
+                LIMIT 1
+            ''', (now, now - LEASE_SECONDS)).fetchone()
+            if row is None:
+                conn.execute('COMMIT')
+                return None
+            conn.execute('''
+                UPDATE enrichment_jobs
+                SET status = 'running', locked_by = ?, locked_at = ?, attempts = attempts + 1, updated_at = ?
+                WHERE id = ?
+            ''', (worker_id, now, now, row['id']))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        job = dict(row)
+        job['attempts'] += 1
+        job['locked_by'] = worker_id
+        return job
+
+    def _finish(self, job, status, result=None, error=None, run_after=None):
+        """Record a job's outcome if this worker still holds its lease; False if the lease was lost
+
+        A job that outlived LEASE_SECONDS may have been reclaimed by another worker,
+        whose outcome then stands (handlers only fill empty columns, so the
+        duplicate run did no harm).
+        """
+        now = time.time()
+        cursor = self._connection().execute('''
+            UPDATE enrichment_jobs
+            SET status = ?, result = ?, last_error = ?, run_after = COALESCE(?, run_after),
+                locked_by = NULL, locked_at = NULL, updated_at = ?
+            WHERE id = ? AND status = 'running' AND locked_by = ?
+        ''', (status, json.dumps(result) if result is not None else None, error, run_after, now,
+              job['id'], job['locked_by']))
+        if cursor.rowcount == 0:
+            print(f"⚠️  Enrichment job {job['id']} lost its lease to another worker; not recording {status}")
+            return False
+        return True
+
+    def run_job(self, job):
+        """Run one claimed job and record its outcome"""
+        handler = self._handlers.get((job['item_table'], job['kind']))
+        if handler is None:
+            self._finish(job, 'failed', error='No handler registered')
+            return
+        try:
+            applied = handler(job['item_id'])
+        except Exception as e:
+            if job['attempts'] >= MAX_ATTEMPTS:
+                if self._finish(job, 'failed', error=str(e)):
+                    print(f"✗ Enrichment job {job['id']} ({job['item_table']}/{job['item_id']} {job['kind']}) failed: {e}")
+            else:
+                retry_at = time.time() + RETRY_BASE_SECONDS * (2 ** (job['attempts'] - 1))
+                self._finish(job, 'queued', error=str(e), run_after=retry_at)
+            return
+        if self._finish(job, 'done', result=applied or {}) and applied:
+            print(f"✓ Enriched {job['item_table']}/{job['item_id']} via {job['kind']}: {', '.join(sorted(applied))}")
+
+    def work(self, worker_id=None, stop=None, once=False):
+        """Worker loop: run due jobs until ``stop`` is set (or the queue is empty, with ``once``)"""
+        worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}'
+        while stop is None or not stop.is_set():
+            try:
+                job = self.claim(worker_id)
+            except sqlite3.Error as e:
+                print(f"Error claiming enrichment job: {e}")
+                job = None
+            if job is not None:
+                self.run_job(job)
+                continue
+            if once:
+                return
+            self._wakeup.wait(POLL_SECONDS)
+            self._wakeup.clear()
+
+    def start_worker_threads(self, count=1):
+        """Run ``count`` daemon worker threads in this process"""
+        for i in range(count):
+            thread = threading.Thread(target=self.work, name=f'enrichment-worker-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    # ---- status ----
+
+    def jobs_for(self, table, item_id):
+        """Every job recorded for one item, newest first"""
+        rows = self._connection().execute('''
+            SELECT * FROM enrichment_jobs WHERE item_table = ? AND item_id = ? ORDER BY id DESC
+        ''', (table, item_id)).fetchall()
+        return [self._job_to_dict(row) for row in rows]
+
+    def count_active(self, kind=None):
+        """Queued or running jobs (of one kind, if given)"""
+        conn = self._connection()
+        if kind:
+            row = conn.execute("SELECT COUNT(*) FROM enrichment_jobs WHERE status IN ('queued', 'running') AND kind = ?",
+                               (kind,)).fetchone()
+        else:
+            row = conn.execute("SELECT COUNT(*) FROM enrichment_jobs WHERE status IN ('queued', 'running')").fetchone()
+        return row[0]
+
+    def recent(self, status=None, limit=50):
+        conn = self._connection()
+        if status:
+            rows = conn.execute('SELECT * FROM enrichment_jobs WHERE status = ? ORDER BY id DESC LIMIT ?',
+                                (status, limit)).fetchall()
+        else:
+            rows = conn.execute('SELECT * FROM enrichment_jobs ORDER BY id DESC LIMIT ?', (limit,)).fetchall()
+        return [self._job_to_dict(row) for row in rows]
+
+    def stats(self):
+        rows = self._connection().execute('''
+            SELECT item_table, kind, status, COUNT(*) AS count FROM enrichment_jobs
+            GROUP BY item_table, kind, status
+        ''').fetchall()
+        counts = {}
+        for row in rows:
+            counts.setdefault(f"{row['item_table']}/{row['kind']}", {})[row['status']] = row['count']
+        return {'path': self.path, 'worker_threads': len(self._threads), 'jobs': counts}
+
+    @staticmethod
+    def _job_to_dict(row):
+        job = dict(row)
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        job.pop('locked_by', None)
+        for field in ('run_after', 'locked_at', 'created_at', 'updated_at'):
+            if job.get(field) is not None:
+                job[field] = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(job[field]))
+        return job
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run the enrichment job worker')
+    parser.add_argument('--once', action='store_true', help='Exit when the queue is empty')
+    args = parser.parse_args()
+
+    os.environ['ENRICHMENT_WORKER_THREADS'] = '0'  # this process is the worker; don't also start threads
+    from app import enrichment_jobs
+
+    print(f"✓ Enrichment worker started ({enrichment_jobs.path})")
+    try:
+        enrichment_jobs.work(once=args.once)
+    except KeyboardInterrupt:
+        pass
@@ -4,7 +4,6 @@ Fetch and populate genre data for all films from TMDB
 """
 
 import sqlite3
-import time
 from tmdb_service import search_movie
 
 DATABASE = 'films.db'
@@ -64,10 +63,6 @@ def fetch_genres():
             print(f"❌ Error: {e}")
             fail_count += 1
 
-        # Rate limiting - TMDB allows 40 requests per 10 seconds
-        if i < total:
-            time.sleep(0.25)
-
         # Progress update every 50 films
         if i % 50 == 0:
             print(f"\n📊 Progress: {i}/{total} ({int(i/total*100)}%) - Success: {success_count}, Failed: {fail_count}\n")
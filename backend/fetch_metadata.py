@@ -3,7 +3,6 @@
 Script to fetch missing release year and duration data from TMDB
 """
 import sqlite3
-import time
 from tmdb_service import search_movie, get_movie_details
 
 DATABASE = 'films.db'
@@ -86,7 +85,6 @@ def main():
                 if details and details.get('runtime'):
                     length_minutes = details['runtime']
                     print(f"  Found duration: {length_minutes} minutes")
-                time.sleep(0.25)  # Additional delay for second API call
 
             # Update database if we found any missing data
             if release_year or length_minutes:
@@ -100,10 +98,6 @@ def main():
             print(f"  ✗ Movie not found on TMDB")
             failed_count += 1
 
-        # Rate limiting - TMDB allows 40 requests per 10 seconds
-        if i < len(films) - 1:
-            time.sleep(0.25)
-
         # Progress update every 50 films
         if (i + 1) % 50 == 0:
             print(f"\n--- Progress: {i+1}/{len(films)} films processed ---")
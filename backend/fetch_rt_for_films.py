@@ -5,47 +5,15 @@ Usage: python fetch_rt_for_films.py "Film Title 1" "Film Title 2"
 """
 
 import sqlite3
-import requests
-import os
 import sys
+from omdb_service import omdb_client
 
 DATABASE = 'films.db'
-OMDB_API_KEY = os.getenv('OMDB_API_KEY', '4e9616c3')
-OMDB_BASE_URL = 'http://www.omdbapi.com/'
 
 def fetch_rt_score_from_omdb(title, year=None):
-    """Fetch Rotten Tomatoes score from OMDb API"""
-    # Handle titles in "Last, First" format
-    search_title = title
-    if ',' in title:
-        parts = title.split(',', 1)
-        if len(parts) == 2:
-            search_title = f"{parts[1].strip()} {parts[0].strip()}"
-    
-    params = {
-        'apikey': OMDB_API_KEY,
-        't': search_title,
-        'type': 'movie'
-    }
-    
-    if year:
-        params['y'] = year
-    
+    """Fetch Rotten Tomatoes score from OMDb (None if not found or OMDb fails)"""
     try:
-        response = requests.get(OMDB_BASE_URL, params=params, timeout=5)
-        response.raise_for_status()
-        data = response.json()
-        
-        if data.get('Response') == 'True':
-            ratings = data.get('Ratings', [])
-            for rating in ratings:
-                if rating.get('Source') == 'Rotten Tomatoes':
-                    rt_value = rating.get('Value', '')
-                    if rt_value:
-                        if '%' not in rt_value:
-                            rt_value = f"{rt_value}%"
-                        return rt_value
-        return None
+        return omdb_client.rt_score(title, year)
     except Exception as e:
         print(f"Error fetching RT score: {e}")
         return None
@@ -13,10 +13,9 @@ Usage:
 """
 
 import sqlite3
-import requests
 import os
-import time
 import re
+from tmdb_service import tmdb_client
 
 DATABASE = 'films.db'
 API_KEY = os.getenv('TMDB_API_KEY')
@@ -36,14 +35,7 @@ def get_tmdb_movie_data(title, year):
     """Get movie data from TMDB including external IDs"""
     try:
         # Search for the movie
-        search_url = 'https://api.themoviedb.org/3/search/movie'
-        params = {
-            'api_key': API_KEY,
-            'query': title,
-            'year': year
-        }
-
-        response = requests.get(search_url, params=params)
+        response = tmdb_client.get('/search/movie', params={'query': title, 'year': year})
         results = response.json().get('results', [])
 
         if not results:
@@ -52,10 +44,7 @@ def get_tmdb_movie_data(title, year):
         movie_id = results[0]['id']
 
         # Get external IDs
-        external_url = f'https://api.themoviedb.org/3/movie/{movie_id}/external_ids'
-        params = {'api_key': API_KEY}
-
-        response = requests.get(external_url, params=params)
+        response = tmdb_client.get(f'/movie/{movie_id}/external_ids')
         external_data = response.json()
 
         return {
@@ -144,9 +133,6 @@ def fetch_all_rt_links(limit=None):
         if i % 10 == 0:
             conn.commit()
 
-        # Rate limiting
-        time.sleep(0.3)
-
     conn.commit()
     conn.close()
 
@@ -1,11 +1,8 @@
 import sqlite3
-import requests
-import time
-import os
+from requests.exceptions import RequestException
+from omdb_service import omdb_client, QuotaExceeded
 
 DATABASE = 'films.db'
-OMDB_API_KEY = '4e9616c3'
-OMDB_BASE_URL = 'http://www.omdbapi.com/'
 
 def get_films_missing_data():
     """Get all films that are missing any data"""
@@ -25,64 +22,6 @@ def get_films_missing_data():
     conn.close()
     return films
 
-def fetch_data_from_omdb(title, year):
-    """Fetch movie data from OMDb API"""
-    # Handle titles in "Last, First" format (e.g., "Fugitive, The" -> "The Fugitive")
-    search_title = title
-    if ',' in title:
-        parts = title.split(',', 1)
-        if len(parts) == 2:
-            search_title = f"{parts[1].strip()} {parts[0].strip()}"
-
-    params = {
-        'apikey': OMDB_API_KEY,
-        't': search_title,
-        'type': 'movie'
-    }
-
-    # Only include year if we have it
-    if year:
-        params['y'] = year
-
-    try:
-        response = requests.get(OMDB_BASE_URL, params=params)
-        response.raise_for_status()
-        data = response.json()
-
-        if data.get('Response') == 'True':
-            result = {
-                'rt_score': None,
-                'year': None,
-                'runtime': None
-            }
-
-            # Get Rotten Tomatoes score
-            ratings = data.get('Ratings', [])
-            for rating in ratings:
-                if rating.get('Source') == 'Rotten Tomatoes':
-                    result['rt_score'] = rating.get('Value')  # Returns like "85%"
-
-            # Get year
-            if data.get('Year') and data.get('Year') != 'N/A':
-                result['year'] = data.get('Year')
-
-            # Get runtime (e.g., "142 min" -> 142)
-            if data.get('Runtime') and data.get('Runtime') != 'N/A':
-                runtime_str = data.get('Runtime')
-                # Extract number from "142 min"
-                runtime_num = runtime_str.split()[0] if ' ' in runtime_str else runtime_str
-                try:
-                    result['runtime'] = int(runtime_num)
-                except ValueError:
-                    pass
-
-            return result
-
-        return None
-    except Exception as e:
-        print(f"Error fetching data: {e}")
-        return None
-
 def update_film_data(film_id, rt_score, year, runtime):
     """Update the film data in the database"""
     conn = sqlite3.connect(DATABASE)
@@ -132,7 +71,14 @@ def main():
     for i, (film_id, title, year, runtime, rt_score) in enumerate(films, 1):
         print(f"[{i}/{total}] Fetching data for: {title} ({year or 'unknown'})...")
 
-        data = fetch_data_from_omdb(title, year)
+        try:
+            data = omdb_client.film_facts(title, year)
+        except QuotaExceeded as e:
+            print(f"  - Stopping: {e}")
+            break
+        except RequestException as e:
+            print(f"  - Skipped ({e})")
+            continue
 
         if data:
             # Track what we're updating
@@ -157,10 +103,6 @@ def main():
             print(f"  ✗ Not found")
             not_found += 1
 
-        # Rate limiting: 1 request per second to be safe (free tier allows more)
-        if i < total:
-            time.sleep(1)
-
     print(f"\n{'='*50}")
     print(f"Summary:")
     print(f"  Total films processed: {total}")
@@ -0,0 +1,100 @@
+"""
+Concurrent metadata enrichment for newly added films
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from tmdb_service import search_movie, get_movie_bundle
+
+DEFAULT_BUDGET_SECONDS = float(os.getenv('FILM_ENRICHMENT_BUDGET_SECONDS', '0'))
+MAX_BUDGET_SECONDS = 30
+
+
+class FilmEnricher:
+    """Fans the TMDB/OMDb lookups for one film out over a shared thread pool"""
+
+    def __init__(self, fetch_rt_score, max_workers=8):
+        self._fetch_rt_score = fetch_rt_score
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='film-enrichment')
+
+    def enrich(self, title, release_year=None, budget_seconds=None, use_tmdb=True):
+        """Look a film up on TMDB and OMDb within ``budget_seconds``
+
+        Returns {'fields': {...}, 'steps': {step: status}, 'pending': [...], 'elapsed_ms': n}.
+        Fields: tmdb_id, poster_url, genres, release_year, length_minutes, imdb_id,
+        watch_providers and rotten_tomatoes - only the ones actually found. Step status
+        is 'ok', 'not_found', 'error' or 'timeout'.
+        """
+        budget = DEFAULT_BUDGET_SECONDS if budget_seconds is None else budget_seconds
+        started = time.monotonic()
+        deadline = started + budget
+        fields = {}
+        steps = {}
+        running = {}  # future -> step name
+
+        def submit(step, fn, *args):
+            running[self._executor.submit(fn, *args)] = step
+
+        if use_tmdb:
+            submit('tmdb_search', search_movie, title, release_year)
+        # With a known year the RT lookup doesn't have to wait for TMDB
+        if release_year or not use_tmdb:
+            submit('omdb', self._fetch_rt_score, title, release_year)
+
+        while running:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, _ = wait(running, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                step = running.pop(future)
+                try:
+                    value = future.result()
+                except Exception as e:
+                    print(f"Error in {step} enrichment for '{title}': {e}")
+                    steps[step] = 'error'
+                    value = None
+                else:
+                    steps[step] = 'ok' if value else 'not_found'
+
+                if step == 'tmdb_search':
+                    if value:
+                        self._apply_search(fields, value)
+                        if value.get('tmdb_id'):
+                            submit('tmdb_details', get_movie_bundle, value['tmdb_id'])
+                    if 'omdb' not in steps and 'omdb' not in running.values():
+                        submit('omdb', self._fetch_rt_score, title, release_year or fields.get('release_year'))
+                elif step == 'tmdb_details' and value:
+                    self._apply_details(fields, value)
+                elif step == 'omdb' and value:
+                    fields['rotten_tomatoes'] = value
+
+        pending = sorted(running.values())
+        for step in pending:
+            steps[step] = 'timeout'
+        return {
+            'fields': fields,
+            'steps': steps,
+            'pending': pending,
+            'elapsed_ms': round((time.monotonic() - started) * 1000)
+        }
+
+    @staticmethod
+    def _apply_search(fields, movie):
+        for field in ('tmdb_id', 'poster_url', 'genres'):
+            if movie.get(field):
+                fields[field] = movie[field]
+        if movie.get('release_date'):
+            fields['release_year'] = int(movie['release_date'][:4])
+
+    @staticmethod
+    def _apply_details(fields, details):
+        if details.get('runtime'):
+            fields['length_minutes'] = details['runtime']
+        if details.get('release_date') and 'release_year' not in fields:
+            fields['release_year'] = int(details['release_date'][:4])
+        if details.get('imdb_id'):
+            fields['imdb_id'] = details['imdb_id']
+        if details.get('watch_providers'):
+            fields['watch_providers'] = details['watch_providers']
@@ -2,7 +2,6 @@ import sqlite3
 import re
 from tmdb_service import search_movie
 from datetime import datetime
-import time
 import os
 
 db_path = 'films.db'
@@ -85,7 +84,6 @@ def fix_all_titles():
                             if new_poster != old_poster:
                                 log_message(f"  ✓ Updated poster")
                                 stats['posters_updated'] += 1
-                        time.sleep(0.25)  # Rate limiting
                     except Exception as e:
                         log_message(f"  ⚠ Could not fetch poster: {e}")
 
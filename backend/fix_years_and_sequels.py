@@ -2,7 +2,6 @@ import sqlite3
 import re
 from tmdb_service import search_movie
 from datetime import datetime
-import time
 import os
 
 db_path = 'films.db'
@@ -154,8 +153,6 @@ def fix_years_and_sequels():
                         else:
                             log_message(f"  ⚠ Not found on TMDB")
 
-                        time.sleep(0.25)  # Rate limiting
-
                     except Exception as e:
                         log_message(f"  ⚠ TMDB error: {e}")
                 else:
@@ -0,0 +1,155 @@
+"""
+Normalized genre index for films and shows (rebuild with: python genre_index.py)
+"""
+from tmdb_service import GENRE_MAP, TV_GENRE_MAP
+
+# base table -> (index table, foreign key column, TMDB genre map)
+INDEXED_TABLES = {
+    'films': ('film_genres', 'film_id', GENRE_MAP),
+    'shows': ('show_genres', 'show_id', TV_GENRE_MAP)
+}
+
+
+def genre_key(name):
+    """Case-insensitive lookup key of a genre name ('Science Fiction' -> 'science fiction')"""
+    return name.strip().lower()
+
+
+def split_genres(genres):
+    """Distinct (ignoring case), non-empty genre names from a genres column value (order kept)"""
+    if not genres:
+        return []
+    names = {}
+    for name in genres.split(','):
+        name = name.strip()
+        if name and genre_key(name) not in names:
+            names[genre_key(name)] = name
+    return list(names.values())
+
+
+class GenreIndex:
+    """Keeps film_genres/show_genres in step with the genres column"""
+
+    def __init__(self, use_postgres):
+        self._use_postgres = use_postgres
+        self._placeholder = '%s' if use_postgres else '?'
+        self._genre_ids = {
+            table: {name: genre_id for genre_id, name in genre_map.items()}
+            for table, (_, _, genre_map) in INDEXED_TABLES.items()
+        }
+
+    def _has_genre_key(self, cursor, index_table):
+        if self._use_postgres:
+            cursor.execute(
+                "SELECT 1 FROM information_schema.columns WHERE table_name = %s AND column_name = 'genre_key'",
+                (index_table,)
+            )
+            return cursor.fetchone() is not None
+        cursor.execute(f'PRAGMA table_info({index_table})')
+        columns = [column[1] for column in cursor.fetchall()]
+        return not columns or 'genre_key' in columns
+
+    def ensure_schema(self, conn):
+        cursor = conn.cursor()
+        for index_table, key_column, _ in INDEXED_TABLES.values():
+            # Index tables from before genre_key are dropped; init rebuilds them from the genres column
+            if not self._has_genre_key(cursor, index_table):
+                cursor.execute(f'DROP TABLE IF EXISTS {index_table}')
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS {index_table} (
+                    {key_column} INTEGER NOT NULL,
+                    genre TEXT NOT NULL,
+                    genre_key TEXT NOT NULL,
+                    tmdb_genre_id INTEGER,
+                    PRIMARY KEY ({key_column}, genre_key)
+                )
+            ''')
+            # (genre_key, item) serves the genre= filter
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS idx_{index_table}_genre_key ON {index_table} (genre_key, {key_column})'
+            )
+
+    def is_empty(self, conn, table):
+        index_table = INDEXED_TABLES[table][0]
+        cursor = conn.cursor()
+        cursor.execute(f'SELECT COUNT(*) FROM {index_table}')
+        return cursor.fetchone()[0] == 0
+
+    def _rows_for(self, table, row_id, genres):
+        genre_ids = self._genre_ids[table]
+        return [(row_id, name, genre_key(name), genre_ids.get(name)) for name in split_genres(genres)]
+
+    def _insert(self, cursor, table, rows):
+        index_table, key_column, _ = INDEXED_TABLES[table]
+        p = self._placeholder
+        cursor.executemany(
+            f'INSERT INTO {index_table} ({key_column}, genre, genre_key, tmdb_genre_id) VALUES ({p}, {p}, {p}, {p})',
+            rows
+        )
+
+    def sync(self, conn, table, row_id):
+        """Re-derive one item's index rows from its genres column (removes them if the item is gone)
+
+        Call after the INSERT/UPDATE/DELETE and before commit.
+        """
+        index_table, key_column, _ = INDEXED_TABLES[table]
+        p = self._placeholder
+        cursor = conn.cursor()
+        cursor.execute(f'SELECT genres FROM {table} WHERE id = {p}', (row_id,))
+        row = cursor.fetchone()
+        cursor.execute(f'DELETE FROM {index_table} WHERE {key_column} = {p}', (row_id,))
+        if row and row[0]:
+            self._insert(cursor, table, self._rows_for(table, row_id, row[0]))
+
+    def rebuild(self, conn, tables=None):
+        """Repopulate the index tables from scratch (all indexed tables, or just ``tables``)"""
+        cursor = conn.cursor()
+        rebuilt = {}
+        for table in tables or INDEXED_TABLES:
+            index_table = INDEXED_TABLES[table][0]
+            cursor.execute(f'DELETE FROM {index_table}')
+            cursor.execute(f"SELECT id, genres FROM {table} WHERE genres IS NOT NULL AND genres != ''")
+            rows = []
+            for row_id, genres in cursor.fetchall():
+                rows.extend(self._rows_for(table, row_id, genres))
+            self._insert(cursor, table, rows)
+            rebuilt[table] = {'rows': len(rows)}
+        return rebuilt
+
+    def filter_clause(self, table, column='id'):
+        """SQL fragment restricting ``column`` to items tagged with a genre (one placeholder, bound to genre_key(name))"""
+        index_table, key_column, _ = INDEXED_TABLES[table]
+        return f'{column} IN (SELECT {key_column} FROM {index_table} WHERE genre_key = {self._placeholder})'
+
+    def stats(self, conn, table):
+        """Return [{genre, count, avg_score}] for a table, most common genres first"""
+        index_table, key_column, _ = INDEXED_TABLES[table]
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT MIN(g.genre) as genre, COUNT(*) as count, ROUND(AVG(t.score), 2) as avg_score
+            FROM {index_table} g
+            JOIN {table} t ON t.id = g.{key_column}
+            GROUP BY g.genre_key
+            ORDER BY count DESC, g.genre_key
+        ''')
+        return [
+            {
+                'genre': genre,
+                'count': count,
+                'avg_score': float(avg_score) if avg_score is not None else None
+            }
+            for genre, count, avg_score in cursor.fetchall()
+        ]
+
+
+if __name__ == '__main__':
+    from app import get_db, genre_index, table_versions
+
+    with get_db() as conn:
+        result = genre_index.rebuild(conn)
+        for table in result:
+            table_versions.bump(conn, table)
+        table_versions.commit(conn)
+
+    for table, info in result.items():
+        print(f"✓ Rebuilt {table} genre index: {info['rows']} rows")
@@ -1,12 +1,74 @@
 import requests
 import os
-import time
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from api_cache import api_cache
+from tmdb_service import TokenBucket
 
 GOOGLE_BOOKS_API_KEY = os.getenv('GOOGLE_BOOKS_API_KEY', '')
 GOOGLE_BOOKS_BASE_URL = 'https://www.googleapis.com/books/v1/volumes'
 
-def search_book(title, author=None, isbn=None):
-    """Search for a book on Google Books API"""
+# Requests per second across all threads (cache hits are free)
+GOOGLE_BOOKS_RATE_LIMIT = float(os.getenv('GOOGLE_BOOKS_RATE_LIMIT', '5'))
+
+rate_limiter = TokenBucket(max(GOOGLE_BOOKS_RATE_LIMIT, 1), max(GOOGLE_BOOKS_RATE_LIMIT, 1) / GOOGLE_BOOKS_RATE_LIMIT)
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(pool_connections=8, pool_maxsize=8))
+
+def _fetch(url, params):
+    """One Google Books request under the shared rate limit"""
+    rate_limiter.acquire()
+    return _session.get(url, params=params, timeout=10)
+
+def _volume_fields(volume):
+    """The fields we keep from a Google Books volume"""
+    volume_info = volume.get('volumeInfo', {})
+
+    # Extract cover image URL
+    image_links = volume_info.get('imageLinks', {})
+    cover_url = None
+    if image_links.get('thumbnail'):
+        # Replace thumbnail with larger image (remove zoom parameter and use larger size)
+        cover_url = image_links['thumbnail'].replace('zoom=1', 'zoom=0').replace('&edge=curl', '')
+    elif image_links.get('small'):
+        cover_url = image_links['small']
+    elif image_links.get('medium'):
+        cover_url = image_links['medium']
+    elif image_links.get('large'):
+        cover_url = image_links['large']
+
+    # Extract ISBNs
+    isbn_13 = None
+    isbn_10 = None
+    industry_identifiers = volume_info.get('industryIdentifiers', [])
+    for identifier in industry_identifiers:
+        if identifier.get('type') == 'ISBN_13':
+            isbn_13 = identifier.get('identifier')
+        elif identifier.get('type') == 'ISBN_10':
+            isbn_10 = identifier.get('identifier')
+
+    return {
+        'google_books_id': volume.get('id'),
+        'title': volume_info.get('title'),
+        'authors': volume_info.get('authors', []),
+        'cover_url': cover_url,
+        'isbn_13': isbn_13,
+        'isbn_10': isbn_10,
+        'isbn': isbn_13 or isbn_10,  # Prefer ISBN-13
+        'average_rating': volume_info.get('averageRating'),
+        'ratings_count': volume_info.get('ratingsCount'),
+        'published_date': volume_info.get('publishedDate'),
+        'description': volume_info.get('description'),
+        'page_count': volume_info.get('pageCount'),
+        'categories': volume_info.get('categories', [])
+    }
+
+def search_book(title, author=None, isbn=None, raise_errors=False):
+    """Search for a book on Google Books API
+
+    With ``raise_errors`` a failed request raises instead of returning None, so a
+    caller that retries (the enrichment jobs) can tell "not found" from "didn't answer".
+    """
     if not GOOGLE_BOOKS_API_KEY:
         print("Warning: GOOGLE_BOOKS_API_KEY not set")
         # API works without key but has lower rate limits
@@ -35,54 +97,19 @@ def search_book(title, author=None, isbn=None):
         params['key'] = GOOGLE_BOOKS_API_KEY
 
     try:
-        response = requests.get(GOOGLE_BOOKS_BASE_URL, params=params, timeout=10)
+        response = api_cache.get(
+            'google_books', GOOGLE_BOOKS_BASE_URL, params,
+            lambda: _fetch(GOOGLE_BOOKS_BASE_URL, params)
+        )
         response.raise_for_status()
         data = response.json()
 
         if data.get('items') and len(data['items']) > 0:
             # Return the first result
-            volume = data['items'][0]
-            volume_info = volume.get('volumeInfo', {})
-            
-            # Extract cover image URL
-            image_links = volume_info.get('imageLinks', {})
-            cover_url = None
-            if image_links.get('thumbnail'):
-                # Replace thumbnail with larger image (remove zoom parameter and use larger size)
-                cover_url = image_links['thumbnail'].replace('zoom=1', 'zoom=0').replace('&edge=curl', '')
-            elif image_links.get('small'):
-                cover_url = image_links['small']
-            elif image_links.get('medium'):
-                cover_url = image_links['medium']
-            elif image_links.get('large'):
-                cover_url = image_links['large']
-            
-            # Extract ISBNs
-            isbn_13 = None
-            isbn_10 = None
-            industry_identifiers = volume_info.get('industryIdentifiers', [])
-            for identifier in industry_identifiers:
-                if identifier.get('type') == 'ISBN_13':
-                    isbn_13 = identifier.get('identifier')
-                elif identifier.get('type') == 'ISBN_10':
-                    isbn_10 = identifier.get('identifier')
-            
-            return {
-                'google_books_id': volume.get('id'),
-                'title': volume_info.get('title'),
-                'authors': volume_info.get('authors', []),
-                'cover_url': cover_url,
-                'isbn_13': isbn_13,
-                'isbn_10': isbn_10,
-                'isbn': isbn_13 or isbn_10,  # Prefer ISBN-13
-                'average_rating': volume_info.get('averageRating'),
-                'ratings_count': volume_info.get('ratingsCount'),
-                'published_date': volume_info.get('publishedDate'),
-                'description': volume_info.get('description'),
-                'page_count': volume_info.get('pageCount'),
-                'categories': volume_info.get('categories', [])
-            }
+            return _volume_fields(data['items'][0])
     except requests.exceptions.RequestException as e:
+        if raise_errors:
+            raise
         print(f"Error searching Google Books for '{title}': {e}")
 
     return None
@@ -94,52 +121,13 @@ def get_book_details(google_books_id):
         params['key'] = GOOGLE_BOOKS_API_KEY
 
     try:
-        response = requests.get(
-            f'{GOOGLE_BOOKS_BASE_URL}/{google_books_id}',
-            params=params,
-            timeout=10
+        url = f'{GOOGLE_BOOKS_BASE_URL}/{google_books_id}'
+        response = api_cache.get(
+            'google_books', url, params,
+            lambda: _fetch(url, params)
         )
         response.raise_for_status()
-        data = response.json()
-        volume_info = data.get('volumeInfo', {})
-        
-        # Extract cover image URL
-        image_links = volume_info.get('imageLinks', {})
-        cover_url = None
-        if image_links.get('thumbnail'):
-            cover_url = image_links['thumbnail'].replace('zoom=1', 'zoom=0').replace('&edge=curl', '')
-        elif image_links.get('small'):
-            cover_url = image_links['small']
-        elif image_links.get('medium'):
-            cover_url = image_links['medium']
-        elif image_links.get('large'):
-            cover_url = image_links['large']
-        
-        # Extract ISBNs
-        isbn_13 = None
-        isbn_10 = None
-        industry_identifiers = volume_info.get('industryIdentifiers', [])
-        for identifier in industry_identifiers:
-            if identifier.get('type') == 'ISBN_13':
-                isbn_13 = identifier.get('identifier')
-            elif identifier.get('type') == 'ISBN_10':
-                isbn_10 = identifier.get('identifier')
-        
-        return {
-            'google_books_id': data.get('id'),
-            'title': volume_info.get('title'),
-            'authors': volume_info.get('authors', []),
-            'cover_url': cover_url,
-            'isbn_13': isbn_13,
-            'isbn_10': isbn_10,
-            'isbn': isbn_13 or isbn_10,
-            'average_rating': volume_info.get('averageRating'),
-            'ratings_count': volume_info.get('ratingsCount'),
-            'published_date': volume_info.get('publishedDate'),
-            'description': volume_info.get('description'),
-            'page_count': volume_info.get('pageCount'),
-            'categories': volume_info.get('categories', [])
-        }
+        return _volume_fields(response.json())
     except requests.exceptions.RequestException as e:
         print(f"Error getting book details for ID {google_books_id}: {e}")
 
@@ -150,30 +138,26 @@ def get_book_cover_url(title, author=None, isbn=None):
     result = search_book(title, author, isbn)
     return result['cover_url'] if result else None
 
-def batch_fetch_book_data(books, delay=0.25):
-    """Fetch book data for multiple books with rate limiting"""
-    results = []
-
-    for i, book in enumerate(books):
-        title = book.get('book_name') or book.get('title')
-        author = book.get('author')
-        isbn = book.get('isbn')
-        book_id = book.get('id')
-
-        print(f"Fetching data for '{title}' by {author or 'Unknown'} ({i+1}/{len(books)})...")
-
-        book_data = search_book(title, author, isbn)
-
-        results.append({
-            'id': book_id,
-            'title': title,
-            'author': author,
-            'book_data': book_data
-        })
-
-        # Rate limiting - Google Books allows 1000 requests/day free tier
-        if i < len(books) - 1:
-            time.sleep(delay)
-
-    return results
-
+def batch_fetch_book_data(books, delay=None, max_workers=8):
+    """Fetch book data for multiple books concurrently
+
+    Pacing comes from the shared GOOGLE_BOOKS_RATE_LIMIT (``delay`` is ignored), and
+    books with the same title/author/ISBN are looked up once.
+    """
+    def lookup_key(book):
+        return (book.get('book_name') or book.get('title'), book.get('author'), book.get('isbn'))
+
+    unique_keys = list(dict.fromkeys(lookup_key(book) for book in books))
+    print(f"Fetching data for {len(books)} books ({len(unique_keys)} distinct lookups)...")
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='google-books') as executor:
+        found = dict(zip(unique_keys, executor.map(lambda key: search_book(*key), unique_keys)))
+
+    return [
+        {
+            'id': book.get('id'),
+            'title': lookup_key(book)[0],
+            'author': book.get('author'),
+            'book_data': found[lookup_key(book)]
+        }
+        for book in books
+    ]
@@ -0,0 +1,391 @@
+"""
+Local content-addressed image store behind the cover/poster proxy
+"""
+import base64
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from io import BytesIO
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Maximum width in pixels per variant, as in TMDB's w160/w342/w780 (None = the image as fetched)
+VARIANTS = {
+    'thumb': 160,
+    'grid': 342,
+    'detail': 780,
+    'original': None
+}
+FORMATS = {'webp': 'image/webp', 'jpeg': 'image/jpeg'}
+PREBUILT_VARIANTS = ('thumb', 'grid', 'detail')
+
+# Width of the inline placeholder; a 16px WebP is ~200 bytes as a data URI and is blurred by the client
+PLACEHOLDER_WIDTH = 16
+
+MAX_IMAGE_BYTES = 10 * 1024 * 1024
+# Don't retry a source whose every candidate failed for this long
+FAILURE_TTL_SECONDS = 6 * 60 * 60
+EVICTION_CHECK_INTERVAL = 50
+
+IMAGE_SIGNATURES = (
+    (b'\xff\xd8', 'image/jpeg'),
+    (b'\x89PNG', 'image/png'),
+    (b'GIF8', 'image/gif'),
+    (b'RIFF', 'image/webp')  # followed by size and 'WEBP'
+)
+
+FETCH_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Referer': 'https://books.google.com/'
+}
+
+
+class ImageUnavailable(Exception):
+    """None of a source's candidate URLs produced an image"""
+
+
+def sniff_content_type(head):
+    for signature, content_type in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            if content_type == 'image/webp' and head[8:12] != b'WEBP':
+                continue
+            return content_type
+    return None
+
+
+class ImageStore:
+    """Blob files on disk plus a SQLite index of sources, blobs and variants"""
+
+    def __init__(self, root=None, max_bytes=None):
+        default_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'image_cache')
+        self.root = root or os.getenv('IMAGE_CACHE_DIR', default_root)
+        self.max_bytes = max_bytes or int(float(os.getenv('IMAGE_CACHE_MAX_MB', '500')) * 1024 * 1024)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._schema_ready = False
+        self._stores_since_check = 0
+        self._stats = {'source_hits': 0, 'source_misses': 0, 'fetch_failures': 0,
+                       'variants_built': 0, 'served': 0}
+
+    # ---- storage ----
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(self.root, exist_ok=True)
+            conn = sqlite3.connect(os.path.join(self.root, 'images.db'), timeout=30.0)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        if not self._schema_ready:
+            with self._lock:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS image_sources (
+                        source_key TEXT PRIMARY KEY,
+                        url TEXT,
+                        blob_hash TEXT,
+                        fetched_at REAL,
+                        failed_at REAL
+                    )
+                ''')
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS image_blobs (
+                        hash TEXT PRIMARY KEY,
+                        content_type TEXT NOT NULL,
+                        size INTEGER NOT NULL,
+                        created_at REAL NOT NULL,
+                        accessed_at REAL NOT NULL
+                    )
+                ''')
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS image_variants (
+                        blob_hash TEXT NOT NULL,
+                        variant TEXT NOT NULL,
+                        format TEXT NOT NULL,
+                        variant_hash TEXT NOT NULL,
+                        PRIMARY KEY (blob_hash, variant, format)
+                    )
+                ''')
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS image_placeholders (
+                        blob_hash TEXT PRIMARY KEY,
+                        data_uri TEXT NOT NULL
+                    )
+                ''')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_image_blobs_accessed ON image_blobs (accessed_at)')
+                conn.commit()
+                self._schema_ready = True
+        return conn
+
+    def _count(self, counter):
+        with self._lock:
+            self._stats[counter] += 1
+
+    def blob_path(self, blob_hash):
+        return os.path.join(self.root, 'blobs', blob_hash[:2], blob_hash)
+
+    def _blob_exists(self, blob_hash):
+        return blob_hash is not None and os.path.exists(self.blob_path(blob_hash))
+
+    def _store_file(self, temp_path, blob_hash, content_type, size):
+        """Move a finished temp file to its content address and index it"""
+        path = self.blob_path(blob_hash)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(temp_path, path)
+        now = time.time()
+        conn = self._connection()
+        conn.execute('''
+            INSERT OR REPLACE INTO image_blobs (hash, content_type, size, created_at, accessed_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (blob_hash, content_type, size, now, now))
+        conn.commit()
+
+        with self._lock:
+            self._stores_since_check += 1
+            check = self._stores_since_check >= EVICTION_CHECK_INTERVAL
+            if check:
+                self._stores_since_check = 0
+        if check:
+            self.evict()
+
+    def _store_bytes(self, data, content_type):
+        blob_hash = hashlib.sha256(data).hexdigest()
+        if not self._blob_exists(blob_hash):
+            fd, temp_path = tempfile.mkstemp(dir=self.root, prefix='.variant-')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            self._store_file(temp_path, blob_hash, content_type, len(data))
+        return blob_hash
+
+    # ---- fetching ----
+
+    def _download(self, url):
+        """Stream one URL to a temp file; (hash, content_type, size) or None if it isn't an image"""
+        os.makedirs(self.root, exist_ok=True)
+        with self.session.get(url, timeout=10, stream=True, headers=FETCH_HEADERS, allow_redirects=True) as response:
+            response.raise_for_status()
+            digest = hashlib.sha256()
+            size = 0
+            head = b''
+            fd, temp_path = tempfile.mkstemp(dir=self.root, prefix='.download-')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    for chunk in response.iter_content(64 * 1024):
+                        if not head:
+                            head = chunk[:16]
+                        size += len(chunk)
+                        if size > MAX_IMAGE_BYTES:
+                            raise ImageUnavailable(f'Image larger than {MAX_IMAGE_BYTES} bytes: {url}')
+                        digest.update(chunk)
+                        f.write(chunk)
+                # Google answers some misses with a tiny placeholder or an HTML page
+                content_type = sniff_content_type(head)
+                if content_type is None:
+                    os.remove(temp_path)
+                    return None
+                blob_hash = digest.hexdigest()
+                if self._blob_exists(blob_hash):
+                    os.remove(temp_path)
+                else:
+                    self._store_file(temp_path, blob_hash, content_type, size)
+                return blob_hash, content_type, size
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+
+    def resolve(self, source_key, candidate_urls):
+        """Blob hash of the image for a source, fetching it (remembered URL first) if it isn't stored
+
+        Raises ImageUnavailable when no candidate yields an image (remembered for
+        FAILURE_TTL_SECONDS so broken covers don't cost a round of requests each time).
+        """
+        conn = self._connection()
+        row = conn.execute('SELECT url, blob_hash, failed_at FROM image_sources WHERE source_key = ?',
+                           (source_key,)).fetchone()
+        if row is not None and self._blob_exists(row['blob_hash']):
+            self._count('source_hits')
+            return row['blob_hash']
+        if row is not None and row['failed_at'] and time.time() - row['failed_at'] < FAILURE_TTL_SECONDS:
+            raise ImageUnavailable(f'No image for {source_key} (recent failure)')
+
+        self._count('source_misses')
+        urls = list(dict.fromkeys(([row['url']] if row is not None and row['url'] else []) + list(candidate_urls)))
+        for url in urls:
+            try:
+                result = self._download(url)
+            except (requests.exceptions.RequestException, ImageUnavailable):
+                continue
+            if result is None:
+                continue
+            conn.execute('''
+                INSERT OR REPLACE INTO image_sources (source_key, url, blob_hash, fetched_at, failed_at)
+                VALUES (?, ?, ?, ?, NULL)
+            ''', (source_key, url, result[0], time.time()))
+            conn.commit()
+            return result[0]
+
+        self._count('fetch_failures')
+        conn.execute('''
+            INSERT INTO image_sources (source_key, failed_at) VALUES (?, ?)
+            ON CONFLICT (source_key) DO UPDATE SET failed_at = excluded.failed_at
+        ''', (source_key, time.time()))
+        conn.commit()
+        raise ImageUnavailable(f'No image for {source_key}')
+
+    def forget(self, source_key):
+        """Drop a source's remembered URL/blob so the next request fetches it again"""
+        conn = self._connection()
+        conn.execute('DELETE FROM image_sources WHERE source_key = ?', (source_key,))
+        conn.commit()
+
+    # ---- variants ----
+
+    def variant(self, blob_hash, variant='original', image_format='jpeg'):
+        """Hash of the blob holding ``variant`` of an image in ``image_format``, building it on first use"""
+        if VARIANTS.get(variant) is None:
+            return blob_hash
+        conn = self._connection()
+        row = conn.execute('''
+            SELECT variant_hash FROM image_variants WHERE blob_hash = ? AND variant = ? AND format = ?
+        ''', (blob_hash, variant, image_format)).fetchone()
+        if row is not None and self._blob_exists(row['variant_hash']):
+            return row['variant_hash']
+
+        try:
+            from PIL import Image, ImageOps
+        except ImportError:
+            return blob_hash
+
+        try:
+            buffer = self._resize(Image, ImageOps, blob_hash, VARIANTS[variant], image_format)
+        except OSError as e:
+            # Unreadable by Pillow (e.g. an odd GIF) - the original is better than nothing
+            print(f"Error building {variant} variant of image {blob_hash[:12]}: {e}")
+            return blob_hash
+
+        variant_hash = self._store_bytes(buffer.getvalue(), FORMATS[image_format])
+        conn.execute('''
+            INSERT OR REPLACE INTO image_variants (blob_hash, variant, format, variant_hash) VALUES (?, ?, ?, ?)
+        ''', (blob_hash, variant, image_format, variant_hash))
+        conn.commit()
+        self._count('variants_built')
+        return variant_hash
+
+    def _resize(self, Image, ImageOps, blob_hash, width, image_format, quality=None):
+        with Image.open(self.blob_path(blob_hash)) as image:
+            image = ImageOps.exif_transpose(image)
+            if image.width > width:
+                image.thumbnail((width, image.height), Image.LANCZOS)
+            if image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+            buffer = BytesIO()
+            if image_format == 'webp':
+                image.save(buffer, 'WEBP', quality=quality or 80, method=4)
+            else:
+                image.save(buffer, 'JPEG', quality=quality or 82, optimize=True, progressive=True)
+        return buffer
+
+    def placeholder(self, blob_hash):
+        """Tiny WebP data URI of an image to show (blurred) while it loads; None without Pillow"""
+        conn = self._connection()
+        row = conn.execute('SELECT data_uri FROM image_placeholders WHERE blob_hash = ?', (blob_hash,)).fetchone()
+        if row is not None:
+            return row['data_uri']
+
+        try:
+            from PIL import Image, ImageOps
+        except ImportError:
+            return None
+
+        try:
+            buffer = self._resize(Image, ImageOps, blob_hash, PLACEHOLDER_WIDTH, 'webp', quality=30)
+        except OSError as e:
+            print(f"Error building placeholder of image {blob_hash[:12]}: {e}")
+            return None
+
+        data_uri = 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+        conn.execute('INSERT OR REPLACE INTO image_placeholders (blob_hash, data_uri) VALUES (?, ?)',
+                     (blob_hash, data_uri))
+        conn.commit()
+        return data_uri
+
+    def ingest(self, source_key, candidate_urls, variants=PREBUILT_VARIANTS):
+        """Fetch an image and build its variants (in every format) before anyone asks for them
+
+        Returns (blob hash, placeholder data URI or None); raises ImageUnavailable like ``resolve``.
+        """
+        blob_hash = self.resolve(source_key, candidate_urls)
+        for variant in variants:
+            for image_format in FORMATS:
+                self.variant(blob_hash, variant, image_format)
+        return blob_hash, self.placeholder(blob_hash)
+
+    # ---- serving ----
+
+    def open_blob(self, blob_hash):
+        """(path, content_type) for a stored blob, or None; marks it recently used"""
+        conn = self._connection()
+        row = conn.execute('SELECT content_type, accessed_at FROM image_blobs WHERE hash = ?', (blob_hash,)).fetchone()
+        if row is None or not self._blob_exists(blob_hash):
+            return None
+        now = time.time()
+        if now - row['accessed_at'] > 60 * 60:
+            conn.execute('UPDATE image_blobs SET accessed_at = ? WHERE hash = ?', (now, blob_hash))
+            conn.commit()
+        self._count('served')
+        return self.blob_path(blob_hash), row['content_type']
+
+    def evict(self):
+        """Delete the least recently served blobs until the store is under max_bytes"""
+        conn = self._connection()
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM image_blobs').fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        # Trim to 90% so the next few stores don't immediately trigger another pass
+        target = self.max_bytes * 0.9
+        evicted = 0
+        while total > target:
+            rows = conn.execute('SELECT hash, size FROM image_blobs ORDER BY accessed_at LIMIT 200').fetchall()
+            if not rows:
+                break
+            for row in rows:
+                try:
+                    os.remove(self.blob_path(row['hash']))
+                except FileNotFoundError:
+                    pass
+                conn.execute('DELETE FROM image_blobs WHERE hash = ?', (row['hash'],))
+                conn.execute('DELETE FROM image_variants WHERE blob_hash = ? OR variant_hash = ?', (row['hash'], row['hash']))
+                conn.execute('DELETE FROM image_placeholders WHERE blob_hash = ?', (row['hash'],))
+                total -= row['size']
+                evicted += 1
+                if total <= target:
+                    break
+        conn.execute('DELETE FROM image_sources WHERE blob_hash IS NOT NULL AND blob_hash NOT IN (SELECT hash FROM image_blobs)')
+        conn.commit()
+        return evicted
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._stats)
+        try:
+            conn = self._connection()
+            blobs, size = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM image_blobs').fetchone()
+            sources = conn.execute('SELECT COUNT(*) FROM image_sources WHERE blob_hash IS NOT NULL').fetchone()[0]
+        except sqlite3.Error:
+            blobs, size, sources = None, None, None
+        return {'root': self.root, 'blobs': blobs, 'size_bytes': size, 'max_bytes': self.max_bytes,
+                'sources': sources, **counters}
+
+
+image_store = ImageStore()
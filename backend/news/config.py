@@ -25,6 +25,24 @@ EXACT_ITEMS_COUNT = 30  # Total articles for AI/Tech section
 SPORTS_ITEMS_COUNT = 30  # Separate quota for Sports section (increased from 10)
 RECENCY_WINDOW_HOURS = 168  # Must be published within last 7 days (168 hours)
 
+# Fetch stage: every source, feed and item is fetched concurrently
+FETCH_DEADLINE_SECONDS = float(os.getenv('NEWS_FETCH_DEADLINE_SECONDS', '90'))  # Whole fetch stage; late fetches are dropped
+FETCH_MAX_WORKERS = int(os.getenv('NEWS_FETCH_MAX_WORKERS', '32'))  # Requests in flight overall
+FETCH_PER_HOST_LIMIT = int(os.getenv('NEWS_FETCH_PER_HOST_LIMIT', '4'))  # Requests in flight per host
+FEED_SEEN_RETENTION_DAYS = int(os.getenv('NEWS_FEED_SEEN_RETENTION_DAYS', '30'))  # How long RSS entry GUIDs count as already seen
+
+# Near-duplicate clustering: title similarity (0-1, estimated Jaccard of title words) at which
+# two articles count as the same story, how long stories are remembered across runs, and the
+# (stricter) similarity at which a story that made an earlier digest is dropped as a repeat
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv('NEWS_NEAR_DUPLICATE_THRESHOLD', '0.55'))
+NEAR_DUPLICATE_HISTORY_DAYS = int(os.getenv('NEWS_NEAR_DUPLICATE_HISTORY_DAYS', '14'))
+NEAR_DUPLICATE_SELECTED_THRESHOLD = float(os.getenv('NEWS_NEAR_DUPLICATE_SELECTED_THRESHOLD', '0.8'))
+
+# Local pre-ranking: how many of the best-scoring articles the LLM gets to choose from,
+# and how fast an article's recency score halves
+LLM_CANDIDATE_COUNT = int(os.getenv('NEWS_LLM_CANDIDATE_COUNT', '50'))
+PRE_RANK_RECENCY_HALF_LIFE_HOURS = float(os.getenv('NEWS_PRE_RANK_RECENCY_HALF_LIFE_HOURS', '24'))
+
 # Source Diversity Caps (maximum articles per source in final selection)
 SOURCE_MAX_CAPS = {
     'Hacker News: Front Page': 5,  # Max 5 from HN (out of 30 = 16%)
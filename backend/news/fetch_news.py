@@ -4,6 +4,7 @@
 import sqlite3
 from datetime import datetime
 import sys
+import time
 
 from config import (
     ANTHROPIC_API_KEY,
@@ -16,16 +17,26 @@ from config import (
     CATEGORIES,
     EXACT_ITEMS_COUNT,
     SPORTS_ITEMS_COUNT,
-    RECENCY_WINDOW_HOURS
+    RECENCY_WINDOW_HOURS,
+    FETCH_DEADLINE_SECONDS,
+    FETCH_MAX_WORKERS,
+    FETCH_PER_HOST_LIMIT,
+    FEED_SEEN_RETENTION_DAYS,
+    NEAR_DUPLICATE_THRESHOLD,
+    NEAR_DUPLICATE_HISTORY_DAYS,
+    NEAR_DUPLICATE_SELECTED_THRESHOLD
 )
 
+from fetchers.fetch_stage import FetchStage
+from fetchers.feed_state import FeedStateStore
 from fetchers.rss_fetcher import fetch_rss_feeds
 from fetchers.newsapi_fetcher import fetch_newsapi_by_category
 from fetchers.hackernews_fetcher import fetch_hackernews
 from fetchers.reddit_fetcher import fetch_reddit
 from filters.category_ranker import categorize_and_rank_articles
-from filters.feedback_analyzer import get_feedback_insights, apply_feedback_boost
-from filters.source_filter import filter_sources
+from filters.feedback_analyzer import get_feedback_insights
+from filters.dedup import DuplicateIndex
+import pipeline
 
 def save_articles_to_db(articles):
     """Save articles to the database, avoiding duplicates."""
@@ -63,68 +74,80 @@ def save_articles_to_db(articles):
 
     return saved_count
 
+def fetch_all_sources(stage, feed_state=None):
+    """(name, outcome) for every source as it finishes (see FetchStage.stream).
+
+    RSS feeds are fetched conditionally against feed_state, returning only unseen entries.
+    """
+    return stage.stream({
+        'Tech RSS': lambda: fetch_rss_feeds(RSS_FEEDS, RECENCY_WINDOW_HOURS, stage, feed_state),
+        'Sports RSS': lambda: fetch_rss_feeds(SPORTS_RSS_FEEDS, RECENCY_WINDOW_HOURS, stage, feed_state),
+        'NewsAPI': lambda: fetch_newsapi_by_category(NEWSAPI_KEY, NEWSAPI_QUERIES, RECENCY_WINDOW_HOURS, stage),
+        'Hacker News': lambda: fetch_hackernews(stage),
+        'Reddit': lambda: fetch_reddit(REDDIT_SUBREDDITS, stage),
+    })
+
+def report_source(name, outcome):
+    if outcome['timed_out']:
+        print(f"    ✗ {name}: deadline reached after {outcome['seconds']}s, skipped")
+    elif outcome['error']:
+        print(f"    ✗ {name}: {outcome['error']}")
+    else:
+        print(f"    ✓ Found {len(outcome['articles'])} recent articles from {name} ({outcome['seconds']}s)")
+
 def main():
     print("🔄 Fetching news from all sources...")
     print(f"   Recency window: {RECENCY_WINDOW_HOURS} hours")
     print(f"   Target: EXACTLY {EXACT_ITEMS_COUNT} articles\n")
 
-    all_articles = []
-
-    # Fetch from Tech/AI RSS feeds
-    print("  → Fetching Tech/AI RSS feeds...")
-    tech_rss_articles = fetch_rss_feeds(RSS_FEEDS, RECENCY_WINDOW_HOURS)
-    all_articles.extend(tech_rss_articles)
-    print(f"    ✓ Found {len(tech_rss_articles)} recent articles from Tech RSS")
-
-    # Fetch from Sports RSS feeds
-    print("  → Fetching Sports RSS feeds...")
-    sports_rss_articles = fetch_rss_feeds(SPORTS_RSS_FEEDS, RECENCY_WINDOW_HOURS)
-    all_articles.extend(sports_rss_articles)
-    print(f"    ✓ Found {len(sports_rss_articles)} recent articles from Sports RSS")
-
-    # Fetch from NewsAPI with category-specific queries
-    print("  → Fetching NewsAPI by category...")
-    newsapi_articles = fetch_newsapi_by_category(NEWSAPI_KEY, NEWSAPI_QUERIES, RECENCY_WINDOW_HOURS)
-    all_articles.extend(newsapi_articles)
-    print(f"    ✓ Found {len(newsapi_articles)} recent articles from NewsAPI")
-
-    # Fetch from Hacker News
-    print("  → Fetching Hacker News...")
-    hn_articles = fetch_hackernews()
-    all_articles.extend(hn_articles)
-    print(f"    ✓ Found {len(hn_articles)} recent articles from Hacker News")
-
-    # Fetch from Reddit
-    print("  → Fetching Reddit...")
-    reddit_articles = fetch_reddit(REDDIT_SUBREDDITS)
-    all_articles.extend(reddit_articles)
-    print(f"    ✓ Found {len(reddit_articles)} recent articles from Reddit")
-
-    print(f"\n📊 Total articles fetched: {len(all_articles)}")
-
-    # Filter out unwanted sources
-    print(f"\n🚫 Filtering unwanted sources...")
-    all_articles = filter_sources(all_articles)
-    print(f"   After filtering: {len(all_articles)} articles")
-
-    if len(all_articles) < EXACT_ITEMS_COUNT:
-        print(f"⚠️  Warning: Only found {len(all_articles)} articles, need {EXACT_ITEMS_COUNT}")
-        print("    Consider widening recency window or adding more sources")
-
-    # Get user feedback insights
-    print(f"\n💭 Analyzing user feedback...")
+    # Get user feedback insights (the boost stage applies them as articles stream past)
+    print(f"💭 Analyzing user feedback...")
     feedback_insights = get_feedback_insights(DB_PATH)
     if feedback_insights['has_feedback']:
-        print(f"   Found feedback data - applying preferences")
-        all_articles = apply_feedback_boost(all_articles, feedback_insights)
+        print(f"   Found feedback data - applying preferences\n")
     else:
-        print(f"   No feedback data yet - using default ranking")
-
-    # Split articles into Sports and AI/Tech
-    sports_articles = [a for a in all_articles if any(src in a.get('source', '').lower()
-                      for src in ['espn', 'marca', 'si.com', 'tennis', 'guardian', 'bbc', 'cnn',
-                                  'nyt > sports', 'ringer', 'r/tennis', 'r/nba', 'r/soccer', 'r/hyrox'])]
-    tech_articles = [a for a in all_articles if a not in sports_articles]
+        print(f"   No feedback data yet - using default ranking\n")
+
+    # fetch → normalize → dedupe → source filter → cluster → feedback boost → split, one article at a time
+    print(f"  → Fetching all sources concurrently (deadline {FETCH_DEADLINE_SECONDS:g}s, "
+          f"{FETCH_PER_HOST_LIMIT} connections per host)...")
+    feed_state = FeedStateStore(DB_PATH, FEED_SEEN_RETENTION_DAYS)
+    duplicates = DuplicateIndex(DB_PATH, NEAR_DUPLICATE_THRESHOLD, NEAR_DUPLICATE_HISTORY_DAYS,
+                                NEAR_DUPLICATE_SELECTED_THRESHOLD)
+    counters = pipeline.StageCounters()
+    stage = FetchStage(FETCH_MAX_WORKERS, FETCH_PER_HOST_LIMIT, FETCH_DEADLINE_SECONDS)
+    started = time.monotonic()
+    try:
+        articles = pipeline.fetch(fetch_all_sources(stage, feed_state), counters, on_source=report_source)
+        articles = pipeline.normalize(articles, counters)
+        articles = pipeline.dedupe(articles, counters)
+        articles = pipeline.drop_unwanted_sources(articles, counters)
+        articles = pipeline.cluster(articles, duplicates, counters)
+        articles = pipeline.boost(articles, feedback_insights, counters)
+        sections = pipeline.split_sections(articles, counters)
+    finally:
+        stage.close()
+
+    stats = stage.stats()
+    print(f"    {stats['requests']} requests to {stats['hosts']} hosts in {time.monotonic() - started:.1f}s "
+          f"({stats['errors']} errors, {stats['timed_out']} timed out)")
+    feed_stats = feed_state.stats()
+    print(f"    RSS: {feed_stats['not_modified']} feeds unchanged (304), "
+          f"{feed_stats['new_entries']} new entries, {feed_stats['seen_entries']} already seen")
+
+    print(f"\n📊 Pipeline:")
+    for row in counters.summary():
+        rate = f", {row['per_second']}/s" if row['per_second'] else ""
+        print(f"   {row['stage']:<14} {row['in']:>5} in → {row['out']:>5} out ({row['dropped']} dropped{rate})")
+
+    tech_articles = list(sections['tech'].values())
+    sports_articles = list(sections['sports'].values())
+    total = len(tech_articles) + len(sports_articles)
+    print(f"   After filtering: {total} articles ({len(tech_articles)} AI/Tech, {len(sports_articles)} Sports)")
+
+    if total < EXACT_ITEMS_COUNT:
+        print(f"⚠️  Warning: Only found {total} articles, need {EXACT_ITEMS_COUNT}")
+        print("    Consider widening recency window or adding more sources")
 
     print(f"\n🤖 Categorizing AI/Tech articles...")
     print(f"   Will select EXACTLY {EXACT_ITEMS_COUNT} AI/Tech articles")
@@ -157,6 +180,10 @@ def main():
     saved_count = save_articles_to_db(selected_articles)
     print(f"    ✓ Saved {saved_count} new articles")
 
+    # Only now remember what was fetched, so a failed run re-fetches everything next time
+    feed_state.commit()
+    duplicates.commit(selected_articles)
+
     # Print summary
     if selected_articles:
         print("\n📰 Articles by category:")
@@ -0,0 +1,129 @@
+"""Per-feed HTTP validators and seen entries, kept in news_articles.db."""
+
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional, Set
+
+
+class FeedStateStore:
+    """Conditional-request validators and seen entry GUIDs for each feed URL"""
+
+    def __init__(self, db_path: str, retention_days: int = 30):
+        self.db_path = db_path
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._validators = {}  # feed_url -> {'etag', 'last_modified'}
+        self._seen = {}  # feed_url -> set of GUIDs
+        self._pending_validators = {}
+        self._pending_seen = {}
+        self._pending_status = {}
+        self._stats = {'not_modified': 0, 'fetched': 0, 'new_entries': 0, 'seen_entries': 0}
+        self._load()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS feed_state (
+            feed_url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            last_status INTEGER,
+            last_fetched_at TIMESTAMP
+        )
+        ''')
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS feed_seen_entries (
+            feed_url TEXT NOT NULL,
+            guid TEXT NOT NULL,
+            first_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (feed_url, guid)
+        )
+        ''')
+        return conn
+
+    def _load(self):
+        conn = self._connect()
+        try:
+            for feed_url, etag, last_modified in conn.execute('SELECT feed_url, etag, last_modified FROM feed_state'):
+                self._validators[feed_url] = {'etag': etag, 'last_modified': last_modified}
+            for feed_url, guid in conn.execute('SELECT feed_url, guid FROM feed_seen_entries'):
+                self._seen.setdefault(feed_url, set()).add(guid)
+        finally:
+            conn.close()
+
+    # ---- used by the fetcher (any thread) ----
+
+    def conditional_headers(self, feed_url: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for the feed's last response"""
+        validators = self._validators.get(feed_url) or {}
+        headers = {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        return headers
+
+    def not_modified(self, feed_url: str):
+        """Record a 304: validators stay as they were"""
+        with self._lock:
+            self._pending_status[feed_url] = 304
+            self._stats['not_modified'] += 1
+
+    def fetched(self, feed_url: str, etag: Optional[str], last_modified: Optional[str]):
+        """Record a full response and the validators to send next time"""
+        with self._lock:
+            self._pending_status[feed_url] = 200
+            self._pending_validators[feed_url] = {'etag': etag, 'last_modified': last_modified}
+            self._stats['fetched'] += 1
+
+    def unseen(self, feed_url: str, guids: Iterable[str]) -> Set[str]:
+        """The GUIDs not seen in this feed before; all of them are remembered at commit()"""
+        guids = set(guids)
+        with self._lock:
+            new = guids - self._seen.get(feed_url, set())
+            self._pending_seen.setdefault(feed_url, set()).update(guids)
+            self._stats['new_entries'] += len(new)
+            self._stats['seen_entries'] += len(guids) - len(new)
+        return new
+
+    # ---- persistence ----
+
+    def commit(self):
+        """Persist this run's validators and seen GUIDs; prune GUIDs past retention"""
+        with self._lock:
+            validators, self._pending_validators = self._pending_validators, {}
+            seen, self._pending_seen = self._pending_seen, {}
+            status, self._pending_status = self._pending_status, {}
+
+        now = datetime.now().isoformat()
+        conn = self._connect()
+        try:
+            for feed_url, code in status.items():
+                cached = validators.get(feed_url) or self._validators.get(feed_url) or {}
+                conn.execute('''
+                INSERT INTO feed_state (feed_url, etag, last_modified, last_status, last_fetched_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(feed_url) DO UPDATE SET
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    last_status = excluded.last_status,
+                    last_fetched_at = excluded.last_fetched_at
+                ''', (feed_url, cached.get('etag'), cached.get('last_modified'), code, now))
+            for feed_url, guids in seen.items():
+                conn.executemany('INSERT OR IGNORE INTO feed_seen_entries (feed_url, guid) VALUES (?, ?)',
+                                 [(feed_url, guid) for guid in guids])
+            cutoff = (datetime.now(timezone.utc) - timedelta(days=self.retention_days)).strftime('%Y-%m-%d %H:%M:%S')
+            conn.execute('DELETE FROM feed_seen_entries WHERE first_seen_at < ?', (cutoff,))
+            conn.commit()
+        finally:
+            conn.close()
+
+        with self._lock:
+            self._validators.update(validators)
+            for feed_url, guids in seen.items():
+                self._seen.setdefault(feed_url, set()).update(guids)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self._stats)
@@ -0,0 +1,183 @@
+"""Concurrent fetch stage shared by all news fetchers."""
+
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+USER_AGENT = 'PersonalizedNews/1.0'
+
+
+class DeadlineExceeded(Exception):
+    """The fetch stage's deadline passed before a request could start or finish"""
+
+
+class FetchStage:
+    """Bounded, per-host-limited concurrent HTTP fetching with a global deadline"""
+
+    def __init__(self, max_workers: int = 32, per_host_limit: int = 4, deadline_seconds: float = 60):
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.deadline_seconds = deadline_seconds
+        self.deadline = time.monotonic() + deadline_seconds
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=per_host_limit)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers['User-Agent'] = USER_AGENT
+
+        # Requests fan out here; sources run on their own threads (see run) so a
+        # source waiting on its items never holds a request slot
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='news-fetch')
+        self._lock = threading.Lock()
+        self._host_slots = {}
+        self._stats = {'requests': 0, 'errors': 0, 'timed_out': 0}
+
+    # ---- requests ----
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (never negative)"""
+        return max(0.0, self.deadline - time.monotonic())
+
+    def _slot(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return slot
+
+    def get(self, url: str, timeout: float = 10, **kwargs) -> requests.Response:
+        """GET ``url`` within this host's connection limit; raises DeadlineExceeded when out of time
+
+        Raises for HTTP error statuses like the fetchers' own raise_for_status calls did.
+        """
+        slot = self._slot(urlparse(url).netloc.lower())
+        if not slot.acquire(timeout=self.remaining()):
+            self._count('timed_out')
+            raise DeadlineExceeded(f'No time left to fetch {url}')
+        try:
+            remaining = self.remaining()
+            if remaining <= 0:
+                self._count('timed_out')
+                raise DeadlineExceeded(f'No time left to fetch {url}')
+            self._count('requests')
+            try:
+                response = self.session.get(url, timeout=min(timeout, remaining), **kwargs)
+                response.raise_for_status()
+            except requests.Timeout:
+                self._count('timed_out')
+                raise
+            except requests.RequestException:
+                self._count('errors')
+                raise
+            return response
+        finally:
+            slot.release()
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    # ---- fan-out ----
+
+    def map(self, fn: Callable, items: Iterable) -> List:
+        """Run ``fn(item)`` for every item on the request pool; results in item order
+
+        Items that raise are reported and skipped; items still running at the
+        deadline are dropped.
+        """
+        items = list(items)
+        futures = {self._executor.submit(fn, item): index for index, item in enumerate(items)}
+        results = {}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=self.remaining(), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    print(f"    Error fetching {items[futures[future]]}: {e}")
+        for future in pending:
+            future.cancel()
+        if pending:
+            print(f"    ⚠️  Deadline reached: dropped {len(pending)} of {len(items)} pending fetches")
+        return [results[index] for index in sorted(results)]
+
+    def stream(self, sources: Dict[str, Callable[[], List[Dict]]]) -> Iterator[Tuple[str, Dict]]:
+        """Run every source at once, yielding (name, outcome) as each one finishes
+
+        An outcome is {'articles', 'seconds', 'error', 'timed_out'}. Sources still
+        running at the deadline (plus a second's grace for them to return what
+        they have) come last, with no articles and timed_out set.
+        """
+        started = time.monotonic()
+        finished = queue.Queue()
+
+        def run_source(name, fetch):
+            outcome = {'articles': [], 'seconds': None, 'error': None, 'timed_out': False}
+            source_started = time.monotonic()
+            try:
+                outcome['articles'] = fetch() or []
+            except Exception as e:
+                outcome['error'] = str(e)
+            outcome['seconds'] = round(time.monotonic() - source_started, 2)
+            finished.put((name, outcome))
+
+        for name, fetch in sources.items():
+            threading.Thread(target=run_source, args=(name, fetch), name=f'news-source-{name}', daemon=True).start()
+
+        running = set(sources)
+        while running:
+            try:
+                name, outcome = finished.get(timeout=self.remaining() + 1)
+            except queue.Empty:
+                break
+            running.discard(name)
+            yield name, outcome
+
+        for name in sources:
+            if name in running:
+                yield name, {'articles': [], 'seconds': round(time.monotonic() - started, 2),
+                             'error': 'deadline exceeded', 'timed_out': True}
+
+    def run(self, sources: Dict[str, Callable[[], List[Dict]]]) -> Dict[str, Dict]:
+        """Run every source at once; {name: outcome} (see stream), in source order"""
+        outcomes = dict(self.stream(sources))
+        return {name: outcomes[name] for name in sources}
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update(
+            max_workers=self.max_workers,
+            per_host_limit=self.per_host_limit,
+            deadline_seconds=self.deadline_seconds,
+            hosts=len(self._host_slots)
+        )
+        return stats
+
+
+@contextmanager
+def using_stage(stage: Optional[FetchStage] = None):
+    """``stage``, or a one-off FetchStage closed afterwards for fetchers called on their own"""
+    if stage is not None:
+        yield stage
+        return
+    stage = FetchStage()
+    try:
+        yield stage
+    finally:
+        stage.close()
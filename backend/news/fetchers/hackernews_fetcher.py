@@ -1,27 +1,24 @@
-import requests
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
 
-def fetch_hackernews() -> List[Dict]:
-    """Fetch top stories from Hacker News."""
+from fetchers.fetch_stage import FetchStage, using_stage
+
+HN_API_URL = "https://hacker-news.firebaseio.com/v0"
+
+
+def fetch_hackernews(stage: Optional[FetchStage] = None) -> List[Dict]:
+    """Fetch top stories from Hacker News (story details fetched concurrently)."""
     articles = []
 
-    try:
-        # Get top stories
-        top_stories_url = "https://hacker-news.firebaseio.com/v0/topstories.json"
-        response = requests.get(top_stories_url, timeout=10)
-        response.raise_for_status()
-        story_ids = response.json()[:20]  # Top 20 stories
-
-        # Fetch details for each story
-        for story_id in story_ids:
-            try:
-                story_url = f"https://hacker-news.firebaseio.com/v0/item/{story_id}.json"
-                story_response = requests.get(story_url, timeout=5)
-                story_response.raise_for_status()
-                story = story_response.json()
-
-                if story.get('type') == 'story' and story.get('url'):
+    with using_stage(stage) as stage:
+        try:
+            # Get top stories
+            response = stage.get(f"{HN_API_URL}/topstories.json", timeout=10)
+            story_ids = response.json()[:20]  # Top 20 stories
+
+            # Fetch details for each story
+            for story in stage.map(lambda story_id: fetch_story(stage, story_id), story_ids):
+                if story and story.get('type') == 'story' and story.get('url'):
                     article = {
                         'title': story.get('title', ''),
                         'url': story.get('url', ''),
@@ -31,11 +28,16 @@ def fetch_hackernews() -> List[Dict]:
                     }
                     articles.append(article)
 
-            except Exception as e:
-                print(f"Error fetching HN story {story_id}: {e}")
-                continue
-
-    except Exception as e:
-        print(f"Error fetching Hacker News: {e}")
+        except Exception as e:
+            print(f"Error fetching Hacker News: {e}")
 
     return articles
+
+
+def fetch_story(stage: FetchStage, story_id: int) -> Optional[Dict]:
+    """One HN item; None (and a note) if it can't be fetched."""
+    try:
+        return stage.get(f"{HN_API_URL}/item/{story_id}.json", timeout=5).json()
+    except Exception as e:
+        print(f"Error fetching HN story {story_id}: {e}")
+        return None
@@ -1,15 +1,18 @@
-import requests
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Optional
 
-def fetch_newsapi_by_category(api_key: str, queries_dict: Dict[str, List[str]], recency_hours: int = 72) -> List[Dict]:
-    """Fetch articles from NewsAPI based on category queries."""
+from fetchers.fetch_stage import FetchStage, using_stage
+
+NEWSAPI_URL = "https://newsapi.org/v2/everything"
+
+
+def fetch_newsapi_by_category(api_key: str, queries_dict: Dict[str, List[str]], recency_hours: int = 72,
+                              stage: Optional[FetchStage] = None) -> List[Dict]:
+    """Fetch articles from NewsAPI based on category queries (queries run concurrently)."""
     if not api_key:
         print("Warning: NewsAPI key not configured, skipping NewsAPI")
         return []
 
-    articles = []
-    base_url = "https://newsapi.org/v2/everything"
     cutoff_time = datetime.now() - timedelta(hours=recency_hours)
 
     # Flatten queries with category tracking
@@ -19,52 +22,62 @@ def fetch_newsapi_by_category(api_key: str, queries_dict: Dict[str, List[str]],
             query_category_map.append((query, category))
 
     # Limit total queries to stay within NewsAPI free tier
-    for query, category in query_category_map[:10]:
-        try:
-            params = {
-                'q': query.strip(),
-                'apiKey': api_key,
-                'language': 'en',
-                'sortBy': 'publishedAt',
-                'from': cutoff_time.isoformat(),
-                'pageSize': 5,
-            }
+    with using_stage(stage) as stage:
+        per_query = stage.map(
+            lambda query_category: fetch_newsapi_query(stage, api_key, *query_category, cutoff_time),
+            query_category_map[:10]
+        )
+    return [article for articles in per_query for article in articles]
 
-            response = requests.get(base_url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
 
-            for article_data in data.get('articles', []):
-                # Validate published date
-                published_at = article_data.get('publishedAt', '')
-                if not published_at:
-                    continue
+def fetch_newsapi_query(stage: FetchStage, api_key: str, query: str, category: str, cutoff_time: datetime) -> List[Dict]:
+    """Recent articles for one NewsAPI query, tagged with its category."""
+    articles = []
 
-                try:
-                    pub_datetime = datetime.fromisoformat(published_at.replace('Z', '+00:00').replace('+00:00', ''))
-                    if pub_datetime < cutoff_time:
-                        continue
-                except:
-                    continue
+    try:
+        params = {
+            'q': query.strip(),
+            'apiKey': api_key,
+            'language': 'en',
+            'sortBy': 'publishedAt',
+            'from': cutoff_time.isoformat(),
+            'pageSize': 5,
+        }
+
+        response = stage.get(NEWSAPI_URL, params=params, timeout=10)
+        data = response.json()
 
-                # Validate URL
-                url = article_data.get('url', '')
-                if not url or not url.startswith('http'):
+        for article_data in data.get('articles', []):
+            # Validate published date
+            published_at = article_data.get('publishedAt', '')
+            if not published_at:
+                continue
+
+            try:
+                pub_datetime = datetime.fromisoformat(published_at.replace('Z', '+00:00').replace('+00:00', ''))
+                if pub_datetime < cutoff_time:
                     continue
+            except:
+                continue
+
+            # Validate URL
+            url = article_data.get('url', '')
+            if not url or not url.startswith('http'):
+                continue
 
-                article = {
-                    'title': article_data.get('title', '').strip(),
-                    'url': url,
-                    'source': article_data.get('source', {}).get('name', 'NewsAPI'),
-                    'description': article_data.get('description', '').strip(),
-                    'published_date': published_at,
-                    'category_hint': category,  # Help AI categorization
-                }
+            article = {
+                'title': article_data.get('title', '').strip(),
+                'url': url,
+                'source': article_data.get('source', {}).get('name', 'NewsAPI'),
+                'description': article_data.get('description', '').strip(),
+                'published_date': published_at,
+                'category_hint': category,  # Help AI categorization
+            }
 
-                if article['title']:
-                    articles.append(article)
+            if article['title']:
+                articles.append(article)
 
-        except Exception as e:
-            print(f"Error fetching NewsAPI for '{query}': {e}")
+    except Exception as e:
+        print(f"Error fetching NewsAPI for '{query}': {e}")
 
     return articles
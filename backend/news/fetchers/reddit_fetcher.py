@@ -1,39 +1,47 @@
-import requests
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
 
-def fetch_reddit(subreddits: List[str]) -> List[Dict]:
-    """Fetch hot posts from Reddit subreddits."""
+from fetchers.fetch_stage import FetchStage, using_stage
+
+
+def fetch_reddit(subreddits: List[str], stage: Optional[FetchStage] = None) -> List[Dict]:
+    """Fetch hot posts from Reddit subreddits (all subreddits at once)."""
+    with using_stage(stage) as stage:
+        per_subreddit = stage.map(lambda subreddit: fetch_subreddit(stage, subreddit), subreddits)
+    return [article for articles in per_subreddit for article in articles]
+
+
+def fetch_subreddit(stage: FetchStage, subreddit: str) -> List[Dict]:
+    """Hot posts with external links from one subreddit."""
     articles = []
 
-    headers = {
-        'User-Agent': 'PersonalizedNews/1.0'
-    }
-
-    for subreddit in subreddits:
-        try:
-            url = f"https://www.reddit.com/r/{subreddit}/hot.json?limit=10"
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-
-            for post in data.get('data', {}).get('children', []):
-                post_data = post.get('data', {})
-
-                # Skip self posts without external links
-                if post_data.get('is_self') and not post_data.get('url_overridden_by_dest'):
-                    continue
-
-                article = {
-                    'title': post_data.get('title', ''),
-                    'url': post_data.get('url', ''),
-                    'source': f"r/{subreddit}",
-                    'description': post_data.get('selftext', '')[:500],
-                    'published_date': datetime.fromtimestamp(post_data.get('created_utc', 0)).isoformat(),
-                }
-                articles.append(article)
-
-        except Exception as e:
-            print(f"Error fetching Reddit r/{subreddit}: {e}")
+    try:
+        url = f"https://www.reddit.com/r/{subreddit}/hot.json?limit=10"
+        response = stage.get(url, timeout=10)
+        data = response.json()
+
+        for post in data.get('data', {}).get('children', []):
+            post_data = post.get('data', {})
+
+            # Skip self posts without external links
+            if post_data.get('is_self') and not post_data.get('url_overridden_by_dest'):
+                continue
+
+            # Link posts (and crossposts of them) point outside Reddit; use that destination
+            crosspost = (post_data.get('crosspost_parent_list') or [{}])[0]
+            url = (post_data.get('url_overridden_by_dest') or crosspost.get('url_overridden_by_dest')
+                   or post_data.get('url', ''))
+
+            article = {
+                'title': post_data.get('title', ''),
+                'url': url,
+                'source': f"r/{subreddit}",
+                'description': post_data.get('selftext', '')[:500],
+                'published_date': datetime.fromtimestamp(post_data.get('created_utc', 0)).isoformat(),
+            }
+            articles.append(article)
+
+    except Exception as e:
+        print(f"Error fetching Reddit r/{subreddit}: {e}")
 
     return articles
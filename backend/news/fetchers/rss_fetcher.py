@@ -1,64 +1,105 @@
 import feedparser
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Optional
 
-def fetch_rss_feeds(feed_urls: List[str], recency_hours: int = 72) -> List[Dict]:
-    """Fetch articles from RSS feeds within the recency window."""
-    articles = []
+from fetchers.fetch_stage import DeadlineExceeded, FetchStage, using_stage
+from fetchers.feed_state import FeedStateStore
+
+
+def fetch_rss_feeds(feed_urls: List[str], recency_hours: int = 72, stage: Optional[FetchStage] = None,
+                    feed_state: Optional[FeedStateStore] = None) -> List[Dict]:
+    """Fetch articles from RSS feeds within the recency window (all feeds at once).
+
+    With a feed_state store, feeds are fetched conditionally and only entries it
+    hasn't seen before are returned.
+    """
     # Use timezone-aware cutoff time
-    from datetime import timezone
     cutoff_time = datetime.now(timezone.utc) - timedelta(hours=recency_hours)
 
-    for feed_url in feed_urls:
-        try:
-            feed = feedparser.parse(feed_url)
-            source_name = feed.feed.get('title', feed_url)
+    with using_stage(stage) as stage:
+        per_feed = stage.map(lambda feed_url: fetch_rss_feed(stage, feed_url, cutoff_time, feed_state), feed_urls)
+    return [article for articles in per_feed for article in articles]
 
-            for entry in feed.entries[:30]:  # Check more entries to find recent ones
-                published_date = parse_date(entry.get('published', entry.get('updated', '')))
 
-                # Skip if no valid date or older than cutoff
-                if not published_date:
-                    continue
+def fetch_rss_feed(stage: FetchStage, feed_url: str, cutoff_time: datetime,
+                   feed_state: Optional[FeedStateStore] = None) -> List[Dict]:
+    """Recent (and, with feed_state, unseen) articles from one feed."""
+    articles = []
 
-                try:
-                    # Parse datetime (keeps timezone info)
-                    pub_datetime = datetime.fromisoformat(published_date.replace('Z', '+00:00'))
-
-                    # Convert to UTC for comparison if it has timezone info
-                    if pub_datetime.tzinfo is not None:
-                        pub_datetime = pub_datetime.astimezone(timezone.utc)
-                    else:
-                        # If naive, assume UTC
-                        pub_datetime = pub_datetime.replace(tzinfo=timezone.utc)
-
-                    if pub_datetime < cutoff_time:
-                        continue
-                except Exception as e:
-                    # Skip articles with unparseable dates
+    try:
+        # Download through the stage (host limits, deadline), then parse; relative
+        # links resolve against the final URL
+        headers = feed_state.conditional_headers(feed_url) if feed_state else {}
+        response = stage.get(feed_url, timeout=15, headers=headers)
+        if response.status_code == 304:
+            feed_state.not_modified(feed_url)
+            return []
+
+        feed = feedparser.parse(response.content, response_headers={
+            'content-location': response.url,
+            'content-type': response.headers.get('content-type', ''),
+        })
+        source_name = feed.feed.get('title', feed_url)
+        entries = feed.entries[:30]  # Check more entries to find recent ones
+
+        if feed_state:
+            # Results that finish after the deadline are dropped, so don't mark them seen
+            if stage.remaining() <= 0:
+                raise DeadlineExceeded(f'Parsed {feed_url} after the deadline')
+            feed_state.fetched(feed_url, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+            unseen = feed_state.unseen(feed_url, [entry_guid(entry) for entry in entries])
+            entries = [entry for entry in entries if entry_guid(entry) in unseen]
+
+        for entry in entries:
+            published_date = parse_date(entry.get('published', entry.get('updated', '')))
+
+            # Skip if no valid date or older than cutoff
+            if not published_date:
+                continue
+
+            try:
+                # Parse datetime (keeps timezone info)
+                pub_datetime = datetime.fromisoformat(published_date.replace('Z', '+00:00'))
+
+                # Convert to UTC for comparison if it has timezone info
+                if pub_datetime.tzinfo is not None:
+                    pub_datetime = pub_datetime.astimezone(timezone.utc)
+                else:
+                    # If naive, assume UTC
+                    pub_datetime = pub_datetime.replace(tzinfo=timezone.utc)
+
+                if pub_datetime < cutoff_time:
                     continue
+            except Exception as e:
+                # Skip articles with unparseable dates
+                continue
 
-                # Validate URL exists
-                url = entry.get('link', '')
-                if not url or not url.startswith('http'):
-                    continue
+            # Validate URL exists
+            url = entry.get('link', '')
+            if not url or not url.startswith('http'):
+                continue
 
-                article = {
-                    'title': entry.get('title', '').strip(),
-                    'url': url,
-                    'source': source_name,
-                    'description': entry.get('summary', '').strip(),
-                    'published_date': published_date,
-                }
+            article = {
+                'title': entry.get('title', '').strip(),
+                'url': url,
+                'source': source_name,
+                'description': entry.get('summary', '').strip(),
+                'published_date': published_date,
+            }
 
-                if article['title']:  # Only add if has a title
-                    articles.append(article)
+            if article['title']:  # Only add if has a title
+                articles.append(article)
 
-        except Exception as e:
-            print(f"Error fetching RSS feed {feed_url}: {e}")
+    except Exception as e:
+        print(f"Error fetching RSS feed {feed_url}: {e}")
 
     return articles
 
+def entry_guid(entry) -> str:
+    """The entry's stable ID: its guid/id, else its link, else its title and date."""
+    return (entry.get('id') or entry.get('link')
+            or f"{entry.get('title', '')}|{entry.get('published', entry.get('updated', ''))}")
+
 def parse_date(date_string: str) -> Optional[str]:
     """Parse date string to ISO format. Returns None if parsing fails."""
     if not date_string:
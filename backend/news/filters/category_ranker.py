@@ -3,6 +3,8 @@ from typing import List, Dict, Tuple
 from collections import Counter
 import json
 
+from filters.pre_ranker import pre_rank
+
 def _enforce_source_diversity(articles: List[Dict], exact_count: int) -> List[Dict]:
     """
     Enforce source diversity caps by removing excess articles from over-represented sources.
@@ -72,9 +74,7 @@ def categorize_and_rank_articles(
     - All URLs validated
     """
 
-    if not api_key:
-        print("Warning: Anthropic API key not configured")
-        return articles[:exact_count]
+    from config import LLM_CANDIDATE_COUNT, PRE_RANK_RECENCY_HALF_LIFE_HOURS
 
     if not articles:
         print("Warning: No articles to filter")
@@ -89,6 +89,17 @@ def categorize_and_rank_articles(
             seen_urls.add(url)
             unique_articles.append(article)
 
+    # Best first by local score (keywords, feedback, recency, coverage) under source caps;
+    # only the top candidate_count (LLM_CANDIDATE_COUNT, but never fewer than the digest needs) go to the model
+    candidate_count = min(max(LLM_CANDIDATE_COUNT, exact_count), len(unique_articles))
+    unique_articles = pre_rank(unique_articles, categories, exact_count, candidate_count,
+                               feedback_insights, PRE_RANK_RECENCY_HALF_LIFE_HOURS)
+    print(f"  Pre-ranked {len(unique_articles)} articles; sending the top {candidate_count} to the LLM")
+
+    if not api_key:
+        print("Warning: Anthropic API key not configured")
+        return unique_articles[:exact_count]
+
     if len(unique_articles) < exact_count:
         print(f"Warning: Only {len(unique_articles)} unique articles available, need {exact_count}")
         return unique_articles
@@ -115,12 +126,14 @@ def categorize_and_rank_articles(
 
         # Prepare article list for AI (simplified to reduce token usage)
         articles_text = []
-        # Limit to 80 articles and shorter descriptions to leave room for response
-        for idx, article in enumerate(unique_articles[:80]):
+        # Only the pre-ranked candidates, with shorter descriptions to leave room for response
+        for idx, article in enumerate(unique_articles[:candidate_count]):
             desc = article.get('description', '')[:100]  # Reduced from 200
+            # Same story from other sources (collapsed before ranking)
+            also_in = f" | Also in: {', '.join(article['also_in'][:5])}" if article.get('also_in') else ""
             articles_text.append(
                 f"[{idx}] {article['title']}\n"
-                f"    Source: {article['source']} | Date: {article.get('published_date', 'unknown')[:10]}\n"
+                f"    Source: {article['source']} | Date: {article.get('published_date', 'unknown')[:10]}{also_in}\n"
                 f"    {desc}"
             )
 
@@ -299,7 +312,7 @@ CRITICAL:
             idx = item.get('index')
 
             # If AI provided an index, use it
-            if idx is not None and idx < len(unique_articles):
+            if idx is not None and idx < candidate_count:
                 article = unique_articles[idx].copy()
             # Otherwise, try to match by title or URL
             elif 'title' in item or 'url' in item:
@@ -0,0 +1,277 @@
+"""URL canonicalization and near-duplicate detection for news articles."""
+
+import hashlib
+import random
+import re
+import sqlite3
+import struct
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit, urlunsplit
+
+from filters.feedback_analyzer import STOP_WORDS
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    'ref', 'ref_src', 'ref_url', 'referrer', 'cmpid', 'cmp', 'smid', 'smtyp', 'ocid',
+    'sr_share', 'taid', 'guccounter', 'guce_referrer', 'guce_referrer_sig', '_ga', '_gl',
+    'amp', 'outputtype', 'ito',
+}
+TRACKING_PREFIXES = ('utm_', 'mkt_', 'pk_', 'hsa_')
+
+# (host, path prefix) -> query parameter holding the real destination
+REDIRECT_WRAPPERS = {
+    ('out.reddit.com', '/'): 'url',
+    ('l.facebook.com', '/l.php'): 'u',
+    ('lm.facebook.com', '/l.php'): 'u',
+    ('www.google.com', '/url'): 'q',
+    ('google.com', '/url'): 'q',
+    ('href.li', '/'): None,  # href.li/?https://example.com/...
+}
+
+FOLDED_HOST_PREFIXES = ('www.', 'm.', 'mobile.', 'amp.')
+
+# 64 hash functions; LSH on 21 bands of 3 of them, so pairs above ~0.55 title similarity
+# share a band ~98% of the time and unrelated titles (~0.2) rarely do
+MINHASH_PERMUTATIONS = 64
+MINHASH_ROWS = 3
+MINHASH_BANDS = MINHASH_PERMUTATIONS // MINHASH_ROWS
+_MERSENNE_PRIME = (1 << 61) - 1
+_seeds = random.Random(20240601)
+_PERMUTATIONS = [(_seeds.randrange(1, _MERSENNE_PRIME), _seeds.randrange(0, _MERSENNE_PRIME))
+                 for _ in range(MINHASH_PERMUTATIONS)]
+
+
+def _unwrap(url: str) -> str:
+    """The destination of a redirect wrapper or AMP cache URL; other URLs unchanged."""
+    for _ in range(3):  # wrappers can nest
+        parts = urlsplit(url)
+        host = parts.netloc.lower()
+        unwrapped = None
+
+        for (wrapper_host, path_prefix), param in REDIRECT_WRAPPERS.items():
+            if host == wrapper_host and parts.path.startswith(path_prefix):
+                if param is None:
+                    unwrapped = unquote(parts.query)
+                else:
+                    unwrapped = dict(parse_qsl(parts.query)).get(param)
+                break
+
+        # www.google.com/amp/s/example.com/story and example-com.cdn.ampproject.org/c/s/example.com/story
+        amp = re.match(r'^/(?:amp|[cv])/(s/)?(.+)$', parts.path)
+        if unwrapped is None and amp and (host.endswith('.cdn.ampproject.org') or
+                                          (host in ('www.google.com', 'google.com') and parts.path.startswith('/amp/'))):
+            unwrapped = ('https://' if amp.group(1) else 'http://') + amp.group(2)
+
+        if not unwrapped or not unwrapped.startswith('http'):
+            return url
+        url = unwrapped
+    return url
+
+
+def canonical_url(url: str) -> str:
+    """The article's URL without redirect wrappers, AMP variants, tracking parameters or fragment."""
+    url = _unwrap((url or '').strip())
+    parts = urlsplit(url)
+    if not parts.netloc:
+        return url
+
+    path = re.sub(r'/amp/?$', '/', parts.path) or '/'
+    path = re.sub(r'\.amp(\.html?)$', r'\1', path)
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+             if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)]
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ''))
+
+
+def url_key(url: str) -> str:
+    """canonical_url with the host prefix, query order and trailing slash folded, for identity only."""
+    parts = urlsplit(canonical_url(url))
+    host = parts.netloc
+    for prefix in FOLDED_HOST_PREFIXES:
+        if host.startswith(prefix) and host.count('.') > 1:
+            host = host[len(prefix):]
+            break
+    path = parts.path.rstrip('/') or '/'
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit(('https' if parts.scheme in ('http', 'https') else parts.scheme, host, path, query, ''))
+
+
+# ---- MinHash ----
+
+def _words(text: str) -> List[str]:
+    text = re.sub(r'<[^>]+>', ' ', text or '').lower()
+    return [word for word in re.findall(r'[a-z0-9]+', text)
+            if word not in STOP_WORDS and (len(word) > 1 or word.isdigit())]
+
+
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def title_tokens(title: str) -> Set[str]:
+    """The words of a title that say what the story is (no stop words, punctuation or case)."""
+    return set(_words(title))
+
+
+def title_numbers(tokens: Set[str]) -> FrozenSet[str]:
+    """The numbers among a title's tokens (week, gameweek, episode, version, year, ...)"""
+    return frozenset(token for token in tokens if token.isdigit())
+
+
+def numbers_agree(first: FrozenSet[str], second: FrozenSet[str]) -> bool:
+    """False when both titles carry numbers and neither's contain the other's ("Week 5" vs "Week 6")"""
+    return not first or not second or first <= second or second <= first
+
+
+def minhash(tokens: Set[str]) -> Tuple[int, ...]:
+    """MinHash signature (MINHASH_PERMUTATIONS values) of a token set; () for no tokens."""
+    if not tokens:
+        return ()
+    hashes = [_token_hash(token) for token in tokens]
+    return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def estimated_similarity(first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of the token sets behind two signatures"""
+    if not first or not second:
+        return 0.0
+    return sum(1 for a, b in zip(first, second) if a == b) / len(first)
+
+
+def _bands(signature: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+    """LSH bands: signatures sharing any band are candidates for a similarity check."""
+    return [(band, signature[band * MINHASH_ROWS:(band + 1) * MINHASH_ROWS]) for band in range(MINHASH_BANDS)]
+
+
+def _pack(signature: Tuple[int, ...]) -> bytes:
+    return struct.pack(f'<{len(signature)}Q', *signature)
+
+
+def _unpack(blob: bytes) -> Tuple[int, ...]:
+    return struct.unpack(f'<{len(blob) // 8}Q', blob) if blob else ()
+
+
+class DuplicateIndex:
+    """MinHash clusters of recent articles, in memory for the run and in news_articles.db across runs"""
+
+    def __init__(self, db_path: str, threshold: float = 0.55, history_days: int = 14,
+                 selected_threshold: float = 0.8):
+        self.db_path = db_path
+        self.threshold = threshold
+        self.history_days = history_days
+        self.selected_threshold = selected_threshold
+        self._lock = threading.Lock()
+        self._clusters = {}  # article_id -> cluster_id
+        self._buckets = {}  # (band, rows) -> [(signature, numbers, cluster_id)]
+        self._selected_clusters = set()  # clusters that made an earlier digest
+        self._repeats = set()  # this run's article IDs that repeat a story from an earlier digest
+        self._pending = {}  # article_id -> row to insert
+        self._load()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS article_fingerprints (
+            article_id TEXT PRIMARY KEY,
+            cluster_id TEXT NOT NULL,
+            signature BLOB,
+            url TEXT,
+            title TEXT,
+            source TEXT,
+            selected INTEGER DEFAULT 0,
+            first_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_fingerprints_cluster ON article_fingerprints(cluster_id)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_fingerprints_seen ON article_fingerprints(first_seen_at)')
+        return conn
+
+    def _history_cutoff(self) -> str:
+        return (datetime.now(timezone.utc) - timedelta(days=self.history_days)).strftime('%Y-%m-%d %H:%M:%S')
+
+    def _load(self):
+        conn = self._connect()
+        try:
+            rows = conn.execute('''
+                SELECT article_id, cluster_id, signature, title, selected FROM article_fingerprints
+                WHERE first_seen_at >= ?
+            ''', (self._history_cutoff(),)).fetchall()
+        finally:
+            conn.close()
+        for article_id, cluster_id, signature, title, selected in rows:
+            self._add(article_id, cluster_id, _unpack(signature), title_numbers(title_tokens(title)))
+            if selected:
+                self._selected_clusters.add(cluster_id)
+
+    def _add(self, article_id: str, cluster_id: str, signature: Tuple[int, ...], numbers: FrozenSet[str]):
+        self._clusters[article_id] = cluster_id
+        if signature:
+            for band in _bands(signature):
+                self._buckets.setdefault(band, []).append((signature, numbers, cluster_id))
+
+    def _nearest_cluster(self, signature: Tuple[int, ...], numbers: FrozenSet[str]) -> Optional[Tuple[float, str]]:
+        """(similarity, cluster_id) of the most similar earlier title at or above the threshold"""
+        if not signature:
+            return None
+        best = None
+        for band in _bands(signature):
+            for candidate, candidate_numbers, cluster_id in self._buckets.get(band, ()):
+                if not numbers_agree(numbers, candidate_numbers):
+                    continue
+                similarity = estimated_similarity(signature, candidate)
+                if similarity >= self.threshold and (best is None or similarity > best[0]):
+                    best = (similarity, cluster_id)
+        return best
+
+    def assign(self, article: Dict) -> str:
+        """The article's cluster ID: an earlier article with the same ID or a near-identical
+        title (with the same numbers), else a new cluster named after this article.
+        Remembered at commit()."""
+        article_id = article['id']
+        tokens = title_tokens(article.get('title', ''))
+        signature = minhash(tokens)
+        with self._lock:
+            if article_id in self._clusters:
+                cluster_id = self._clusters[article_id]
+                if cluster_id in self._selected_clusters:
+                    self._repeats.add(article_id)
+                return cluster_id
+
+            numbers = title_numbers(tokens)
+            nearest = self._nearest_cluster(signature, numbers)
+            cluster_id = nearest[1] if nearest else article_id
+            if nearest and cluster_id in self._selected_clusters and nearest[0] >= self.selected_threshold:
+                self._repeats.add(article_id)
+            self._add(article_id, cluster_id, signature, numbers)
+            self._pending[article_id] = (article_id, cluster_id, _pack(signature),
+                                         article.get('url'), article.get('title'), article.get('source'))
+        return cluster_id
+
+    def was_selected(self, article: Dict) -> bool:
+        """Whether an assigned article repeats a story from an earlier digest: the same
+        article, or a title at least selected_threshold similar to one in a selected cluster"""
+        return article['id'] in self._repeats
+
+    def commit(self, selected_articles: Iterable[Dict] = ()):
+        """Persist this run's signatures and mark the selected articles' clusters; prune old rows"""
+        with self._lock:
+            rows, self._pending = list(self._pending.values()), {}
+        selected = {article['cluster_id'] for article in selected_articles if article.get('cluster_id')}
+
+        conn = self._connect()
+        try:
+            conn.executemany('''
+                INSERT OR IGNORE INTO article_fingerprints (article_id, cluster_id, signature, url, title, source)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', rows)
+            conn.executemany('UPDATE article_fingerprints SET selected = 1 WHERE cluster_id = ?',
+                             [(cluster_id,) for cluster_id in selected])
+            conn.execute('DELETE FROM article_fingerprints WHERE first_seen_at < ?', (self._history_cutoff(),))
+            conn.commit()
+        finally:
+            conn.close()
+
+        with self._lock:
+            self._selected_clusters.update(selected)
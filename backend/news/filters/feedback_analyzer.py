@@ -127,9 +127,25 @@ def get_feedback_insights(db_path: str) -> Dict:
     }
 
 
-def apply_feedback_boost(articles: List[Dict], feedback_insights: Dict) -> List[Dict]:
+def prepare_feedback_boost(feedback_insights: Dict) -> Dict:
+    """
+    The parts of the feedback insights feedback_boost() needs, worked out once per run.
+    """
+    liked_keywords = feedback_insights.get('liked_keywords', Counter())
+    disliked_keywords = feedback_insights.get('disliked_keywords', Counter())
+
+    return {
+        'category_feedback': feedback_insights['category_feedback'],
+        'source_feedback': feedback_insights['source_feedback'],
+        # Get top keywords (most frequently appearing in liked/disliked articles)
+        'top_liked_keywords': set(word for word, count in liked_keywords.most_common(20) if count >= 2),
+        'top_disliked_keywords': set(word for word, count in disliked_keywords.most_common(20) if count >= 2),
+    }
+
+
+def feedback_boost(article: Dict, prepared: Dict) -> float:
     """
-    Boost relevance scores of articles based on user feedback patterns.
+    Relevance boost for one article based on user feedback patterns.
 
     Four signals:
     - Category preference: Boost/penalize based on category feedback
@@ -137,57 +153,57 @@ def apply_feedback_boost(articles: List[Dict], feedback_insights: Dict) -> List[
     - Keyword matching: Boost articles with keywords from liked articles
     - Keyword avoidance: Penalize articles with keywords from disliked articles
     """
-    if not feedback_insights['has_feedback']:
-        return articles
+    category_feedback = prepared['category_feedback']
+    source_feedback = prepared['source_feedback']
+    boost = 0.0
+
+    # 1. Boost based on category preference
+    category = article.get('category_hint') or article.get('category', '')
+    if category in category_feedback:
+        cat_data = category_feedback[category]
+        if cat_data['net_score'] > 0:
+            boost += 0.15 * (cat_data['ratio'])  # Up to 0.15 boost
+        elif cat_data['net_score'] < 0:
+            boost -= 0.15 * (1 - cat_data['ratio'])  # Up to 0.15 penalty
+
+        if cat_data['ratio'] >= 0.8 and cat_data['total'] >= 3:
+            boost += 0.1  # Bonus for highly preferred categories
+
+    # 2. Boost based on source preference (REDUCED from 0.1 to 0.05)
+    source = article.get('source', '')
+    if source in source_feedback:
+        src_data = source_feedback[source]
+        if src_data['net_score'] > 0:
+            boost += 0.05 * (src_data['ratio'])  # Up to 0.05 boost
+        elif src_data['net_score'] < 0:
+            boost -= 0.05 * (1 - src_data['ratio'])  # Up to 0.05 penalty
+
+    # 3. NEW: Boost based on keyword matching from liked articles
+    title = article.get('title', '').lower()
+    title_words = set(re.findall(r'\b[a-z]{3,}\b', title))
+
+    # Count matches with liked keywords
+    liked_matches = len(title_words & prepared['top_liked_keywords'])
+    if liked_matches > 0:
+        boost += 0.15 * min(liked_matches / 3, 1.0)  # Up to 0.15 boost for keyword matches
+
+    # 4. NEW: Penalize based on keyword matching from disliked articles
+    disliked_matches = len(title_words & prepared['top_disliked_keywords'])
+    if disliked_matches > 0:
+        boost -= 0.15 * min(disliked_matches / 3, 1.0)  # Up to 0.15 penalty for disliked keywords
+
+    return boost
 
-    category_feedback = feedback_insights['category_feedback']
-    source_feedback = feedback_insights['source_feedback']
-    liked_keywords = feedback_insights.get('liked_keywords', Counter())
-    disliked_keywords = feedback_insights.get('disliked_keywords', Counter())
 
-    # Get top keywords (most frequently appearing in liked/disliked articles)
-    top_liked_keywords = set(word for word, count in liked_keywords.most_common(20) if count >= 2)
-    top_disliked_keywords = set(word for word, count in disliked_keywords.most_common(20) if count >= 2)
+def apply_feedback_boost(articles: List[Dict], feedback_insights: Dict) -> List[Dict]:
+    """
+    Store each article's feedback_boost (see feedback_boost) based on user feedback patterns.
+    """
+    if not feedback_insights['has_feedback']:
+        return articles
 
+    prepared = prepare_feedback_boost(feedback_insights)
     for article in articles:
-        boost = 0.0
-
-        # 1. Boost based on category preference
-        category = article.get('category_hint') or article.get('category', '')
-        if category in category_feedback:
-            cat_data = category_feedback[category]
-            if cat_data['net_score'] > 0:
-                boost += 0.15 * (cat_data['ratio'])  # Up to 0.15 boost
-            elif cat_data['net_score'] < 0:
-                boost -= 0.15 * (1 - cat_data['ratio'])  # Up to 0.15 penalty
-
-            if cat_data['ratio'] >= 0.8 and cat_data['total'] >= 3:
-                boost += 0.1  # Bonus for highly preferred categories
-
-        # 2. Boost based on source preference (REDUCED from 0.1 to 0.05)
-        source = article.get('source', '')
-        if source in source_feedback:
-            src_data = source_feedback[source]
-            if src_data['net_score'] > 0:
-                boost += 0.05 * (src_data['ratio'])  # Up to 0.05 boost
-            elif src_data['net_score'] < 0:
-                boost -= 0.05 * (1 - src_data['ratio'])  # Up to 0.05 penalty
-
-        # 3. NEW: Boost based on keyword matching from liked articles
-        title = article.get('title', '').lower()
-        title_words = set(re.findall(r'\b[a-z]{3,}\b', title))
-
-        # Count matches with liked keywords
-        liked_matches = len(title_words & top_liked_keywords)
-        if liked_matches > 0:
-            boost += 0.15 * min(liked_matches / 3, 1.0)  # Up to 0.15 boost for keyword matches
-
-        # 4. NEW: Penalize based on keyword matching from disliked articles
-        disliked_matches = len(title_words & top_disliked_keywords)
-        if disliked_matches > 0:
-            boost -= 0.15 * min(disliked_matches / 3, 1.0)  # Up to 0.15 penalty for disliked keywords
-
-        # Store the feedback boost
-        article['feedback_boost'] = boost
+        article['feedback_boost'] = feedback_boost(article, prepared)
 
     return articles
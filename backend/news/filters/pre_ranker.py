@@ -0,0 +1,119 @@
+"""Cheap local scoring that picks the LLM's candidates."""
+
+import math
+import re
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from config import SOURCE_MAX_CAPS, DEFAULT_SOURCE_MAX
+from filters.feedback_analyzer import prepare_feedback_boost, feedback_boost
+
+KEYWORD_WEIGHT = 0.5
+RECENCY_WEIGHT = 0.3
+CATEGORY_HINT_BONUS = 0.1
+SPORTS_BOOST = 0.1
+SPORTS_PENALTY = 0.4
+COVERAGE_BONUS_PER_SOURCE = 0.05
+MAX_COVERAGE_BONUS = 0.15
+
+
+def _keyword_pattern(keywords: List[str]):
+    if not keywords:
+        return None
+    return re.compile(r'\b(?:' + '|'.join(re.escape(keyword.lower()) for keyword in keywords) + r')\b')
+
+
+def _compile_categories(categories: Dict[str, Dict]) -> List[Dict]:
+    compiled = []
+    for name, info in categories.items():
+        compiled.append({
+            'name': name,
+            # Priority 1 counts fully, each step down a little less
+            'weight': max(0.5, 1.0 - 0.1 * (info.get('priority', 1) - 1)),
+            'keywords': _keyword_pattern(info.get('keywords', [])),
+            'boost': _keyword_pattern(info.get('boost_keywords', [])),
+            'penalize': _keyword_pattern(info.get('penalize_keywords', [])),
+        })
+    return compiled
+
+
+def _age_hours(published_date: Optional[str], now: datetime) -> Optional[float]:
+    if not published_date:
+        return None
+    try:
+        published = datetime.fromisoformat(published_date.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if published.tzinfo is None:
+        published = published.replace(tzinfo=timezone.utc)
+    return max(0.0, (now - published).total_seconds() / 3600)
+
+
+def score_article(article: Dict, compiled_categories: List[Dict], now: datetime,
+                  recency_half_life_hours: float = 24) -> float:
+    """Local relevance score of one article (higher is better; roughly -0.5 to 1.5)."""
+    title = article.get('title', '').lower()
+    description = article.get('description', '').lower()
+
+    keyword_score = 0.0
+    adjustment = 0.0
+    for category in compiled_categories:
+        if category['keywords']:
+            hits = len(category['keywords'].findall(title)) + 0.5 * len(category['keywords'].findall(description))
+            keyword_score = max(keyword_score, min(1.0, hits / 2) * category['weight'])
+        if article.get('category_hint') == category['name']:
+            adjustment += CATEGORY_HINT_BONUS
+        if category['boost'] and category['boost'].search(title):
+            adjustment += SPORTS_BOOST
+        if category['penalize'] and category['penalize'].search(title):
+            adjustment -= SPORTS_PENALTY
+
+    age = _age_hours(article.get('published_date'), now)
+    recency = 0.5 ** (age / recency_half_life_hours) if age is not None else 0.25
+
+    coverage = min(MAX_COVERAGE_BONUS, COVERAGE_BONUS_PER_SOURCE * len(article.get('also_in') or []))
+
+    return (KEYWORD_WEIGHT * keyword_score + RECENCY_WEIGHT * recency + adjustment + coverage
+            + article.get('feedback_boost', 0.0))
+
+
+def _source_key(source: str) -> str:
+    # Hacker News variants share one cap, as in _enforce_source_diversity
+    return 'Hacker News: Front Page' if 'hacker news' in source.lower() else source
+
+
+def pre_rank(articles: List[Dict], categories: Dict[str, Dict], exact_count: int, candidate_count: int,
+             feedback_insights: Dict = None, recency_half_life_hours: float = 24) -> List[Dict]:
+    """
+    All articles, best first: the top candidate_count respect per-source caps, the rest follow by score.
+
+    Sets ``pre_rank_score`` on each article. Articles without a feedback_boost get
+    one from feedback_insights.
+    """
+    compiled_categories = _compile_categories(categories)
+    prepared_feedback = (prepare_feedback_boost(feedback_insights)
+                         if feedback_insights and feedback_insights.get('has_feedback') else None)
+    now = datetime.now(timezone.utc)
+
+    for article in articles:
+        if prepared_feedback and 'feedback_boost' not in article:
+            article['feedback_boost'] = feedback_boost(article, prepared_feedback)
+        article['pre_rank_score'] = round(score_article(article, compiled_categories, now, recency_half_life_hours), 4)
+    ranked = sorted(articles, key=lambda article: article['pre_rank_score'], reverse=True)
+
+    # Scale the digest's source caps to the candidate list
+    scale = max(1.0, candidate_count / max(exact_count, 1))
+    source_counts = Counter()
+    candidates = []
+    overflow = []
+    for article in ranked:
+        source = _source_key(article.get('source', 'Unknown'))
+        cap = math.ceil(SOURCE_MAX_CAPS.get(source, DEFAULT_SOURCE_MAX) * scale)
+        if len(candidates) < candidate_count and source_counts[source] < cap:
+            candidates.append(article)
+            source_counts[source] += 1
+        else:
+            overflow.append(article)
+
+    return candidates + overflow
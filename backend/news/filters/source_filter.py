@@ -24,29 +24,29 @@ EXCLUDED_SOURCES_GLOBAL = [
 ]
 
 
-def filter_sources(articles: List[Dict]) -> List[Dict]:
+def is_wanted_source(article: Dict) -> bool:
     """
-    Filter out articles from unwanted sources.
+    Whether an article's source passes the exclusion rules.
 
     Rules:
     - Times of India, MensHealth.com excluded from AI & Tech categories
     - r/tennis only allowed in SPORTS category
     """
-    filtered_articles = []
+    source = article.get('source', '').lower()
+    category = article.get('category_hint', article.get('category', ''))
 
-    for article in articles:
-        source = article.get('source', '')
-        category = article.get('category_hint', article.get('category', ''))
+    # Check global exclusions
+    if any(excluded.lower() in source for excluded in EXCLUDED_SOURCES_GLOBAL):
+        return False
 
-        # Check global exclusions
-        if any(excluded.lower() in source.lower() for excluded in EXCLUDED_SOURCES_GLOBAL):
-            continue
+    # Check AI & Tech category exclusions
+    if category != 'SPORTS':
+        if any(excluded.lower() in source for excluded in EXCLUDED_SOURCES_AI_TECH):
+            return False
 
-        # Check AI & Tech category exclusions
-        if category != 'SPORTS':
-            if any(excluded.lower() in source.lower() for excluded in EXCLUDED_SOURCES_AI_TECH):
-                continue
+    return True
 
-        filtered_articles.append(article)
 
-    return filtered_articles
+def filter_sources(articles: List[Dict]) -> List[Dict]:
+    """Filter out articles from unwanted sources (see is_wanted_source)."""
+    return [article for article in articles if is_wanted_source(article)]
@@ -0,0 +1,172 @@
+"""Streaming article pipeline: fetch → normalize → dedupe → source-filter → cluster → boost → split."""
+
+import hashlib
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from filters.dedup import DuplicateIndex, canonical_url, url_key
+from filters.source_filter import is_wanted_source
+from filters.feedback_analyzer import prepare_feedback_boost, feedback_boost
+
+STAGES = ('fetch', 'normalize', 'dedupe', 'source_filter', 'cluster', 'boost', 'split')
+
+# Source names (lowercase substrings) that belong in the Sports section
+SPORTS_SOURCE_MARKERS = ['espn', 'marca', 'si.com', 'tennis', 'guardian', 'bbc', 'cnn',
+                         'nyt > sports', 'ringer', 'r/tennis', 'r/nba', 'r/soccer', 'r/hyrox']
+
+
+def article_id(url: str) -> str:
+    """Stable ID for an article: a hash of its URL key (no tracking parameters, AMP or www.)."""
+    return hashlib.sha1(url_key(url).encode('utf-8')).hexdigest()[:16]
+
+
+def is_sports_article(article: Dict) -> bool:
+    source = article.get('source', '').lower()
+    return any(marker in source for marker in SPORTS_SOURCE_MARKERS)
+
+
+def is_aggregator(article: Dict) -> bool:
+    """Hacker News and subreddits link to stories other sources published"""
+    source = article.get('source', '').lower()
+    return 'hacker news' in source or source.startswith('r/')
+
+
+class StageCounters:
+    """Per-stage in/out counts and throughput for one pipeline run"""
+
+    def __init__(self):
+        self.stages = {}  # stage name -> {'in', 'out', 'started', 'finished'}
+
+    def _stage(self, name: str) -> Dict:
+        if name not in self.stages:
+            self.stages[name] = {'in': 0, 'out': 0, 'started': None, 'finished': None}
+        return self.stages[name]
+
+    def take(self, name: str, articles: Iterable[Dict]) -> Iterator[Dict]:
+        """Iterate a stage's input, counting it and timing the stage from first to last article"""
+        stage = self._stage(name)
+        stage['started'] = time.monotonic()
+        for article in articles:
+            stage['in'] += 1
+            yield article
+        stage['finished'] = time.monotonic()
+
+    def emit(self, name: str, article: Dict) -> Dict:
+        """Count an article a stage passes on"""
+        self._stage(name)['out'] += 1
+        return article
+
+    def summary(self) -> List[Dict]:
+        """[{'stage', 'in', 'out', 'dropped', 'seconds', 'per_second'}] in pipeline order"""
+        rows = []
+        # Stages start when first pulled (last stage first), so list them in pipeline order
+        names = sorted(self.stages, key=lambda name: STAGES.index(name) if name in STAGES else len(STAGES))
+        for name in names:
+            stage = self.stages[name]
+            seconds = (stage['finished'] or time.monotonic()) - stage['started'] if stage['started'] else 0.0
+            rows.append({
+                'stage': name,
+                'in': stage['in'],
+                'out': stage['out'],
+                'dropped': stage['in'] - stage['out'],
+                'seconds': round(seconds, 2),
+                'per_second': round(stage['in'] / seconds) if seconds > 0 else None,
+            })
+        return rows
+
+
+# ---- stages ----
+
+def fetch(sources: Iterable, counters: StageCounters,
+          on_source: Optional[Callable[[str, Dict], None]] = None) -> Iterator[Dict]:
+    """Articles from (name, outcome) pairs as each source finishes (see FetchStage.stream)."""
+    def source_articles():
+        for name, outcome in sources:
+            if on_source:
+                on_source(name, outcome)
+            yield from outcome['articles']
+
+    for article in counters.take('fetch', source_articles()):
+        yield counters.emit('fetch', article)
+
+
+def normalize(articles: Iterable[Dict], counters: StageCounters) -> Iterator[Dict]:
+    """Trimmed fields, a canonical URL and an ``id``; articles without a title or an http(s) URL are dropped."""
+    for article in counters.take('normalize', articles):
+        url = canonical_url(article.get('url') or '')
+        title = (article.get('title') or '').strip()
+        if not title or not url.startswith('http'):
+            continue
+        article['url'] = url
+        article['title'] = title
+        article['source'] = (article.get('source') or 'Unknown').strip()
+        article['description'] = (article.get('description') or '').strip()
+        article['id'] = article_id(url)
+        yield counters.emit('normalize', article)
+
+
+def dedupe(articles: Iterable[Dict], counters: StageCounters) -> Iterator[Dict]:
+    """First article for each ID."""
+    seen_ids = set()
+    for article in counters.take('dedupe', articles):
+        if article['id'] in seen_ids:
+            continue
+        seen_ids.add(article['id'])
+        yield counters.emit('dedupe', article)
+
+
+def drop_unwanted_sources(articles: Iterable[Dict], counters: StageCounters) -> Iterator[Dict]:
+    """Articles from wanted sources (see filters.source_filter)."""
+    for article in counters.take('source_filter', articles):
+        if is_wanted_source(article):
+            yield counters.emit('source_filter', article)
+
+
+def cluster(articles: Iterable[Dict], duplicates: DuplicateIndex, counters: StageCounters) -> Iterator[Dict]:
+    """One article per story, listing the other sources that carried it in ``also_in``.
+
+    A publisher's article represents its cluster over an aggregator's (HN,
+    Reddit) when both are in the same section; otherwise the first one seen
+    does. Clusters are held until the input runs out, so each representative
+    is final before any later stage sees it. Articles repeating a story that
+    made an earlier digest are dropped (see DuplicateIndex.was_selected).
+    """
+    clusters = {}  # cluster_id -> articles in arrival order
+    for article in counters.take('cluster', articles):
+        cluster_id = duplicates.assign(article)
+        if duplicates.was_selected(article):
+            continue
+        clusters.setdefault(cluster_id, []).append(article)
+
+    for cluster_id, members in clusters.items():
+        representative = members[0]
+        if is_aggregator(representative):
+            representative = next((member for member in members
+                                   if not is_aggregator(member)
+                                   and is_sports_article(member) == is_sports_article(members[0])),
+                                  representative)
+        also_in = []
+        for member in members:
+            if member['source'] != representative['source'] and member['source'] not in also_in:
+                also_in.append(member['source'])
+        representative['cluster_id'] = cluster_id
+        representative['also_in'] = also_in
+        yield counters.emit('cluster', representative)
+
+
+def boost(articles: Iterable[Dict], feedback_insights: Dict, counters: StageCounters) -> Iterator[Dict]:
+    """Articles with their feedback_boost set, when there is feedback."""
+    prepared = prepare_feedback_boost(feedback_insights) if feedback_insights['has_feedback'] else None
+    for article in counters.take('boost', articles):
+        if prepared:
+            article['feedback_boost'] = feedback_boost(article, prepared)
+        yield counters.emit('boost', article)
+
+
+def split_sections(articles: Iterable[Dict], counters: StageCounters) -> Dict[str, Dict[str, Dict]]:
+    """Drain the pipeline into {'tech': {id: article}, 'sports': {id: article}}."""
+    sections = {'tech': {}, 'sports': {}}
+    for article in counters.take('split', articles):
+        section = 'sports' if is_sports_article(article) else 'tech'
+        sections[section][article['id']] = counters.emit('split', article)
+    return sections
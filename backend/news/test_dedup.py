@@ -0,0 +1,67 @@
+"""Near-duplicate clustering of serialized and syndicated headlines (run with pytest from backend/news)."""
+
+import hashlib
+
+from filters.dedup import DuplicateIndex, title_tokens
+
+
+def make_article(title, url):
+    return {'id': hashlib.sha1(url.encode('utf-8')).hexdigest()[:16], 'title': title, 'url': url, 'source': 'Test'}
+
+
+def test_numbers_are_title_tokens():
+    assert title_tokens('Week 5 NFL picks') == {'week', '5', 'nfl', 'picks'}
+
+
+def test_serialized_headlines_are_separate_stories(tmp_path):
+    duplicates = DuplicateIndex(str(tmp_path / 'news.db'))
+    pairs = [
+        ('Week 5 NFL picks', 'Week 6 NFL picks'),
+        ('Premier League predictions: Gameweek 10', 'Premier League predictions: Gameweek 11'),
+        ('iOS 17 review: the best features', 'iOS 18 review: the best features'),
+    ]
+    for index, (first, second) in enumerate(pairs):
+        first_cluster = duplicates.assign(make_article(first, f'https://a.example.com/{index}'))
+        second_cluster = duplicates.assign(make_article(second, f'https://b.example.com/{index}'))
+        assert first_cluster != second_cluster, (first, second)
+
+
+def test_reworded_syndication_still_clusters(tmp_path):
+    duplicates = DuplicateIndex(str(tmp_path / 'news.db'))
+    first = duplicates.assign(make_article('OpenAI releases GPT-5 to all ChatGPT users',
+                                           'https://techcrunch.com/openai-gpt-5'))
+    second = duplicates.assign(make_article('OpenAI releases GPT-5 to all ChatGPT users today',
+                                            'https://news.ycombinator.com/item?id=1'))
+    assert first == second
+
+
+def test_next_edition_of_a_selected_story_is_kept(tmp_path):
+    db_path = str(tmp_path / 'news.db')
+    last_week = make_article('Week 5 NFL picks and predictions', 'https://espn.com/nfl/week-5')
+    duplicates = DuplicateIndex(db_path)
+    last_week['cluster_id'] = duplicates.assign(last_week)
+    duplicates.commit([last_week])
+
+    duplicates = DuplicateIndex(db_path)
+    this_week = make_article('Week 6 NFL picks and predictions', 'https://espn.com/nfl/week-6')
+    duplicates.assign(this_week)
+    assert not duplicates.was_selected(this_week)
+
+
+def test_resurfaced_selected_story_is_dropped(tmp_path):
+    db_path = str(tmp_path / 'news.db')
+    story = make_article('Apple unveils the M5 MacBook Pro with longer battery life',
+                         'https://theverge.com/apple-m5-macbook-pro')
+    duplicates = DuplicateIndex(db_path)
+    story['cluster_id'] = duplicates.assign(story)
+    duplicates.commit([story])
+
+    duplicates = DuplicateIndex(db_path)
+    same_story = make_article('Apple unveils the M5 MacBook Pro with longer battery life',
+                              'https://www.reddit.com/r/apple/comments/abc')
+    related_story = make_article('Apple M5 MacBook Pro benchmarks are in',
+                                 'https://arstechnica.com/m5-benchmarks')
+    duplicates.assign(same_story)
+    duplicates.assign(related_story)
+    assert duplicates.was_selected(same_story)
+    assert not duplicates.was_selected(related_story)
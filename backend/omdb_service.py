@@ -0,0 +1,217 @@
+"""
+Shared OMDb client for Rotten Tomatoes scores, IMDb ratings and runtime/year lookups
+"""
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from api_cache import api_cache, normalize_request
+from title_matcher import TRAILING_ARTICLE
+
+OMDB_API_KEY = os.getenv('OMDB_API_KEY', '4e9616c3')
+OMDB_BASE_URL = 'http://www.omdbapi.com/'
+
+DAY = 24 * 60 * 60
+
+_TRAILING_ARTICLE = re.compile(TRAILING_ARTICLE.pattern, re.IGNORECASE)
+
+
+class QuotaExceeded(requests.exceptions.RequestException):
+    """Raised instead of calling OMDb once the day's request quota is used up"""
+
+
+def search_title(title):
+    """Title as OMDb expects it: 'Fugitive, The' -> 'The Fugitive' (other commas are left alone)"""
+    title = ' '.join(str(title).split())
+    match = _TRAILING_ARTICLE.match(title)
+    if match:
+        title = f'{match.group(2)} {match.group(1)}{match.group(3)}'
+    return title
+
+
+def rt_score_from(record):
+    """Rotten Tomatoes score from an OMDb record, always with a % sign ('85%'); None if it has none"""
+    for rating in (record or {}).get('Ratings', []):
+        if rating.get('Source') == 'Rotten Tomatoes' and rating.get('Value'):
+            value = rating['Value']
+            return value if '%' in value else f'{value}%'
+    return None
+
+
+def _known(value):
+    return value if value and value != 'N/A' else None
+
+
+class OMDbClient:
+    """Coalescing, cached, quota-aware OMDb client shared by the app and scripts"""
+
+    def __init__(self, api_key=None, base_url=OMDB_BASE_URL, daily_quota=None, max_workers=None, timeout=10):
+        self.api_key = api_key if api_key is not None else OMDB_API_KEY
+        self.base_url = base_url
+        self.daily_quota = daily_quota or int(os.getenv('OMDB_DAILY_QUOTA', '1000'))
+        self.max_workers = max_workers or int(os.getenv('OMDB_MAX_WORKERS', '4'))
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._lock = threading.Lock()
+        self._in_flight = {}  # normalized request -> Future
+        self._quota_day = None
+        self._used_today = 0
+        self._exhausted_day = None
+        self._stats = {'lookups': 0, 'coalesced': 0, 'network_calls': 0, 'by_id': 0, 'by_title': 0,
+                       'not_found': 0, 'quota_refusals': 0}
+
+    # ---- quota ----
+
+    @staticmethod
+    def _today():
+        return int(time.time() // DAY)
+
+    def remaining(self):
+        """Requests left under today's quota (0 once OMDb itself has said the limit is reached)"""
+        with self._lock:
+            today = self._today()
+            if self._exhausted_day == today:
+                return 0
+            used = self._used_today if self._quota_day == today else 0
+            return max(self.daily_quota - used, 0)
+
+    def _take_quota(self):
+        with self._lock:
+            today = self._today()
+            if self._quota_day != today:
+                self._quota_day, self._used_today = today, 0
+            if self._exhausted_day == today or self._used_today >= self.daily_quota:
+                self._stats['quota_refusals'] += 1
+                raise QuotaExceeded(f'OMDb daily quota of {self.daily_quota} requests used up')
+            self._used_today += 1
+            self._stats['network_calls'] += 1
+
+    # ---- requests ----
+
+    def _fetch(self, params):
+        self._take_quota()
+        response = self.session.get(self.base_url, params={**params, 'apikey': self.api_key}, timeout=self.timeout)
+        if response.status_code == 401 and 'limit' in response.text.lower():
+            with self._lock:
+                self._exhausted_day = self._today()
+            raise QuotaExceeded('OMDb request limit reached')
+        return response
+
+    def _get(self, params):
+        """One (cached) OMDb request; identical requests already in flight share its response"""
+        key = normalize_request('omdb', self.base_url, params)
+        with self._lock:
+            self._stats['lookups'] += 1
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+            else:
+                self._stats['coalesced'] += 1
+        if not owner:
+            return future.result()
+
+        try:
+            response = api_cache.get('omdb', self.base_url, params, lambda: self._fetch(params))
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(response)
+            return response
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def lookup(self, title=None, year=None, imdb_id=None, kind='movie'):
+        """The OMDb record for an IMDb id, or else for a title (and year); None if OMDb has no match
+
+        Raises requests.exceptions.RequestException when OMDb can't be asked (network
+        errors, QuotaExceeded, CacheMiss in offline mode).
+        """
+        if imdb_id:
+            params = {'i': imdb_id}
+        elif title:
+            params = {'t': search_title(title), 'type': kind}
+            if year:
+                params['y'] = year
+        else:
+            return None
+        with self._lock:
+            self._stats['by_id' if imdb_id else 'by_title'] += 1
+
+        response = self._get(params)
+        response.raise_for_status()
+        data = response.json()
+        if data.get('Response') != 'True':
+            with self._lock:
+                self._stats['not_found'] += 1
+            return None
+
+        # Remember a title match under its IMDb id too, so the next lookup of this film by id is free
+        if not imdb_id and data.get('imdbID') and not getattr(response, 'from_cache', False):
+            api_cache.get('omdb', self.base_url, {'i': data['imdbID']}, lambda: response)
+        return data
+
+    def rt_score(self, title=None, year=None, imdb_id=None):
+        """Rotten Tomatoes score ('85%') for a film, by IMDb id when known; None if OMDb has none"""
+        return rt_score_from(self.lookup(title, year, imdb_id))
+
+    def imdb_rating(self, imdb_id):
+        """IMDb rating ('8.1') for an IMDb id; None if OMDb has none"""
+        if not imdb_id:
+            return None
+        return _known((self.lookup(imdb_id=imdb_id) or {}).get('imdbRating'))
+
+    def film_facts(self, title=None, year=None, imdb_id=None):
+        """{'rt_score', 'year', 'runtime', 'imdb_id'} for a film (each None if unknown); None if not found"""
+        record = self.lookup(title, year, imdb_id)
+        if record is None:
+            return None
+        runtime = _known(record.get('Runtime'))
+        year_value = _known(record.get('Year'))
+        return {
+            'rt_score': rt_score_from(record),
+            'year': int(year_value[:4]) if year_value and year_value[:4].isdigit() else None,
+            'runtime': int(runtime.split()[0]) if runtime and runtime.split()[0].isdigit() else None,
+            'imdb_id': _known(record.get('imdbID'))
+        }
+
+    # ---- bulk ----
+
+    def map(self, fn, items):
+        """Run ``fn(item)`` for every item on the bounded worker pool, yielding (item, result, error)
+
+        Results come back in completion order. Once the quota runs out the remaining
+        items fail fast with QuotaExceeded (cached answers are still served).
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='omdb') as executor:
+            def run(item):
+                try:
+                    return item, fn(item), None
+                except requests.exceptions.RequestException as e:
+                    return item, None, e
+
+            futures = [executor.submit(run, item) for item in items]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update(daily_quota=self.daily_quota, remaining_today=self.remaining(), max_workers=self.max_workers)
+        return stats
+
+
+# Every OMDb call in the app and scripts goes through this client
+omdb_client = OMDbClient()
@@ -1,7 +1,75 @@
+import os
 import requests
-import time
+from requests.adapters import HTTPAdapter
+from api_cache import api_cache
+from tmdb_service import TokenBucket
 
 OPEN_LIBRARY_BASE_URL = 'https://openlibrary.org'
+OPEN_LIBRARY_COVER_URL = 'https://covers.openlibrary.org/b/id/{cover_id}-L.jpg'
+
+# Requests per second across all threads (cache hits are free); Open Library asks bulk users to go easy
+OPEN_LIBRARY_RATE_LIMIT = float(os.getenv('OPEN_LIBRARY_RATE_LIMIT', '3'))
+
+# Search result fields the book enrichment uses
+SEARCH_FIELDS = 'key,title,author_name,first_publish_year,number_of_pages_median,isbn,cover_i,ratings_average,ratings_count'
+
+rate_limiter = TokenBucket(max(OPEN_LIBRARY_RATE_LIMIT, 1), max(OPEN_LIBRARY_RATE_LIMIT, 1) / OPEN_LIBRARY_RATE_LIMIT)
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(pool_connections=8, pool_maxsize=8))
+
+def _fetch(url, params=None):
+    """One Open Library request under the shared rate limit"""
+    rate_limiter.acquire()
+    return _session.get(url, params=params, timeout=10)
+
+def get_work(work_key):
+    """Fetch an Open Library work record (cached); returns the response"""
+    url = f'{OPEN_LIBRARY_BASE_URL}/works/{work_key}.json'
+    return api_cache.get('open_library', url, None, lambda: _fetch(url))
+
+def search_book(title, author=None, isbn=None, raise_errors=False):
+    """One Open Library search (by ISBN when known, else title/author) in the shape the book enrichment merges
+
+    Returns {'open_library_key', 'cover_url', 'isbn', 'page_count', 'year_written',
+    'average_rating', 'ratings_count'} or None. With ``raise_errors`` a failed request
+    raises instead of returning None.
+    """
+    if isbn:
+        params = {'q': f'isbn:{isbn}'}
+    elif title:
+        params = {'title': title}
+        if author:
+            params['author'] = author
+    else:
+        return None
+    params.update(limit=1, fields=SEARCH_FIELDS)
+
+    url = f'{OPEN_LIBRARY_BASE_URL}/search.json'
+    try:
+        response = api_cache.get('open_library', url, params, lambda: _fetch(url, params))
+        response.raise_for_status()
+        docs = response.json().get('docs') or []
+    except requests.exceptions.RequestException as e:
+        if raise_errors:
+            raise
+        print(f"Error searching Open Library for '{isbn or title}': {e}")
+        return None
+    if not docs:
+        return None
+
+    doc = docs[0]
+    isbns = doc.get('isbn') or []
+    rating = get_book_rating(doc)
+    return {
+        'open_library_key': doc.get('key'),
+        'cover_url': OPEN_LIBRARY_COVER_URL.format(cover_id=doc['cover_i']) if doc.get('cover_i') else None,
+        # Prefer the ISBN that was searched for, then any ISBN-13
+        'isbn': isbn or next((value for value in isbns if len(value) == 13), isbns[0] if isbns else None),
+        'page_count': doc.get('number_of_pages_median'),
+        'year_written': doc.get('first_publish_year'),
+        'average_rating': rating['average_rating'] if rating else None,
+        'ratings_count': rating['ratings_count'] if rating else None
+    }
 
 def search_book_by_isbn(isbn):
     """Search for a book by ISBN on Open Library"""
@@ -10,10 +78,8 @@ def search_book_by_isbn(isbn):
     
     try:
         # Open Library API endpoint for ISBN lookup
-        response = requests.get(
-            f'{OPEN_LIBRARY_BASE_URL}/isbn/{isbn}.json',
-            timeout=10
-        )
+        url = f'{OPEN_LIBRARY_BASE_URL}/isbn/{isbn}.json'
+        response = api_cache.get('open_library', url, None, lambda: _fetch(url))
         
         if response.status_code == 200:
             data = response.json()
@@ -40,11 +106,8 @@ def search_book_by_title_author(title, author=None):
             'limit': 1
         }
         
-        response = requests.get(
-            f'{OPEN_LIBRARY_BASE_URL}/search.json',
-            params=params,
-            timeout=10
-        )
+        url = f'{OPEN_LIBRARY_BASE_URL}/search.json'
+        response = api_cache.get('open_library', url, params, lambda: _fetch(url, params))
         
         if response.status_code == 200:
             data = response.json()
@@ -71,6 +134,13 @@ def get_book_rating(book_data):
                 'ratings_count': count
             }
     
+    # Search results carry them as ratings_average / ratings_count
+    if book_data.get('ratings_average') is not None and book_data.get('ratings_count'):
+        return {
+            'average_rating': book_data['ratings_average'],
+            'ratings_count': book_data['ratings_count']
+        }
+
     # Sometimes ratings are in a different format
     if 'average' in book_data:
         return {
@@ -90,10 +160,7 @@ def get_book_rating_by_isbn(isbn):
             work_key = works[0].get('key', '').replace('/works/', '')
             if work_key:
                 try:
-                    work_response = requests.get(
-                        f'{OPEN_LIBRARY_BASE_URL}/works/{work_key}.json',
-                        timeout=10
-                    )
+                    work_response = get_work(work_key)
                     if work_response.status_code == 200:
                         work_data = work_response.json()
                         return get_book_rating(work_data)
@@ -114,10 +181,7 @@ def get_book_rating_by_title_author(title, author=None):
         if work_keys and len(work_keys) > 0:
             work_key = work_keys[0].replace('/works/', '')
             try:
-                work_response = requests.get(
-                    f'{OPEN_LIBRARY_BASE_URL}/works/{work_key}.json',
-                    timeout=10
-                )
+                work_response = get_work(work_key)
                 if work_response.status_code == 200:
                     work_data = work_response.json()
                     return get_book_rating(work_data)
@@ -0,0 +1,93 @@
+"""
+Local poster thumbnails for films and shows
+"""
+import re
+
+from image_cache import image_store, ImageUnavailable, VARIANTS, PREBUILT_VARIANTS
+
+TMDB_POSTER_URL = re.compile(r'^https?://image\.tmdb\.org/t/p/[a-z0-9]+/([A-Za-z0-9_-]+\.(?:jpg|jpeg|png))$')
+POSTER_FILE = re.compile(r'^[A-Za-z0-9_-]+\.(?:jpg|jpeg|png)$')
+
+# Fetch TMDB's w780 rendition so the 'detail' width has the pixels it needs; w500 is what poster_url uses
+TMDB_SOURCE_SIZES = ('w780', 'w500')
+
+POSTER_TABLES = ('films', 'shows')
+
+
+def tmdb_poster_file(poster_url):
+    """'abc123.jpg' for a TMDB poster URL (any size); None for other URLs"""
+    match = TMDB_POSTER_URL.match(poster_url or '')
+    return match.group(1) if match else None
+
+
+def poster_source(poster_file):
+    """(image store source key, candidate URLs) for a TMDB poster file"""
+    return f'tmdb:{poster_file}', [f'https://image.tmdb.org/t/p/{size}/{poster_file}' for size in TMDB_SOURCE_SIZES]
+
+
+def poster_srcset(poster_url, poster_placeholder):
+    """srcset of the locally served widths of an ingested TMDB poster ('/api/posters/thumb/x.jpg 160w, ...'); None otherwise
+
+    poster_placeholder is only set once the poster job has built the variants, so posters that were never
+    ingested keep being served from poster_url instead of being fetched and resized on the request path.
+    """
+    poster_file = tmdb_poster_file(poster_url)
+    if poster_file is None or not poster_placeholder:
+        return None
+    return ', '.join(f'/api/posters/{variant}/{poster_file} {VARIANTS[variant]}w' for variant in PREBUILT_VARIANTS)
+
+
+def ingest_poster(poster_url):
+    """Fetch a TMDB poster and build its variants; returns its placeholder data URI (None if it has none)"""
+    poster_file = tmdb_poster_file(poster_url)
+    if poster_file is None:
+        return None
+    try:
+        _, placeholder = image_store.ingest(*poster_source(poster_file))
+    except ImageUnavailable as e:
+        print(f"Poster unavailable: {e}")
+        return None
+    return placeholder
+
+
+class PosterPlaceholders:
+    """Keeps poster_placeholder from outliving the poster it was built from"""
+
+    def __init__(self, use_postgres):
+        self._use_postgres = use_postgres
+
+    def ensure_schema(self, conn):
+        cursor = conn.cursor()
+        for table in POSTER_TABLES:
+            if self._use_postgres:
+                # Created once, like the SQLite trigger; an existing trigger (and its function) is left alone
+                cursor.execute(
+                    'SELECT 1 FROM pg_trigger WHERE tgname = %s AND tgrelid = %s::regclass',
+                    (f'{table}_poster_placeholder_reset', table)
+                )
+                if cursor.fetchone() is not None:
+                    continue
+                cursor.execute(f'''
+                    CREATE OR REPLACE FUNCTION {table}_poster_placeholder_reset() RETURNS trigger AS $$
+                    BEGIN
+                        IF NEW.poster_url IS DISTINCT FROM OLD.poster_url THEN
+                            NEW.poster_placeholder := NULL;
+                        END IF;
+                        RETURN NEW;
+                    END
+                    $$ LANGUAGE plpgsql
+                ''')
+                cursor.execute(f'''
+                    CREATE TRIGGER {table}_poster_placeholder_reset
+                    BEFORE UPDATE OF poster_url ON {table}
+                    FOR EACH ROW EXECUTE PROCEDURE {table}_poster_placeholder_reset()
+                ''')
+            else:
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS {table}_poster_placeholder_reset
+                    AFTER UPDATE OF poster_url ON {table}
+                    WHEN old.poster_url IS NOT new.poster_url
+                    BEGIN
+                        UPDATE {table} SET poster_placeholder = NULL WHERE id = new.id;
+                    END
+                ''')
@@ -0,0 +1,249 @@
+"""
+Stale-while-revalidate refresh of film/show watch providers
+"""
+import math
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+DAY = 24 * 60 * 60
+
+TTL_SECONDS = float(os.getenv('PROVIDER_TTL_DAYS', '30')) * DAY
+VIEWED_TTL_SECONDS = float(os.getenv('PROVIDER_VIEWED_TTL_DAYS', '3')) * DAY
+VIEW_WINDOW_SECONDS = float(os.getenv('PROVIDER_VIEW_WINDOW_DAYS', '30')) * DAY
+REFRESH_BUDGET = int(os.getenv('PROVIDER_REFRESH_BUDGET', '200'))
+REFRESH_INTERVAL_SECONDS = float(os.getenv('PROVIDER_REFRESH_INTERVAL_HOURS', '6')) * 60 * 60
+VIEW_FLUSH_SECONDS = float(os.getenv('PROVIDER_VIEW_FLUSH_SECONDS', '30'))
+
+TRACKED_TABLES = ('films', 'shows')
+
+
+def timestamp_seconds(value):
+    """Epoch seconds for a stored timestamp (datetime from PostgreSQL, text from SQLite); None if unset"""
+    if value in (None, ''):
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', ''))
+        except ValueError:
+            return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)  # CURRENT_TIMESTAMP and utcnow() are both UTC
+    return value.timestamp()
+
+
+class ProviderRefreshScheduler:
+    """View counts for films/shows plus the choice of which watch providers to refresh next"""
+
+    def __init__(self, use_postgres):
+        self._use_postgres = use_postgres
+        self._placeholder = '%s' if use_postgres else '?'
+        self._views = {}  # (table, id) -> views since the last flush
+        self._lock = threading.Lock()
+        self._thread = None
+        self._hooks = None  # (get_db, enqueue, in_flight), see attach
+        self.last_run = None
+
+    def ensure_schema(self, conn):
+        cursor = conn.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS item_views (
+                item_table TEXT NOT NULL,
+                item_id INTEGER NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                last_viewed_at REAL NOT NULL,
+                PRIMARY KEY (item_table, item_id)
+            )
+        ''')
+
+    # ---- view tracking ----
+
+    def record_view(self, table, item_id):
+        with self._lock:
+            key = (table, item_id)
+            self._views[key] = self._views.get(key, 0) + 1
+        if self._thread is None and self._hooks is not None:
+            self.start()
+
+    def tracks(self, table, id_arg):
+        """Decorator for a detail route: count a view of the item named by the ``id_arg`` URL parameter
+
+        Goes outside table_versions.conditional so that 304 answers are counted too.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                self.record_view(table, kwargs[id_arg])
+                return view(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def flush(self, conn):
+        """Add buffered view counts to item_views; returns {table: [ids viewed since the last flush]}"""
+        with self._lock:
+            views, self._views = self._views, {}
+        if not views:
+            return {}
+        now = time.time()
+        p = self._placeholder
+        cursor = conn.cursor()
+        viewed = {}
+        for (table, item_id), hits in views.items():
+            cursor.execute(f'''
+                INSERT INTO item_views (item_table, item_id, hits, last_viewed_at) VALUES ({p}, {p}, {p}, {p})
+                ON CONFLICT (item_table, item_id) DO UPDATE SET
+                    hits = item_views.hits + EXCLUDED.hits, last_viewed_at = EXCLUDED.last_viewed_at
+            ''', (table, item_id, hits, now))
+            viewed.setdefault(table, []).append(item_id)
+        conn.commit()
+        return viewed
+
+    def stale(self, conn, table, ids):
+        """The ids among ``ids`` whose providers are older than the viewed-item TTL (or were never fetched)"""
+        if not ids:
+            return []
+        p = self._placeholder
+        cursor = conn.cursor()
+        cursor.execute(
+            f'SELECT id, watch_providers_updated_at FROM {table} '
+            f'WHERE tmdb_id IS NOT NULL AND id IN ({", ".join([p] * len(ids))})', list(ids)
+        )
+        cutoff = time.time() - VIEWED_TTL_SECONDS
+        stale = []
+        for item_id, updated_at in cursor.fetchall():
+            refreshed = timestamp_seconds(updated_at)
+            if refreshed is None or refreshed < cutoff:
+                stale.append(item_id)
+        return stale
+
+    # ---- scheduling ----
+
+    def candidates(self, conn, now=None):
+        """Every item with a TMDB id whose providers are due, most overdue first
+
+        Returns dicts with table, id, title, hits, age_days and priority, where
+        priority = age / TTL scaled by 1 + ln(1 + hits).
+        """
+        now = now or time.time()
+        cursor = conn.cursor()
+        cursor.execute('SELECT item_table, item_id, hits, last_viewed_at FROM item_views')
+        views = {(table, item_id): (hits, last_viewed) for table, item_id, hits, last_viewed in cursor.fetchall()}
+
+        due = []
+        for table in TRACKED_TABLES:
+            cursor.execute(f'SELECT id, title, watch_providers_updated_at FROM {table} WHERE tmdb_id IS NOT NULL')
+            for item_id, title, updated_at in cursor.fetchall():
+                hits, last_viewed = views.get((table, item_id), (0, None))
+                recently_viewed = last_viewed is not None and now - last_viewed < VIEW_WINDOW_SECONDS
+                ttl = VIEWED_TTL_SECONDS if recently_viewed else TTL_SECONDS
+                refreshed = timestamp_seconds(updated_at)
+                age = now - refreshed if refreshed is not None else math.inf
+                if age < ttl:
+                    continue
+                priority = (age / ttl) * (1 + math.log1p(hits if recently_viewed else 0))
+                due.append({
+                    'table': table,
+                    'id': item_id,
+                    'title': title,
+                    'hits': hits,
+                    'age_days': round(age / DAY, 1) if refreshed is not None else None,
+                    'priority': priority
+                })
+        due.sort(key=lambda item: item['priority'], reverse=True)
+        for item in due:
+            item['priority'] = round(item['priority'], 2) if item['priority'] != math.inf else None
+        return due
+
+    def plan(self, conn, budget=REFRESH_BUDGET, in_flight=0):
+        """The items one pass should refresh: the top of ``candidates`` within what's left of the budget"""
+        due = self.candidates(conn)
+        return due[:max(budget - in_flight, 0)], len(due)
+
+    # ---- background loop ----
+
+    def attach(self, get_db, enqueue, in_flight):
+        """Give the background loop its database and queue; starts nothing
+
+        ``enqueue(table, ids)`` queues provider refreshes; ``in_flight()`` counts the ones
+        still pending, which come out of the next pass's budget.
+        """
+        self._hooks = (get_db, enqueue, in_flight)
+
+    def start(self, scheduled=False):
+        """Flush views and queue refreshes on a daemon thread (once per process; needs attach)
+
+        With ``scheduled`` the thread also runs a pass every REFRESH_INTERVAL_SECONDS;
+        only the designated runner process should ask for that.
+        """
+        get_db, enqueue, in_flight = self._hooks
+
+        def loop():
+            next_pass = (time.time() + VIEW_FLUSH_SECONDS
+                         if scheduled and REFRESH_INTERVAL_SECONDS > 0 else math.inf)
+            while True:
+                time.sleep(VIEW_FLUSH_SECONDS)
+                try:
+                    with get_db() as conn:
+                        for table, ids in self.flush(conn).items():
+                            stale = self.stale(conn, table, ids)
+                            if stale:
+                                enqueue(table, stale)
+                    if time.time() >= next_pass:
+                        self.run_pass(get_db, enqueue, in_flight())
+                        next_pass = time.time() + REFRESH_INTERVAL_SECONDS
+                except Exception as e:
+                    print(f"Error in watch provider refresh loop: {e}")
+
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=loop, name='provider-refresh', daemon=True)
+        self._thread.start()
+
+    def run_pass(self, get_db, enqueue, in_flight=0, budget=REFRESH_BUDGET):
+        """Queue one budgeted pass of refreshes; returns a summary"""
+        with get_db() as conn:
+            self.flush(conn)
+            chosen, due = self.plan(conn, budget, in_flight)
+        for table in TRACKED_TABLES:
+            ids = [item['id'] for item in chosen if item['table'] == table]
+            if ids:
+                enqueue(table, ids)
+        self.last_run = {
+            'at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'due': due,
+            'in_flight': in_flight,
+            'queued': len(chosen)
+        }
+        if chosen:
+            print(f"✓ Queued watch provider refresh for {len(chosen)} of {due} due items")
+        return self.last_run
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Queue a pass of watch provider refreshes')
+    parser.add_argument('--budget', type=int, default=REFRESH_BUDGET, help='Maximum refreshes to queue')
+    parser.add_argument('--dry-run', action='store_true', help='List what would be refreshed without queueing')
+    args = parser.parse_args()
+
+    os.environ['ENRICHMENT_WORKER_THREADS'] = '0'
+    os.environ['BATCH_JOB_RUNNER'] = '0'
+    os.environ['PROVIDER_REFRESH_RUNNER'] = '0'
+    from app import get_db, provider_refresh, queue_provider_refresh, enrichment_jobs
+
+    if args.dry_run:
+        with get_db() as conn:
+            chosen, due = provider_refresh.plan(conn, args.budget)
+        for item in chosen:
+            print(f"  {item['table']}/{item['id']} {item['title']}: "
+                  f"age {item['age_days'] if item['age_days'] is not None else 'never'} days, {item['hits']} views")
+        print(f"{len(chosen)} of {due} due items would be refreshed")
+    else:
+        result = provider_refresh.run_pass(get_db, queue_provider_refresh,
+                                           enrichment_jobs.count_active('providers'), args.budget)
+        print(f"Queued {result['queued']} of {result['due']} due items; run `python enrichment_jobs.py --once` "
+              f"if no app process is working the queue")
@@ -1,13 +1,13 @@
+import argparse
 import sqlite3
 import os
+from api_cache import add_cache_only_argument, apply_cache_args
 from tmdb_service import search_movie, get_movie_details
-import time
 from datetime import datetime
 
 # Configuration
 db_path = 'films.db'
 log_file = f'poster_refresh_log_{datetime.now().strftime("%Y%m%d_%H%M%S")}.txt'
-rate_limit_delay = 0.25  # 250ms between requests to respect TMDB rate limits
 
 def log_message(message):
     """Write message to both console and log file"""
@@ -78,9 +78,6 @@ def refresh_all_posters():
                 log_message(f"{progress} NOT FOUND: {title} ({release_year})")
                 stats['not_found'] += 1
 
-            # Rate limiting
-            time.sleep(rate_limit_delay)
-
         except Exception as e:
             log_message(f"{progress} ERROR: {title} ({release_year})")
             log_message(f"  Error: {str(e)}\n")
@@ -103,6 +100,10 @@ def refresh_all_posters():
     return stats
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Re-fetch all film posters from TMDB')
+    add_cache_only_argument(parser)
+    apply_cache_args(parser.parse_args())
+
     print("\n🎬 Starting poster refresh for all films...")
     print("This will take a few minutes (rate limited to respect TMDB API).\n")
 
@@ -1,7 +1,6 @@
 import sqlite3
 from tmdb_service import search_movie
 from datetime import datetime
-import time
 import os
 
 db_path = 'films.db'
@@ -70,8 +69,6 @@ def refresh_missing_posters():
                 log_message(f"  ✗ Not found on TMDB")
                 stats['not_found'] += 1
 
-            time.sleep(0.25)  # Rate limiting
-
         except Exception as e:
             log_message(f"  ⚠ Error: {e}")
             stats['errors'] += 1
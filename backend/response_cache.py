@@ -0,0 +1,102 @@
+"""
+In-process cache for expensive, read-mostly JSON endpoints (the analytics routes)
+"""
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import request, Response
+
+
+class ResponseCache:
+    """TTL + LRU bounded cache of serialized 200 responses, tagged by table"""
+
+    def __init__(self, version_source, max_entries=256, ttl_seconds=300):
+        self._version_source = version_source
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, tables, body, mimetype)
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'expired': 0,
+            'evictions': 0,
+            'invalidations': 0
+        }
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                self._stats['expired'] += 1
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry
+
+    def _store(self, key, tables, body, mimetype):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, tables, body, mimetype)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def invalidate(self, table):
+        """Drop every cached response that was computed from ``table``"""
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if table in entry[1]]
+            for key in stale:
+                del self._entries[key]
+            self._stats['invalidations'] += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def cached(self, *tables):
+        """Decorator for GET routes whose response depends only on ``tables`` and the URL"""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                try:
+                    versions = self._version_source(tables)
+                except Exception as e:
+                    print(f"Error reading table versions for response cache: {e}")
+                    return view(*args, **kwargs)
+
+                key = (
+                    request.path,
+                    request.query_string.decode(),
+                    tuple(versions[table][0] for table in tables)
+                )
+                entry = self._lookup(key)
+                if entry is not None:
+                    return Response(entry[2], mimetype=entry[3])
+
+                response = view(*args, **kwargs)
+                if isinstance(response, Response) and response.status_code == 200:
+                    self._store(key, tables, response.get_data(), response.mimetype)
+                return response
+            return wrapper
+        return decorator
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds
+            })
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else None
+        return stats
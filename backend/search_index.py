@@ -0,0 +1,239 @@
+"""
+Trigger-maintained full-text search over films, books and shows
+"""
+import re
+
+# base table -> indexed columns, as (column, weight). The first column is the title.
+INDEXED_COLUMNS = {
+    'films': [('title', 'A')],
+    'books': [('book_name', 'A'), ('author', 'B'), ('details_commentary', 'C'), ('description', 'D')],
+    'shows': [('title', 'A'), ('details_commentary', 'C')]
+}
+
+# Columns that may be stored as "Last, First" and also get a flipped copy in the FTS5 table
+NORMALIZED_COLUMNS = {'title', 'book_name', 'author'}
+
+# bm25 column weights for FTS5, by PostgreSQL weight class
+BM25_WEIGHTS = {'A': 10.0, 'B': 5.0, 'C': 1.0, 'D': 1.0}
+
+WORD_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def query_words(text):
+    """Lowercased words of a search string (what both backends tokenize on)"""
+    return WORD_PATTERN.findall((text or '').lower())
+
+
+class SearchIndex:
+    """Creates, queries and rebuilds the full-text index for each table"""
+
+    def __init__(self, use_postgres):
+        self._use_postgres = use_postgres
+        self._placeholder = '%s' if use_postgres else '?'
+
+    # ---- SQL building blocks ----
+
+    def _normalized_sql(self, expression):
+        """SQL turning 'Fugitive, The' into 'The Fugitive' (unchanged if there is no comma)"""
+        find = 'strpos' if self._use_postgres else 'instr'
+        return (f"CASE WHEN {find}({expression}, ', ') > 0 "
+                f"THEN substr({expression}, {find}({expression}, ', ') + 2) || ' ' || "
+                f"substr({expression}, 1, {find}({expression}, ', ') - 1) "
+                f"ELSE {expression} END")
+
+    def _fts_columns(self, table, prefix=''):
+        """(FTS5 column, weight, SQL over ``prefix``+base column that fills it) for a table"""
+        columns = []
+        for column, weight in INDEXED_COLUMNS[table]:
+            columns.append((column, weight, f'{prefix}{column}'))
+            if column in NORMALIZED_COLUMNS:
+                columns.append((f'{column}_normalized', weight, self._normalized_sql(f'{prefix}{column}')))
+        return columns
+
+    def _tsvector_sql(self, table, prefix):
+        parts = [
+            f"setweight(to_tsvector('simple', coalesce({prefix}.{column}, '')), '{weight}')"
+            for column, weight in INDEXED_COLUMNS[table]
+        ]
+        return ' || '.join(parts)
+
+    # ---- schema ----
+
+    def ensure_schema(self, conn):
+        """Create index tables and triggers, and (re)build any index that is out of step"""
+        cursor = conn.cursor()
+        for table in INDEXED_COLUMNS:
+            if self._use_postgres:
+                self._ensure_postgres(cursor, table)
+            else:
+                self._ensure_sqlite(cursor, table)
+
+        rebuilt = {}
+        for table in INDEXED_COLUMNS:
+            index_table = self._index_table(table)
+            cursor.execute(f'SELECT (SELECT COUNT(*) FROM {table}), (SELECT COUNT(*) FROM {index_table})')
+            base_count, indexed_count = cursor.fetchone()
+            if base_count != indexed_count:
+                rebuilt.update(self.rebuild(conn, [table]))
+        return rebuilt
+
+    def _index_table(self, table):
+        return f'{table}_search' if self._use_postgres else f'{table}_fts'
+
+    def _ensure_sqlite(self, cursor, table):
+        fts_table = self._index_table(table)
+        columns = self._fts_columns(table)
+        column_names = ', '.join(name for name, _, _ in columns)
+        source_columns = ', '.join(column for column, _ in INDEXED_COLUMNS[table])
+
+        cursor.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table}
+            USING fts5({column_names}, tokenize = "unicode61 remove_diacritics 2")
+        ''')
+
+        new_values = ', '.join(expression for _, _, expression in self._fts_columns(table, 'new.'))
+        insert_new = f'INSERT INTO {fts_table} (rowid, {column_names}) VALUES (new.id, {new_values});'
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {table} BEGIN
+                {insert_new}
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {table} BEGIN
+                DELETE FROM {fts_table} WHERE rowid = old.id;
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE OF {source_columns} ON {table} BEGIN
+                DELETE FROM {fts_table} WHERE rowid = old.id;
+                {insert_new}
+            END
+        ''')
+
+    def _ensure_postgres(self, cursor, table):
+        search_table = self._index_table(table)
+        source_columns = ', '.join(column for column, _ in INDEXED_COLUMNS[table])
+
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {search_table} (
+                id INTEGER PRIMARY KEY,
+                document TSVECTOR NOT NULL
+            )
+        ''')
+        cursor.execute(
+            f'CREATE INDEX IF NOT EXISTS idx_{search_table}_document ON {search_table} USING GIN (document)'
+        )
+        # Like the SQLite triggers, created once; an existing trigger (and its function) is left alone
+        cursor.execute(
+            'SELECT 1 FROM pg_trigger WHERE tgname = %s AND tgrelid = %s::regclass',
+            (f'{search_table}_sync', table)
+        )
+        if cursor.fetchone() is not None:
+            return
+        cursor.execute(f'''
+            CREATE OR REPLACE FUNCTION {search_table}_sync() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    DELETE FROM {search_table} WHERE id = OLD.id;
+                    RETURN OLD;
+                END IF;
+                INSERT INTO {search_table} (id, document)
+                VALUES (NEW.id, {self._tsvector_sql(table, 'NEW')})
+                ON CONFLICT (id) DO UPDATE SET document = EXCLUDED.document;
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER {search_table}_sync
+            AFTER INSERT OR DELETE OR UPDATE OF {source_columns} ON {table}
+            FOR EACH ROW EXECUTE PROCEDURE {search_table}_sync()
+        ''')
+
+    def rebuild(self, conn, tables=None):
+        """Repopulate the index from the base tables (all tables, or just ``tables``)"""
+        cursor = conn.cursor()
+        rebuilt = {}
+        for table in tables or INDEXED_COLUMNS:
+            index_table = self._index_table(table)
+            cursor.execute(f'DELETE FROM {index_table}')
+            if self._use_postgres:
+                cursor.execute(f'''
+                    INSERT INTO {index_table} (id, document)
+                    SELECT t.id, {self._tsvector_sql(table, 't')} FROM {table} t
+                ''')
+            else:
+                columns = self._fts_columns(table)
+                cursor.execute(f'''
+                    INSERT INTO {index_table} (rowid, {', '.join(name for name, _, _ in columns)})
+                    SELECT id, {', '.join(expression for _, _, expression in columns)} FROM {table}
+                ''')
+            cursor.execute(f'SELECT COUNT(*) FROM {index_table}')
+            rebuilt[table] = {'rows': cursor.fetchone()[0]}
+        return rebuilt
+
+    # ---- querying ----
+
+    def match_query(self, text):
+        """Backend-specific query matching every word as a prefix, or None if there are no words"""
+        words = query_words(text)
+        if not words:
+            return None
+        if self._use_postgres:
+            return ' & '.join(f'{word}:*' for word in words)
+        return ' '.join(f'"{word}"*' for word in words)
+
+    def filter_clause(self, table, column='id'):
+        """SQL fragment restricting ``column`` to matching items; takes match_query() as its one parameter"""
+        index_table = self._index_table(table)
+        p = self._placeholder
+        if self._use_postgres:
+            return f"{column} IN (SELECT id FROM {index_table} WHERE document @@ to_tsquery('simple', {p}))"
+        return f'{column} IN (SELECT rowid FROM {index_table} WHERE {index_table} MATCH {p})'
+
+    def search(self, cursor, table, text, limit=20):
+        """Run a ranked search on ``cursor`` and return the matching base-table rows, best first"""
+        match = self.match_query(text)
+        if match is None:
+            return []
+
+        p = self._placeholder
+        index_table = self._index_table(table)
+        title_column = INDEXED_COLUMNS[table][0][0]
+        # Titles that start with the query (in either "The Fugitive" or "Fugitive, The" form) come first
+        title_prefix = re.sub(r'([\\%_])', r'\\\1', text.strip()) + '%'
+        like = 'ILIKE' if self._use_postgres else 'LIKE'
+        starts_with = (f"(t.{title_column} {like} {p} ESCAPE '\\' OR "
+                       f"{self._normalized_sql(f't.{title_column}')} {like} {p} ESCAPE '\\')")
+
+        if self._use_postgres:
+            cursor.execute(f'''
+                SELECT t.*
+                FROM {index_table} s
+                JOIN {table} t ON t.id = s.id
+                WHERE s.document @@ to_tsquery('simple', {p})
+                ORDER BY {starts_with} DESC, ts_rank(s.document, to_tsquery('simple', {p})) DESC, t.id
+                LIMIT {p}
+            ''', (match, title_prefix, title_prefix, match, limit))
+        else:
+            weights = ', '.join(str(BM25_WEIGHTS[weight]) for _, weight, _ in self._fts_columns(table))
+            cursor.execute(f'''
+                SELECT t.*
+                FROM {index_table} f
+                JOIN {table} t ON t.id = f.rowid
+                WHERE {index_table} MATCH {p}
+                ORDER BY {starts_with} DESC, bm25({index_table}, {weights}), t.id
+                LIMIT {p}
+            ''', (match, title_prefix, title_prefix, limit))
+        return cursor.fetchall()
+
+
+if __name__ == '__main__':
+    from app import get_db, search_index
+
+    with get_db() as conn:
+        result = search_index.rebuild(conn)
+        conn.commit()
+
+    for table, info in result.items():
+        print(f"✓ Rebuilt {table} search index: {info['rows']} rows")
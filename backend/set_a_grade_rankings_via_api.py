@@ -11,6 +11,8 @@ import requests
 import os
 import sys
 
+from title_matcher import TitleIndex
+
 # Get API URL from environment or prompt user
 API_URL = os.getenv('API_URL')
 
@@ -59,27 +61,39 @@ def main():
     print(f"Setting A-grade rankings via API: {API_URL}")
     print("=" * 60)
     
-    # First, try to get all A-grade films to see their exact titles
+    # Fetch the A-grade candidates once (id/title/rating only) and match titles locally
     try:
         print("\nFetching A-grade films from database to check exact titles...")
-        films_response = requests.get(f'{API_URL}/films')
-        if films_response.status_code == 200:
-            all_films = films_response.json()
-            a_grade_films = [f for f in all_films if f.get('letter_rating') == 'A']
-            print(f"Found {len(a_grade_films)} A-grade films in database:")
-            for film in sorted(a_grade_films, key=lambda x: x.get('title', '')):
-                print(f"  - '{film.get('title')}'")
-            print()
+        films_response = requests.get(f'{API_URL}/films', params={'fields': 'title,letter_rating'})
+        films_response.raise_for_status()
+        a_grade_films = [f for f in films_response.json() if f.get('letter_rating') == 'A']
+        print(f"Found {len(a_grade_films)} A-grade films in database:")
+        for film in sorted(a_grade_films, key=lambda x: x.get('title', '')):
+            print(f"  - '{film.get('title')}'")
+        print()
     except Exception as e:
-        print(f"Could not fetch films list: {e}\n")
+        print(f"❌ Could not fetch films list: {e}")
+        print(f"\nMake sure the API_URL is correct: {API_URL}")
+        return
+    
+    title_index = TitleIndex((film['id'], film['title']) for film in a_grade_films)
     
-    # Prepare rankings to send
-    rankings_to_send = [{'title': item['title'], 'rank': item['rank']} for item in rankings]
+    operations = []
+    not_found = []
+    for item in rankings:
+        film_id, matched_title, score, candidates = title_index.resolve([item['title']])
+        if film_id is None:
+            not_found.append((item['title'], candidates))
+            continue
+        if score < 1.0:
+            print(f"  ~ '{item['title']}' matched '{matched_title}' (similarity {score})")
+        operations.append({'id': film_id, 'field': 'a_grade_rank', 'value': item['rank']})
     
+    # All rankings go out in a single request and are written in one transaction
     try:
         response = requests.post(
-            f'{API_URL}/admin/set-a-grade-rankings',
-            json={'rankings': rankings_to_send},
+            f'{API_URL}/admin/films/bulk-update',
+            json={'operations': operations},
             headers={'Content-Type': 'application/json'}
         )
         
@@ -87,12 +101,9 @@ def main():
             result = response.json()
             print(f"✅ Successfully updated {result.get('updated', 0)} rankings!")
             
-            not_found = result.get('not_found', [])
-            if not_found:
-                print(f"\n⚠ Could not find {len(not_found)} movies:")
-                for title in not_found:
-                    print(f"  - {title}")
-                print("\nPlease check the titles above and update them if needed.")
+            failed = [r for r in result.get('results', []) if r.get('status') != 'updated']
+            for failure in failed:
+                print(f"  ⚠ Film id {failure.get('id')}: {failure.get('status')} {failure.get('error', '')}")
         else:
             print(f"❌ Error: {response.status_code}")
             print(response.text)
@@ -101,7 +112,14 @@ def main():
         print(f"❌ Error connecting to API: {e}")
         print(f"\nMake sure the API_URL is correct: {API_URL}")
         print("You can set it via environment variable: export API_URL='https://your-api-url.com/api'")
+        return
+    
+    if not_found:
+        print(f"\n⚠ Could not find {len(not_found)} movies:")
+        for title, candidates in not_found:
+            hint = f" (did you mean: {', '.join(c['title'] for c in candidates)}?)" if candidates else ''
+            print(f"  - {title}{hint}")
+        print("\nPlease check the titles above and update them if needed.")
 
 if __name__ == '__main__':
     main()
-
@@ -0,0 +1,146 @@
+"""
+Per-table change counters used to answer conditional GETs
+"""
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import request, make_response
+
+
+class TableVersionTracker:
+    """Reads, caches and bumps the change counter of each tracked table"""
+
+    def __init__(self, get_db, use_postgres, tables, cache_seconds=1.0):
+        self._get_db = get_db
+        self._use_postgres = use_postgres
+        self._placeholder = '%s' if use_postgres else '?'
+        self.tables = tuple(tables)
+        self.cache_seconds = cache_seconds
+
+        self._lock = threading.Lock()
+        self._cache = {}  # table -> (version, updated_at_epoch)
+        self._fetched_at = 0.0
+        self._listeners = []
+        self._pending = {}  # id(conn) -> tables bumped in its open transaction
+
+    def ensure_schema(self, conn):
+        """Create the counters table and a row per tracked table (called from init_db)"""
+        cursor = conn.cursor()
+        timestamp_type = 'DOUBLE PRECISION' if self._use_postgres else 'REAL'
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS table_versions (
+                table_name TEXT PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0,
+                updated_at {timestamp_type}
+            )
+        ''')
+        for table in self.tables:
+            cursor.execute(
+                f'INSERT INTO table_versions (table_name, version, updated_at) '
+                f'VALUES ({self._placeholder}, 0, {self._placeholder}) ON CONFLICT (table_name) DO NOTHING',
+                (table, time.time())
+            )
+
+    def bump(self, conn, table):
+        """Increment a table's counter; run this in the same transaction as the write
+
+        Uses its own cursor so the caller's cursor.rowcount is left untouched.
+        Caches and listeners are notified by commit(), after the transaction ends.
+        """
+        cursor = conn.cursor()
+        cursor.execute(
+            f'UPDATE table_versions SET version = version + 1, updated_at = {self._placeholder} '
+            f'WHERE table_name = {self._placeholder}',
+            (time.time(), table)
+        )
+        with self._lock:
+            self._pending.setdefault(id(conn), set()).add(table)
+
+    def commit(self, conn):
+        """Commit ``conn``, then drop cached counters and notify listeners of the tables it bumped
+
+        Notifying before the commit would let a concurrent reader refill a cache
+        from the pre-write rows and keep serving them after the write lands.
+        """
+        conn.commit()
+        with self._lock:
+            tables = self._pending.pop(id(conn), set())
+        if not tables:
+            return
+        self.invalidate()
+        for table in sorted(tables):
+            for listener in self._listeners:
+                listener(table)
+
+    def add_listener(self, callback):
+        """Call ``callback(table)`` after a transaction that bumped a table's counter commits"""
+        self._listeners.append(callback)
+
+    def invalidate(self):
+        """Drop the cached counters so the next read goes to the database"""
+        with self._lock:
+            self._fetched_at = 0.0
+
+    def get(self, tables):
+        """Return {table: (version, updated_at_epoch)} for the requested tables"""
+        with self._lock:
+            if time.monotonic() - self._fetched_at < self.cache_seconds:
+                return {table: self._cache.get(table, (0, None)) for table in tables}
+
+        with self._get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT table_name, version, updated_at FROM table_versions')
+            rows = cursor.fetchall()
+
+        versions = {row[0]: (row[1], row[2]) for row in rows}
+        with self._lock:
+            self._cache = versions
+            self._fetched_at = time.monotonic()
+        return {table: versions.get(table, (0, None)) for table in tables}
+
+    def conditional(self, *tables):
+        """Decorator for GET routes: emit ETag/Last-Modified and answer 304 when unchanged"""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                try:
+                    versions = self.get(tables)
+                except Exception as e:
+                    # Counters unavailable (e.g. DB not initialized yet) - serve uncached
+                    print(f"Error reading table versions: {e}")
+                    return view(*args, **kwargs)
+
+                # Same table versions + same URL => byte-identical response, so a strong ETag is safe
+                fingerprint = '|'.join(f'{table}:{versions[table][0]}' for table in tables)
+                fingerprint += f'|{request.path}?{request.query_string.decode()}'
+                etag = hashlib.sha1(fingerprint.encode()).hexdigest()
+
+                timestamps = [versions[table][1] for table in tables if versions[table][1]]
+                last_modified = (
+                    datetime.fromtimestamp(int(max(timestamps)), tz=timezone.utc) if timestamps else None
+                )
+
+                not_modified = False
+                if request.if_none_match:
+                    not_modified = request.if_none_match.contains(etag)
+                elif last_modified and request.if_modified_since:
+                    not_modified = last_modified <= request.if_modified_since
+
+                if not_modified:
+                    response = make_response('', 304)
+                else:
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+
+                response.set_etag(etag)
+                if last_modified:
+                    response.last_modified = last_modified
+                # Browsers may keep the body but must revalidate with the ETag before reusing it
+                response.headers['Cache-Control'] = 'no-cache'
+                return response
+            return wrapper
+        return decorator
@@ -0,0 +1,165 @@
+"""
+In-memory, typo-tolerant title lookup
+"""
+import re
+import unicodedata
+from collections import defaultdict
+
+ARTICLES = ('the', 'a', 'an')
+TRAILING_ARTICLE = re.compile(r'^(.*?),\s*(the|a|an)\b(.*)$')
+
+# Fuzzy matches at or above this similarity are accepted automatically...
+DEFAULT_ACCEPT_SCORE = 0.9
+# ...and only if the runner-up is at least this far behind
+DEFAULT_ACCEPT_MARGIN = 0.05
+# Candidates below this similarity are not worth reporting
+MIN_CANDIDATE_SCORE = 0.5
+
+ROMAN_NUMERALS = {'ii', 'iii', 'iv', 'v', 'vi', 'vii', 'viii', 'ix', 'x', 'xi', 'xii'}
+
+
+def normalize_title(title):
+    """Canonical form of a title for comparison ('Fugitive, The' -> 'fugitive')"""
+    if not title:
+        return ''
+    text = unicodedata.normalize('NFKD', str(title))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).lower().strip()
+
+    # "Fugitive, The" / "Man in Full, A" / "House of Morgan, The - Subtitle"
+    match = TRAILING_ARTICLE.match(text)
+    if match:
+        text = f'{match.group(2)} {match.group(1)}{match.group(3)}'
+
+    text = text.replace('&', ' and ')
+    text = re.sub(r"['’]", '', text)  # "Schindler's" -> "schindlers"
+    words = re.sub(r'[^\w\s]', ' ', text).split()
+    if len(words) > 1 and words[0] in ARTICLES:
+        words = words[1:]
+    return ' '.join(words)
+
+
+def sequel_markers(normalized):
+    """Number-like words ('2', 'ii', 'iv') - titles that differ only in these are different films"""
+    return {word for word in normalized.split() if word.isdigit() or word in ROMAN_NUMERALS}
+
+
+def trigrams(text):
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b):
+    """Levenshtein distance between two strings"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb)
+            ))
+        previous = current
+    return previous[-1]
+
+
+def similarity(a, b):
+    """1.0 for identical normalized titles, falling towards 0.0 with edit distance"""
+    if not a and not b:
+        return 1.0
+    longest = max(len(a), len(b))
+    return 1.0 - edit_distance(a, b) / longest
+
+
+class TitleIndex:
+    """Exact + fuzzy lookup over a fixed set of (id, title) rows"""
+
+    def __init__(self, rows):
+        self._titles = {}                   # id -> original title
+        self._exact = defaultdict(list)     # normalized title -> [ids]
+        self._normalized = {}               # id -> normalized title
+        self._trigrams = defaultdict(set)   # trigram -> {ids}
+
+        for row_id, title in rows:
+            normalized = normalize_title(title)
+            if not normalized:
+                continue
+            self._titles[row_id] = title
+            self._normalized[row_id] = normalized
+            self._exact[normalized].append(row_id)
+            for gram in trigrams(normalized):
+                self._trigrams[gram].add(row_id)
+
+    def __len__(self):
+        return len(self._titles)
+
+    def exact(self, title):
+        """Ids whose normalized title equals this one's (oldest first)"""
+        return sorted(self._exact.get(normalize_title(title), []))
+
+    def candidates(self, title, limit=3, shortlist=25):
+        """Best fuzzy matches as [{id, title, score}], highest score first"""
+        normalized = normalize_title(title)
+        if not normalized:
+            return []
+
+        # Shortlist by shared trigrams, then score the shortlist by edit distance
+        query_grams = trigrams(normalized)
+        overlap = defaultdict(int)
+        for gram in query_grams:
+            for row_id in self._trigrams.get(gram, ()):
+                overlap[row_id] += 1
+        ranked = sorted(
+            overlap,
+            key=lambda row_id: -overlap[row_id] / len(query_grams | trigrams(self._normalized[row_id]))
+        )[:shortlist]
+
+        scored = []
+        for row_id in ranked:
+            score = similarity(normalized, self._normalized[row_id])
+            if score >= MIN_CANDIDATE_SCORE:
+                scored.append({'id': row_id, 'title': self._titles[row_id], 'score': round(score, 3)})
+        scored.sort(key=lambda candidate: (-candidate['score'], candidate['id']))
+        return scored[:limit]
+
+    def resolve(self, titles, accept_score=DEFAULT_ACCEPT_SCORE, accept_margin=DEFAULT_ACCEPT_MARGIN):
+        """Resolve a title (trying each alternative in turn) to one id
+
+        Returns (id, matched_title, score, candidates): an exact normalized match
+        scores 1.0; otherwise the best fuzzy candidate is used if it is confident
+        and unambiguous, and id is None with the candidates for review if not.
+        """
+        for title in titles:
+            ids = self.exact(title)
+            if ids:
+                return ids[0], self._titles[ids[0]], 1.0, []
+
+        best = []
+        for title in titles:
+            for candidate in self.candidates(title):
+                if all(candidate['id'] != existing['id'] for existing in best):
+                    best.append(candidate)
+        best.sort(key=lambda candidate: (-candidate['score'], candidate['id']))
+        best = best[:3]
+
+        if best and best[0]['score'] >= accept_score:
+            runner_up = best[1]['score'] if len(best) > 1 else 0.0
+            same_part = any(
+                sequel_markers(normalize_title(title)) == sequel_markers(self._normalized[best[0]['id']])
+                for title in titles
+            )
+            if same_part and best[0]['score'] - runner_up >= accept_margin:
+                return best[0]['id'], best[0]['title'], best[0]['score'], best
+        return None, None, None, best
+
+    def near_duplicates(self, title, min_score=DEFAULT_ACCEPT_SCORE):
+        """Ids of titles that are the same film modulo formatting or a small typo"""
+        normalized = normalize_title(title)
+        ids = self.exact(title)
+        for candidate in self.candidates(title, limit=5):
+            if (candidate['id'] not in ids and candidate['score'] >= min_score
+                    and sequel_markers(normalized) == sequel_markers(self._normalized[candidate['id']])):
+                ids.append(candidate['id'])
+        return ids
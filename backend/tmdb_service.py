@@ -1,11 +1,172 @@
 import requests
 import os
+import random
+import re
+import threading
 import time
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+from api_cache import api_cache
 
 TMDB_API_KEY = os.getenv('TMDB_API_KEY', '')
 TMDB_BASE_URL = 'https://api.themoviedb.org/3'
 TMDB_IMAGE_BASE_URL = 'https://image.tmdb.org/t/p/w500'
 
+
+class TokenBucket:
+    """Blocking token bucket: ``capacity`` requests per ``period`` seconds, refilled continuously"""
+
+    def __init__(self, capacity, period):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until one is available; returns seconds waited"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class TMDBClient:
+    """Shared TMDB HTTP client
+
+    - one pooled keep-alive requests.Session (no new TLS handshake per call)
+    - token-bucket limiting to TMDB's 40 requests / 10 seconds across all threads
+    - jittered exponential retries on 429/5xx and connection errors, honoring Retry-After
+    - per-endpoint call/error/retry counts and latency (see stats())
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, api_key=None, base_url=TMDB_BASE_URL, rate_limit=40, rate_period=10,
+                 max_retries=3, backoff_base=0.5, backoff_cap=8.0, timeout=10, pool_size=10):
+        self.api_key = api_key if api_key is not None else TMDB_API_KEY
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.limiter = TokenBucket(rate_limit, rate_period)
+
+        self._stats_lock = threading.Lock()
+        self._stats = {}  # endpoint -> counters
+        self._rate_limit_wait = 0.0
+
+    @staticmethod
+    def _endpoint_label(path):
+        """'/movie/603/watch/providers' -> '/movie/{id}/watch/providers'"""
+        return re.sub(r'/\d+', '/{id}', path)
+
+    def _retry_after(self, response):
+        header = response.headers.get('Retry-After') if response is not None else None
+        if not header:
+            return None
+        try:
+            return max(0.0, float(header))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(header).timestamp() - time.time())
+            except (TypeError, ValueError):
+                return None
+
+    def _backoff(self, attempt, response=None):
+        # "Full jitter": random delay up to the exponential cap, but never less than Retry-After
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+        retry_after = self._retry_after(response)
+        return max(delay, retry_after) if retry_after is not None else delay
+
+    def _record(self, endpoint, elapsed, error=False, retries=0):
+        with self._stats_lock:
+            entry = self._stats.setdefault(endpoint, {
+                'calls': 0, 'errors': 0, 'retries': 0, 'total_ms': 0.0, 'max_ms': 0.0
+            })
+            entry['calls'] += 1
+            entry['retries'] += retries
+            entry['total_ms'] += elapsed * 1000
+            entry['max_ms'] = max(entry['max_ms'], elapsed * 1000)
+            if error:
+                entry['errors'] += 1
+
+    def get(self, path, params=None, timeout=None, refresh=False):
+        """GET a TMDB API path (e.g. '/search/movie'); returns the final (possibly cached) response
+
+        Answers come from the on-disk api_cache when fresh (unless ``refresh``); otherwise
+        the request is made (rate limited, retried) and cached. Raises requests.exceptions.RequestException
+        when the request still fails after retries (connection errors, or CacheMiss in
+        offline mode) - HTTP error statuses are left to raise_for_status().
+        """
+        query = {'api_key': self.api_key}
+        query.update(params or {})
+        # Anything carrying watch providers (directly or appended) gets the shorter TTL
+        appended = str((params or {}).get('append_to_response', ''))
+        source = 'tmdb_watch_providers' if 'watch/providers' in path + appended else 'tmdb'
+        return api_cache.get(source, f'{self.base_url}{path}', query, lambda: self._fetch(path, query, timeout),
+                             refresh=refresh)
+
+    def _fetch(self, path, query, timeout):
+        endpoint = self._endpoint_label(path)
+        started = time.monotonic()
+        limiter_wait = 0.0  # excluded from latency, reported separately
+        retries = 0
+
+        while True:
+            waited = self.limiter.acquire()
+            if waited:
+                limiter_wait += waited
+                with self._stats_lock:
+                    self._rate_limit_wait += waited
+            try:
+                response = self.session.get(f'{self.base_url}{path}', params=query, timeout=timeout or self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if retries >= self.max_retries:
+                    self._record(endpoint, time.monotonic() - started - limiter_wait, error=True, retries=retries)
+                    raise
+                time.sleep(self._backoff(retries))
+                retries += 1
+                continue
+
+            if response.status_code in self.RETRY_STATUSES and retries < self.max_retries:
+                time.sleep(self._backoff(retries, response))
+                retries += 1
+                continue
+
+            self._record(endpoint, time.monotonic() - started - limiter_wait, error=response.status_code >= 400, retries=retries)
+            return response
+
+    def stats(self):
+        with self._stats_lock:
+            endpoints = {}
+            for endpoint, entry in self._stats.items():
+                endpoints[endpoint] = dict(entry)
+                endpoints[endpoint]['total_ms'] = round(entry['total_ms'], 1)
+                endpoints[endpoint]['max_ms'] = round(entry['max_ms'], 1)
+                endpoints[endpoint]['avg_ms'] = round(entry['total_ms'] / entry['calls'], 1) if entry['calls'] else None
+            return {
+                'endpoints': endpoints,
+                'rate_limit_wait_seconds': round(self._rate_limit_wait, 3)
+            }
+
+
+# Every TMDB call in the app and scripts goes through this client
+tmdb_client = TMDBClient()
+
 # TMDB Genre mapping
 GENRE_MAP = {
     28: 'Action',
@@ -43,7 +204,6 @@ def search_movie(title, year=None):
             search_title = f"{parts[1].strip()} {parts[0].strip()}"
 
     params = {
-        'api_key': TMDB_API_KEY,
         'query': search_title
     }
 
@@ -51,7 +211,7 @@ def search_movie(title, year=None):
         params['year'] = year
 
     try:
-        response = requests.get(f'{TMDB_BASE_URL}/search/movie', params=params)
+        response = tmdb_client.get('/search/movie', params=params)
         response.raise_for_status()
         data = response.json()
 
@@ -84,10 +244,7 @@ def get_movie_details(tmdb_id):
         return None
 
     try:
-        response = requests.get(
-            f'{TMDB_BASE_URL}/movie/{tmdb_id}',
-            params={'api_key': TMDB_API_KEY}
-        )
+        response = tmdb_client.get(f'/movie/{tmdb_id}')
         response.raise_for_status()
         data = response.json()
 
@@ -101,13 +258,54 @@ def get_movie_details(tmdb_id):
 
     return None
 
+def get_movie_external_ids(tmdb_id):
+    """Get external IDs (IMDb etc.) for a movie"""
+    if not TMDB_API_KEY or not tmdb_id:
+        return None
+
+    try:
+        response = tmdb_client.get(f'/movie/{tmdb_id}/external_ids')
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.RequestException as e:
+        print(f"Error getting external IDs for movie {tmdb_id}: {e}")
+
+    return None
+
+def get_movie_bundle(tmdb_id, country='US'):
+    """Details, external IDs and watch providers for a movie in one call (append_to_response)
+
+    Returns {runtime, release_date, title, imdb_id, watch_providers} - the combined
+    equivalent of get_movie_details, get_movie_external_ids and get_movie_watch_providers.
+    """
+    if not TMDB_API_KEY or not tmdb_id:
+        return None
+
+    try:
+        response = tmdb_client.get(f'/movie/{tmdb_id}', params={'append_to_response': 'external_ids,watch/providers'})
+        response.raise_for_status()
+        data = response.json()
+
+        providers = data.get('watch/providers', {}).get('results', {}).get(country, {})
+        return {
+            'runtime': data.get('runtime'),
+            'release_date': data.get('release_date'),
+            'title': data.get('title'),
+            'imdb_id': data.get('external_ids', {}).get('imdb_id') or data.get('imdb_id'),
+            'watch_providers': _format_watch_providers(providers) if providers else None
+        }
+    except requests.exceptions.RequestException as e:
+        print(f"Error getting movie bundle for ID {tmdb_id}: {e}")
+
+    return None
+
 def get_poster_url(title, year=None):
     """Get just the poster URL for a movie"""
     result = search_movie(title, year)
     return result['poster_url'] if result else None
 
-def batch_fetch_posters(films, delay=0.25):
-    """Fetch posters for multiple films with rate limiting"""
+def batch_fetch_posters(films):
+    """Fetch posters for multiple films (tmdb_client handles rate limiting)"""
     results = []
 
     for i, film in enumerate(films):
@@ -125,10 +323,6 @@ def batch_fetch_posters(films, delay=0.25):
             'poster_url': poster_url
         })
 
-        # Rate limiting - TMDB allows 40 requests per 10 seconds
-        if i < len(films) - 1:
-            time.sleep(delay)
-
     return results
 
 
@@ -160,7 +354,6 @@ def search_tv_show(title, year=None):
         return None
 
     params = {
-        'api_key': TMDB_API_KEY,
         'query': title
     }
 
@@ -168,7 +361,7 @@ def search_tv_show(title, year=None):
         params['first_air_date_year'] = year
 
     try:
-        response = requests.get(f'{TMDB_BASE_URL}/search/tv', params=params)
+        response = tmdb_client.get('/search/tv', params=params)
         response.raise_for_status()
         data = response.json()
 
@@ -203,18 +396,12 @@ def get_tv_show_details(tmdb_id):
 
     try:
         # Get show details
-        response = requests.get(
-            f'{TMDB_BASE_URL}/tv/{tmdb_id}',
-            params={'api_key': TMDB_API_KEY}
-        )
+        response = tmdb_client.get(f'/tv/{tmdb_id}')
         response.raise_for_status()
         data = response.json()
 
         # Get external IDs (for IMDB ID)
-        ext_response = requests.get(
-            f'{TMDB_BASE_URL}/tv/{tmdb_id}/external_ids',
-            params={'api_key': TMDB_API_KEY}
-        )
+        ext_response = tmdb_client.get(f'/tv/{tmdb_id}/external_ids')
         ext_data = ext_response.json() if ext_response.status_code == 200 else {}
 
         # Calculate total episodes
@@ -268,16 +455,16 @@ def get_tv_poster_url(title, year=None):
 
 TMDB_LOGO_BASE_URL = 'https://image.tmdb.org/t/p/original'
 
-def get_movie_watch_providers(tmdb_id, country='US'):
-    """Get streaming/rent/buy providers for a movie"""
+def get_movie_watch_providers(tmdb_id, country='US', raise_errors=False, refresh=False):
+    """Get streaming/rent/buy providers for a movie (None if it has none; with raise_errors, failures raise)
+
+    ``refresh`` asks TMDB even when the API cache holds a fresh answer.
+    """
     if not TMDB_API_KEY or not tmdb_id:
         return None
 
     try:
-        response = requests.get(
-            f'{TMDB_BASE_URL}/movie/{tmdb_id}/watch/providers',
-            params={'api_key': TMDB_API_KEY}
-        )
+        response = tmdb_client.get(f'/movie/{tmdb_id}/watch/providers', refresh=refresh)
         response.raise_for_status()
         data = response.json()
 
@@ -287,20 +474,22 @@ def get_movie_watch_providers(tmdb_id, country='US'):
 
         return _format_watch_providers(results)
     except requests.exceptions.RequestException as e:
+        if raise_errors:
+            raise
         print(f"Error getting watch providers for movie {tmdb_id}: {e}")
         return None
 
 
-def get_tv_watch_providers(tmdb_id, country='US'):
-    """Get streaming/rent/buy providers for a TV show"""
+def get_tv_watch_providers(tmdb_id, country='US', raise_errors=False, refresh=False):
+    """Get streaming/rent/buy providers for a TV show (None if it has none; with raise_errors, failures raise)
+
+    ``refresh`` asks TMDB even when the API cache holds a fresh answer.
+    """
     if not TMDB_API_KEY or not tmdb_id:
         return None
 
     try:
-        response = requests.get(
-            f'{TMDB_BASE_URL}/tv/{tmdb_id}/watch/providers',
-            params={'api_key': TMDB_API_KEY}
-        )
+        response = tmdb_client.get(f'/tv/{tmdb_id}/watch/providers', refresh=refresh)
         response.raise_for_status()
         data = response.json()
 
@@ -310,6 +499,8 @@ def get_tv_watch_providers(tmdb_id, country='US'):
 
         return _format_watch_providers(results)
     except requests.exceptions.RequestException as e:
+        if raise_errors:
+            raise
         print(f"Error getting watch providers for TV show {tmdb_id}: {e}")
         return None
 
@@ -1,62 +1,35 @@
+import argparse
 import sqlite3
-import requests
 import time
+from requests.exceptions import RequestException
+from api_cache import api_cache, CacheMiss, add_cache_only_argument, apply_cache_args
+from omdb_service import omdb_client, QuotaExceeded
 
 DATABASE = 'films.db'
-OMDB_API_KEY = '4e9616c3'
-OMDB_BASE_URL = 'http://www.omdbapi.com/'
 
 def get_all_films():
-    """Get all films from the database"""
+    """Get all films from the database (with their IMDb ids, where the column exists yet)"""
     conn = sqlite3.connect(DATABASE)
     cursor = conn.cursor()
 
-    cursor.execute('''
-        SELECT id, title, release_year, rotten_tomatoes
-        FROM films
-        ORDER BY id
-    ''')
+    try:
+        cursor.execute('''
+            SELECT id, title, release_year, rotten_tomatoes, imdb_id
+            FROM films
+            ORDER BY id
+        ''')
+    except sqlite3.OperationalError:
+        # imdb_id is added by the app on startup; before that every lookup is by title
+        cursor.execute('''
+            SELECT id, title, release_year, rotten_tomatoes, NULL
+            FROM films
+            ORDER BY id
+        ''')
 
     films = cursor.fetchall()
     conn.close()
     return films
 
-def fetch_rt_score_from_omdb(title, year):
-    """Fetch Rotten Tomatoes score from OMDb API"""
-    # Handle titles in "Last, First" format (e.g., "Fugitive, The" -> "The Fugitive")
-    search_title = title
-    if ',' in title:
-        parts = title.split(',', 1)
-        if len(parts) == 2:
-            search_title = f"{parts[1].strip()} {parts[0].strip()}"
-
-    params = {
-        'apikey': OMDB_API_KEY,
-        't': search_title,
-        'type': 'movie'
-    }
-
-    # Only include year if we have it
-    if year:
-        params['y'] = year
-
-    try:
-        response = requests.get(OMDB_BASE_URL, params=params)
-        response.raise_for_status()
-        data = response.json()
-
-        if data.get('Response') == 'True':
-            # Get Rotten Tomatoes score
-            ratings = data.get('Ratings', [])
-            for rating in ratings:
-                if rating.get('Source') == 'Rotten Tomatoes':
-                    return rating.get('Value')  # Returns like "85%"
-
-        return None
-    except Exception as e:
-        print(f"Error fetching data: {e}")
-        return None
-
 def update_rt_score(film_id, rt_score):
     """Update the Rotten Tomatoes score in the database"""
     conn = sqlite3.connect(DATABASE)
@@ -77,11 +50,27 @@ def main():
     unchanged = 0
     not_found = 0
     cleared = 0
+    skipped = 0
 
-    for i, (film_id, title, year, current_rt) in enumerate(films, 1):
+    for i, (film_id, title, year, current_rt, imdb_id) in enumerate(films, 1):
         print(f"[{i}/{total}] Checking: {title} ({year or 'unknown'})...")
 
-        rt_score = fetch_rt_score_from_omdb(title, year)
+        network_calls = api_cache.network_calls()
+        try:
+            rt_score = omdb_client.rt_score(title, year, imdb_id)
+        except CacheMiss:
+            # Offline and never fetched - leave the stored score alone
+            print(f"  - Skipped (not cached)")
+            skipped += 1
+            continue
+        except QuotaExceeded as e:
+            print(f"  - Stopping: {e}")
+            skipped += total - i + 1
+            break
+        except RequestException as e:
+            print(f"  - Skipped ({e})")
+            skipped += 1
+            continue
 
         if rt_score:
             if rt_score != current_rt:
@@ -101,8 +90,8 @@ def main():
                 print(f"  ✗ Not found (no RT score available)")
                 not_found += 1
 
-        # Rate limiting: 1 request per second to be safe
-        if i < total:
+        # Rate limiting: 1 request per second to be safe (cached answers cost nothing)
+        if i < total and api_cache.network_calls() > network_calls:
             time.sleep(1)
 
     print(f"\n{'='*50}")
@@ -112,7 +101,12 @@ def main():
     print(f"  Already correct: {unchanged}")
     print(f"  Cleared (not in OMDb): {cleared}")
     print(f"  Not found: {not_found}")
+    if skipped:
+        print(f"  Skipped (not cached / OMDb unavailable): {skipped}")
     print(f"{'='*50}")
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Update Rotten Tomatoes scores for all films from OMDb')
+    add_cache_only_argument(parser)
+    apply_cache_args(parser.parse_args())
     main()
@@ -17,6 +17,9 @@ const getApiUrl = () => {
 }
 const API_URL = getApiUrl()
 
+// Page size for streaming list endpoints (server caps this at 500)
+const PAGE_SIZE = 250
+
 // Consolidated component for both films and books
 function ItemsApp({ config }) {
   const location = useLocation()
@@ -231,8 +234,9 @@ function ItemsApp({ config }) {
     updateURL(searchTerm, activeFilter, sortConfig, showAnalytics)
   }, [searchTerm, activeFilter, sortConfig, showAnalytics, updateURL])
 
-  // Fetch all items
+  // Fetch all items page by page so the first page renders without waiting for the full payload
   const fetchItems = async () => {
+    let showedCache = false
     try {
       // Try to load from cache first
       const cached = localStorage.getItem(config.cacheKey)
@@ -242,20 +246,37 @@ function ItemsApp({ config }) {
           if (cachedData && Array.isArray(cachedData) && cachedData.length > 0) {
             setItems(cachedData)
             setIsLoading(false)
+            showedCache = true
           }
         } catch (e) {
           console.error(`Error parsing cached ${config.type}:`, e)
         }
       }
 
-      // Fetch fresh data
-      const cacheParam = config.type === 'books' ? `?_t=${Date.now()}` : ''
-      const fetchOptions = config.type === 'books' ? { cache: 'no-store' } : {}
+      // Fetch fresh data (the API sends ETags with Cache-Control: no-cache, so the browser
+      // revalidates each page and unchanged pages come back as cheap 304s)
+      let data = []
+      let cursor = null
+
+      do {
+        const params = new URLSearchParams({ limit: PAGE_SIZE })
+        if (cursor) params.set('cursor', cursor)
+
+        const response = await fetch(`${API_URL}/${config.apiEndpoint}?${params}`)
+        const page = await response.json()
+        if (!page || !Array.isArray(page.items)) break
 
-      const response = await fetch(`${API_URL}/${config.apiEndpoint}${cacheParam}`, fetchOptions)
-      const data = await response.json()
+        data = data.concat(page.items)
+        cursor = page.next_cursor
+
+        // Stream pages in as they arrive unless the cached list is already on screen
+        if (!showedCache && data.length > 0) {
+          setItems(data)
+          setIsLoading(false)
+        }
+      } while (cursor)
 
-      if (data && Array.isArray(data) && data.length > 0) {
+      if (data.length > 0) {
         setItems(data)
         setIsLoading(false)
         setHasLoadedOnce(true)
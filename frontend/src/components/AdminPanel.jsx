@@ -79,6 +79,8 @@ function AdminPanel({ onLogout }) {
           setMessage('Film updated successfully!')
         } else if (result.metadata_fetched) {
           setMessage('Film added successfully! Metadata (poster, genres, runtime) auto-fetched from TMDB.')
+        } else if (result.enrichment_jobs?.length) {
+          setMessage('Film added successfully! Metadata (poster, genres, runtime) is being fetched in the background.')
         } else {
           setMessage('Film added successfully!')
         }
@@ -95,6 +95,8 @@ function BookAdminPanel({ onLogout }) {
           setMessage('Book updated successfully!')
         } else if (result.metadata_fetched) {
           setMessage('Book added successfully! Metadata (cover, rating) auto-fetched from Google Books.')
+        } else if (result.enrichment_jobs?.length) {
+          setMessage('Book added successfully! Metadata (cover, rating) is being fetched in the background.')
         } else {
           setMessage('Book added successfully!')
         }
@@ -172,13 +172,14 @@ function BookList({ books, onEdit, onDelete, viewMode = 'grid' }) {
   }
 
   // Helper function to get image URL - simplified like films
-  const getImageUrl = (coverUrl, googleBooksId) => {
+  // size: 'thumb' (list rows) or 'grid' (cards), resized and cached by the backend image store
+  const getImageUrl = (coverUrl, googleBooksId, size = 'grid') => {
     if (!coverUrl || coverUrl === 'PLACEHOLDER') return null
     if (!coverUrl.startsWith('http')) return null
     
-    // For Google Books URLs with ID, use stable publisher URL format
+    // Google Books covers go through the cover proxy, which caches them locally and serves a resized copy
     if (googleBooksId && (coverUrl.includes('books.google.com') || coverUrl.includes('googleapis.com') || coverUrl.includes('googleusercontent.com'))) {
-      return `https://books.google.com/books/publisher/content/images/frontcover/${googleBooksId}?fife=w480-h690`
+      return `${API_URL}/books/cover-proxy?book_id=${encodeURIComponent(googleBooksId)}&url=${encodeURIComponent(coverUrl)}&size=${size}`
     }
     
     // For all other URLs, use directly (like films do)
@@ -189,7 +190,7 @@ function BookList({ books, onEdit, onDelete, viewMode = 'grid' }) {
     return (
       <div className="film-list-view">
         {books.map((book, index) => {
-          const imageUrl = getImageUrl(book.cover_url, book.google_books_id)
+          const imageUrl = getImageUrl(book.cover_url, book.google_books_id, 'thumb')
           const shouldLoadEagerly = index < 10
           const shouldPrioritize = index < 30 // First 30 get priority hints
           
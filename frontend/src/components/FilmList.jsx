@@ -1,4 +1,5 @@
 import React, { useState, useEffect } from 'react'
+import { GRID_POSTER_SIZES, posterImageProps, posterPlaceholderStyle, fallBackToPosterUrl } from '../utils/posterImages'
 
 // Major streaming providers we want to show (TMDB provider IDs)
 const MAJOR_PROVIDERS = {
@@ -220,11 +221,12 @@ function FilmList({ films, onEdit, onDelete, viewMode = 'grid' }) {
             <div key={film.id} className="film-row">
               {film.poster_url && (
                 <img
-                  src={film.poster_url}
+                  {...posterImageProps(film, '60px')}
                   alt={`${film.title} poster`}
                   className="film-poster-small"
                   loading={shouldLoadEagerly ? "eager" : "lazy"}
                   fetchPriority={shouldLoadEagerly ? "high" : (shouldPrioritize ? "auto" : "low")}
+                  onError={(e) => fallBackToPosterUrl(e, film)}
                 />
               )}
             <div className="film-row-content">
@@ -280,14 +282,20 @@ function FilmList({ films, onEdit, onDelete, viewMode = 'grid' }) {
                 <div className="poster-container">
                   {film.poster_url && film.poster_url !== 'PLACEHOLDER' ? (
                     <>
-                      {!loadedImages.has(film.id) && <div className="poster-skeleton"></div>}
+                      {!loadedImages.has(film.id) && (
+                        <div
+                          className={`poster-skeleton ${film.poster_placeholder ? 'poster-lqip' : ''}`}
+                          style={posterPlaceholderStyle(film)}
+                        ></div>
+                      )}
                       <img
-                        src={film.poster_url}
+                        {...posterImageProps(film, GRID_POSTER_SIZES)}
                         alt={`${film.title} poster`}
                         className={`film-poster ${loadedImages.has(film.id) ? 'loaded' : ''}`}
                         loading={shouldLoadEagerly ? "eager" : "lazy"}
                         fetchPriority={shouldLoadEagerly ? "high" : (shouldPrioritize ? "auto" : "low")}
                         onLoad={() => handleImageLoad(film.id)}
+                        onError={(e) => fallBackToPosterUrl(e, film)}
                       />
                     </>
                   ) : (
@@ -346,11 +354,12 @@ function FilmList({ films, onEdit, onDelete, viewMode = 'grid' }) {
                 <div className="card-back-header">
                   {film.poster_url && film.poster_url !== 'PLACEHOLDER' && (
                     <img
-                      src={film.poster_url}
+                      {...posterImageProps(film, '87px')}
                       alt={`${film.title} poster`}
                       className="poster-thumbnail"
                       loading="lazy"
                       fetchPriority={shouldPrioritize ? "auto" : "low"}
+                      onError={(e) => fallBackToPosterUrl(e, film)}
                     />
                   )}
                   <div className="header-text">
@@ -82,6 +82,8 @@ function ShowAdminPanel({ onLogout }) {
           setMessage('Show updated successfully!')
         } else if (result.metadata_fetched) {
           setMessage('Show added successfully! Metadata (poster, IMDB rating) auto-fetched.')
+        } else if (result.enrichment_jobs?.length) {
+          setMessage('Show added successfully! Metadata (poster, IMDB rating) is being fetched in the background.')
         } else {
           setMessage('Show added successfully!')
         }
@@ -1,7 +1,5 @@
 import React, { useState, useEffect } from 'react'
-
-const API_URL = import.meta.env.VITE_API_URL ||
-  (import.meta.env.PROD ? 'https://web-production-01d1.up.railway.app/api' : 'http://localhost:5001/api')
+import { GRID_POSTER_SIZES, posterImageProps, posterPlaceholderStyle, fallBackToPosterUrl } from '../utils/posterImages'
 
 // Major streaming providers we want to show (TMDB provider IDs)
 const MAJOR_PROVIDERS = {
@@ -184,12 +182,12 @@ function ShowList({ shows, onEdit, onDelete, viewMode = 'grid' }) {
             <div key={show.id} className="film-row">
               {show.poster_url && (
                 <img
-                  src={show.poster_url}
+                  {...posterImageProps(show, '60px')}
                   alt={`${show.title} poster`}
                   className="film-poster-small"
                   loading={shouldLoadEagerly ? "eager" : "lazy"}
                   fetchPriority={shouldLoadEagerly ? "high" : (shouldPrioritize ? "auto" : "low")}
-                  onError={(e) => { e.target.style.display = 'none' }}
+                  onError={(e) => { if (!fallBackToPosterUrl(e, show)) e.target.style.display = 'none' }}
                 />
               )}
               <div className="film-row-content">
@@ -230,15 +228,20 @@ function ShowList({ shows, onEdit, onDelete, viewMode = 'grid' }) {
                 <div className="poster-container">
                   {show.poster_url && show.poster_url !== 'PLACEHOLDER' ? (
                     <>
-                      {!loadedImages.has(show.id) && <div className="poster-skeleton"></div>}
+                      {!loadedImages.has(show.id) && (
+                        <div
+                          className={`poster-skeleton ${show.poster_placeholder ? 'poster-lqip' : ''}`}
+                          style={posterPlaceholderStyle(show)}
+                        ></div>
+                      )}
                       <img
-                        src={show.poster_url}
+                        {...posterImageProps(show, GRID_POSTER_SIZES)}
                         alt={`${show.title} poster`}
                         className={`film-poster ${loadedImages.has(show.id) ? 'loaded' : ''}`}
                         loading={shouldLoadEagerly ? "eager" : "lazy"}
                         fetchPriority={shouldLoadEagerly ? "high" : (shouldPrioritize ? "auto" : "low")}
                         onLoad={() => handleImageLoad(show.id)}
-                        onError={(e) => { e.target.style.display = 'none' }}
+                        onError={(e) => { if (!fallBackToPosterUrl(e, show)) e.target.style.display = 'none' }}
                       />
                     </>
                   ) : (
@@ -284,12 +287,12 @@ function ShowList({ shows, onEdit, onDelete, viewMode = 'grid' }) {
                 <div className="card-back-header">
                   {show.poster_url && show.poster_url !== 'PLACEHOLDER' && (
                     <img
-                      src={show.poster_url}
+                      {...posterImageProps(show, '87px')}
                       alt={`${show.title} poster`}
                       className="poster-thumbnail"
                       loading="lazy"
                       fetchPriority={shouldPrioritize ? "auto" : "low"}
-                      onError={(e) => { e.target.style.display = 'none' }}
+                      onError={(e) => { if (!fallBackToPosterUrl(e, show)) e.target.style.display = 'none' }}
                     />
                   )}
                   <div className="header-text">
@@ -0,0 +1,26 @@
+const API_URL = import.meta.env.VITE_API_URL ||
+  (import.meta.env.PROD ? 'https://web-production-01d1.up.railway.app/api' : 'http://localhost:5001/api')
+
+// poster_srcset lists locally resized posters as backend paths ("/api/posters/thumb/x.jpg 160w, ...");
+// src is the smallest, so tiles start with a thumbnail and the browser picks a sharper width when it needs one
+const API_ORIGIN = new URL(API_URL).origin
+export const GRID_POSTER_SIZES = '(max-width: 555px) 90vw, (max-width: 767px) 45vw, 270px'
+
+export const posterImageProps = (item, sizes) => {
+  if (!item.poster_srcset) return { src: item.poster_url }
+  const srcSet = item.poster_srcset.split(', ').map((entry) => `${API_ORIGIN}${entry}`).join(', ')
+  return { src: srcSet.split(' ')[0], srcSet, sizes }
+}
+
+// Blurred inline preview shown in the skeleton until the poster loads
+export const posterPlaceholderStyle = (item) => (
+  item.poster_placeholder ? { backgroundImage: `url(${item.poster_placeholder})` } : undefined
+)
+
+// If the local copy can't be served, fall back to the stored poster URL once
+export const fallBackToPosterUrl = (e, item) => {
+  if (!e.target.srcset) return false
+  e.target.removeAttribute('srcset')
+  e.target.src = item.poster_url
+  return true
+}